@@ -9,13 +9,19 @@ Features:
 - Task decomposition
 - Memory and context
 - Error recovery
+- Parallel actions: independent tool calls in one step run concurrently
+- Tool-call cache: idempotent tools (web_search, read_file, calculator) are memoized
+- Incremental prompts: Ollama's context is reused instead of re-sending history
 """
 
 import os
+import re
 import json
+import time
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any, Callable
+from collections import OrderedDict
+from typing import Dict, List, Optional, Any, Callable, Tuple
 from datetime import datetime
 from dataclasses import dataclass, field
 from abc import ABC, abstractmethod
@@ -78,6 +84,10 @@ class AgentTask:
 class AgentTool(ABC):
     """Base class for agent tools"""
 
+    # Seconds a result may be reused for identical arguments (None = never cached).
+    # Only set this for tools without side effects.
+    cache_ttl: Optional[float] = None
+
     @property
     @abstractmethod
     def name(self) -> str:
@@ -99,10 +109,16 @@ class AgentTool(ABC):
         """Execute the tool and return result"""
         pass
 
+    def cache_key(self, **kwargs) -> str:
+        """Key identifying a call for memoization (override to add freshness checks)"""
+        return json.dumps(kwargs, sort_keys=True, default=str)
+
 
 class WebSearchTool(AgentTool):
     """Search the web for information"""
 
+    cache_ttl = 600.0
+
     @property
     def name(self) -> str:
         return "web_search"
@@ -119,6 +135,10 @@ class WebSearchTool(AgentTool):
         }
 
     async def execute(self, query: str, num_results: int = 5) -> str:
+        # Blocking HTTP runs in a thread so parallel actions overlap
+        return await asyncio.to_thread(self._search, query, num_results)
+
+    def _search(self, query: str, num_results: int) -> str:
         try:
             import requests
             from bs4 import BeautifulSoup
@@ -151,6 +171,8 @@ class WebSearchTool(AgentTool):
 class FileReadTool(AgentTool):
     """Read contents of a file"""
 
+    cache_ttl = float('inf')  # Key includes mtime/size, so edits invalidate
+
     @property
     def name(self) -> str:
         return "read_file"
@@ -166,6 +188,14 @@ class FileReadTool(AgentTool):
             "max_lines": {"type": "integer", "description": "Max lines to read", "default": 100}
         }
 
+    def cache_key(self, path: str = "", max_lines: int = 100, **kwargs) -> str:
+        try:
+            stat = os.stat(path)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+        return json.dumps([os.path.abspath(path), max_lines, version, kwargs], sort_keys=True, default=str)
+
     async def execute(self, path: str, max_lines: int = 100) -> str:
         try:
             from pathlib import Path
@@ -250,7 +280,8 @@ class ShellCommandTool(AgentTool):
             return f"Command '{base_cmd}' not allowed. Allowed: {', '.join(self.ALLOWED_COMMANDS)}"
 
         try:
-            result = subprocess.run(
+            result = await asyncio.to_thread(
+                subprocess.run,
                 command,
                 shell=True,
                 capture_output=True,
@@ -325,6 +356,8 @@ class CodeExecuteTool(AgentTool):
 class CalculatorTool(AgentTool):
     """Perform calculations"""
 
+    cache_ttl = float('inf')
+
     @property
     def name(self) -> str:
         return "calculator"
@@ -407,6 +440,21 @@ class FinalAnswerTool(AgentTool):
 # AUTONOMOUS AGENT
 # ============================================================================
 
+@dataclass
+class _PromptSession:
+    """Per-task prompt state for incremental ReAct prompts"""
+    context: Optional[List[int]] = None  # Ollama's encoded conversation so far
+    history: List[str] = field(default_factory=list)  # Formatted steps, for full prompts
+    pending: List[str] = field(default_factory=list)  # Observations the model has not seen yet
+
+
+# Tool results that describe a failure are never memoized
+TOOL_ERROR_PREFIXES = ("Search error:", "Error", "Calculation error:", "File not found:",
+                       "Not a file:", "Tool error:", "Unknown tool:")
+
+ACTION_RE = re.compile(r"ACTION:\s*([\w-]+)")
+
+
 class AutonomousAgent:
     """
     Autonomous agent with ReAct reasoning pattern
@@ -417,11 +465,25 @@ class AutonomousAgent:
         self,
         name: str = "Alfred",
         max_steps: int = 10,
-        ai_provider: str = "ollama"
+        ai_provider: str = "ollama",
+        max_parallel_actions: int = 4,
+        tool_cache_size: int = 256
     ):
+        """
+        Initialize agent
+
+        Args:
+            name: Agent name (used in prompts and logs)
+            max_steps: Maximum LLM round-trips per task
+            ai_provider: AI backend ('ollama', falls back to simple reasoning)
+            max_parallel_actions: Independent actions executed per step
+            tool_cache_size: Memoized results kept for cacheable tools
+        """
         self.name = name
         self.max_steps = max_steps
         self.ai_provider = ai_provider
+        self.max_parallel_actions = max(1, max_parallel_actions)
+        self.tool_cache_size = tool_cache_size
         self.logger = logging.getLogger(f"Agent.{name}")
 
         # Initialize tools
@@ -432,6 +494,17 @@ class AutonomousAgent:
         self.current_task: Optional[AgentTask] = None
         self.task_history: List[AgentTask] = []
 
+        # Tool-call memoization (shared by every task this agent runs)
+        self._tool_cache: "OrderedDict[Tuple[str, str], Tuple[float, str]]" = OrderedDict()
+        self._inflight: Dict[Tuple[str, str], asyncio.Future] = {}
+        self._sessions: Dict[str, _PromptSession] = {}
+
+        self.stats = {
+            'llm_calls': 0,
+            'tool_calls': 0,
+            'cache_hits': 0
+        }
+
         # AI clients
         self.ollama = None
         self._init_ai()
@@ -465,6 +538,10 @@ class AutonomousAgent:
         """Register a custom tool"""
         self.tools[tool.name] = tool
 
+    def clear_tool_cache(self):
+        """Forget memoized tool results"""
+        self._tool_cache.clear()
+
     def get_tools_description(self) -> str:
         """Get formatted description of all tools"""
         descriptions = []
@@ -505,18 +582,20 @@ class AutonomousAgent:
             for step in range(1, self.max_steps + 1):
                 print(f"\n--- Step {step}/{self.max_steps} ---")
 
-                # Get next action from AI
-                thought = await self._think_and_act(task, step)
-                task.thoughts.append(thought)
+                # Get next action(s) from AI
+                thoughts = await self._think_and_act(task, step)
+                task.thoughts.extend(thoughts)
 
-                print(f"Thought: {thought.thought[:100]}...")
-                print(f"Action: {thought.action}")
-                print(f"Observation: {thought.observation[:200]}...")
+                print(f"Thought: {thoughts[0].thought[:100]}...")
+                for thought in thoughts:
+                    print(f"Action: {thought.action}")
+                    print(f"Observation: {thought.observation[:200]}...")
 
                 # Check if task is complete
-                if "TASK_COMPLETE" in thought.observation:
+                done = next((t for t in thoughts if "TASK_COMPLETE" in t.observation), None)
+                if done:
                     task.status = TaskStatus.COMPLETED
-                    task.result = thought.observation.replace("TASK_COMPLETE: ", "")
+                    task.result = done.observation.replace("TASK_COMPLETE: ", "")
                     task.completed_at = datetime.now().isoformat()
                     break
 
@@ -530,6 +609,7 @@ class AutonomousAgent:
             task.error = str(e)
             self.logger.error(f"Task failed: {e}")
 
+        self._sessions.pop(task.id, None)
         self.task_history.append(task)
         self.current_task = None
 
@@ -543,16 +623,68 @@ class AutonomousAgent:
 
         return task
 
-    async def _think_and_act(self, task: AgentTask, step: int) -> AgentThought:
-        """Generate thought and execute action"""
+    async def _think_and_act(self, task: AgentTask, step: int) -> List[AgentThought]:
+        """Generate thought and execute the chosen action(s) concurrently"""
+        session = self._sessions.setdefault(task.id, _PromptSession())
 
-        # Build context from previous steps
-        history = ""
-        for t in task.thoughts:
-            history += f"\nStep {t.step}:\nThought: {t.thought}\nAction: {t.action}\nObservation: {t.observation}\n"
+        # Get AI response
+        if self.ollama:
+            prompt = self._build_prompt(task, session)
+            response, session.context = await asyncio.to_thread(
+                self.ollama.generate_with_context,
+                prompt,
+                session.context,
+                model=self.ollama.primary_model
+            )
+            session.pending.clear()
+            self.stats['llm_calls'] += 1
+        else:
+            # Fallback to simple pattern matching
+            response = self._simple_reasoning(task, step)
 
-        # Create prompt
-        prompt = f"""You are {self.name}, an autonomous AI agent.
+        thought_text, actions = self._parse_response(response)
+        if len(actions) > self.max_parallel_actions:
+            self.logger.warning(f"Step {step}: running first {self.max_parallel_actions} of {len(actions)} actions")
+            actions = actions[:self.max_parallel_actions]
+
+        # Independent actions run at the same time
+        observations = await asyncio.gather(
+            *(self._execute_action(action, action_input) for action, action_input in actions)
+        )
+
+        thoughts = [
+            AgentThought(
+                step=step,
+                thought=thought_text,
+                action=action,
+                action_input=action_input,
+                observation=observation
+            )
+            for (action, action_input), observation in zip(actions, observations)
+        ]
+
+        for t in thoughts:
+            session.history.append(
+                f"\nStep {t.step}:\nThought: {t.thought}\nAction: {t.action}\nObservation: {t.observation}\n"
+            )
+            session.pending.append(f"OBSERVATION ({t.action}): {t.observation}")
+
+        return thoughts
+
+    def _build_prompt(self, task: AgentTask, session: _PromptSession) -> str:
+        """
+        Prompt for the next step
+
+        With an Ollama context the model has already seen the goal, tools and
+        its own earlier replies, so only the new observations are sent.
+        Otherwise (first step, or the context was lost) the full prompt is
+        built from the accumulated history.
+        """
+        if session.context and session.pending:
+            return "\n".join(session.pending) + "\n\nWhat is your next step?"
+
+        history = "".join(session.history)
+        return f"""You are {self.name}, an autonomous AI agent.
 
 GOAL: {task.goal}
 
@@ -568,51 +700,76 @@ THOUGHT: <your reasoning about what to do next>
 ACTION: <tool_name>
 ACTION_INPUT: <JSON object with tool parameters>
 
+If several actions do not depend on each other (e.g. two searches), you may
+repeat the ACTION/ACTION_INPUT lines for each; they run at the same time.
+
 When you have achieved the goal, use the 'final_answer' tool.
 
 What is your next step?"""
 
-        # Get AI response
-        if self.ollama:
-            response = self.ollama.generate(prompt, model=self.ollama.primary_model)
-        else:
-            # Fallback to simple pattern matching
-            response = self._simple_reasoning(task, step)
-
-        # Parse response
+    @staticmethod
+    def _parse_response(response: str) -> Tuple[str, List[Tuple[str, Dict]]]:
+        """Extract the thought and every (action, action_input) pair from a reply"""
         thought_text = ""
-        action = "think"
-        action_input = {"thought": "Processing..."}
-
-        try:
-            if "THOUGHT:" in response:
-                thought_text = response.split("THOUGHT:")[1].split("ACTION:")[0].strip()
-            if "ACTION:" in response:
-                action = response.split("ACTION:")[1].split("ACTION_INPUT:")[0].strip().lower()
-            if "ACTION_INPUT:" in response:
-                input_str = response.split("ACTION_INPUT:")[1].strip()
-                # Try to parse JSON
-                action_input = json.loads(input_str)
-        except Exception:
-            pass
-
-        # Execute action
-        observation = await self._execute_action(action, action_input)
-
-        return AgentThought(
-            step=step,
-            thought=thought_text,
-            action=action,
-            action_input=action_input,
-            observation=observation
-        )
+        if "THOUGHT:" in response:
+            thought_text = response.split("THOUGHT:")[1].split("ACTION:")[0].strip()
+
+        decoder = json.JSONDecoder()
+        actions = []
+        matches = list(ACTION_RE.finditer(response))
+        for i, match in enumerate(matches):
+            end = matches[i + 1].start() if i + 1 < len(matches) else len(response)
+            segment = response[match.end():end]
+            action_input: Any = {}
+            if "ACTION_INPUT:" in segment:
+                try:
+                    action_input, _ = decoder.raw_decode(segment.split("ACTION_INPUT:", 1)[1].strip())
+                except ValueError:
+                    pass
+            actions.append((match.group(1).lower(), action_input if isinstance(action_input, dict) else {}))
+
+        if not actions:
+            actions = [("think", {"thought": "Processing..."})]
+        return thought_text, actions
 
     async def _execute_action(self, action: str, action_input: Dict) -> str:
-        """Execute a tool action"""
+        """Execute a tool action (memoized for cacheable tools)"""
         if action not in self.tools:
             return f"Unknown tool: {action}. Available: {list(self.tools.keys())}"
 
         tool = self.tools[action]
+        if tool.cache_ttl is None:
+            return await self._run_tool(tool, action_input)
+
+        key = (action, tool.cache_key(**action_input))
+        cached = self._tool_cache.get(key)
+        if cached and cached[0] > time.monotonic():
+            self._tool_cache.move_to_end(key)
+            self.stats['cache_hits'] += 1
+            return cached[1]
+
+        # Identical call already running (e.g. in the same step): share its result
+        inflight = self._inflight.get(key)
+        if inflight is not None:
+            self.stats['cache_hits'] += 1
+            return await asyncio.shield(inflight)
+
+        future = asyncio.ensure_future(self._run_tool(tool, action_input))
+        self._inflight[key] = future
+        try:
+            result = await future
+        finally:
+            self._inflight.pop(key, None)
+
+        if not result.startswith(TOOL_ERROR_PREFIXES):
+            self._tool_cache[key] = (time.monotonic() + tool.cache_ttl, result)
+            self._tool_cache.move_to_end(key)
+            while len(self._tool_cache) > self.tool_cache_size:
+                self._tool_cache.popitem(last=False)
+        return result
+
+    async def _run_tool(self, tool: AgentTool, action_input: Dict) -> str:
+        self.stats['tool_calls'] += 1
         try:
             result = await tool.execute(**action_input)
             return result
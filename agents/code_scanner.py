@@ -0,0 +1,377 @@
+"""
+ALFRED Code Scanner - Parallel, incremental pattern scanning of source trees
+
+Used by AlfredSecurityAgent when Strix is not available.
+
+Features:
+- Precompiled, lower-cased patterns run over one lower-cased copy of each
+  file (fast literal-prefix search instead of IGNORECASE scanning)
+- Line numbers from a newline-offset index (bisect) instead of re-counting
+- Process pool across files, no file cap
+- Results cached by file content hash; files whose size/mtime are unchanged
+  are not even re-read
+
+Author: Daniel J Rita (BATDAN)
+License: Proprietary - Part of ALFRED-UBX
+"""
+
+import bisect
+import hashlib
+import json
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+
+# Patterns for common vulnerabilities
+VULN_PATTERNS: Dict[str, List[str]] = {
+    "SQL Injection": [
+        r'execute\s*\(\s*["\'].*%s',
+        r'cursor\.execute\s*\(\s*f["\']',
+        r'\+\s*["\'].*SELECT.*FROM',
+    ],
+    "Command Injection": [
+        r'os\.system\s*\(',
+        r'subprocess\.call\s*\(\s*[^,\]]+\s*,\s*shell\s*=\s*True',
+        r'eval\s*\(',
+        r'exec\s*\(',
+    ],
+    "Hardcoded Secrets": [
+        r'password\s*=\s*["\'][^"\']+["\']',
+        r'api_key\s*=\s*["\'][^"\']+["\']',
+        r'secret\s*=\s*["\'][^"\']+["\']',
+        r'token\s*=\s*["\'][A-Za-z0-9]{20,}["\']',
+    ],
+    "XSS Vulnerability": [
+        r'innerHTML\s*=',
+        r'document\.write\s*\(',
+        r'\.html\s*\([^)]*\+',
+    ],
+    "Path Traversal": [
+        r'open\s*\([^)]*\+[^)]*\)',
+        r'Path\s*\([^)]*\+',
+    ],
+}
+
+
+def _lower_pattern(pattern: str) -> str:
+    """Lower-case a regex's literals, leaving escapes (\\S, \\W, ...) intact"""
+    out = []
+    chars = iter(pattern)
+    for char in chars:
+        if char == '\\':
+            out.append(char + next(chars, ''))
+        else:
+            out.append(char.lower())
+    return ''.join(out)
+
+
+# Case-insensitive matching is done once per file by lower-casing the text and
+# running case-sensitive, lower-cased patterns: their literal prefixes then use
+# re's fast search (IGNORECASE, or one big alternation, scans several times slower)
+COMPILED_PATTERNS: List[Tuple[str, "re.Pattern"]] = [
+    (vuln_type, re.compile(_lower_pattern(pattern)))
+    for vuln_type, patterns in VULN_PATTERNS.items()
+    for pattern in patterns
+]
+
+# For the rare text whose lower-case form has a different length (offsets would shift)
+IGNORECASE_PATTERNS: List[Tuple[str, "re.Pattern"]] = [
+    (vuln_type, re.compile(pattern, re.IGNORECASE))
+    for vuln_type, patterns in VULN_PATTERNS.items()
+    for pattern in patterns
+]
+
+# Cached results are only valid for the ruleset that produced them
+RULESET_VERSION = hashlib.sha1(json.dumps(VULN_PATTERNS, sort_keys=True).encode()).hexdigest()[:12]
+
+DEFAULT_EXTENSIONS = ('.py', '.js', '.ts')
+DEFAULT_EXCLUDE_DIRS = frozenset({'.git', 'node_modules', '__pycache__', '.venv', 'venv', '.tox'})
+
+# (vuln_type, line, snippet)
+Hit = Tuple[str, int, str]
+
+
+class LineIndex:
+    """Newline offsets of a text; line lookups are O(log n)"""
+
+    def __init__(self, text: str):
+        offsets = []
+        pos = text.find('\n')
+        while pos >= 0:
+            offsets.append(pos)
+            pos = text.find('\n', pos + 1)
+        self._offsets = offsets
+
+    def line_of(self, pos: int) -> int:
+        """1-based line number of a character offset"""
+        return bisect.bisect_left(self._offsets, pos) + 1
+
+
+def scan_text(text: str) -> List[Hit]:
+    """
+    Match every vulnerability pattern against a text
+
+    Args:
+        text: Source code
+
+    Returns:
+        (vuln_type, line, snippet) per match, grouped by pattern in ruleset order
+    """
+    lowered = text.lower()
+    if len(lowered) == len(text):
+        haystack, patterns = lowered, COMPILED_PATTERNS
+    else:
+        haystack, patterns = text, IGNORECASE_PATTERNS
+
+    index: Optional[LineIndex] = None
+    hits: List[Hit] = []
+    for vuln_type, pattern in patterns:
+        for match in pattern.finditer(haystack):
+            if index is None:
+                index = LineIndex(text)
+            hits.append((vuln_type, index.line_of(match.start()), text[match.start():match.end()][:100]))
+    return hits
+
+
+def _scan_file(path: str) -> Tuple[str, Optional[str], List[Hit]]:
+    """Read, hash and scan one file (runs in worker processes)"""
+    try:
+        data = Path(path).read_bytes()
+    except OSError as e:
+        logging.debug(f"Error scanning {path}: {e}")
+        return path, None, []
+    digest = hashlib.sha256(data).hexdigest()
+    return path, digest, scan_text(data.decode('utf-8', errors='ignore'))
+
+
+def _default_path() -> Path:
+    """PathManager cache directory when available, else the local data directory."""
+    try:
+        from core.path_manager import PathManager
+        return Path(PathManager.CACHE_DIR) / "code_scan_cache.db"
+    except ImportError:
+        return Path("alfred_data") / "code_scan_cache.db"
+
+
+class CodeScanner:
+    """
+    Pattern-based vulnerability scanner for files and directory trees.
+
+    For each file, the size and mtime are compared with the cache first.
+    Unchanged files reuse the stored findings for their content hash.
+    Everything else is read, hashed and scanned, in a process pool when
+    there are enough files to amortise it.
+    """
+
+    # Entries recorded within this window of the file's mtime are re-hashed
+    # (the file may have changed again within the mtime resolution)
+    RACY_WINDOW_NS = 2_000_000_000
+
+    def __init__(
+        self,
+        cache_path: Optional[str] = None,
+        use_cache: bool = True,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 32,
+        extensions: Sequence[str] = DEFAULT_EXTENSIONS,
+        exclude_dirs: Iterable[str] = DEFAULT_EXCLUDE_DIRS
+    ):
+        """
+        Initialize code scanner
+
+        Args:
+            cache_path: SQLite file for cached results (default: PathManager.CACHE_DIR/code_scan_cache.db)
+            use_cache: Disable to always re-scan
+            max_workers: Worker processes (default: CPU count)
+            parallel_threshold: Minimum files to scan before a process pool is used
+            extensions: File suffixes scanned in directories
+            exclude_dirs: Directory names skipped while walking
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.extensions = tuple(extensions)
+        self.exclude_dirs = frozenset(exclude_dirs)
+        self.logger = logging.getLogger(__name__)
+
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+        if use_cache:
+            self.cache_path = Path(cache_path) if cache_path else _default_path()
+            self._conn = self._open_cache()
+        else:
+            self.cache_path = None
+
+    # ==================== PUBLIC API ====================
+
+    def discover(self, target: Path) -> List[Path]:
+        """Files to scan under target (or target itself if it is a file)"""
+        if target.is_file():
+            return [target]
+
+        files = []
+        for root, dirs, names in os.walk(target):
+            dirs[:] = sorted(d for d in dirs if d not in self.exclude_dirs)
+            files.extend(Path(root) / name for name in sorted(names) if name.endswith(self.extensions))
+        return files
+
+    def scan(self, target: str) -> Dict[str, Any]:
+        """
+        Scan a file or directory
+
+        Args:
+            target: Path to scan
+
+        Returns:
+            Dict with success, files_scanned, cache_hits, elapsed and findings
+            (dicts with path, type, line, snippet)
+        """
+        start = time.perf_counter()
+        target_path = Path(target)
+        if not target_path.exists():
+            return {"success": False, "error": f"Path not found: {target}"}
+
+        files = [str(path) for path in self.discover(target_path)]
+        stats = self._stat_files(files)
+        cached = self._cached_hits(stats)
+        misses = [path for path in files if path not in cached and path in stats]
+
+        scanned = self._scan_files(misses)
+        self._store(stats, scanned)
+
+        results = {**cached, **{path: hits for path, (_, hits) in scanned.items()}}
+        findings = [
+            {"path": path, "type": vuln_type, "line": line, "snippet": snippet}
+            for path in files if path in results
+            for vuln_type, line, snippet in results[path]
+        ]
+
+        return {
+            "success": True,
+            "files_scanned": len(results),
+            "cache_hits": len(cached),
+            "findings": findings,
+            "elapsed": time.perf_counter() - start
+        }
+
+    def clear(self):
+        """Drop every cached result."""
+        if self._conn is None:
+            return
+        with self._lock:
+            self._conn.execute("DELETE FROM files")
+            self._conn.execute("DELETE FROM results")
+            self._conn.commit()
+
+    def close(self):
+        """Close the cache database."""
+        if self._conn is not None:
+            with self._lock:
+                self._conn.close()
+                self._conn = None
+
+    # ==================== SCANNING ====================
+
+    def _scan_files(self, paths: List[str]) -> Dict[str, Tuple[str, List[Hit]]]:
+        """path -> (content hash, hits) for files that could be read"""
+        if not paths:
+            return {}
+
+        results = None
+        if len(paths) >= self.parallel_threshold and self.max_workers > 1:
+            try:
+                chunksize = max(1, len(paths) // (self.max_workers * 4))
+                with ProcessPoolExecutor(max_workers=self.max_workers) as pool:
+                    results = list(pool.map(_scan_file, paths, chunksize=chunksize))
+            except (OSError, BrokenProcessPool) as e:
+                self.logger.warning(f"Process pool unavailable, scanning serially: {e}")
+
+        if results is None:
+            results = [_scan_file(path) for path in paths]
+
+        return {path: (digest, hits) for path, digest, hits in results if digest is not None}
+
+    # ==================== CACHE ====================
+
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.cache_path), timeout=10, check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS files (
+                    path TEXT PRIMARY KEY,
+                    size INTEGER NOT NULL,
+                    mtime_ns INTEGER NOT NULL,
+                    digest TEXT NOT NULL,
+                    checked_ns INTEGER NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS results (
+                    digest TEXT NOT NULL,
+                    ruleset TEXT NOT NULL,
+                    hits TEXT NOT NULL,
+                    PRIMARY KEY (digest, ruleset)
+                );
+            """)
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            self.logger.warning(f"Code scan cache disabled: {e}")
+            return None
+
+    @staticmethod
+    def _stat_files(paths: List[str]) -> Dict[str, Tuple[int, int]]:
+        stats = {}
+        for path in paths:
+            try:
+                st = os.stat(path)
+                stats[path] = (st.st_size, st.st_mtime_ns)
+            except OSError:
+                pass
+        return stats
+
+    def _cached_hits(self, stats: Dict[str, Tuple[int, int]]) -> Dict[str, List[Hit]]:
+        """Stored hits for files whose size and mtime still match"""
+        if self._conn is None or not stats:
+            return {}
+
+        paths = list(stats)
+        found: Dict[str, List[Hit]] = {}
+        with self._lock:
+            for i in range(0, len(paths), 500):  # Stay under SQLite's variable limit
+                chunk = paths[i:i + 500]
+                rows = self._conn.execute(f"""
+                    SELECT f.path, f.size, f.mtime_ns, f.checked_ns, r.hits
+                    FROM files f JOIN results r ON r.digest = f.digest AND r.ruleset = ?
+                    WHERE f.path IN ({','.join('?' * len(chunk))})
+                """, [RULESET_VERSION, *chunk])
+                for path, size, mtime_ns, checked_ns, hits in rows:
+                    if (size, mtime_ns) == stats[path] and checked_ns - mtime_ns > self.RACY_WINDOW_NS:
+                        found[path] = [tuple(hit) for hit in json.loads(hits)]
+        return found
+
+    def _store(self, stats: Dict[str, Tuple[int, int]], scanned: Dict[str, Tuple[str, List[Hit]]]):
+        if self._conn is None or not scanned:
+            return
+        now = time.time_ns()
+        try:
+            with self._lock:
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO results (digest, ruleset, hits) VALUES (?, ?, ?)",
+                    [(digest, RULESET_VERSION, json.dumps(hits)) for digest, hits in scanned.values()]
+                )
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO files (path, size, mtime_ns, digest, checked_ns) VALUES (?, ?, ?, ?, ?)",
+                    [(path, *stats[path], digest, now) for path, (digest, _) in scanned.items()]
+                )
+                self._conn.commit()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Code scan cache write failed: {e}")
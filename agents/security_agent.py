@@ -110,7 +110,8 @@ class AlfredSecurityAgent:
         voice=None,
         github_token: Optional[str] = None,
         slack_webhook: Optional[str] = None,
-        max_iterations: int = 10
+        max_iterations: int = 10,
+        code_scanner=None
     ):
         """
         Initialize the Security Agent
@@ -124,6 +125,7 @@ class AlfredSecurityAgent:
             github_token: GitHub personal access token for issue creation
             slack_webhook: Slack webhook URL for notifications
             max_iterations: Maximum ReAct iterations before stopping
+            code_scanner: CodeScanner for the fallback scan (created on first use)
         """
         self.logger = logging.getLogger(__name__)
 
@@ -133,6 +135,7 @@ class AlfredSecurityAgent:
         self.fabric = fabric_patterns
         self.privacy_controller = privacy_controller
         self.voice = voice
+        self.code_scanner = code_scanner
 
         # External integrations
         self.github_token = github_token or os.getenv("GITHUB_TOKEN")
@@ -540,83 +543,34 @@ class AlfredSecurityAgent:
 
     def _fallback_code_scan(self, target: str) -> Dict[str, Any]:
         """Fallback code scanning when Strix is not available"""
-        import re
-        from pathlib import Path
-
-        findings = []
+        if self.code_scanner is None:
+            from agents.code_scanner import CodeScanner
+            self.code_scanner = CodeScanner()
 
-        # Patterns for common vulnerabilities
-        vuln_patterns = {
-            "SQL Injection": [
-                r'execute\s*\(\s*["\'].*%s',
-                r'cursor\.execute\s*\(\s*f["\']',
-                r'\+\s*["\'].*SELECT.*FROM',
-            ],
-            "Command Injection": [
-                r'os\.system\s*\(',
-                r'subprocess\.call\s*\(\s*[^,\]]+\s*,\s*shell\s*=\s*True',
-                r'eval\s*\(',
-                r'exec\s*\(',
-            ],
-            "Hardcoded Secrets": [
-                r'password\s*=\s*["\'][^"\']+["\']',
-                r'api_key\s*=\s*["\'][^"\']+["\']',
-                r'secret\s*=\s*["\'][^"\']+["\']',
-                r'token\s*=\s*["\'][A-Za-z0-9]{20,}["\']',
-            ],
-            "XSS Vulnerability": [
-                r'innerHTML\s*=',
-                r'document\.write\s*\(',
-                r'\.html\s*\([^)]*\+',
-            ],
-            "Path Traversal": [
-                r'open\s*\([^)]*\+[^)]*\)',
-                r'Path\s*\([^)]*\+',
-            ],
-        }
+        result = self.code_scanner.scan(target)
+        if not result["success"]:
+            return result
 
-        target_path = Path(target)
-        if not target_path.exists():
-            return {"success": False, "error": f"Path not found: {target}"}
-
-        files_scanned = 0
-
-        # Scan files
-        if target_path.is_file():
-            files_to_scan = [target_path]
-        else:
-            files_to_scan = list(target_path.rglob("*.py")) + \
-                           list(target_path.rglob("*.js")) + \
-                           list(target_path.rglob("*.ts"))
-
-        for file_path in files_to_scan[:100]:  # Limit to 100 files
-            try:
-                content = file_path.read_text(encoding='utf-8', errors='ignore')
-                files_scanned += 1
-
-                for vuln_type, patterns in vuln_patterns.items():
-                    for pattern in patterns:
-                        matches = re.finditer(pattern, content, re.IGNORECASE)
-                        for match in matches:
-                            line_num = content[:match.start()].count('\n') + 1
-                            finding = SecurityFinding(
-                                id=f"CODE-{len(self.findings)+len(findings)+1}",
-                                title=f"Potential {vuln_type}",
-                                severity="high" if "Injection" in vuln_type else "medium",
-                                description=f"Found potential {vuln_type} at {file_path}:{line_num}",
-                                proof_of_concept=match.group(0)[:100],
-                                recommendation=f"Review and sanitize the code at line {line_num}",
-                                affected_component=str(file_path)
-                            )
-                            findings.append(finding)
-            except Exception as e:
-                self.logger.debug(f"Error scanning {file_path}: {e}")
+        findings = []
+        for hit in result["findings"]:
+            vuln_type, line_num = hit["type"], hit["line"]
+            finding = SecurityFinding(
+                id=f"CODE-{len(self.findings)+len(findings)+1}",
+                title=f"Potential {vuln_type}",
+                severity="high" if "Injection" in vuln_type else "medium",
+                description=f"Found potential {vuln_type} at {hit['path']}:{line_num}",
+                proof_of_concept=hit["snippet"],
+                recommendation=f"Review and sanitize the code at line {line_num}",
+                affected_component=hit["path"]
+            )
+            findings.append(finding)
 
         self.findings.extend(findings)
 
         return {
             "success": True,
-            "files_scanned": files_scanned,
+            "files_scanned": result["files_scanned"],
+            "files_from_cache": result["cache_hits"],
             "vulnerabilities_found": len(findings),
             "note": "Fallback scan (Strix not available)"
         }
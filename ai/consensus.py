@@ -0,0 +1,80 @@
+"""
+Consensus Helpers - Agreement detection for multi-model consensus
+Normalizes model responses and finds groups that say the same thing, so the
+orchestrator can exit early or skip the synthesis call
+
+Author: Daniel J Rita (BATDAN)
+"""
+
+import re
+from enum import Enum
+from typing import Dict, List, Optional, Set
+
+
+class ConsensusStrategy(Enum):
+    """How MultiModelOrchestrator combines provider responses"""
+    ALL = "all"              # Wait for every provider, then synthesize
+    FIRST_K = "first_k"      # Return as soon as k responses agree
+    HEDGED = "hedged"        # Primary provider first, backups after a delay; first answer wins
+
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def normalize_response(text: str) -> str:
+    """Lower-case, drop punctuation and collapse whitespace"""
+    return " ".join(_WORD_RE.findall(text.lower()))
+
+
+def _terms(text: str) -> Set[str]:
+    return set(normalize_response(text).split())
+
+
+def response_similarity(a: str, b: str) -> float:
+    """Jaccard similarity of the normalized word sets (1.0 = same content)"""
+    terms_a, terms_b = _terms(a), _terms(b)
+    if not terms_a and not terms_b:
+        return 1.0
+    return len(terms_a & terms_b) / len(terms_a | terms_b)
+
+
+def find_agreement(responses: Dict[str, str], k: int, threshold: float) -> Optional[List[str]]:
+    """
+    Find k responses that agree with each other
+
+    Args:
+        responses: Provider name -> response text (in arrival order)
+        k: Number of agreeing responses required
+        threshold: Minimum pairwise similarity to count as agreement
+
+    Returns:
+        Provider names of the agreeing group, or None
+    """
+    names = list(responses)
+    if len(names) < k:
+        return None
+
+    terms = {name: _terms(responses[name]) for name in names}
+
+    def similar(x: str, y: str) -> bool:
+        if not terms[x] and not terms[y]:
+            return True
+        return len(terms[x] & terms[y]) / len(terms[x] | terms[y]) >= threshold
+
+    # Greedy: seed a group with each response and add every compatible one
+    for seed in names:
+        group = [seed]
+        if len(group) >= k:
+            return group
+        for name in names:
+            if name != seed and all(similar(name, member) for member in group):
+                group.append(name)
+                if len(group) >= k:
+                    return group
+
+    return None
+
+
+def all_agree(responses: Dict[str, str], threshold: float) -> bool:
+    """True if every pair of responses is near-identical"""
+    return find_agreement(responses, len(responses), threshold) is not None
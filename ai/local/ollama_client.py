@@ -25,6 +25,10 @@ import json
 from typing import Optional, Dict, List, Generator
 
 
+class OllamaStreamError(RuntimeError):
+    """A streamed generation failed (raised by generate_stream with raise_errors=True)"""
+
+
 class OllamaClient:
     """
     Ollama local AI client for privacy-first inference
@@ -282,7 +286,8 @@ PERSONALITY: Wise, slightly sarcastic, occasional "sir". Concise.
         prompt: str,
         system: Optional[str] = None,
         temperature: float = 0.7,
-        max_tokens: int = 500
+        max_tokens: int = 500,
+        raise_errors: bool = False
     ) -> Generator[str, None, None]:
         """
         Generate streaming response from Ollama
@@ -292,11 +297,15 @@ PERSONALITY: Wise, slightly sarcastic, occasional "sir". Concise.
             system: System prompt
             temperature: Sampling temperature
             max_tokens: Maximum tokens to generate
+            raise_errors: Raise OllamaStreamError on failure instead of
+                          yielding the error message as a chunk
 
         Yields:
             Chunks of generated text
         """
         if not self.available:
+            if raise_errors:
+                raise OllamaStreamError("Ollama not available")
             yield "Error: Ollama not available"
             return
 
@@ -320,14 +329,19 @@ PERSONALITY: Wise, slightly sarcastic, occasional "sir". Concise.
                 stream=True,
                 timeout=300
             )
+            response.raise_for_status()
 
             for line in response.iter_lines():
                 if line:
                     data = json.loads(line)
+                    if "error" in data:
+                        raise OllamaStreamError(data["error"])
                     if "response" in data:
                         yield data["response"]
 
         except Exception as e:
+            if raise_errors:
+                raise e if isinstance(e, OllamaStreamError) else OllamaStreamError(str(e)) from e
             yield f"\nError: {str(e)}"
 
     def chat(
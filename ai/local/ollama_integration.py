@@ -6,7 +6,7 @@ Unrestricted AI Models + Llama 3.3 Support
 
 import requests
 import json
-from typing import Optional, Dict, List, Generator
+from typing import Optional, Dict, List, Generator, Tuple
 import time
 
 
@@ -178,6 +178,68 @@ class OllamaAI:
         except Exception as e:
             return f"Error: {str(e)}"
 
+    def generate_with_context(
+        self,
+        prompt: str,
+        context: Optional[List[int]] = None,
+        model: Optional[str] = None,
+        system: Optional[str] = None,
+        temperature: float = 0.8,
+        max_tokens: Optional[int] = None
+    ) -> Tuple[str, Optional[List[int]]]:
+        """
+        Generate a continuation of an earlier exchange
+
+        Ollama returns the encoded conversation as `context`; passing it back
+        means only the new prompt text is sent and evaluated each turn.
+
+        Args:
+            prompt: New text for this turn
+            context: Context returned by the previous call (None = new conversation)
+            model: Model to use (defaults to primary_model)
+            system: System prompt
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum tokens to generate
+
+        Returns:
+            (generated text, context for the next turn - None on error)
+        """
+        payload = {
+            "model": model or self.primary_model,
+            "prompt": prompt,
+            "stream": False,
+            "options": {
+                "temperature": temperature
+            }
+        }
+
+        if context:
+            payload["context"] = context
+
+        if system:
+            payload["system"] = system
+
+        if max_tokens:
+            payload["options"]["num_predict"] = max_tokens
+
+        try:
+            response = requests.post(
+                f"{self.api_base}/api/generate",
+                json=payload,
+                timeout=300
+            )
+
+            if response.status_code == 200:
+                result = response.json()
+                return result.get("response", ""), result.get("context")
+
+            return f"Error: HTTP {response.status_code}", None
+
+        except requests.exceptions.Timeout:
+            return "Error: Request timed out. Model may be too large or busy.", None
+        except Exception as e:
+            return f"Error: {str(e)}", None
+
     def generate_stream(
         self,
         prompt: str,
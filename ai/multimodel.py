@@ -13,10 +13,14 @@ Author: Daniel J Rita (BATDAN)
 """
 
 import logging
-from typing import Optional, Dict, List
+import time
+import concurrent.futures
+from typing import Optional, Dict, List, Generator, Tuple, Union
 from enum import Enum
 
-from .local.ollama_client import OllamaClient
+from .consensus import ConsensusStrategy, find_agreement, all_agree
+from .response_cache import ResponseCache
+from .local.ollama_client import OllamaClient, OllamaStreamError
 from .cloud.claude_client import ClaudeClient
 from .cloud.openai_client import OpenAIClient
 from .cloud.groq_client import GroqClient
@@ -36,6 +40,10 @@ except ImportError:
     KNOWLEDGE_AVAILABLE = False
 
 
+# Pre-lookup sources whose data goes stale within minutes (responses are never cached)
+REALTIME_LOOKUPS = frozenset({'stock', 'weather', 'news', 'cyber', 'tech', 'web'})
+
+
 class CloudProvider(Enum):
     """Cloud AI provider types"""
     CLAUDE = "claude"
@@ -56,18 +64,63 @@ class MultiModelOrchestrator:
     5. OpenAI (cloud) - Reliable fallback, requires approval
     """
 
-    def __init__(self, privacy_controller=None, auto_lookup: bool = True):
+    def __init__(self, privacy_controller=None, auto_lookup: bool = True,
+                 consensus_strategy: Union[str, ConsensusStrategy] = ConsensusStrategy.ALL,
+                 consensus_k: int = 2,
+                 agreement_threshold: float = 0.8,
+                 provider_deadline: Optional[float] = None,
+                 provider_deadlines: Optional[Dict[str, float]] = None,
+                 hedge_delay: float = 2.0,
+                 response_cache: Union[bool, ResponseCache, None] = None,
+                 lookup_budget: float = 8.0,
+                 lookup_deadlines: Optional[Dict[str, float]] = None):
         """
         Initialize multi-model orchestrator
 
         Args:
             privacy_controller: PrivacyController instance for cloud approval
             auto_lookup: Enable automatic web/stock lookup when ALFRED doesn't know
+            consensus_strategy: "all" (wait for every model, then synthesize),
+                                "first_k" (return once k responses agree) or
+                                "hedged" (primary model, backups after hedge_delay)
+            consensus_k: Agreeing responses needed by the first_k strategy
+            agreement_threshold: Word-overlap similarity at which responses agree;
+                                 synthesis is skipped when all responses agree
+            provider_deadline: Seconds to wait for any one provider (None = no limit)
+            provider_deadlines: Per-provider overrides, e.g. {'ollama': 30}
+            hedge_delay: Seconds before the hedged strategy queries backup models
+            response_cache: ResponseCache instance, or True for the default
+                            persistent cache in PathManager.CACHE_DIR (None = off)
+            lookup_budget: Overall seconds the concurrent pre-lookup may take
+            lookup_deadlines: Per-source caps within the budget, e.g. {'web': 3}
         """
         self.logger = logging.getLogger(__name__)
         self.privacy_controller = privacy_controller
         self.auto_lookup_enabled = auto_lookup
 
+        # Consensus configuration
+        self.consensus_strategy = ConsensusStrategy(consensus_strategy)
+        self.consensus_k = consensus_k
+        self.agreement_threshold = agreement_threshold
+        self.provider_deadline = provider_deadline
+        self.provider_deadlines = dict(provider_deadlines or {})
+        self.hedge_delay = hedge_delay
+
+        # Response cache (repeated prompts skip lookups and consensus entirely)
+        if response_cache is True:
+            try:
+                from core.path_manager import PathManager
+                cache_path = PathManager.CACHE_DIR / "response_cache.json"
+            except ImportError:
+                cache_path = None
+            response_cache = ResponseCache(path=cache_path)
+        self.response_cache = response_cache or None
+
+        # Concurrent pre-lookup (executor created on first use)
+        self.lookup_budget = lookup_budget
+        self.lookup_deadlines = dict(lookup_deadlines or {})
+        self._lookup_executor = None
+
         # Initialize all clients
         self.ollama = OllamaClient()
         self.claude = ClaudeClient()
@@ -107,7 +160,16 @@ class MultiModelOrchestrator:
             'groq': {'requests': 0, 'successes': 0, 'failures': 0},
             'auto_lookups': {
                 'stock': 0, 'weather': 0, 'news': 0,
-                'cyber': 0, 'tech': 0, 'encyclopedia': 0, 'web': 0, 'retries': 0
+                'cyber': 0, 'tech': 0, 'encyclopedia': 0, 'web': 0, 'retries': 0,
+                'timings': {}  # source -> {latency bucket: count}
+            },
+            'consensus': {
+                strategy.value: {
+                    'requests': 0, 'early_exits': 0, 'synthesis_calls': 0,
+                    'synthesis_skipped': 0, 'deadline_misses': 0, 'hedges_fired': 0,
+                    'total_latency': 0.0
+                }
+                for strategy in ConsensusStrategy
             }
         }
 
@@ -134,7 +196,8 @@ class MultiModelOrchestrator:
 
     def generate(self, prompt: str, context: Optional[List[Dict]] = None,
                  temperature: float = 0.7, max_tokens: int = 2000,
-                 force_cloud: bool = False, consensus: bool = True) -> Optional[str]:
+                 force_cloud: bool = False, consensus: bool = True,
+                 cache_context: Optional[List[Dict]] = None) -> Optional[str]:
         """
         Generate AI response using multi-model CONSENSUS (not fallback)
 
@@ -148,17 +211,31 @@ class MultiModelOrchestrator:
             max_tokens: Maximum response length
             force_cloud: Skip local and force cloud AI
             consensus: Use multi-model consensus (default True)
+            cache_context: Context the response cache is keyed on (default: context).
+                Pass the caller's stable part when context also carries history
+                that changes every turn
 
         Returns:
             Synthesized truthful response based on model consensus
         """
         if context is None:
             context = []
+        if cache_context is None:
+            cache_context = context
+
+        # PHASE 0: Response cache (skipped for real-time questions)
+        cache = self._cache_for(prompt, force_cloud)
+        if cache:
+            cached = cache.get(prompt, cache_context, temperature, max_tokens)
+            if cached:
+                self.logger.info("Response cache hit")
+                return cached
 
         # PHASE 1: Pre-lookup for real-time data
-        knowledge_context = ""
+        lookups = []
         if self.auto_lookup_enabled and self.knowledge_detector:
-            knowledge_context = self._pre_lookup(prompt)
+            lookups = self._pre_lookup_sources(prompt)
+        knowledge_context = "\n".join(text for _, text in lookups)
 
         augmented_context = context.copy() if context else []
         if knowledge_context:
@@ -174,22 +251,125 @@ class MultiModelOrchestrator:
             return None
 
         # PHASE 3: Check uncertainty
+        retried = False
         if self.auto_lookup_enabled and self.knowledge_detector:
             if self.knowledge_detector.needs_lookup_after(response) and not knowledge_context:
                 self.logger.info("ALFRED uncertain - triggering auto-lookup")
                 response = self._retry_with_lookup(prompt, context, temperature, max_tokens, force_cloud)
+                retried = True
+
+        if cache and response:
+            if retried or any(source in REALTIME_LOOKUPS for source, _ in lookups):
+                cache.record_bypass()
+            else:
+                cache.put(prompt, response, cache_context, temperature, max_tokens)
 
         return response
 
+    def _cache_for(self, prompt: str, force_cloud: bool = False) -> Optional[ResponseCache]:
+        """The response cache, unless this prompt must not be served from it"""
+        if not self.response_cache or force_cloud:
+            return None
+
+        # Real-time questions (prices, weather, "latest ...") always go live
+        if self.auto_lookup_enabled and self.knowledge_detector:
+            if self.knowledge_detector.needs_lookup_before(prompt):
+                self.response_cache.record_bypass()
+                return None
+
+        return self.response_cache
+
+    def generate_stream(self, prompt: str, context: Optional[List[Dict]] = None,
+                        temperature: float = 0.7, max_tokens: int = 2000,
+                        cache_context: Optional[List[Dict]] = None) -> Generator[str, None, None]:
+        """
+        Stream an AI response as it is generated
+
+        Streams token chunks from local Ollama (privacy-first). When Ollama is
+        unavailable, or fails before the first chunk, falls back to generate()
+        and yields the full response once. Failed streams are never cached.
+
+        Args:
+            prompt: User prompt/question
+            context: Conversation context from AlfredBrain
+            temperature: Sampling temperature (0.0-1.0)
+            max_tokens: Maximum response length
+            cache_context: Context the response cache is keyed on (default: context)
+
+        Yields:
+            Chunks of the response text
+
+        Raises:
+            OllamaStreamError: Ollama failed after part of the response was yielded
+        """
+        if context is None:
+            context = []
+        if cache_context is None:
+            cache_context = context
+
+        if not self.ollama.is_available():
+            response = self.generate(prompt, context, temperature, max_tokens, cache_context=cache_context)
+            if response:
+                yield response
+            return
+
+        cache = self._cache_for(prompt)
+        if cache:
+            cached = cache.get(prompt, cache_context, temperature, max_tokens)
+            if cached:
+                yield cached
+                return
+
+        # Pre-lookup for real-time data (same as generate)
+        augmented_context = context.copy()
+        lookups = []
+        if self.auto_lookup_enabled and self.knowledge_detector:
+            lookups = self._pre_lookup_sources(prompt)
+            if lookups:
+                augmented_context.insert(0, {
+                    'role': 'system', 'content': "\n".join(text for _, text in lookups)
+                })
+
+        self.stats['ollama']['requests'] += 1
+        full_prompt = self.ollama._build_prompt_with_context(prompt, augmented_context)
+
+        chunks = []
+        try:
+            for chunk in self.ollama.generate_stream(full_prompt, temperature=temperature,
+                                                     max_tokens=max_tokens, raise_errors=True):
+                chunks.append(chunk)
+                yield chunk
+        except OllamaStreamError as e:
+            self.stats['ollama']['failures'] += 1
+            self.logger.warning(f"Ollama stream failed: {e}")
+            if chunks:
+                raise
+            response = self.generate(prompt, context, temperature, max_tokens, cache_context=cache_context)
+            if response:
+                yield response
+            return
+
+        if chunks:
+            self.stats['ollama']['successes'] += 1
+            if cache:
+                if any(source in REALTIME_LOOKUPS for source, _ in lookups):
+                    cache.record_bypass()
+                else:
+                    cache.put(prompt, "".join(chunks), cache_context, temperature, max_tokens)
+        else:
+            self.stats['ollama']['failures'] += 1
+
     def _generate_with_consensus(self, prompt: str, context: Optional[List[Dict]],
                                   temperature: float, max_tokens: int) -> Optional[str]:
         """
         Query ALL available models, compare responses, derive truth.
 
         NEVER make things up. Find consistencies across narratives.
-        """
-        import concurrent.futures
 
+        The configured consensus_strategy decides how long to wait:
+        all models (then synthesize), until k agree, or hedged (first answer).
+        Providers that miss their deadline are abandoned, not waited on.
+        """
         responses = {}
         available_models = []
 
@@ -218,9 +398,16 @@ class MultiModelOrchestrator:
                 self.stats[name]['successes'] += 1
             return response
 
-        self.logger.info(f"CONSENSUS MODE: Querying {len(available_models)} models...")
+        strategy = self.consensus_strategy
+        strategy_stats = self.stats['consensus'][strategy.value]
+        strategy_stats['requests'] += 1
+        started = time.monotonic()
 
-        # Query all models in parallel
+        self.logger.info(
+            f"CONSENSUS MODE ({strategy.value}): Querying {len(available_models)} models..."
+        )
+
+        # Query models in parallel
         def query_model(name_client):
             name, client = name_client
             try:
@@ -237,24 +424,99 @@ class MultiModelOrchestrator:
                 self.stats[name]['failures'] += 1
                 return (name, None)
 
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            results = list(executor.map(query_model, available_models))
+        executor = concurrent.futures.ThreadPoolExecutor(max_workers=len(available_models))
+        pending = {}  # future -> (name, deadline)
 
-        # Collect successful responses
-        for name, response in results:
-            if response:
-                responses[name] = response
+        def launch(models):
+            now = time.monotonic()
+            for name_client in models:
+                limit = self.provider_deadlines.get(name_client[0], self.provider_deadline)
+                deadline = now + limit if limit is not None else None
+                pending[executor.submit(query_model, name_client)] = (name_client[0], deadline)
+
+        if strategy == ConsensusStrategy.HEDGED:
+            # Primary (privacy-first order) alone; backups only if it is slow
+            launch(available_models[:1])
+            backups = available_models[1:]
+        else:
+            launch(available_models)
+            backups = []
+
+        early_result = None
+        try:
+            while pending:
+                now = time.monotonic()
+
+                # Abandon providers past their deadline (their threads are not awaited)
+                for future, (name, deadline) in list(pending.items()):
+                    if deadline is not None and now >= deadline:
+                        future.cancel()
+                        del pending[future]
+                        strategy_stats['deadline_misses'] += 1
+                        self.logger.warning(f"{name} missed its deadline - skipping")
+                if not pending and not backups:
+                    break
+
+                deadlines = [deadline for _, deadline in pending.values() if deadline is not None]
+                timeout = max(0.0, min(deadlines) - now) if deadlines else None
+                if backups:
+                    hedge_at = started + self.hedge_delay
+                    timeout = max(0.0, hedge_at - now) if timeout is None else min(timeout, max(0.0, hedge_at - now))
+
+                done, _ = concurrent.futures.wait(
+                    pending, timeout=timeout, return_when=concurrent.futures.FIRST_COMPLETED
+                )
+
+                for future in done:
+                    del pending[future]
+                    name, response = future.result()
+                    if response:
+                        responses[name] = response
+
+                if strategy == ConsensusStrategy.HEDGED and responses:
+                    early_result = next(iter(responses.values()))
+                    break
+
+                if strategy == ConsensusStrategy.FIRST_K:
+                    group = find_agreement(responses, self.consensus_k, self.agreement_threshold)
+                    if group:
+                        early_result = max((responses[name] for name in group), key=len)
+                        break
+
+                # Hedge: primary is slow (or failed) - fire the backups
+                if backups and (time.monotonic() >= started + self.hedge_delay or not pending):
+                    strategy_stats['hedges_fired'] += 1
+                    self.logger.info(f"Hedging with {len(backups)} backup models")
+                    launch(backups)
+                    backups = []
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        if early_result is not None:
+            if pending:
+                strategy_stats['early_exits'] += 1
+            strategy_stats['total_latency'] += time.monotonic() - started
+            return early_result
 
         if not responses:
             self.logger.error("All models failed")
+            strategy_stats['total_latency'] += time.monotonic() - started
             return None
 
         if len(responses) == 1:
             # Only one succeeded
-            return list(responses.values())[0]
+            result = list(responses.values())[0]
+        elif all_agree(responses, self.agreement_threshold):
+            # Near-identical answers - a synthesis call would add latency, not truth
+            strategy_stats['synthesis_skipped'] += 1
+            result = max(responses.values(), key=len)
+        else:
+            # SYNTHESIZE TRUTH from multiple responses
+            strategy_stats['synthesis_calls'] += 1
+            result = self._synthesize_consensus(prompt, responses)
 
-        # SYNTHESIZE TRUTH from multiple responses
-        return self._synthesize_consensus(prompt, responses)
+        strategy_stats['total_latency'] += time.monotonic() - started
+        return result
 
     def _synthesize_consensus(self, original_prompt: str, responses: Dict[str, str]) -> str:
         """
@@ -317,6 +579,15 @@ SYNTHESIZED TRUTHFUL ANSWER:"""
         """
         Check if query needs real-time data and fetch it
 
+        Returns:
+            Knowledge context to inject, or empty string
+        """
+        return "\n".join(text for _, text in self._pre_lookup_sources(prompt))
+
+    def _pre_lookup_sources(self, prompt: str) -> List[Tuple[str, str]]:
+        """
+        Check if query needs real-time data and fetch it
+
         ALFRED Intelligence Suite:
         - Stocks (Polygon.io)
         - Weather (OpenWeatherMap/MECA)
@@ -325,73 +596,100 @@ SYNTHESIZED TRUTHFUL ANSWER:"""
         - Tech Pulse (GitHub/HackerNews)
         - Web (DuckDuckGo fallback)
 
+        All sources are queried concurrently within lookup_budget seconds
+        (each also capped by its lookup_deadlines entry). Sources that miss
+        their deadline are abandoned. Results are merged in priority order;
+        encyclopedia and web are only used when nothing above them answered.
+
         Args:
             prompt: User prompt
 
         Returns:
-            Knowledge context to inject, or empty string
+            (source, knowledge context) pairs in priority order
         """
-        knowledge_parts = []
-
-        # Check for stock queries (highest priority for financial data)
-        if self.stock_lookup and self.stock_lookup.is_available():
-            is_stock, stock_context = self.stock_lookup.lookup_for_prompt(prompt)
-            if is_stock and stock_context:
-                self.stats['auto_lookups']['stock'] += 1
-                self.logger.info("Pre-fetched stock data for query")
-                knowledge_parts.append(stock_context)
-
-        # Check for weather queries (MECA integration)
-        if self.weather_lookup and self.weather_lookup.is_available():
-            is_weather, weather_context = self.weather_lookup.lookup_for_prompt(prompt)
-            if is_weather and weather_context:
-                self.stats['auto_lookups']['weather'] += 1
-                self.logger.info("Pre-fetched weather data for query")
-                knowledge_parts.append(weather_context)
-
-        # Check for cybersecurity queries (CVEs, threats, vulnerabilities)
-        if self.cyber_intel and self.cyber_intel.is_available():
-            is_cyber, cyber_context = self.cyber_intel.lookup_for_prompt(prompt)
-            if is_cyber and cyber_context:
-                self.stats['auto_lookups']['cyber'] += 1
-                self.logger.info("Pre-fetched cybersecurity intelligence for query")
-                knowledge_parts.append(cyber_context)
-
-        # Check for tech queries (cutting-edge tech, AI, GitHub trending)
-        if self.tech_pulse and self.tech_pulse.is_available():
-            is_tech, tech_context = self.tech_pulse.lookup_for_prompt(prompt)
-            if is_tech and tech_context:
-                self.stats['auto_lookups']['tech'] += 1
-                self.logger.info("Pre-fetched tech pulse data for query")
-                knowledge_parts.append(tech_context)
-
-        # Check for news queries (general + business)
-        if self.news_lookup and self.news_lookup.is_available():
-            is_news, news_context = self.news_lookup.lookup_for_prompt(prompt)
-            if is_news and news_context:
-                self.stats['auto_lookups']['news'] += 1
-                self.logger.info("Pre-fetched news data for query")
-                knowledge_parts.append(news_context)
-
-        # Check for encyclopedia queries (Wikipedia)
-        if self.encyclopedia and self.encyclopedia.is_available() and not knowledge_parts:
-            is_knowledge, wiki_context = self.encyclopedia.lookup_for_prompt(prompt)
-            if is_knowledge and wiki_context:
-                self.stats['auto_lookups']['encyclopedia'] += 1
-                self.logger.info("Pre-fetched encyclopedia data for query")
-                knowledge_parts.append(wiki_context)
-
-        # Check for other real-time queries (web search fallback)
+        # Priority order: (source, lookup, query) - web uses an extracted query
+        sources = [
+            ('stock', self.stock_lookup, prompt),
+            ('weather', self.weather_lookup, prompt),
+            ('cyber', self.cyber_intel, prompt),
+            ('tech', self.tech_pulse, prompt),
+            ('news', self.news_lookup, prompt),
+            ('encyclopedia', self.encyclopedia, prompt),
+        ]
         if self.knowledge_detector and self.knowledge_detector.needs_lookup_before(prompt):
-            if self.web_lookup and not knowledge_parts:  # Don't double-lookup
-                query = self.knowledge_detector.extract_lookup_query(prompt)
-                found, web_context = self.web_lookup.lookup_for_prompt(query)
-                if found and web_context:
-                    self.stats['auto_lookups']['web'] += 1
-                    self.logger.info("Pre-fetched web data for query")
-                    knowledge_parts.append(web_context)
+            if self.web_lookup:
+                sources.append(('web', self.web_lookup, self.knowledge_detector.extract_lookup_query(prompt)))
+
+        # Web is a fallback only; its availability isn't gated like the others
+        sources = [
+            (name, lookup, query) for name, lookup, query in sources
+            if lookup and (name == 'web' or lookup.is_available())
+        ]
+        if not sources:
+            return []
+
+        def run_lookup(lookup, query):
+            started = time.monotonic()
+            found, context = lookup.lookup_for_prompt(query)
+            return found, context, time.monotonic() - started
+
+        if self._lookup_executor is None:
+            self._lookup_executor = concurrent.futures.ThreadPoolExecutor(
+                max_workers=8, thread_name_prefix="alfred-lookup"
+            )
+
+        started = time.monotonic()
+        budget_end = started + self.lookup_budget
+        futures = {}
+        for name, lookup, query in sources:
+            deadline = min(budget_end, started + self.lookup_deadlines.get(name, self.lookup_budget))
+            futures[name] = (self._lookup_executor.submit(run_lookup, lookup, query), deadline)
+
+        results = {}
+        for name, _, _ in sources:
+            future, deadline = futures[name]
+            try:
+                found, context, elapsed = future.result(timeout=max(0.0, deadline - time.monotonic()))
+            except concurrent.futures.TimeoutError:
+                future.cancel()
+                self._record_lookup_timing(name, None)
+                self.logger.warning(f"{name} lookup missed its deadline - skipping")
+                continue
+            except Exception as e:
+                self.logger.warning(f"{name} lookup failed: {e}")
+                continue
 
-        return "\n".join(knowledge_parts)
+            self._record_lookup_timing(name, elapsed)
+            if found and context:
+                results[name] = context
+
+        # Merge in the original priority order
+        knowledge_parts = []
+        for name, _, _ in sources:
+            if name not in results:
+                continue
+            if name in ('encyclopedia', 'web') and knowledge_parts:
+                continue  # Don't double-lookup
+            self.stats['auto_lookups'][name] += 1
+            self.logger.info(f"Pre-fetched {name} data for query")
+            knowledge_parts.append((name, results[name]))
+
+        return knowledge_parts
+
+    # Upper bounds (seconds) of the lookup timing histogram buckets
+    LOOKUP_TIMING_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.0, 5.0, 10.0)
+
+    def _record_lookup_timing(self, source: str, elapsed: Optional[float]):
+        """Add one lookup duration (None = deadline missed) to the source's histogram"""
+        histogram = self.stats['auto_lookups']['timings'].setdefault(source, {})
+        if elapsed is None:
+            bucket = 'timeout'
+        else:
+            bucket = next(
+                (f"<{limit}s" for limit in self.LOOKUP_TIMING_BUCKETS if elapsed < limit),
+                f">={self.LOOKUP_TIMING_BUCKETS[-1]}s"
+            )
+        histogram[bucket] = histogram.get(bucket, 0) + 1
 
     def _retry_with_lookup(self, prompt: str, context: Optional[List[Dict]],
                            temperature: float, max_tokens: int, force_cloud: bool) -> Optional[str]:
@@ -572,8 +870,19 @@ SYNTHESIZED TRUTHFUL ANSWER:"""
         return status
 
     def get_performance_stats(self) -> Dict:
-        """Get performance statistics"""
-        return self.stats.copy()
+        """Get performance statistics (consensus stats include average latency per strategy)"""
+        stats = self.stats.copy()
+        stats['consensus'] = {
+            strategy: {
+                **values,
+                'avg_latency': values['total_latency'] / values['requests'] if values['requests'] else 0.0
+            }
+            for strategy, values in self.stats['consensus'].items()
+        }
+        stats['consensus_strategy'] = self.consensus_strategy.value
+        if self.response_cache:
+            stats['response_cache'] = self.response_cache.get_stats()
+        return stats
 
 
 def create_orchestrator(privacy_controller=None) -> MultiModelOrchestrator:
@@ -0,0 +1,277 @@
+"""
+Response Cache - Reuse AI responses for repeated and near-repeated prompts
+Exact tier keyed on normalized prompt + context hash + sampling settings,
+optional embedding-similarity tier, TTL/LRU eviction and JSON persistence
+
+Author: Daniel J Rita (BATDAN)
+"""
+
+import atexit
+import hashlib
+import json
+import logging
+import math
+import os
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Union
+
+from .consensus import normalize_response
+
+
+Embedder = Callable[[str], List[float]]
+
+
+def _cosine(a: List[float], b: List[float]) -> float:
+    dot = sum(x * y for x, y in zip(a, b))
+    norm = math.sqrt(sum(x * x for x in a)) * math.sqrt(sum(y * y for y in b))
+    return dot / norm if norm else 0.0
+
+
+class ResponseCache:
+    """
+    TTL + LRU response cache for MultiModelOrchestrator.
+
+    Key Features:
+    - Exact tier: normalized prompt + context hash + temperature + max_tokens
+    - Optional semantic tier: cosine similarity of prompt embeddings, only
+      among entries with the same context and settings
+    - Thread-safe; persisted to disk atomically (on demand, periodically and at exit)
+    - Hit-rate metrics via get_stats()
+    """
+
+    def __init__(
+        self,
+        path: Optional[Union[str, Path]] = None,
+        max_entries: int = 1000,
+        ttl: float = 3600.0,
+        embedder: Optional[Embedder] = None,
+        similarity_threshold: float = 0.95,
+        autosave_every: int = 20
+    ):
+        """
+        Initialize response cache
+
+        Args:
+            path: JSON file to persist entries to (None = memory only)
+            max_entries: LRU capacity
+            ttl: Seconds an entry stays valid
+            embedder: Optional text -> vector function for near-duplicate prompts
+            similarity_threshold: Minimum cosine similarity for a semantic hit
+            autosave_every: Save to disk after this many new entries
+        """
+        self.logger = logging.getLogger(__name__)
+        self.path = Path(path) if path else None
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.embedder = embedder
+        self.similarity_threshold = similarity_threshold
+        self.autosave_every = autosave_every
+
+        self._entries: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.RLock()
+        self._unsaved = 0
+
+        self.stats = {
+            'hits': 0,
+            'semantic_hits': 0,
+            'misses': 0,
+            'stores': 0,
+            'bypassed': 0,
+            'evictions': 0,
+            'expirations': 0,
+        }
+
+        if self.path:
+            self.load()
+            atexit.register(self.save)
+
+    # ------------------------------------------------------------------
+    # Keys
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def context_hash(context: Optional[List[Dict]]) -> str:
+        """Stable hash of the conversation context"""
+        payload = json.dumps(context or [], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def settings_key(context: Optional[List[Dict]], temperature: float, max_tokens: int) -> str:
+        """Everything except the prompt that must match for a reuse"""
+        return f"{ResponseCache.context_hash(context)}|{round(temperature, 2)}|{max_tokens}"
+
+    @staticmethod
+    def make_key(prompt: str, context: Optional[List[Dict]],
+                 temperature: float, max_tokens: int) -> str:
+        """Exact-tier cache key"""
+        raw = f"{normalize_response(prompt)}|{ResponseCache.settings_key(context, temperature, max_tokens)}"
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    # ------------------------------------------------------------------
+    # Lookup / store
+    # ------------------------------------------------------------------
+
+    def _expired(self, entry: Dict, now: float) -> bool:
+        return now - entry['created'] > self.ttl
+
+    def get(self, prompt: str, context: Optional[List[Dict]] = None,
+            temperature: float = 0.7, max_tokens: int = 2000) -> Optional[str]:
+        """
+        Look up a cached response
+
+        Returns:
+            Cached response, or None on a miss
+        """
+        key = self.make_key(prompt, context, temperature, max_tokens)
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if self._expired(entry, now):
+                    del self._entries[key]
+                    self.stats['expirations'] += 1
+                else:
+                    self._entries.move_to_end(key)
+                    self.stats['hits'] += 1
+                    return entry['response']
+
+        if self.embedder:
+            response = self._semantic_get(prompt, context, temperature, max_tokens, now)
+            if response is not None:
+                return response
+
+        with self._lock:
+            self.stats['misses'] += 1
+        return None
+
+    def _semantic_get(self, prompt: str, context: Optional[List[Dict]],
+                      temperature: float, max_tokens: int, now: float) -> Optional[str]:
+        """Nearest cached prompt with the same context/settings, if close enough"""
+        try:
+            vector = self.embedder(normalize_response(prompt))
+        except Exception as e:
+            self.logger.warning(f"Response cache embedding failed: {e}")
+            return None
+
+        settings = self.settings_key(context, temperature, max_tokens)
+        best_key, best_score = None, self.similarity_threshold
+
+        with self._lock:
+            for key, entry in self._entries.items():
+                if entry['settings'] != settings or not entry.get('embedding'):
+                    continue
+                if self._expired(entry, now):
+                    continue
+                score = _cosine(vector, entry['embedding'])
+                if score >= best_score:
+                    best_key, best_score = key, score
+
+            if best_key is None:
+                return None
+
+            self._entries.move_to_end(best_key)
+            self.stats['semantic_hits'] += 1
+            return self._entries[best_key]['response']
+
+    def put(self, prompt: str, response: str, context: Optional[List[Dict]] = None,
+            temperature: float = 0.7, max_tokens: int = 2000):
+        """Store a response"""
+        if not response:
+            return
+
+        embedding = None
+        if self.embedder:
+            try:
+                embedding = list(self.embedder(normalize_response(prompt)))
+            except Exception as e:
+                self.logger.warning(f"Response cache embedding failed: {e}")
+
+        key = self.make_key(prompt, context, temperature, max_tokens)
+        with self._lock:
+            self._entries[key] = {
+                'response': response,
+                'created': time.time(),
+                'settings': self.settings_key(context, temperature, max_tokens),
+                'embedding': embedding,
+            }
+            self._entries.move_to_end(key)
+            self.stats['stores'] += 1
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+            self._unsaved += 1
+            autosave = self.path is not None and self._unsaved >= self.autosave_every
+
+        if autosave:
+            self.save()
+
+    def record_bypass(self):
+        """Count a request that skipped the cache (real-time data)"""
+        with self._lock:
+            self.stats['bypassed'] += 1
+
+    def clear(self):
+        """Drop every entry"""
+        with self._lock:
+            self._entries.clear()
+            self._unsaved += 1
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def load(self):
+        """Load unexpired entries from disk"""
+        if not self.path or not self.path.exists():
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Could not load response cache: {e}")
+            return
+
+        now = time.time()
+        with self._lock:
+            for key, entry in data.get('entries', []):
+                if not self._expired(entry, now):
+                    self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def save(self):
+        """Write entries to disk (atomic replace)"""
+        if not self.path:
+            return
+
+        with self._lock:
+            if not self._unsaved:
+                return
+            data = {'entries': list(self._entries.items())}
+            self._unsaved = 0
+
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp_path = self.path.with_suffix(self.path.suffix + '.tmp')
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            self.logger.warning(f"Could not save response cache: {e}")
+
+    def get_stats(self) -> Dict:
+        """Cache statistics including hit rate"""
+        with self._lock:
+            lookups = self.stats['hits'] + self.stats['semantic_hits'] + self.stats['misses']
+            return {
+                **self.stats,
+                'entries': len(self._entries),
+                'hit_rate': (self.stats['hits'] + self.stats['semantic_hits']) / lookups if lookups else 0.0,
+            }
@@ -19,6 +19,7 @@ from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
 from pathlib import Path
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool, iterate_in_threadpool
 import uvicorn
 import json
 
@@ -31,9 +32,10 @@ logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 # Initialize Alfred components
-brain = AlfredBrain()
+# Write-behind: conversation turns are journaled and stored off the request path
+brain = AlfredBrain(write_behind=True)
 privacy = PrivacyController(auto_confirm=True)
-ai = MultiModelOrchestrator(privacy_controller=privacy)
+ai = MultiModelOrchestrator(privacy_controller=privacy, response_cache=True)
 
 # FastAPI app
 app = FastAPI(
@@ -57,6 +59,12 @@ if STATIC_DIR.exists():
     app.mount("/static", StaticFiles(directory=str(STATIC_DIR)), name="static")
 
 
+@app.on_event("shutdown")
+def shutdown_brain():
+    """Drain journaled conversations to the database before exiting"""
+    brain.close()
+
+
 # ============================================================================
 # OpenAI-Compatible Models
 # ============================================================================
@@ -199,6 +207,9 @@ async def chat_completion(request: ChatCompletionRequest):
     """
     OpenAI-compatible chat completions endpoint
     Compatible with M5Stack ModuleLLM plugin
+
+    Generation runs in the threadpool so one slow request never blocks the
+    event loop. With stream=true the reply is sent as Server-Sent Events.
     """
     try:
         logger.info(f"Chat request from M5Stack: {len(request.messages)} messages")
@@ -214,18 +225,31 @@ async def chat_completion(request: ChatCompletionRequest):
                 "content": msg.content
             })
 
+        # Responses are cached on the request's own messages: the brain history
+        # below changes every turn, so a key built from it would never repeat
+        request_context = context
+
         # Get conversation context from brain
-        brain_context = brain.get_conversation_context(limit=3)
+        brain_context = await run_in_threadpool(brain.get_conversation_context, limit=3)
         if brain_context:
             context = brain_context + context
 
+        if request.stream:
+            return StreamingResponse(
+                stream_chat_completion(request, user_message, context, request_context),
+                media_type="text/event-stream",
+                headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+            )
+
         # Generate response using Alfred's AI
         logger.info(f"Generating response for: {user_message[:50]}...")
-        response_text = ai.generate(
+        response_text = await run_in_threadpool(
+            ai.generate,
             prompt=user_message,
             context=context,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            cache_context=request_context
         )
 
         if not response_text:
@@ -263,11 +287,80 @@ async def chat_completion(request: ChatCompletionRequest):
             }
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Chat completion error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
+async def stream_chat_completion(request: ChatCompletionRequest, user_message: str,
+                                 context: List[Dict], cache_context: List[Dict]):
+    """
+    Server-Sent Events stream of OpenAI chat.completion.chunk objects
+
+    Chunks are pulled from the blocking Ollama stream in the threadpool and
+    forwarded as soon as they arrive; the full reply is stored once finished.
+    A stream that fails part-way ends with an error event instead of a
+    "stop" chunk (so a cut-off reply never looks complete) and is not stored.
+    """
+    completion_id = f"chatcmpl-{datetime.now().timestamp()}"
+    created = int(datetime.now().timestamp())
+
+    def sse_chunk(delta: Dict[str, str], finish_reason: Optional[str] = None) -> str:
+        chunk = {
+            "id": completion_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": request.model,
+            "choices": [
+                {
+                    "index": 0,
+                    "delta": delta,
+                    "finish_reason": finish_reason
+                }
+            ]
+        }
+        return f"data: {json.dumps(chunk)}\n\n"
+
+    yield sse_chunk({"role": "assistant"})
+
+    parts = []
+    failed = False
+    try:
+        stream = ai.generate_stream(
+            prompt=user_message,
+            context=context,
+            temperature=request.temperature,
+            max_tokens=request.max_tokens,
+            cache_context=cache_context
+        )
+        async for text in iterate_in_threadpool(stream):
+            if text:
+                parts.append(text)
+                yield sse_chunk({"content": text})
+    except Exception as e:
+        # A partial reply is not remembered
+        failed = True
+        logger.error(f"Chat stream error: {e}")
+        error = {"error": {"message": str(e), "type": "stream_error", "code": 502}}
+        yield f"data: {json.dumps(error)}\n\n"
+    else:
+        yield sse_chunk({}, finish_reason="stop")
+
+    yield "data: [DONE]\n\n"
+
+    response_text = "".join(parts)
+    if response_text and not failed:
+        brain.store_conversation(
+            user_input=user_message,
+            alfred_response=response_text,
+            context={"source": "m5stack", "model": request.model, "stream": True},
+            importance=6,
+            success=True
+        )
+
+
 @app.post("/v1/completions")
 async def text_completion(request: CompletionRequest):
     """
@@ -277,14 +370,16 @@ async def text_completion(request: CompletionRequest):
         logger.info(f"Text completion request: {request.prompt[:50]}...")
 
         # Get context from brain
-        context = brain.get_conversation_context(limit=3)
+        context = await run_in_threadpool(brain.get_conversation_context, limit=3)
 
-        # Generate response
-        response_text = ai.generate(
+        # Generate response (threadpool - keeps the event loop free)
+        response_text = await run_in_threadpool(
+            ai.generate,
             prompt=request.prompt,
             context=context,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            cache_context=[]  # keyed on the prompt, not the changing brain history
         )
 
         if not response_text:
@@ -15,10 +15,12 @@ from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from pydantic import BaseModel, Field
+from starlette.concurrency import run_in_threadpool
 import uvicorn
 
 from core.brain import AlfredBrain
 from core.privacy_controller import PrivacyController
+from core.sync_batch import BatchReceiver
 from ai.multimodel import MultiModelOrchestrator
 
 # Initialize logging
@@ -29,9 +31,13 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 # Initialize Alfred components
-brain = AlfredBrain()
+# Write-behind: conversation turns are journaled and stored off the request path
+brain = AlfredBrain(write_behind=True)
 privacy = PrivacyController(auto_confirm=True)
-ai = MultiModelOrchestrator(privacy_controller=privacy)
+ai = MultiModelOrchestrator(privacy_controller=privacy, response_cache=True)
+
+# Resumable batched uploads (spooled under the brain's data directory)
+batch_receiver = BatchReceiver(brain)
 
 # Device registry (in-memory for now, will move to brain DB)
 device_registry: Dict[str, Dict[str, Any]] = {}
@@ -56,6 +62,12 @@ app.add_middleware(
 app.add_middleware(GZipMiddleware, minimum_size=1000)
 
 
+@app.on_event("shutdown")
+def shutdown_brain():
+    """Drain journaled conversations to the database before exiting"""
+    brain.close()
+
+
 # ============================================================================
 # Pydantic Models
 # ============================================================================
@@ -118,6 +130,15 @@ class BrainSyncRequest(BaseModel):
     knowledge_updates: List[KnowledgeUpload] = Field(default_factory=list)
 
 
+class BrainPushRequest(BaseModel):
+    """One page of change-log deltas pushed by a PC brain"""
+    device_id: str = Field(..., description="Device identifier")
+    timestamp: Optional[str] = Field(None, description="Client time (ISO 8601)")
+    changes: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict, description="Changed rows per table")
+    deletes: Dict[str, List[Dict[str, Any]]] = Field(default_factory=dict, description="Deleted natural keys per table")
+    cursor: Optional[int] = Field(None, description="Client change-log cursor after this page")
+
+
 # ============================================================================
 # Root & Health Endpoints
 # ============================================================================
@@ -143,6 +164,7 @@ async def root():
             "brain_sync": [
                 "/sync/register",
                 "/sync/upload",
+                "/sync/batch/{batch_id}",
                 "/sync/download",
                 "/sync/status"
             ],
@@ -250,18 +272,24 @@ async def chat_completion(request: ChatCompletionRequest):
                 "content": msg.content
             })
 
+        # Responses are cached on the request's own messages: the brain history
+        # below changes every turn, so a key built from it would never repeat
+        request_context = context
+
         # Get conversation context from brain (last 3 conversations)
-        brain_context = brain.get_conversation_context(limit=3)
+        brain_context = await run_in_threadpool(brain.get_conversation_context, limit=3)
         if brain_context:
             context = brain_context + context
 
         # Generate response using Alfred's AI
         logger.info(f"Generating response for: {user_message[:50]}...")
-        response_text = ai.generate(
+        response_text = await run_in_threadpool(
+            ai.generate,
             prompt=user_message,
             context=context,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            cache_context=request_context
         )
 
         if not response_text:
@@ -311,14 +339,16 @@ async def text_completion(request: CompletionRequest):
         logger.info(f"Text completion request: {request.prompt[:50]}...")
 
         # Get context from brain
-        context = brain.get_conversation_context(limit=3)
+        context = await run_in_threadpool(brain.get_conversation_context, limit=3)
 
         # Generate response
-        response_text = ai.generate(
+        response_text = await run_in_threadpool(
+            ai.generate,
             prompt=request.prompt,
             context=context,
             temperature=request.temperature,
-            max_tokens=request.max_tokens
+            max_tokens=request.max_tokens,
+            cache_context=[]  # keyed on the prompt, not the changing brain history
         )
 
         if not response_text:
@@ -407,6 +437,18 @@ async def register_device(device: DeviceRegistration):
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _ensure_registered(device_id: str):
+    """Auto-register devices that sync before registering"""
+    if device_id not in device_registry:
+        logger.warning(f"Unregistered device attempting sync: {device_id}")
+        device_registry[device_id] = {
+            "device_id": device_id,
+            "device_type": "m5stack-auto",
+            "registered_at": datetime.now().isoformat(),
+            "active": True
+        }
+
+
 @app.post("/sync/upload")
 async def upload_brain_data(sync_request: BrainSyncRequest):
     """
@@ -416,98 +458,18 @@ async def upload_brain_data(sync_request: BrainSyncRequest):
     try:
         device_id = sync_request.device_id
 
-        # Verify device is registered
-        if device_id not in device_registry:
-            logger.warning(f"Unregistered device attempting sync: {device_id}")
-            # Auto-register for convenience
-            device_registry[device_id] = {
-                "device_id": device_id,
-                "device_type": "m5stack-auto",
-                "registered_at": datetime.now().isoformat(),
-                "active": True
-            }
+        # Verify device is registered (auto-register for convenience)
+        _ensure_registered(device_id)
 
         logger.info(f"Syncing brain data from device: {device_id}")
         logger.info(f"  Conversations: {len(sync_request.conversations)}")
         logger.info(f"  Knowledge updates: {len(sync_request.knowledge_updates)}")
 
-        upload_results = {
-            "conversations_uploaded": 0,
-            "knowledge_uploaded": 0,
-            "conflicts": []
-        }
-
-        # Upload conversations
-        for conv in sync_request.conversations:
-            try:
-                brain.store_conversation(
-                    user_input=conv.user_input,
-                    alfred_response=conv.alfred_response,
-                    context={
-                        "source": conv.source,
-                        "device_id": device_id,
-                        "offline_timestamp": conv.timestamp
-                    },
-                    topics=conv.topics if conv.topics else None,
-                    importance=conv.importance,
-                    success=True
-                )
-                upload_results["conversations_uploaded"] += 1
-            except Exception as e:
-                logger.error(f"Error uploading conversation: {e}")
-                upload_results["conflicts"].append({
-                    "type": "conversation",
-                    "error": str(e),
-                    "data": conv.user_input[:50]
-                })
-
-        # Upload knowledge updates
-        for knowledge in sync_request.knowledge_updates:
-            try:
-                # Check for conflicts (existing knowledge with different value)
-                existing = brain.recall_knowledge(knowledge.category, knowledge.key)
-
-                if existing and existing.get("value") != knowledge.value:
-                    # Conflict detected - use importance to resolve
-                    existing_importance = existing.get("importance", 0)
-                    if knowledge.importance >= existing_importance:
-                        # New knowledge wins
-                        brain.store_knowledge(
-                            category=knowledge.category,
-                            key=knowledge.key,
-                            value=knowledge.value,
-                            importance=knowledge.importance
-                        )
-                        upload_results["knowledge_uploaded"] += 1
-                        logger.info(f"Resolved conflict: {knowledge.category}/{knowledge.key} (new wins)")
-                    else:
-                        # Keep existing
-                        upload_results["conflicts"].append({
-                            "type": "knowledge",
-                            "category": knowledge.category,
-                            "key": knowledge.key,
-                            "reason": "existing knowledge has higher importance",
-                            "existing_importance": existing_importance,
-                            "new_importance": knowledge.importance
-                        })
-                        logger.info(f"Resolved conflict: {knowledge.category}/{knowledge.key} (existing wins)")
-                else:
-                    # No conflict, store normally
-                    brain.store_knowledge(
-                        category=knowledge.category,
-                        key=knowledge.key,
-                        value=knowledge.value,
-                        importance=knowledge.importance
-                    )
-                    upload_results["knowledge_uploaded"] += 1
-
-            except Exception as e:
-                logger.error(f"Error uploading knowledge: {e}")
-                upload_results["conflicts"].append({
-                    "type": "knowledge",
-                    "error": str(e),
-                    "data": f"{knowledge.category}/{knowledge.key}"
-                })
+        # One transaction for the whole upload
+        records = ([dict(conv.model_dump(), kind="conversation") for conv in sync_request.conversations] +
+                   [dict(k.model_dump(), kind="knowledge") for k in sync_request.knowledge_updates])
+        conversations, knowledge, _ = batch_receiver.to_brain_records(records, device_id)
+        upload_results = await run_in_threadpool(brain.ingest_batch, conversations, knowledge, origin=device_id)
 
         # Update device last sync time
         device_registry[device_id]["last_sync"] = datetime.now().isoformat()
@@ -521,42 +483,148 @@ async def upload_brain_data(sync_request: BrainSyncRequest):
             "server_time": datetime.now().isoformat()
         }
 
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Upload error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.get("/sync/download")
-async def download_brain_updates(device_id: str, since: Optional[str] = None):
+@app.post("/sync/batch/{batch_id}")
+async def upload_batch_part(
+    batch_id: str,
+    request: Request,
+    device_id: str,
+    offset: int,
+    total: int,
+    encoding: str = "zlib"
+):
     """
-    Download brain updates from server to M5Stack
-    Delta sync: only send updates since last sync
+    Upload one part of a compressed, resumable sync batch
+
+    The body is raw bytes at `offset` of a `total`-byte payload (JSON lines,
+    zlib-compressed unless encoding=identity). A part at the wrong offset is
+    answered with the offset to resume from; the final part ingests the
+    whole batch in one transaction and acknowledges its item IDs.
     """
+    data = await request.body()
     try:
-        logger.info(f"Brain download request from device: {device_id}")
-        if since:
-            logger.info(f"  Delta sync since: {since}")
+        result = await run_in_threadpool(
+            batch_receiver.receive, device_id, batch_id, offset, total, data, encoding
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    except Exception as e:
+        logger.error(f"Batch upload error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+    if result.get("complete") and not result.get("duplicate"):
+        _ensure_registered(device_id)
+        device_registry[device_id]["last_sync"] = datetime.now().isoformat()
+        logger.info(f"Batch {batch_id} from {device_id}: "
+                    f"{result['conversations_uploaded']} conversations, "
+                    f"{result['knowledge_uploaded']} knowledge, {result['duplicates']} duplicates")
 
-        # Get recent conversations (limit to last 10 for M5Stack storage)
-        conversations = brain.get_conversation_context(limit=10)
+    return result
+
+
+@app.get("/sync/batch/{batch_id}")
+async def batch_status(batch_id: str, device_id: str):
+    """Bytes received for a batch, so an interrupted upload can resume"""
+    try:
+        return await run_in_threadpool(batch_receiver.status, device_id, batch_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
-        # Get important knowledge (top 20 by importance)
-        # TODO: Add get_top_knowledge method to brain
-        # For now, return empty list
-        knowledge_updates = []
 
-        # Get topics for context
-        topics = brain.get_topics_by_importance()[:5]  # Top 5 topics
+@app.post("/sync/push")
+async def push_brain_changes(push: BrainPushRequest):
+    """
+    Merge one page of a PC brain's change log
+
+    Merging is idempotent, so a page re-sent after a lost response is
+    harmless. Merged rows are tagged with the device so /sync/pull does
+    not send them back to it.
+    """
+    try:
+        _ensure_registered(push.device_id)
+        merged = await run_in_threadpool(brain.merge_changes, push.changes, push.deletes, push.device_id)
+        device_registry[push.device_id]["last_sync"] = datetime.now().isoformat()
+
+        logger.info(f"Merged push from {push.device_id} (cursor {push.cursor}): {merged}")
+        return {
+            "status": "success",
+            "device_id": push.device_id,
+            "cursor": push.cursor,
+            "merged": merged,
+            "conversations_merged": merged["conversations"],
+            "knowledge_merged": merged["knowledge"],
+            "server_time": datetime.now().isoformat()
+        }
+
+    except Exception as e:
+        logger.error(f"Push error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/sync/pull")
+async def pull_brain_changes(device_id: str, cursor: int = 0, limit: int = 500):
+    """
+    Page through the server brain's change log after `cursor`
+
+    Returns the rows changed since the cursor (each once, latest state),
+    excluding changes the device pushed itself. Call again with
+    next_cursor while has_more is true.
+    """
+    try:
+        limit = max(1, min(limit, 5000))
+        page = await run_in_threadpool(brain.get_changes, cursor, limit, None, device_id)
+        return {"device_id": device_id, "server_time": datetime.now().isoformat(), **page}
+
+    except Exception as e:
+        logger.error(f"Pull error: {e}")
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.get("/sync/download")
+async def download_brain_updates(
+    device_id: str,
+    since: Optional[str] = None,
+    cursor: Optional[int] = None,
+    limit: int = 50
+):
+    """
+    Download brain updates from server to M5Stack
+    Delta sync: conversations, knowledge and topics changed after `cursor`,
+    a page at a time (pass next_cursor back while has_more is true).
+    Clients that only send `since` (ISO 8601) start at the first change
+    after that time; with neither, paging starts at the beginning.
+    """
+    try:
+        logger.info(f"Brain download request from device: {device_id}")
+        if cursor is None and since:
+            cursor = await run_in_threadpool(brain.get_change_cursor, since)
+            logger.info(f"  Delta sync since {since} -> cursor {cursor}")
+        elif cursor is not None:
+            logger.info(f"  Delta sync from cursor: {cursor}")
+
+        limit = max(1, min(limit, 500))
+        page = await run_in_threadpool(
+            brain.get_changes, cursor or 0, limit, ["conversations", "knowledge", "topics"], device_id
+        )
+        changes = page["changes"]
 
         download_data = {
-            "conversations": conversations if conversations else [],
-            "knowledge_updates": knowledge_updates,
-            "topics": [t.get("topic_name") for t in topics] if topics else [],
+            "conversations": changes["conversations"],
+            "knowledge_updates": changes["knowledge"],
+            "topics": [t["topic"] for t in changes["topics"]],
+            "next_cursor": page["next_cursor"],
+            "has_more": page["has_more"],
             "server_time": datetime.now().isoformat(),
             "sync_metadata": {
-                "total_conversations": len(conversations) if conversations else 0,
-                "total_knowledge": len(knowledge_updates),
-                "is_delta_sync": since is not None
+                "total_conversations": len(changes["conversations"]),
+                "total_knowledge": len(changes["knowledge"]),
+                "is_delta_sync": cursor is not None
             }
         }
 
@@ -616,6 +684,7 @@ def main():
     logger.info("Brain Sync Endpoints:")
     logger.info("  POST /sync/register - Register M5Stack device")
     logger.info("  POST /sync/upload - Upload offline conversations/knowledge")
+    logger.info("  POST /sync/batch/{id} - Resumable compressed batch upload")
     logger.info("  GET  /sync/download - Download brain updates")
     logger.info("  GET  /sync/status - Get device sync status")
     logger.info("")
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Alfred Brain per-turn latency, connect-per-call vs pooled connections
+
+Builds a synthetic brain database (100k conversations by default), then runs
+the same simulated chat turn against two copies of it:
+- legacy: fresh sqlite3.connect() per method call, rollback journal
+- pooled: BrainConnectionPool (per-thread connection, WAL, tuned pragmas)
+
+Usage:
+    python benchmarks/bench_brain_connections.py
+    python benchmarks/bench_brain_connections.py --conversations 20000 --turns 200
+
+Author: Daniel J Rita (BATDAN)
+"""
+
+import argparse
+import shutil
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.brain import AlfredBrain
+
+
+def build_database(data_dir: Path, conversations: int):
+    """Create a brain database populated with synthetic conversations"""
+    brain = AlfredBrain(data_dir=str(data_dir))
+    brain.close()
+
+    conn = sqlite3.connect(data_dir / "alfred_brain.db")
+    start = datetime.now() - timedelta(days=365)
+    rows = (
+        (
+            (start + timedelta(minutes=i * 5)).isoformat(),
+            f"Question {i} about topic {i % 97}",
+            f"Answer {i} with some detail about topic {i % 97}",
+            5 + (i % 5),
+            1,
+        )
+        for i in range(conversations)
+    )
+    conn.executemany("""
+        INSERT INTO conversations (timestamp, user_input, alfred_response, importance, success)
+        VALUES (?, ?, ?, ?, ?)
+    """, rows)
+    conn.executemany("""
+        INSERT INTO knowledge (timestamp, category, key, value, importance)
+        VALUES (?, ?, ?, ?, ?)
+    """, ((start.isoformat(), "bench", f"key_{i}", f"value {i}", 5) for i in range(1000)))
+    conn.commit()
+    conn.close()
+
+
+def run_turns(brain: AlfredBrain, turns: int) -> list:
+    """Run simulated chat turns and return per-turn latencies (ms)"""
+    latencies = []
+    for i in range(turns):
+        t0 = time.perf_counter()
+        brain.get_conversation_context(limit=10)
+        brain.recall_knowledge("bench", f"key_{i % 1000}")
+        brain.get_preference("voice", default="ryan")
+        brain.store_conversation(
+            f"Benchmark turn {i}",
+            "Certainly, sir.",
+            topics=["benchmark"],
+            importance=5
+        )
+        brain.track_skill_use("benchmark", success=True)
+        brain.record_pattern("benchmark", {"turn": i % 10})
+        latencies.append((time.perf_counter() - t0) * 1000)
+    return latencies
+
+
+def summarize(name: str, latencies: list):
+    latencies = sorted(latencies)
+    p95 = latencies[int(len(latencies) * 0.95) - 1]
+    print(f"  {name:<8} mean={statistics.mean(latencies):7.2f}ms  "
+          f"median={statistics.median(latencies):7.2f}ms  p95={p95:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Alfred Brain connection benchmark")
+    parser.add_argument("--conversations", type=int, default=100_000)
+    parser.add_argument("--turns", type=int, default=500)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        base = tmp / "base"
+        base.mkdir()
+        print(f"Building database with {args.conversations:,} conversations...")
+        build_database(base, args.conversations)
+
+        results = {}
+        for mode in ("legacy", "pooled"):
+            data_dir = tmp / mode
+            shutil.copytree(base, data_dir)
+            db_path = data_dir / "alfred_brain.db"
+
+            if mode == "legacy":
+                conn = sqlite3.connect(db_path)
+                conn.execute("PRAGMA journal_mode = DELETE")
+                conn.close()
+
+            brain = AlfredBrain(data_dir=str(data_dir))
+            if mode == "legacy":
+                brain.close()
+                brain._connect = lambda: sqlite3.connect(db_path)
+
+            results[mode] = run_turns(brain, args.turns)
+            brain.close()
+
+        print()
+        print(f"Per-turn latency over {args.turns} turns:")
+        for mode, latencies in results.items():
+            summarize(mode, latencies)
+
+        speedup = statistics.mean(results["legacy"]) / statistics.mean(results["pooled"])
+        print(f"  speedup  {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+"""
+Benchmark: embedding throughput (chunks/sec)
+
+Compares three ways of embedding crawled chunks:
+  1. legacy      - one model.encode call per chunk (old add_document/search path)
+  2. service     - EmbeddingService with concurrent callers (micro-batched)
+  3. re-crawl    - same chunks again through the service (served from the cache)
+
+Uses all-MiniLM-L6-v2 when sentence-transformers is installed; otherwise a
+synthetic model with a fixed per-call overhead and per-text cost, so the
+batching and caching effects are still visible.
+
+Usage:
+    python benchmarks/bench_embeddings.py
+    python benchmarks/bench_embeddings.py --chunks 2000 --callers 16
+
+Author: Daniel J Rita (BATDAN)
+"""
+
+import argparse
+import random
+import string
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# RAG modules import each other as scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "capabilities" / "rag"))
+
+from embedding_service import EmbeddingService
+
+
+class SyntheticModel:
+    """Stand-in with ~2ms call overhead and ~0.2ms per text"""
+
+    def encode(self, texts, batch_size=32, **kwargs):
+        time.sleep(0.002 + 0.0002 * len(texts))
+        return [[float(len(text))] * 384 for text in texts]
+
+
+def load_model(synthetic: bool):
+    if not synthetic:
+        try:
+            from sentence_transformers import SentenceTransformer
+            return SentenceTransformer('all-MiniLM-L6-v2'), 'all-MiniLM-L6-v2'
+        except ImportError:
+            print("sentence-transformers not installed - using synthetic model")
+    return SyntheticModel(), 'synthetic'
+
+
+def synthetic_chunks(count: int, seed: int = 11) -> list:
+    rng = random.Random(seed)
+    words = ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(3, 9))) for _ in range(2000)]
+    return [" ".join(rng.choice(words) for _ in range(150)) for _ in range(count)]
+
+
+def run_service(service: EmbeddingService, chunks: list, callers: int, per_call: int) -> float:
+    """Embed chunks from concurrent callers, per_call chunks per request"""
+    requests = [chunks[i:i + per_call] for i in range(0, len(chunks), per_call)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=callers) as pool:
+        list(pool.map(service.embed, requests))
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Embedding throughput benchmark")
+    parser.add_argument("--chunks", type=int, default=1000)
+    parser.add_argument("--callers", type=int, default=8)
+    parser.add_argument("--per-call", type=int, default=1, help="Chunks per caller request")
+    parser.add_argument("--synthetic", action="store_true", help="Skip loading the real model")
+    args = parser.parse_args()
+
+    model, name = load_model(args.synthetic)
+    chunks = synthetic_chunks(args.chunks)
+    print(f"Model: {name}, {len(chunks):,} chunks, {args.callers} concurrent callers\n")
+
+    start = time.perf_counter()
+    for chunk in chunks:
+        model.encode([chunk])
+    legacy = time.perf_counter() - start
+    print(f"  legacy (one encode per chunk): {len(chunks) / legacy:10,.0f} chunks/sec")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        service = EmbeddingService(model, model_name=name, cache_path=str(Path(tmp) / "embeddings.db"))
+        cold = run_service(service, chunks, args.callers, args.per_call)
+        stats = service.get_stats()
+        print(f"  service (micro-batched):       {len(chunks) / cold:10,.0f} chunks/sec"
+              f"  ({stats['batches']} batches, avg {stats['avg_batch_size']:.1f})")
+
+        warm = run_service(service, chunks, args.callers, args.per_call)
+        print(f"  re-crawl (cache hits):         {len(chunks) / warm:10,.0f} chunks/sec")
+        service.close()
+
+    print(f"\n  speedup: {legacy / cold:.1f}x batched, {legacy / warm:.1f}x cached")
+
+
+if __name__ == "__main__":
+    main()
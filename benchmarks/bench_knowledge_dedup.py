@@ -0,0 +1,125 @@
+#!/usr/bin/env python3
+"""
+Benchmark: knowledge near-duplicate detection
+
+Generates synthetic knowledge items (50k by default) with injected typo
+duplicates, then times AlfredBrain.find_duplicate_knowledge (MinHash/LSH
+blocking + bounded edit distance). Recall is checked against the legacy
+all-pairs scan on a subsample small enough for it to finish.
+
+Usage:
+    python benchmarks/bench_knowledge_dedup.py
+    python benchmarks/bench_knowledge_dedup.py --items 10000 --sample 1500
+
+Author: Daniel J Rita (BATDAN)
+"""
+
+import argparse
+import random
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.brain import AlfredBrain
+
+_vocab_rng = random.Random(3)
+WORDS = [
+    "".join(_vocab_rng.choice(string.ascii_lowercase) for _ in range(_vocab_rng.randint(3, 9)))
+    for _ in range(5_000)
+]
+CATEGORIES = ["user_preferences", "user_info", "user_habits", "learning_goals", "user_expertise"]
+
+
+def typo(text: str, rng: random.Random) -> str:
+    """Introduce a single-character edit"""
+    pos = rng.randrange(len(text))
+    return text[:pos] + rng.choice(string.ascii_lowercase) + text[pos + 1:]
+
+
+def synthetic_items(count: int, seed: int = 7) -> list:
+    """Knowledge rows as (category, key, value), ~5% near-duplicates"""
+    rng = random.Random(seed)
+    rows = []
+    while len(rows) < count:
+        category = rng.choice(CATEGORIES)
+        key = f"{rng.choice(WORDS)}_{rng.randrange(10_000)}"
+        value = " ".join(rng.choice(WORDS) for _ in range(rng.randint(3, 8)))
+        rows.append((category, key, value))
+        if rng.random() < 0.05:
+            rows.append((category, typo(key, rng), typo(value, rng)))
+    return rows[:count]
+
+
+def load(brain: AlfredBrain, rows: list):
+    conn = brain._connect()
+    conn.executemany("""
+        INSERT INTO knowledge (timestamp, category, key, value)
+        VALUES ('2025-01-01T00:00:00', ?, ?, ?)
+    """, rows)
+    conn.commit()
+    conn.close()
+
+
+def legacy_pairs(brain: AlfredBrain, threshold: float) -> set:
+    """Original O(n^2) scan using calculate_knowledge_similarity"""
+    conn = brain._connect()
+    items = [
+        {'id': r[0], 'category': r[1], 'key': r[2], 'value': r[3]}
+        for r in conn.execute("SELECT id, category, key, value FROM knowledge ORDER BY category, key")
+    ]
+    conn.close()
+
+    pairs = set()
+    for i in range(len(items)):
+        for j in range(i + 1, len(items)):
+            if items[i]['category'] != items[j]['category']:
+                continue
+            if brain.calculate_knowledge_similarity(items[i], items[j]) >= threshold:
+                pairs.add((items[i]['id'], items[j]['id']))
+    return pairs
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Knowledge dedup benchmark")
+    parser.add_argument("--items", type=int, default=50_000)
+    parser.add_argument("--sample", type=int, default=2_000)
+    parser.add_argument("--threshold", type=float, default=0.85)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        print(f"Full run: {args.items:,} items")
+        brain = AlfredBrain(data_dir=str(Path(tmp) / "full"))
+        load(brain, synthetic_items(args.items))
+        t0 = time.perf_counter()
+        found = brain.find_duplicate_knowledge(args.threshold)
+        elapsed = time.perf_counter() - t0
+        print(f"  find_duplicate_knowledge: {elapsed:.2f}s, {len(found):,} duplicate pairs")
+        brain.close()
+
+        print(f"\nRecall check: {args.sample:,} items (all-pairs baseline)")
+        brain = AlfredBrain(data_dir=str(Path(tmp) / "sample"))
+        brain.DEDUP_EXHAUSTIVE_LIMIT = 0  # Force LSH path even on the subsample
+        load(brain, synthetic_items(args.sample))
+
+        t0 = time.perf_counter()
+        fast = {(a, b) for a, b, *_ in brain.find_duplicate_knowledge(args.threshold)}
+        fast_time = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        exact = legacy_pairs(brain, args.threshold)
+        exact_time = time.perf_counter() - t0
+
+        recall = len(fast & exact) / len(exact) if exact else 1.0
+        print(f"  LSH:    {fast_time:.2f}s, {len(fast)} pairs")
+        print(f"  legacy: {exact_time:.2f}s, {len(exact)} pairs")
+        print(f"  recall: {recall:.1%}, false positives: {len(fast - exact)}")
+        brain.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Benchmark: GrepTool/GlobTool search backend
+
+Builds a synthetic source tree (5,000 files by default) with a .gitignore'd
+build directory, a node_modules tree and binary blobs, then times the legacy
+search (Path.rglob + per-line regex over every file) against SearchEngine
+for a full scan, an early-stopping search and a glob.
+
+Usage:
+    python benchmarks/bench_search.py
+    python benchmarks/bench_search.py --files 20000 --workers 4
+
+Author: Daniel J Rita (BATDAN)
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.search import GlobTool, GrepTool
+from tools.search_engine import SearchEngine
+
+_rng = random.Random(11)
+WORDS = ["".join(_rng.choice(string.ascii_lowercase) for _ in range(_rng.randint(3, 10))) for _ in range(3_000)]
+
+
+def build_tree(root: Path, files: int, lines: int, seed: int = 5):
+    """Source files, plus ignored/binary content the legacy search also reads"""
+    rng = random.Random(seed)
+    (root / ".gitignore").write_text("build/\n*.bin\n")
+
+    def source(path: Path):
+        path.parent.mkdir(parents=True, exist_ok=True)
+        body = []
+        for _ in range(lines):
+            line = "    " + " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 12)))
+            if rng.random() < 0.002:
+                line += "  # FIXME handle this"
+            body.append(line)
+        path.write_text("\n".join(body) + "\n")
+
+    for i in range(files):
+        source(root / "src" / f"mod{i % 50:02d}" / f"file{i}.py")
+    for i in range(files // 4):
+        source(root / "node_modules" / f"pkg{i % 20}" / f"index{i}.js")
+        source(root / "build" / f"gen{i}.py")
+    for i in range(files // 20):
+        blob = root / "assets" / f"blob{i}.bin"
+        blob.parent.mkdir(parents=True, exist_ok=True)
+        blob.write_bytes(bytes(rng.randrange(256) for _ in range(32_768)))
+
+
+def legacy_grep(pattern: str, root: Path, max_results: int = None) -> list:
+    """The previous GrepTool loop (optionally stopping once max_results is reached)"""
+    regex = re.compile(pattern, re.IGNORECASE)
+    matches = []
+    for file_path in root.rglob("*"):
+        if not file_path.is_file():
+            continue
+        try:
+            with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+                for line_num, line in enumerate(f, 1):
+                    if regex.search(line):
+                        matches.append({'file': str(file_path), 'line_num': line_num, 'line': line.rstrip()})
+        except Exception:
+            continue
+        if max_results and len(matches) >= max_results:
+            break
+    return matches
+
+
+def legacy_glob(pattern: str, root: Path) -> list:
+    """The previous GlobTool body: glob, sort by mtime, format relative paths"""
+    matches = list(root.glob(pattern))
+    matches.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+    return [str(m.relative_to(root) if m.is_relative_to(root) else m) for m in matches]
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the search tools backend")
+    parser.add_argument("--files", type=int, default=5_000, help="Source files to generate")
+    parser.add_argument("--lines", type=int, default=120, help="Lines per file")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: CPU count)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        print(f"Building tree: {args.files} source files x {args.lines} lines ...")
+        build_tree(root, args.files, args.lines)
+
+        engine = SearchEngine(max_workers=args.workers)
+        grep, glob = GrepTool(engine), GlobTool(engine)
+        print(f"Workers: {engine.max_workers}\n")
+
+        old, t_old = timed(lambda: legacy_grep("fixme", root))
+        new, t_new = timed(lambda: grep.execute("fixme", str(root), max_results=10**9))
+        expected = {(m['file'], m['line_num']) for m in old if "/src/" in m['file']}
+        assert {(m['file'], m['line_num']) for m in new.metadata['matches']} == expected
+        print(f"Full scan       legacy {t_old:7.2f}s ({len(old)} hits)   engine {t_new:7.2f}s "
+              f"({new.metadata['count']} hits, ignored/binary skipped)   {t_old / t_new:5.1f}x")
+
+        old, t_old = timed(lambda: legacy_grep("fixme", root, max_results=20))
+        new, t_new = timed(lambda: grep.execute("fixme", str(root), max_results=20))
+        print(f"First 20 hits   legacy {t_old:7.2f}s   engine {t_new:7.2f}s   {t_old / t_new:5.1f}x")
+
+        old, t_old = timed(lambda: legacy_glob("**/*.py", root))
+        new, t_new = timed(lambda: glob.execute("**/*.py", str(root)))
+        print(f"Glob **/*.py    legacy {t_old:7.2f}s ({len(old)} files)   engine {t_new:7.2f}s "
+              f"({new.metadata['count']} files)   {t_old / t_new:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
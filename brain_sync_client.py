@@ -17,7 +17,6 @@ import os
 import sys
 import json
 import socket
-import sqlite3
 import hashlib
 import argparse
 import requests
@@ -31,15 +30,20 @@ sys.path.insert(0, str(Path(__file__).parent))
 from core.brain import AlfredBrain
 
 
+# Origin tag for rows merged from the server (never pushed back)
+SERVER_ORIGIN = "server"
+
+
 class BrainSyncClient:
     """Sync ALFRED's brain between PCs"""
 
-    def __init__(self, server_url: str = None):
-        self.brain = AlfredBrain()
+    def __init__(self, server_url: str = None, page_size: int = 500, brain: Optional[AlfredBrain] = None):
+        self.brain = brain or AlfredBrain()
         self.db_path = self.brain.db_path
         self.device_id = self._get_device_id()
         self.server_url = server_url or os.getenv("ALFRED_SYNC_SERVER", "http://localhost:5050")
         self.sync_state_file = Path(self.db_path).parent / "sync_state.json"
+        self.page_size = page_size
 
     def _get_device_id(self) -> str:
         """Generate unique device ID from hostname + MAC"""
@@ -49,24 +53,18 @@ class BrainSyncClient:
         return f"pc-{hostname}-{device_hash}"
 
     def _load_sync_state(self) -> Dict:
-        """Load last sync state"""
+        """Load last sync state (change-log cursors for both directions)"""
+        state = {"last_sync": None, "push_cursor": 0, "pull_cursor": 0}
         if self.sync_state_file.exists():
             with open(self.sync_state_file, 'r') as f:
-                return json.load(f)
-        return {"last_sync": None, "last_hash": None}
+                state.update(json.load(f))
+        return state
 
     def _save_sync_state(self, state: Dict):
         """Save sync state"""
         with open(self.sync_state_file, 'w') as f:
             json.dump(state, f, indent=2)
 
-    def _get_db_hash(self) -> str:
-        """Get hash of current database for change detection"""
-        if not os.path.exists(self.db_path):
-            return ""
-        with open(self.db_path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
-
     def register(self) -> bool:
         """Register this PC with the sync server"""
         try:
@@ -91,252 +89,125 @@ class BrainSyncClient:
             print(f"[ERROR] Cannot connect to sync server at {self.server_url}")
             return False
 
-    def get_local_changes(self, since: str = None) -> Dict[str, List]:
-        """Get all local changes since last sync"""
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        c = conn.cursor()
-
-        changes = {
-            "conversations": [],
-            "knowledge": [],
-            "patterns": [],
-            "skills": [],
-            "topics": [],
-            "mistakes": []
-        }
+    def get_local_changes(self, cursor: int = 0) -> Dict[str, Any]:
+        """
+        Get one page of local changes after a change-log cursor
 
-        # Build WHERE clause for timestamp filtering
-        time_filter = ""
-        if since:
-            time_filter = f"WHERE timestamp > '{since}'"
-
-        # Get conversations
-        c.execute(f"""
-            SELECT id, user_input, alfred_response, timestamp, importance,
-                   sentiment, topics, context, success
-            FROM conversations
-            {time_filter}
-            ORDER BY timestamp DESC
-            LIMIT 100
-        """)
-        for row in c.fetchall():
-            changes["conversations"].append(dict(row))
-
-        # Get knowledge
-        c.execute(f"""
-            SELECT id, category, key, value, confidence, importance,
-                   timestamp, source, last_accessed
-            FROM knowledge
-            {time_filter}
-            ORDER BY timestamp DESC
-            LIMIT 200
-        """)
-        for row in c.fetchall():
-            changes["knowledge"].append(dict(row))
-
-        # Get patterns
-        c.execute("""
-            SELECT id, pattern_type, pattern_data, frequency,
-                   success_rate, last_seen, confidence
-            FROM patterns
-            ORDER BY last_seen DESC
-            LIMIT 50
-        """)
-        for row in c.fetchall():
-            changes["patterns"].append(dict(row))
-
-        # Get skills
-        c.execute("""
-            SELECT skill_name, proficiency, times_used, success_count,
-                   failure_count, last_used, notes
-            FROM skills
-            ORDER BY last_used DESC
-        """)
-        for row in c.fetchall():
-            changes["skills"].append(dict(row))
-
-        # Get topics
-        c.execute("""
-            SELECT topic, frequency, first_seen, last_seen, interest_level
-            FROM topics
-            ORDER BY last_seen DESC
-            LIMIT 50
-        """)
-        for row in c.fetchall():
-            changes["topics"].append(dict(row))
-
-        # Get mistakes
-        c.execute("""
-            SELECT id, timestamp, error_type, description, context,
-                   solution, learned
-            FROM mistakes
-            ORDER BY timestamp DESC
-            LIMIT 50
-        """)
-        for row in c.fetchall():
-            changes["mistakes"].append(dict(row))
-
-        conn.close()
-        return changes
+        Rows pulled from the server are skipped so they are not echoed back.
+
+        Returns:
+            {"changes", "deletes", "next_cursor", "has_more"} (see AlfredBrain.get_changes)
+        """
+        return self.brain.get_changes(cursor, self.page_size, exclude_origin=SERVER_ORIGIN)
 
     def push(self) -> bool:
-        """Push local brain changes to server"""
+        """Push local brain changes to server, a page at a time from the last acknowledged cursor"""
         print(f"[SYNC] Pushing brain to {self.server_url}...")
 
         sync_state = self._load_sync_state()
-        changes = self.get_local_changes(sync_state.get("last_sync"))
-
-        total_items = sum(len(v) for v in changes.values())
-        print(f"[INFO] Sending {total_items} items to server")
+        totals = {"conversations": 0, "knowledge": 0, "unchanged": 0}
+        sent = 0
 
         try:
-            response = requests.post(
-                f"{self.server_url}/sync/push",
-                json={
-                    "device_id": self.device_id,
-                    "timestamp": datetime.now().isoformat(),
-                    "changes": changes
-                },
-                timeout=60,
-                headers={"Content-Encoding": "gzip"}
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                print(f"[OK] Push complete!")
-                print(f"     Conversations: {result.get('conversations_merged', 0)}")
-                print(f"     Knowledge: {result.get('knowledge_merged', 0)}")
-                print(f"     Conflicts resolved: {result.get('conflicts_resolved', 0)}")
-
-                # Update sync state
-                self._save_sync_state({
-                    "last_sync": datetime.now().isoformat(),
-                    "last_hash": self._get_db_hash(),
-                    "last_push": datetime.now().isoformat()
-                })
-                return True
-            else:
-                print(f"[ERROR] Push failed: {response.text}")
-                return False
+            while True:
+                page = self.get_local_changes(sync_state["push_cursor"])
+                items = sum(len(v) for v in page["changes"].values()) + sum(len(v) for v in page["deletes"].values())
+
+                if items:
+                    response = requests.post(
+                        f"{self.server_url}/sync/push",
+                        json={
+                            "device_id": self.device_id,
+                            "timestamp": datetime.now().isoformat(),
+                            "changes": page["changes"],
+                            "deletes": page["deletes"],
+                            "cursor": page["next_cursor"]
+                        },
+                        timeout=60
+                    )
+                    if response.status_code != 200:
+                        print(f"[ERROR] Push failed: {response.text}")
+                        return False
+
+                    merged = response.json().get("merged", {})
+                    for key in totals:
+                        totals[key] += merged.get(key, 0)
+                    sent += items
+
+                # Acknowledged: a retry resumes after this page
+                sync_state["push_cursor"] = page["next_cursor"]
+                sync_state["last_push"] = datetime.now().isoformat()
+                self._save_sync_state(sync_state)
+
+                if not page["has_more"]:
+                    break
 
         except requests.exceptions.ConnectionError:
             print(f"[ERROR] Cannot connect to {self.server_url}")
             return False
 
+        sync_state["last_sync"] = datetime.now().isoformat()
+        self._save_sync_state(sync_state)
+
+        print(f"[OK] Push complete! Sent {sent} changes")
+        print(f"     Conversations: {totals['conversations']}")
+        print(f"     Knowledge: {totals['knowledge']}")
+        print(f"     Already up to date: {totals['unchanged']}")
+        return True
+
     def pull(self) -> bool:
-        """Pull brain changes from server"""
+        """Pull brain changes from server, a page at a time from the last merged cursor"""
         print(f"[SYNC] Pulling brain from {self.server_url}...")
 
         sync_state = self._load_sync_state()
+        totals = {"conversations": 0, "knowledge": 0}
+        received = 0
 
         try:
-            response = requests.get(
-                f"{self.server_url}/sync/pull",
-                params={
-                    "device_id": self.device_id,
-                    "since": sync_state.get("last_sync")
-                },
-                timeout=60
-            )
+            while True:
+                response = requests.get(
+                    f"{self.server_url}/sync/pull",
+                    params={
+                        "device_id": self.device_id,
+                        "cursor": sync_state["pull_cursor"],
+                        "limit": self.page_size
+                    },
+                    timeout=60
+                )
+                if response.status_code != 200:
+                    print(f"[ERROR] Pull failed: {response.text}")
+                    return False
+
+                page = response.json()
+                received += sum(len(v) for v in page.get("changes", {}).values())
 
-            if response.status_code == 200:
-                data = response.json()
-                changes = data.get("changes", {})
+                # Merge into local brain
+                merged = self._merge_changes(page.get("changes", {}), page.get("deletes", {}))
+                for key in totals:
+                    totals[key] += merged.get(key, 0)
 
-                total_items = sum(len(v) for v in changes.values())
-                print(f"[INFO] Received {total_items} items from server")
+                sync_state["pull_cursor"] = page["next_cursor"]
+                sync_state["last_pull"] = datetime.now().isoformat()
+                self._save_sync_state(sync_state)
 
-                # Merge into local brain
-                merged = self._merge_changes(changes)
-
-                print(f"[OK] Pull complete!")
-                print(f"     Conversations: {merged.get('conversations', 0)}")
-                print(f"     Knowledge: {merged.get('knowledge', 0)}")
-
-                # Update sync state
-                self._save_sync_state({
-                    "last_sync": datetime.now().isoformat(),
-                    "last_hash": self._get_db_hash(),
-                    "last_pull": datetime.now().isoformat()
-                })
-                return True
-            else:
-                print(f"[ERROR] Pull failed: {response.text}")
-                return False
+                if not page.get("has_more"):
+                    break
 
         except requests.exceptions.ConnectionError:
             print(f"[ERROR] Cannot connect to {self.server_url}")
             return False
 
-    def _merge_changes(self, changes: Dict) -> Dict[str, int]:
-        """Merge remote changes into local brain"""
-        conn = sqlite3.connect(self.db_path)
-        c = conn.cursor()
-        merged = {}
-
-        # Merge conversations (skip duplicates by checking timestamp+user_input hash)
-        merged["conversations"] = 0
-        for conv in changes.get("conversations", []):
-            # Check if exists
-            c.execute("""
-                SELECT id FROM conversations
-                WHERE timestamp = ? AND user_input = ?
-            """, (conv["timestamp"], conv["user_input"]))
-            if not c.fetchone():
-                c.execute("""
-                    INSERT INTO conversations
-                    (user_input, alfred_response, timestamp, importance,
-                     sentiment, topics, context, success)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    conv["user_input"], conv["alfred_response"],
-                    conv["timestamp"], conv.get("importance", 5),
-                    conv.get("sentiment"), conv.get("topics"),
-                    conv.get("context"), conv.get("success", 1)
-                ))
-                merged["conversations"] += 1
-
-        # Merge knowledge (update if newer, insert if new)
-        merged["knowledge"] = 0
-        for k in changes.get("knowledge", []):
-            c.execute("""
-                SELECT id, timestamp FROM knowledge
-                WHERE category = ? AND key = ?
-            """, (k["category"], k["key"]))
-            existing = c.fetchone()
-
-            if existing:
-                # Update if newer
-                k_timestamp = k.get("timestamp") or k.get("learned_at", "")
-                if k_timestamp > (existing[1] or ""):
-                    c.execute("""
-                        UPDATE knowledge
-                        SET value = ?, confidence = ?, importance = ?,
-                            timestamp = ?, source = ?
-                        WHERE id = ?
-                    """, (
-                        k["value"], k.get("confidence", 0.5),
-                        k.get("importance", 5), k_timestamp,
-                        k.get("source", "sync"), existing[0]
-                    ))
-                    merged["knowledge"] += 1
-            else:
-                # Insert new
-                c.execute("""
-                    INSERT INTO knowledge
-                    (category, key, value, confidence, importance, timestamp, source)
-                    VALUES (?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    k["category"], k["key"], k["value"],
-                    k.get("confidence", 0.5), k.get("importance", 5),
-                    k.get("timestamp") or k.get("learned_at"), k.get("source", "sync")
-                ))
-                merged["knowledge"] += 1
-
-        conn.commit()
-        conn.close()
-        return merged
+        sync_state["last_sync"] = datetime.now().isoformat()
+        self._save_sync_state(sync_state)
+
+        print(f"[OK] Pull complete! Received {received} changes")
+        print(f"     Conversations: {totals['conversations']}")
+        print(f"     Knowledge: {totals['knowledge']}")
+        return True
+
+    def _merge_changes(self, changes: Dict, deletes: Optional[Dict] = None) -> Dict[str, int]:
+        """Merge remote changes into local brain (idempotent; tagged so they are not pushed back)"""
+        return self.brain.merge_changes(changes, deletes, origin=SERVER_ORIGIN)
 
     def sync(self) -> bool:
         """Full bidirectional sync"""
@@ -371,15 +242,15 @@ class BrainSyncClient:
     def status(self) -> Dict:
         """Get sync status"""
         sync_state = self._load_sync_state()
-        current_hash = self._get_db_hash()
 
-        has_local_changes = current_hash != sync_state.get("last_hash")
+        pending = self.brain.get_changes(sync_state["push_cursor"], limit=1, exclude_origin=SERVER_ORIGIN)
+        has_local_changes = any(pending["changes"].values()) or any(pending["deletes"].values())
 
         status = {
             "device_id": self.device_id,
             "server_url": self.server_url,
             "brain_path": str(self.db_path),
-            "last_sync": sync_state.get("last_sync", "Never"),
+            "last_sync": sync_state.get("last_sync") or "Never",
             "has_local_changes": has_local_changes,
             "brain_stats": self.brain.get_stats() if hasattr(self.brain, 'get_stats') else {}
         }
@@ -11,6 +11,7 @@ Capabilities:
 - Tech pulse (cutting-edge tech, AI developments, GitHub trending)
 - Encyclopedia (Wikipedia, Wikidata)
 - Web search (DuckDuckGo)
+- Shared lookup client (keep-alive sessions, TTL cache, web_cache persistence)
 
 Author: Daniel J Rita (BATDAN)
 For: ALFRED_J_RITA - State of the Art Intelligence System
@@ -23,6 +24,7 @@ from .news_lookup import NewsLookup, BusinessIntelligence, create_news_lookup, c
 from .cybersecurity_intel import CybersecurityIntel, create_cybersecurity_intel
 from .tech_pulse import TechPulse, create_tech_pulse
 from .encyclopedia_lookup import EncyclopediaLookup, create_encyclopedia_lookup
+from .lookup_client import LookupClient, LookupResponse, get_lookup_client
 
 __all__ = [
     # Stock
@@ -50,4 +52,8 @@ __all__ = [
     # Encyclopedia (Wikipedia)
     'EncyclopediaLookup',
     'create_encyclopedia_lookup',
+    # Shared HTTP layer (pooled sessions + TTL cache)
+    'LookupClient',
+    'LookupResponse',
+    'get_lookup_client',
 ]
@@ -16,11 +16,12 @@ For: ALFRED_J_RITA - State of the Art Cybersecurity Intelligence
 import os
 import re
 import logging
-import requests
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 import json
 
+from .lookup_client import get_lookup_client
+
 
 class CybersecurityIntel:
     """
@@ -80,6 +81,7 @@ class CybersecurityIntel:
             nvd_api_key: NVD API key (optional, increases rate limits)
         """
         self.logger = logging.getLogger(__name__)
+        self.http = get_lookup_client()  # Pooled keep-alive session + TTL cache
         self.nvd_api_key = nvd_api_key or os.getenv('NVD_API_KEY')
 
         # API endpoints
@@ -150,7 +152,7 @@ class CybersecurityIntel:
                 headers['apiKey'] = self.nvd_api_key
 
             params = {'cveId': cve_id.upper()}
-            response = requests.get(self.nvd_url, params=params, headers=headers, timeout=15)
+            response = self.http.get(self.nvd_url, params=params, headers=headers, timeout=15)
 
             if response.status_code == 200:
                 data = response.json()
@@ -250,7 +252,7 @@ class CybersecurityIntel:
                 'resultsPerPage': limit
             }
 
-            response = requests.get(self.nvd_url, params=params, headers=headers, timeout=20)
+            response = self.http.get(self.nvd_url, params=params, headers=headers, timeout=20)
 
             if response.status_code == 200:
                 data = response.json()
@@ -306,7 +308,7 @@ class CybersecurityIntel:
                 return self._cisa_kev_cache
 
         try:
-            response = requests.get(self.cisa_url, timeout=15)
+            response = self.http.get(self.cisa_url, timeout=15)
 
             if response.status_code == 200:
                 data = response.json()
@@ -350,7 +352,7 @@ class CybersecurityIntel:
                 'resultsPerPage': 20
             }
 
-            response = requests.get(self.nvd_url, params=params, headers=headers, timeout=20)
+            response = self.http.get(self.nvd_url, params=params, headers=headers, timeout=20)
 
             if response.status_code == 200:
                 data = response.json()
@@ -11,11 +11,12 @@ For: ALFRED_J_RITA - Human Knowledge Database
 """
 
 import logging
-import requests
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 import re
 
+from .lookup_client import get_lookup_client
+
 
 class EncyclopediaLookup:
     """
@@ -72,6 +73,7 @@ class EncyclopediaLookup:
             language: Wikipedia language code (default: English)
         """
         self.logger = logging.getLogger(__name__)
+        self.http = get_lookup_client()  # Pooled keep-alive session + TTL cache
         self.language = language
         self.base_api = f"https://{language}.wikipedia.org/api/rest_v1"
         self.action_api = f"https://{language}.wikipedia.org/w/api.php"
@@ -152,7 +154,7 @@ class EncyclopediaLookup:
             # Use the REST API for summaries
             url = f"{self.base_api}/page/summary/{title.replace(' ', '_')}"
 
-            response = requests.get(url, timeout=10)
+            response = self.http.get(url, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -196,7 +198,7 @@ class EncyclopediaLookup:
                 'format': 'json'
             }
 
-            response = requests.get(self.action_api, params=params, timeout=10)
+            response = self.http.get(self.action_api, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -234,7 +236,7 @@ class EncyclopediaLookup:
                 'format': 'json'
             }
 
-            response = requests.get(self.action_api, params=params, timeout=10)
+            response = self.http.get(self.action_api, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -281,7 +283,7 @@ class EncyclopediaLookup:
                 'format': 'json'
             }
 
-            response = requests.get(self.action_api, params=params, timeout=10)
+            response = self.http.get(self.action_api, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -327,7 +329,7 @@ class EncyclopediaLookup:
                 'format': 'json'
             }
 
-            response = requests.get(self.action_api, params=params, timeout=10)
+            response = self.http.get(self.action_api, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -362,7 +364,7 @@ class EncyclopediaLookup:
                 'format': 'json'
             }
 
-            response = requests.get(self.action_api, params=params, timeout=10)
+            response = self.http.get(self.action_api, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -390,7 +392,7 @@ class EncyclopediaLookup:
                 'format': 'json'
             }
 
-            response = requests.get(self.WIKIDATA_API, params=params, timeout=10)
+            response = self.http.get(self.WIKIDATA_API, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
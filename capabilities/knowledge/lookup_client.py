@@ -0,0 +1,419 @@
+"""
+Lookup Client - Shared HTTP layer for the knowledge lookup suite
+Keep-alive connection pools, per-endpoint TTL caching with
+stale-while-revalidate, and persistence into the brain's web_cache table
+
+Author: Daniel J Rita (BATDAN)
+"""
+
+import hashlib
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+from urllib.parse import urlencode
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# (URL pattern, TTL seconds) - first match wins
+DEFAULT_TTLS: List[Tuple[str, float]] = [
+    (r"api\.polygon\.io/v2/aggs", 60),                 # Quotes: seconds-to-minutes
+    (r"api\.polygon\.io/v2/reference/news", 900),
+    (r"alphavantage\.co", 900),
+    (r"openweathermap\.org/geo", 7 * 86400),          # Geocoding rarely changes
+    (r"openweathermap\.org", 600),
+    (r"newsapi\.org", 900),
+    (r"services\.nvd\.nist\.gov", 6 * 3600),          # CVE records: hours
+    (r"cisa\.gov", 3600),
+    (r"wikipedia\.org|wikidata\.org", 24 * 3600),     # Encyclopedia: hours
+    (r"api\.github\.com", 1800),
+    (r"hacker-news\.firebaseio\.com/v0/item", 900),   # Per-story cache (scores move)
+    (r"hacker-news\.firebaseio\.com", 300),
+    (r"duckduckgo\.com", 6 * 3600),
+]
+
+DEFAULT_TTL = 300
+
+# Query parameters that carry credentials - never part of a cache key or stored URL
+SECRET_PARAMS = {"apikey", "api_key", "appid", "key", "token", "access_token"}
+
+
+class LookupResponse:
+    """
+    Minimal requests.Response stand-in for cached results.
+
+    Exposes status_code, text, headers and json() - everything the lookup
+    modules use - plus from_cache / stale flags.
+    """
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict[str, str]] = None,
+                 from_cache: bool = False, stale: bool = False):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+        self.from_cache = from_cache
+        self.stale = stale
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode("utf-8")
+
+    def json(self) -> Any:
+        return json.loads(self.text)
+
+
+class LookupClient:
+    """
+    Shared HTTP client for StockLookup, WeatherLookup, NewsLookup,
+    EncyclopediaLookup, TechPulse, WebLookup and CybersecurityIntel.
+
+    Key Features:
+    - One requests.Session with pooled keep-alive connections (no handshake per call)
+    - Per-endpoint TTLs (DEFAULT_TTLS), overridable per call
+    - Stale-while-revalidate: an expired entry is served immediately while a
+      background refresh runs; also served if the live request fails
+    - Conditional revalidation (ETag / If-Modified-Since): a 304 renews an
+      entry without re-downloading it
+    - Persistence of successful responses into the brain's web_cache table
+    """
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        ttls: Optional[List[Tuple[str, float]]] = None,
+        default_ttl: float = DEFAULT_TTL,
+        stale_factor: float = 1.0,
+        max_entries: int = 2000,
+        pool_size: int = 16
+    ):
+        """
+        Initialize lookup client
+
+        Args:
+            db_path: Brain database for persistence (None = memory only)
+            ttls: (URL regex, seconds) rules, first match wins (default: DEFAULT_TTLS)
+            default_ttl: TTL for URLs no rule matches
+            stale_factor: Serve-stale window as a multiple of the TTL
+            max_entries: In-memory cache capacity
+            pool_size: Keep-alive connections per host
+        """
+        self.logger = logging.getLogger(__name__)
+        self.ttls = [(re.compile(pattern), ttl) for pattern, ttl in (ttls or DEFAULT_TTLS)]
+        self.default_ttl = default_ttl
+        self.stale_factor = stale_factor
+        self.max_entries = max_entries
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.session.headers["User-Agent"] = "ALFRED-Knowledge/1.0"
+
+        self._cache: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._refreshing = set()
+        self._refresher = ThreadPoolExecutor(max_workers=2, thread_name_prefix="lookup-refresh")
+
+        self._db_path = str(db_path) if db_path else None
+        self._db = None
+        self._db_lock = threading.Lock()
+
+        self.stats = {
+            "requests": 0,
+            "hits": 0,
+            "stale_hits": 0,
+            "misses": 0,
+            "revalidations": 0,
+            "not_modified": 0,
+            "errors": 0,
+            "stale_on_error": 0,
+        }
+
+    # ------------------------------------------------------------------
+    # Keys and TTLs
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    def cache_url(url: str, params: Optional[Dict] = None) -> str:
+        """Canonical URL for caching (sorted params, credentials removed)"""
+        if not params:
+            return url
+        public = sorted(
+            (k, str(v)) for k, v in params.items()
+            if k.lower() not in SECRET_PARAMS and v is not None
+        )
+        return f"{url}?{urlencode(public)}" if public else url
+
+    def ttl_for(self, url: str) -> float:
+        """TTL for a URL from the first matching rule"""
+        for pattern, ttl in self.ttls:
+            if pattern.search(url):
+                return ttl
+        return self.default_ttl
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+
+    def get(self, url: str, params: Optional[Dict] = None, headers: Optional[Dict] = None,
+            timeout: float = 10, ttl: Optional[float] = None) -> LookupResponse:
+        """
+        Cached GET (drop-in for requests.get in the lookup modules)
+
+        Args:
+            url: Endpoint URL
+            params: Query parameters
+            headers: Request headers
+            timeout: Seconds before the live request gives up
+            ttl: Override the endpoint TTL (0 disables caching)
+
+        Returns:
+            LookupResponse (raises requests exceptions only if nothing is cached)
+        """
+        key = self.cache_url(url, params)
+        ttl = self.ttl_for(key) if ttl is None else ttl
+        self.stats["requests"] += 1
+
+        entry = self._lookup(key) if ttl > 0 else None
+        if entry:
+            age = time.time() - entry["fetched_at"]
+            if age <= ttl:
+                self.stats["hits"] += 1
+                return self._response(entry)
+            if age <= ttl * (1 + self.stale_factor):
+                self.stats["stale_hits"] += 1
+                self._revalidate(key, url, params, headers, timeout, entry)
+                return self._response(entry, stale=True)
+
+        self.stats["misses"] += 1
+        try:
+            return self._fetch(key, url, params, headers, timeout, cache=ttl > 0, entry=entry)
+        except requests.exceptions.RequestException:
+            self.stats["errors"] += 1
+            if entry:
+                # Live request failed - an old answer beats no answer
+                self.stats["stale_on_error"] += 1
+                return self._response(entry, stale=True)
+            raise
+
+    def _fetch(self, key: str, url: str, params: Optional[Dict], headers: Optional[Dict],
+               timeout: float, cache: bool = True, entry: Optional[Dict] = None) -> LookupResponse:
+        """
+        Live request through the pooled session; caches 200 responses
+
+        When a cached entry has an ETag or Last-Modified validator the request
+        is conditional, and a 304 renews the entry without a new body.
+        """
+        validators = (entry or {}).get("headers", {})
+        if cache and validators:
+            headers = dict(headers or {})
+            if validators.get("ETag"):
+                headers["If-None-Match"] = validators["ETag"]
+            if validators.get("Last-Modified"):
+                headers["If-Modified-Since"] = validators["Last-Modified"]
+
+        response = self.session.get(url, params=params, headers=headers, timeout=timeout)
+
+        if response.status_code == 304 and entry:
+            self.stats["not_modified"] += 1
+            renewed = dict(entry, fetched_at=time.time())
+            self._store(key, renewed)
+            return self._response(renewed)
+
+        result = LookupResponse(response.status_code, response.text, dict(response.headers))
+
+        if cache and response.status_code == 200:
+            entry = {
+                "status": response.status_code,
+                "text": response.text,
+                "headers": {k: response.headers[k] for k in ("Content-Type", "ETag", "Last-Modified")
+                            if response.headers.get(k)},
+                "fetched_at": time.time(),
+            }
+            self._store(key, entry)
+
+        return result
+
+    def _revalidate(self, key: str, url: str, params: Optional[Dict],
+                    headers: Optional[Dict], timeout: float, entry: Optional[Dict] = None):
+        """Refresh an expired entry in the background (one refresh per key)"""
+        with self._lock:
+            if key in self._refreshing:
+                return
+            self._refreshing.add(key)
+
+        def refresh():
+            try:
+                self._fetch(key, url, params, headers, timeout, entry=entry)
+                self.stats["revalidations"] += 1
+            except requests.exceptions.RequestException as e:
+                self.stats["errors"] += 1
+                self.logger.debug(f"Background refresh failed for {key}: {e}")
+            finally:
+                with self._lock:
+                    self._refreshing.discard(key)
+
+        self._refresher.submit(refresh)
+
+    @staticmethod
+    def _response(entry: Dict, stale: bool = False) -> LookupResponse:
+        return LookupResponse(entry["status"], entry["text"], entry.get("headers"),
+                              from_cache=True, stale=stale)
+
+    # ------------------------------------------------------------------
+    # Storage (memory, then web_cache)
+    # ------------------------------------------------------------------
+
+    def _lookup(self, key: str) -> Optional[Dict]:
+        with self._lock:
+            entry = self._cache.get(key)
+        if entry is None:
+            entry = self._db_load(key)
+            if entry:
+                with self._lock:
+                    self._cache[key] = entry
+        return entry
+
+    def _store(self, key: str, entry: Dict):
+        with self._lock:
+            self._cache.pop(key, None)
+            self._cache[key] = entry
+            while len(self._cache) > self.max_entries:
+                self._cache.pop(next(iter(self._cache)))
+        self._db_save(key, entry)
+
+    def _connection(self) -> Optional[sqlite3.Connection]:
+        """Lazily open the brain database (persistence is disabled on any schema error)"""
+        if self._db is None and self._db_path:
+            try:
+                self._db = sqlite3.connect(self._db_path, timeout=5, check_same_thread=False)
+                self._db.execute("SELECT 1 FROM web_cache LIMIT 1")
+            except sqlite3.Error as e:
+                self.logger.warning(f"Lookup cache persistence disabled: {e}")
+                self._db_path = None
+                self._db = None
+        return self._db
+
+    def _db_load(self, key: str) -> Optional[Dict]:
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None:
+                return None
+            try:
+                row = conn.execute(
+                    "SELECT content, metadata FROM web_cache WHERE url = ?", (key,)
+                ).fetchone()
+                if row:
+                    conn.execute("""
+                        UPDATE web_cache
+                        SET times_accessed = times_accessed + 1, last_accessed = ?
+                        WHERE url = ?
+                    """, (datetime.now().isoformat(), key))
+                    conn.commit()
+            except sqlite3.Error as e:
+                self.logger.debug(f"web_cache read failed: {e}")
+                return None
+
+        if not row:
+            return None
+        metadata = json.loads(row[1] or "{}")
+        return {
+            "status": metadata.get("status", 200),
+            "text": row[0],
+            "headers": metadata.get("headers", {}),
+            "fetched_at": metadata.get("fetched_at", 0.0),
+        }
+
+    def _db_save(self, key: str, entry: Dict):
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            metadata = json.dumps({
+                "status": entry["status"],
+                "headers": entry["headers"],
+                "fetched_at": entry["fetched_at"],
+                "source": "lookup_client",
+            })
+            try:
+                conn.execute("""
+                    INSERT INTO web_cache (url, content, metadata, crawled_at, content_hash)
+                    VALUES (?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        content = excluded.content,
+                        metadata = excluded.metadata,
+                        crawled_at = excluded.crawled_at,
+                        content_hash = excluded.content_hash
+                """, (
+                    key, entry["text"], metadata,
+                    datetime.fromtimestamp(entry["fetched_at"]).isoformat(),
+                    hashlib.sha256(entry["text"].encode("utf-8")).hexdigest()
+                ))
+                conn.commit()
+            except sqlite3.Error as e:
+                self.logger.debug(f"web_cache write failed: {e}")
+
+    def record_market_data(self, symbol: str, market: str, data: Dict,
+                           data_type: str = "quote", source: Optional[str] = None):
+        """Persist a market data point into the brain's market_data table"""
+        with self._db_lock:
+            conn = self._connection()
+            if conn is None:
+                return
+            try:
+                conn.execute("""
+                    INSERT OR IGNORE INTO market_data
+                    (symbol, market, data, timestamp, data_type, source)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                """, (symbol, market, json.dumps(data, default=str),
+                      data.get("timestamp") or datetime.now().isoformat(), data_type, source))
+                conn.commit()
+            except sqlite3.Error as e:
+                self.logger.debug(f"market_data write failed: {e}")
+
+    def get_stats(self) -> Dict:
+        """Cache and request statistics"""
+        with self._lock:
+            entries = len(self._cache)
+        served = self.stats["hits"] + self.stats["stale_hits"]
+        return {
+            **self.stats,
+            "entries": entries,
+            "hit_rate": served / self.stats["requests"] if self.stats["requests"] else 0.0,
+            "persistent": self._db_path is not None,
+        }
+
+    def close(self):
+        """Close pooled connections and the database handle"""
+        self._refresher.shutdown(wait=False)
+        self.session.close()
+        with self._db_lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+
+_shared_client: Optional[LookupClient] = None
+_shared_lock = threading.Lock()
+
+
+def get_lookup_client() -> LookupClient:
+    """Process-wide LookupClient shared by every knowledge lookup"""
+    global _shared_client
+    with _shared_lock:
+        if _shared_client is None:
+            try:
+                from core.path_manager import PathManager
+                db_path = PathManager.BRAIN_DB if Path(PathManager.BRAIN_DB).exists() else None
+            except ImportError:
+                db_path = None
+            _shared_client = LookupClient(db_path=db_path)
+        return _shared_client
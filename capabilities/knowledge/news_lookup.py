@@ -15,10 +15,11 @@ Author: Daniel J Rita (BATDAN)
 import os
 import re
 import logging
-import requests
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 
+from .lookup_client import get_lookup_client
+
 
 class NewsLookup:
     """
@@ -72,6 +73,7 @@ class NewsLookup:
             alphavantage_key: Alpha Vantage API key (for market sentiment)
         """
         self.logger = logging.getLogger(__name__)
+        self.http = get_lookup_client()  # Pooled keep-alive session + TTL cache
 
         self.newsapi_key = newsapi_key or os.getenv('NEWSAPI_KEY')
         self.polygon_key = polygon_key or os.getenv('POLYGON_API_KEY')
@@ -215,7 +217,7 @@ class NewsLookup:
                     'pageSize': 10
                 }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -265,7 +267,7 @@ class NewsLookup:
             if ticker:
                 params['ticker'] = ticker.upper()
 
-            response = requests.get(self.polygon_url, params=params, timeout=10)
+            response = self.http.get(self.polygon_url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -311,7 +313,7 @@ class NewsLookup:
                 'limit': 10
             }
 
-            response = requests.get(self.alphavantage_url, params=params, timeout=10)
+            response = self.http.get(self.alphavantage_url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
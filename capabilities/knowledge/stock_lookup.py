@@ -8,10 +8,11 @@ Author: Daniel J Rita (BATDAN)
 import os
 import re
 import logging
-import requests
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 
+from .lookup_client import get_lookup_client
+
 
 class StockLookup:
     """
@@ -118,6 +119,7 @@ class StockLookup:
             api_key: Polygon.io API key (defaults to POLYGON_API_KEY env var)
         """
         self.logger = logging.getLogger(__name__)
+        self.http = get_lookup_client()  # Pooled keep-alive session + TTL cache
         self.api_key = api_key or os.getenv('POLYGON_API_KEY')
         self.base_url = "https://api.polygon.io"
 
@@ -215,13 +217,13 @@ class StockLookup:
 
             params = {'apiKey': self.api_key}
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
                 if data.get('results') and len(data['results']) > 0:
                     result = data['results'][0]
-                    return {
+                    quote = {
                         'ticker': ticker,
                         'price': result.get('c'),  # Close price
                         'open': result.get('o'),
@@ -233,6 +235,14 @@ class StockLookup:
                         'timestamp': datetime.now().isoformat()
                     }
 
+                    # Keep a history of fresh quotes in the brain's market_data table
+                    if not response.from_cache:
+                        self.http.record_market_data(
+                            ticker, 'crypto' if is_crypto else 'stocks', quote,
+                            data_type='quote', source='polygon'
+                        )
+                    return quote
+
             self.logger.warning(f"Polygon API returned {response.status_code} for {ticker}")
             return None
 
@@ -18,10 +18,12 @@ For: ALFRED_J_RITA - Edge of Tomorrow Technical Intelligence
 import os
 import re
 import logging
-import requests
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime, timedelta
 import json
+from concurrent.futures import ThreadPoolExecutor
+
+from .lookup_client import get_lookup_client
 
 
 class TechPulse:
@@ -102,6 +104,9 @@ class TechPulse:
         'osint': ['maltego', 'spiderfoot', 'theHarvester', 'shodan'],
     }
 
+    # Concurrent requests per batch (Hacker News items, GitHub releases)
+    MAX_PARALLEL_FETCHES = 10
+
     def __init__(self, github_token: Optional[str] = None,
                  newsapi_key: Optional[str] = None):
         """
@@ -112,6 +117,7 @@ class TechPulse:
             newsapi_key: NewsAPI key for tech news
         """
         self.logger = logging.getLogger(__name__)
+        self.http = get_lookup_client()  # Pooled keep-alive session + TTL cache
         self.github_token = github_token or os.getenv('GITHUB_TOKEN')
         self.newsapi_key = newsapi_key or os.getenv('NEWSAPI_KEY')
 
@@ -120,6 +126,19 @@ class TechPulse:
         self.newsapi_url = "https://newsapi.org/v2"
         self.hacker_news_api = "https://hacker-news.firebaseio.com/v0"
 
+        # Bounded pool shared by all TechPulse instances for batched item fetches
+        self._executor = TechPulse._shared_executor()
+
+    _executor_instance: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def _shared_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor_instance is None:
+            cls._executor_instance = ThreadPoolExecutor(
+                max_workers=cls.MAX_PARALLEL_FETCHES, thread_name_prefix="tech-pulse"
+            )
+        return cls._executor_instance
+
     def is_available(self) -> bool:
         """Tech pulse is always available"""
         return True
@@ -201,7 +220,7 @@ class TechPulse:
                 'per_page': 10
             }
 
-            response = requests.get(
+            response = self.http.get(
                 f"{self.github_api}/search/repositories",
                 params=params,
                 headers=headers,
@@ -237,8 +256,6 @@ class TechPulse:
         Returns:
             List of security tool updates
         """
-        updates = []
-
         # Check a few popular security repos
         security_repos = [
             'projectdiscovery/nuclei',
@@ -255,27 +272,28 @@ class TechPulse:
         if self.github_token:
             headers['Authorization'] = f'token {self.github_token}'
 
-        for repo in security_repos[:5]:  # Limit to avoid rate limits
-            try:
-                response = requests.get(
-                    f"{self.github_api}/repos/{repo}/releases/latest",
-                    headers=headers,
-                    timeout=5
-                )
-
-                if response.status_code == 200:
-                    release = response.json()
-                    updates.append({
-                        'tool': repo.split('/')[-1],
-                        'repo': repo,
-                        'version': release.get('tag_name', 'Unknown'),
-                        'published': release.get('published_at', '')[:10],
-                        'name': release.get('name', ''),
-                        'url': release.get('html_url', '')
-                    })
+        def latest_release(repo: str) -> Optional[Dict]:
+            # Revalidated with ETag/If-Modified-Since - 304s don't count against rate limits
+            response = self.http.get(
+                f"{self.github_api}/repos/{repo}/releases/latest",
+                headers=headers,
+                timeout=5
+            )
+            if response.status_code != 200:
+                return None
+
+            release = response.json()
+            return {
+                'tool': repo.split('/')[-1],
+                'repo': repo,
+                'version': release.get('tag_name', 'Unknown'),
+                'published': release.get('published_at', '')[:10],
+                'name': release.get('name', ''),
+                'url': release.get('html_url', '')
+            }
 
-            except Exception:
-                continue
+        repos = security_repos[:5]  # Limit to avoid rate limits
+        updates = [update for update in self._fetch_all(latest_release, repos) if update]
 
         return updates
 
@@ -291,28 +309,25 @@ class TechPulse:
         """
         try:
             # Get top story IDs
-            response = requests.get(f"{self.hacker_news_api}/topstories.json", timeout=10)
+            response = self.http.get(f"{self.hacker_news_api}/topstories.json", timeout=10)
 
             if response.status_code == 200:
                 story_ids = response.json()[:limit]
-                stories = []
 
-                for story_id in story_ids:
-                    story_response = requests.get(
-                        f"{self.hacker_news_api}/item/{story_id}.json",
-                        timeout=5
-                    )
-
-                    if story_response.status_code == 200:
-                        story = story_response.json()
-                        if story.get('type') == 'story':
-                            stories.append({
-                                'title': story.get('title', ''),
-                                'url': story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
-                                'score': story.get('score', 0),
-                                'comments': story.get('descendants', 0),
-                                'by': story.get('by', 'unknown')
-                            })
+                # One concurrent batch instead of a round-trip per story;
+                # items are cached per story ID by the lookup client
+                items = self._fetch_all(self._get_hn_item, story_ids)
+
+                stories = []
+                for story_id, story in zip(story_ids, items):
+                    if story and story.get('type') == 'story':
+                        stories.append({
+                            'title': story.get('title', ''),
+                            'url': story.get('url', f"https://news.ycombinator.com/item?id={story_id}"),
+                            'score': story.get('score', 0),
+                            'comments': story.get('descendants', 0),
+                            'by': story.get('by', 'unknown')
+                        })
 
                 return stories
 
@@ -322,6 +337,28 @@ class TechPulse:
             self.logger.error(f"Hacker News fetch failed: {e}")
             return []
 
+    def _get_hn_item(self, story_id: int) -> Optional[Dict]:
+        """Fetch one Hacker News item (cached by story ID)"""
+        response = self.http.get(f"{self.hacker_news_api}/item/{story_id}.json", timeout=5)
+        if response.status_code == 200:
+            return response.json()
+        return None
+
+    def _fetch_all(self, fetch, items: List) -> List:
+        """
+        Run fetch(item) for every item on the shared pool, preserving order
+
+        Failed fetches yield None rather than aborting the batch.
+        """
+        def safe_fetch(item):
+            try:
+                return fetch(item)
+            except Exception as e:
+                self.logger.debug(f"Tech pulse fetch failed for {item}: {e}")
+                return None
+
+        return list(self._executor.map(safe_fetch, items))
+
     def get_ai_developments(self) -> Dict:
         """
         Get latest AI/ML developments
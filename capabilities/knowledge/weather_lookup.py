@@ -14,10 +14,11 @@ Author: Daniel J Rita (BATDAN)
 import os
 import re
 import logging
-import requests
 from typing import Optional, Dict, List, Tuple
 from datetime import datetime
 
+from .lookup_client import get_lookup_client
+
 
 class WeatherLookup:
     """
@@ -61,6 +62,7 @@ class WeatherLookup:
             default_location: Default location if none specified
         """
         self.logger = logging.getLogger(__name__)
+        self.http = get_lookup_client()  # Pooled keep-alive session + TTL cache
         self.api_key = api_key or os.getenv('OPEN_WEATHER_KEY') or os.getenv('OPENWEATHERMAP_API_KEY')
         self.base_url = "https://api.openweathermap.org/data/2.5"
         self.geo_url = "https://api.openweathermap.org/geo/1.0"
@@ -152,7 +154,7 @@ class WeatherLookup:
                 'appid': self.api_key
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
             if response.status_code == 200:
                 data = response.json()
                 if data:
@@ -189,7 +191,7 @@ class WeatherLookup:
                 'units': 'imperial'  # Fahrenheit
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -243,7 +245,7 @@ class WeatherLookup:
                 'cnt': min(days * 8, 40)  # 3-hour intervals, 8 per day
             }
 
-            response = requests.get(url, params=params, timeout=10)
+            response = self.http.get(url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
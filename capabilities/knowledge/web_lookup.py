@@ -6,11 +6,12 @@ Author: Daniel J Rita (BATDAN)
 """
 
 import logging
-import requests
 from typing import Optional, List, Dict, Tuple
 from datetime import datetime
 import re
 
+from .lookup_client import get_lookup_client
+
 
 class WebLookup:
     """
@@ -23,6 +24,7 @@ class WebLookup:
     def __init__(self):
         """Initialize web lookup"""
         self.logger = logging.getLogger(__name__)
+        self.http = get_lookup_client()  # Pooled keep-alive session + TTL cache
         self.ddg_url = "https://api.duckduckgo.com/"
 
     def is_available(self) -> bool:
@@ -47,7 +49,7 @@ class WebLookup:
                 'skip_disambig': 1
             }
 
-            response = requests.get(self.ddg_url, params=params, timeout=10)
+            response = self.http.get(self.ddg_url, params=params, timeout=10)
 
             if response.status_code == 200:
                 data = response.json()
@@ -0,0 +1,468 @@
+#!/usr/bin/env python3
+"""
+Alfred Document Chunker - Streaming, token-aware, markdown-aware chunking
+
+Features:
+- Generator API: works over a string, a file object or any iterable of text
+  pieces and yields chunks as soon as they are complete (memory stays flat
+  on multi-megabyte documents)
+- Chunks sized by embedding-model tokens (any tokenizer with encode/tokenize
+  or a counting callable) or by characters
+- Markdown structure respected: headings start new chunks, fenced code blocks
+  are kept whole where they fit, and each chunk records its heading path
+"""
+
+import logging
+import re
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+HEADING_RE = re.compile(r"^(#{1,6})\s+(.+?)\s*#*\s*$")
+FENCE_RE = re.compile(r"^\s{0,3}(```|~~~)")
+SENTENCE_RE = re.compile(r"(?<=[.!?])\s+")
+
+TextSource = Union[str, Iterable[str]]
+
+
+def token_counter(tokenizer: Any = None) -> Callable[[str], int]:
+    """
+    Build a size function for chunking
+
+    Args:
+        tokenizer: None (count characters), a callable returning a token
+            count, or a tokenizer object with encode() (HuggingFace,
+            tiktoken) or tokenize()
+
+    Returns:
+        Function mapping text to its size
+    """
+    if tokenizer is None:
+        return len
+
+    if hasattr(tokenizer, 'encode'):
+        def count(text: str) -> int:
+            try:
+                return len(tokenizer.encode(text, add_special_tokens=False))
+            except TypeError:  # tiktoken-style encode(text)
+                return len(tokenizer.encode(text))
+        return count
+
+    if hasattr(tokenizer, 'tokenize'):
+        return lambda text: len(tokenizer.tokenize(text))
+
+    if callable(tokenizer):
+        return tokenizer
+
+    raise TypeError(f"Unsupported tokenizer: {type(tokenizer).__name__}")
+
+
+@dataclass
+class _Block:
+    """A structural unit of the document (paragraph, heading or code block)"""
+    text: str
+    start: int
+    end: int
+    kind: str
+    section: str
+    size: int = 0
+
+
+class DocumentChunker:
+    """
+    Chunks large documents into smaller pieces for better retrieval
+
+    The document is read line by line and split into blocks (headings,
+    paragraphs, fenced code). Blocks are packed into chunks up to chunk_size;
+    only oversized blocks are split further (sentences, then words), and the
+    tail of each chunk is carried into the next as overlap.
+    """
+
+    def __init__(
+        self,
+        chunk_size: int = 1000,
+        chunk_overlap: int = 200,
+        tokenizer: Any = None,
+        max_line_chars: int = 64 * 1024
+    ):
+        """
+        Initialize chunker
+
+        Args:
+            chunk_size: Target size of each chunk (characters, or tokens if a
+                tokenizer is given)
+            chunk_overlap: Overlap between chunks for context (same unit)
+            tokenizer: Optional embedding-model tokenizer (see token_counter)
+            max_line_chars: Lines/paragraphs longer than this are cut while
+                reading, so a single huge line never sits in memory whole
+        """
+        self.chunk_size = max(1, chunk_size)
+        self.chunk_overlap = max(0, min(chunk_overlap, self.chunk_size // 2))
+        self.tokenizer = tokenizer
+        self.unit = 'tokens' if tokenizer is not None else 'chars'
+        self.max_line_chars = max_line_chars
+        self._size = token_counter(tokenizer)
+        self._sep = self._size('\n\n')  # Cost of joining two blocks
+
+    # ==================== PUBLIC API ====================
+
+    def iter_chunks(self, source: TextSource, metadata: Optional[Dict] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily chunk a document
+
+        Args:
+            source: Text, an open text file, or an iterable of text pieces
+                (e.g. a streamed HTTP body)
+            metadata: Metadata to include with each chunk
+
+        Yields:
+            Dicts with text and metadata (chunk_num, chunk_start, chunk_end,
+            chunk_size, chunk_tokens when token-sized, section when under a
+            heading)
+        """
+        metadata = metadata or {}
+        current: List[_Block] = []
+        current_size = 0
+        chunk_num = 0
+
+        for block in self._sized_blocks(self._blocks(self._lines(source))):
+            # Prefer starting a chunk at a heading once the current one is reasonably full
+            if block.kind == 'heading' and current_size >= self.chunk_size // 2 and self._has_content(current):
+                yield self._make_chunk(current, chunk_num, metadata)
+                chunk_num += 1
+                current, current_size = [], 0
+
+            if current and current_size + self._sep + block.size > self.chunk_size:
+                # Trailing headings move to the next chunk, with the text they introduce
+                headings: List[_Block] = []
+                while current and current[-1].kind == 'heading':
+                    headings.insert(0, current.pop())
+
+                if self._has_content(current):
+                    yield self._make_chunk(current, chunk_num, metadata)
+                    chunk_num += 1
+                current = headings or self._overlap_tail(current, self.chunk_size - block.size - self._sep)
+                current_size = sum(b.size + self._sep for b in current)
+                while current and current_size + block.size > self.chunk_size:
+                    current_size -= current.pop(0).size + self._sep
+
+            if current:
+                current_size += self._sep
+            current.append(block)
+            current_size += block.size
+
+        if self._has_content(current):
+            yield self._make_chunk(current, chunk_num, metadata)
+            chunk_num += 1
+
+        logging.debug(f"Chunked text into {chunk_num} pieces")
+
+    def chunk_text(self, text: TextSource, metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+        """
+        Chunk text into overlapping segments
+
+        Args:
+            text: Text to chunk (or any source accepted by iter_chunks)
+            metadata: Metadata to include with each chunk
+
+        Returns:
+            List of chunks with text and metadata
+        """
+        if not text:
+            return []
+        chunks = list(self.iter_chunks(text, metadata))
+        logging.info(f"Chunked text into {len(chunks)} pieces")
+        return chunks
+
+    def chunk_documents(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        text_key: str = 'text',
+        metadata_key: str = 'metadata'
+    ) -> List[Dict[str, Any]]:
+        """
+        Chunk multiple documents
+
+        Args:
+            documents: List of documents with text and metadata
+            text_key: Key for text in document dict
+            metadata_key: Key for metadata in document dict
+
+        Returns:
+            List of chunked documents
+        """
+        return list(self.iter_documents(documents, text_key, metadata_key))
+
+    def iter_documents(
+        self,
+        documents: Iterable[Dict[str, Any]],
+        text_key: str = 'text',
+        metadata_key: str = 'metadata'
+    ) -> Iterator[Dict[str, Any]]:
+        """Lazy chunk_documents"""
+        for doc in documents:
+            text = doc.get(text_key, '')
+            if text:
+                yield from self.iter_chunks(text, doc.get(metadata_key, {}))
+
+    # ==================== READING ====================
+
+    def _lines(self, source: TextSource) -> Iterator[Tuple[str, int]]:
+        """(line without newline, offset) pairs from any text source"""
+        pieces = (source,) if isinstance(source, str) else source
+        buffer = ''
+        offset = 0  # Offset of buffer[0] in the document
+
+        for piece in pieces:
+            if not piece:
+                continue
+            buffer = buffer + piece if buffer else piece
+            pos = 0
+            while True:
+                newline = buffer.find('\n', pos)
+                if newline < 0:
+                    break
+                yield buffer[pos:newline], offset + pos
+                pos = newline + 1
+
+            # A line with no end in sight is cut so it never grows unbounded
+            while len(buffer) - pos > self.max_line_chars:
+                yield buffer[pos:pos + self.max_line_chars], offset + pos
+                pos += self.max_line_chars
+
+            buffer = buffer[pos:]
+            offset += pos
+
+        if buffer:
+            yield buffer, offset
+
+    def _blocks(self, lines: Iterator[Tuple[str, int]]) -> Iterator[_Block]:
+        """Group lines into headings, paragraphs and fenced code blocks"""
+        headings: List[str] = []
+        section = ''
+        para: List[str] = []
+        para_start = para_end = para_chars = 0
+        fence: Optional[str] = None
+
+        def flush(kind: str) -> Optional[_Block]:
+            nonlocal para, para_chars
+            if not para:
+                return None
+            text = '\n'.join(para)
+            para, para_chars = [], 0
+            if kind != 'code':
+                text = text.strip()
+            return _Block(text, para_start, para_end, kind, section) if text.strip() else None
+
+        for line, start in lines:
+            end = start + len(line)
+
+            if fence is not None:
+                if not para:
+                    para_start = start
+                para.append(line)
+                para_end, para_chars = end, para_chars + len(line) + 1
+                if FENCE_RE.match(line) and line.strip().startswith(fence):
+                    fence = None
+                    block = flush('code')
+                    if block:
+                        yield block
+                elif para_chars > self.max_line_chars:
+                    block = flush('code')
+                    if block:
+                        yield block
+                continue
+
+            fence_match = FENCE_RE.match(line)
+            if fence_match:
+                block = flush('text')
+                if block:
+                    yield block
+                fence = fence_match.group(1)
+                para, para_start, para_end, para_chars = [line], start, end, len(line) + 1
+                continue
+
+            heading = HEADING_RE.match(line)
+            if heading:
+                block = flush('text')
+                if block:
+                    yield block
+                level = len(heading.group(1))
+                headings = headings[:level - 1] + [heading.group(2)]
+                section = ' > '.join(headings)
+                yield _Block(line.strip(), start, end, 'heading', section)
+                continue
+
+            if not line.strip():
+                block = flush('text')
+                if block:
+                    yield block
+                continue
+
+            if not para:
+                para_start = start
+            para.append(line)
+            para_end, para_chars = end, para_chars + len(line) + 1
+            if para_chars > self.max_line_chars:
+                block = flush('text')
+                if block:
+                    yield block
+
+        block = flush('code' if fence is not None else 'text')
+        if block:
+            yield block
+
+    # ==================== PACKING ====================
+
+    def _sized_blocks(self, blocks: Iterator[_Block]) -> Iterator[_Block]:
+        """Measure each block once; split the ones that can never fit a chunk"""
+        headings = 0  # Size of the headings right before this block (they share its chunk)
+        for block in blocks:
+            block.size = self._size(block.text)
+            if block.size <= self.chunk_size:
+                yield block
+            else:
+                yield from self._split_block(block, min(headings, self.chunk_size // 2))
+            headings = headings + block.size + self._sep if block.kind == 'heading' else 0
+
+    def _split_block(self, block: _Block, reserve: int = 0) -> Iterator[_Block]:
+        """
+        Split an oversized block at lines (code) or sentences, then words
+
+        Args:
+            block: Block larger than chunk_size
+            reserve: Room to keep for the headings that precede the block
+        """
+        if block.kind == 'code':
+            units = block.text.split('\n')
+            joiner = '\n'
+        else:
+            units = SENTENCE_RE.split(block.text)
+            joiner = ' '
+
+        joiner_size = self._size(joiner)
+        limit = max(1, self.chunk_size - self.chunk_overlap - self._sep)  # Leave room for overlap
+        # The first piece shares its chunk with the headings before the block
+        room = max(1, self.chunk_size - max(self.chunk_overlap + self._sep, reserve))
+        cursor = 0
+        pieces: List[str] = []
+        size = 0
+
+        def emit() -> _Block:
+            nonlocal cursor, room
+            room = limit
+            text = joiner.join(pieces)
+            start = block.text.find(pieces[0], cursor)
+            start = cursor if start < 0 else start
+            cursor = start + len(text)
+            return _Block(text, block.start + start, block.start + cursor, block.kind, block.section, size)
+
+        for unit in units:
+            unit_size = self._size(unit)
+            if unit_size > room:
+                if pieces:
+                    yield emit()
+                    pieces, size = [], 0
+                for part in self._split_unit(unit, unit_size, room):
+                    pieces, size = [part], self._size(part)
+                    yield emit()
+                pieces, size = [], 0
+                continue
+            if pieces and size + joiner_size + unit_size > room:
+                yield emit()
+                pieces, size = [], 0
+            if pieces:
+                size += joiner_size
+            pieces.append(unit)
+            size += unit_size
+
+        if pieces:
+            yield emit()
+
+    def _split_unit(self, text: str, size: int, limit: int) -> Iterator[str]:
+        """Split a single oversized sentence/line at words, hard-cutting giant words"""
+        words = text.split()
+        if len(words) <= 1:
+            step = max(1, len(text) * limit // max(size, 1))
+            for i in range(0, len(text), step):
+                yield text[i:i + step]
+            return
+
+        part: List[str] = []
+        part_size = 0
+        for word in words:
+            word_size = self._size(word)
+            if word_size > limit:
+                if part:
+                    yield ' '.join(part)
+                    part, part_size = [], 0
+                yield from self._split_unit(word, word_size, limit)
+                continue
+            if part and part_size + word_size + 1 > limit:
+                yield ' '.join(part)
+                part, part_size = [], 0
+            part.append(word)
+            part_size += word_size + (1 if self.tokenizer is None else 0)
+        if part:
+            yield ' '.join(part)
+
+    def _overlap_tail(self, blocks: List[_Block], room: int) -> List[_Block]:
+        """Trailing context carried into the next chunk (never more than room)"""
+        budget = min(self.chunk_overlap, room)
+        if budget <= 0:
+            return []
+
+        tail: List[_Block] = []
+        used = 0
+        for block in reversed(blocks):
+            if block.kind == 'heading' or used + block.size + self._sep > budget:
+                break
+            tail.insert(0, _Block(block.text, block.start, block.end, 'overlap', block.section, block.size))
+            used += block.size + self._sep
+
+        if tail or blocks[-1].kind in ('heading', 'code'):
+            return tail
+
+        # Last paragraph is too long to repeat whole: carry its final sentences
+        last = blocks[-1]
+        sentences = SENTENCE_RE.split(last.text)
+        kept: List[str] = []
+        used = self._sep
+        for sentence in reversed(sentences[1:]):
+            sentence_size = self._size(sentence) + 1
+            if used + sentence_size > budget:
+                break
+            kept.insert(0, sentence)
+            used += sentence_size
+        if not kept:
+            return []
+        text = ' '.join(kept)
+        return [_Block(text, last.end - len(text), last.end, 'overlap', last.section, self._size(text))]
+
+    @staticmethod
+    def _has_content(blocks: List[_Block]) -> bool:
+        """True if blocks hold more than the overlap already emitted"""
+        return any(block.kind != 'overlap' for block in blocks)
+
+    def _make_chunk(self, blocks: List[_Block], chunk_num: int, metadata: Dict) -> Dict[str, Any]:
+        text = '\n\n'.join(block.text for block in blocks)
+        # Section of the first new block (overlap belongs to the previous chunk)
+        section = next((b.section for b in blocks if b.kind != 'overlap'), blocks[0].section)
+
+        chunk_meta = {
+            **metadata,
+            'chunk_num': chunk_num,
+            'chunk_start': blocks[0].start,
+            'chunk_end': blocks[-1].end,
+            'chunk_size': len(text)
+        }
+        if self.tokenizer is not None:
+            chunk_meta['chunk_tokens'] = sum(block.size for block in blocks)
+        if section:
+            chunk_meta['section'] = section
+
+        return {'text': text, 'metadata': chunk_meta}
+
+
+def chunk_large_text(text: TextSource, chunk_size: int = 1000) -> List[str]:
+    """Quick text chunking"""
+    return [c['text'] for c in DocumentChunker(chunk_size=chunk_size).iter_chunks(text)]
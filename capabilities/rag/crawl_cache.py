@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+ALFRED Crawl Cache - Persistent page cache shared by all crawlers
+
+Features:
+- SQLite-backed, survives restarts (one file shared by WebIntelligence,
+  AdvancedCrawler and CrawlerPowerUps)
+- zlib-compressed entries
+- ETag / Last-Modified validators for conditional revalidation
+- LRU eviction once the compressed size exceeds a byte budget (monitoring
+  snapshots are pinned: never evicted, not counted against the budget)
+- Hit / miss / bytes-saved statistics
+"""
+
+import json
+import logging
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional, Tuple
+
+try:
+    from .crawl_frontier import normalize_url
+except ImportError:
+    # When running as script directly
+    from crawl_frontier import normalize_url
+
+logger = logging.getLogger("crawl_cache")
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL = 3600
+
+# Namespaces whose entries are baselines rather than a cache (change detection
+# loses its reference if they are dropped): never evicted, outside the budget
+PINNED_NAMESPACES = ('snapshot',)
+_PINNED_SQL = ', '.join(f"'{namespace}'" for namespace in PINNED_NAMESPACES)
+
+
+class CrawlCache:
+    """
+    Size-bounded, disk-backed cache of crawl results.
+
+    Entries live in namespaces ('page' for WebIntelligence results, 'advanced'
+    for AdvancedCrawler results, 'snapshot' for monitoring snapshots) keyed by
+    normalized URL; each producer's result shape stays in its own namespace. Each stores the JSON
+    payload compressed, the response validators and access times for LRU.
+    """
+
+    def __init__(
+        self,
+        path: Optional[str] = None,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        ttl: float = DEFAULT_TTL,
+        compress_level: int = 6
+    ):
+        """
+        Initialize crawl cache
+
+        Args:
+            path: SQLite file (default: PathManager.CACHE_DIR/crawl_cache.db)
+            max_bytes: Compressed size budget before LRU eviction (pinned
+                namespaces are not counted)
+            ttl: Seconds an entry is served without revalidation
+            compress_level: zlib level (1 = fastest, 9 = smallest)
+        """
+        self.path = Path(path) if path else _default_path()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.compress_level = compress_level
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS crawl_cache (
+                namespace TEXT NOT NULL,
+                url TEXT NOT NULL,
+                data BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                raw_size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                accessed_at REAL NOT NULL,
+                PRIMARY KEY (namespace, url)
+            )
+        """)
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_crawl_cache_lru ON crawl_cache(accessed_at)")
+        self._conn.commit()
+
+        self._total_bytes = self._conn.execute(
+            f"SELECT COALESCE(SUM(size), 0) FROM crawl_cache WHERE namespace NOT IN ({_PINNED_SQL})"
+        ).fetchone()[0]
+
+        self.stats = {
+            'hits': 0,
+            'misses': 0,
+            'stale': 0,
+            'revalidated': 0,
+            'stores': 0,
+            'evictions': 0,
+            'bytes_saved': 0
+        }
+
+    def get(self, url: str, namespace: str = 'page', ttl: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Look up a cached entry.
+
+        Fresh entries count as hits; expired ones are still returned (with
+        fresh=False) so the caller can revalidate using their validators.
+
+        Args:
+            url: URL to look up
+            namespace: Entry namespace
+            ttl: Override the default freshness lifetime
+
+        Returns:
+            Dict with data, etag, last_modified, fetched_at, raw_size and
+            fresh - or None on a miss
+        """
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT data, raw_size, etag, last_modified, fetched_at FROM crawl_cache "
+                "WHERE namespace = ? AND url = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                self.stats['misses'] += 1
+                return None
+
+            data, raw_size, etag, last_modified, fetched_at = row
+            fresh = now - fetched_at < (self.ttl if ttl is None else ttl)
+            if fresh:
+                self.stats['hits'] += 1
+                self.stats['bytes_saved'] += raw_size
+                self._conn.execute(
+                    "UPDATE crawl_cache SET accessed_at = ? WHERE namespace = ? AND url = ?",
+                    (now, namespace, key)
+                )
+                self._conn.commit()
+            else:
+                self.stats['stale'] += 1
+
+        return {
+            'data': json.loads(zlib.decompress(data)),
+            'etag': etag,
+            'last_modified': last_modified,
+            'fetched_at': fetched_at,
+            'raw_size': raw_size,
+            'fresh': fresh
+        }
+
+    def put(
+        self,
+        url: str,
+        data: Any,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        namespace: str = 'page'
+    ):
+        """
+        Store an entry (replacing any previous one) and evict if over budget.
+
+        Args:
+            url: URL the data belongs to
+            data: JSON-serializable payload
+            etag: ETag response header
+            last_modified: Last-Modified response header
+            namespace: Entry namespace
+        """
+        raw = json.dumps(data, default=str).encode('utf-8')
+        blob = zlib.compress(raw, self.compress_level)
+        key = normalize_url(url)
+        now = time.time()
+
+        with self._lock:
+            old = self._conn.execute(
+                "SELECT size FROM crawl_cache WHERE namespace = ? AND url = ?", (namespace, key)
+            ).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO crawl_cache "
+                "(namespace, url, data, size, raw_size, etag, last_modified, fetched_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (namespace, key, blob, len(blob), len(raw), etag, last_modified, now, now)
+            )
+            if namespace not in PINNED_NAMESPACES:
+                self._total_bytes += len(blob) - (old[0] if old else 0)
+            self.stats['stores'] += 1
+            if self._total_bytes > self.max_bytes:
+                self._evict()
+            self._conn.commit()
+
+    def renew(self, url: str, namespace: str = 'page'):
+        """Mark an entry fresh again after a 304 Not Modified."""
+        key = normalize_url(url)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT raw_size FROM crawl_cache WHERE namespace = ? AND url = ?", (namespace, key)
+            ).fetchone()
+            if row is None:
+                return
+            self._conn.execute(
+                "UPDATE crawl_cache SET fetched_at = ?, accessed_at = ? WHERE namespace = ? AND url = ?",
+                (now, now, namespace, key)
+            )
+            self._conn.commit()
+            self.stats['revalidated'] += 1
+            self.stats['bytes_saved'] += row[0]
+
+    @staticmethod
+    def conditional_headers(entry: Optional[Dict[str, Any]]) -> Dict[str, str]:
+        """Request headers that revalidate a cached entry."""
+        headers = {}
+        if entry:
+            if entry.get('etag'):
+                headers['If-None-Match'] = entry['etag']
+            if entry.get('last_modified'):
+                headers['If-Modified-Since'] = entry['last_modified']
+        return headers
+
+    def _evict(self):
+        """Drop least recently used entries until 90% of the budget (lock held)."""
+        target = self.max_bytes * 0.9
+        rows = self._conn.execute(
+            f"SELECT namespace, url, size FROM crawl_cache WHERE namespace NOT IN ({_PINNED_SQL}) "
+            "ORDER BY accessed_at"
+        )
+        doomed = []
+        for namespace, url, size in rows:
+            if self._total_bytes <= target:
+                break
+            doomed.append((namespace, url))
+            self._total_bytes -= size
+        self._conn.executemany("DELETE FROM crawl_cache WHERE namespace = ? AND url = ?", doomed)
+        self.stats['evictions'] += len(doomed)
+
+    def delete(self, url: str, namespace: str = 'page'):
+        """Remove one entry."""
+        key = normalize_url(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size FROM crawl_cache WHERE namespace = ? AND url = ?", (namespace, key)
+            ).fetchone()
+            if row:
+                self._conn.execute("DELETE FROM crawl_cache WHERE namespace = ? AND url = ?", (namespace, key))
+                self._conn.commit()
+                if namespace not in PINNED_NAMESPACES:
+                    self._total_bytes -= row[0]
+
+    def items(self, namespace: str = 'page') -> Iterator[Tuple[str, Any]]:
+        """Yield (url, data) for every entry in a namespace."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT url, data FROM crawl_cache WHERE namespace = ?", (namespace,)
+            ).fetchall()
+        for url, data in rows:
+            yield url, json.loads(zlib.decompress(data))
+
+    def count(self, namespace: Optional[str] = None) -> int:
+        """Number of entries (in one namespace, or overall)."""
+        with self._lock:
+            if namespace is None:
+                return self._conn.execute("SELECT COUNT(*) FROM crawl_cache").fetchone()[0]
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM crawl_cache WHERE namespace = ?", (namespace,)
+            ).fetchone()[0]
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def clear(self, namespace: Optional[str] = None):
+        """Remove all entries (in one namespace, or overall)."""
+        with self._lock:
+            if namespace is None:
+                self._conn.execute("DELETE FROM crawl_cache")
+            else:
+                self._conn.execute("DELETE FROM crawl_cache WHERE namespace = ?", (namespace,))
+            self._conn.commit()
+            self._total_bytes = self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM crawl_cache WHERE namespace NOT IN ({_PINNED_SQL})"
+            ).fetchone()[0]
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get cache statistics."""
+        lookups = self.stats['hits'] + self.stats['misses'] + self.stats['stale']
+        return {
+            **self.stats,
+            'hit_rate': (self.stats['hits'] + self.stats['revalidated']) / lookups if lookups else 0.0,
+            'entries': self.count(),
+            'stored_bytes': self._total_bytes,
+            'max_bytes': self.max_bytes,
+            'path': str(self.path)
+        }
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+
+def _default_path() -> Path:
+    """PathManager cache directory when available, else alongside the vector store."""
+    try:
+        from core.path_manager import PathManager
+        return Path(PathManager.CACHE_DIR) / "crawl_cache.db"
+    except ImportError:
+        return Path("alfred_data") / "crawl_cache.db"
+
+
+_shared_cache: Optional[CrawlCache] = None
+_shared_lock = threading.Lock()
+
+
+def get_crawl_cache() -> CrawlCache:
+    """Process-wide CrawlCache shared by every crawler"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = CrawlCache()
+        return _shared_cache
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+ALFRED Crawl Frontier - Building blocks for concurrent deep crawls
+
+Features:
+- URL normalization (so trivially different URLs are crawled once)
+- Per-host token-bucket politeness instead of a global sleep
+- Bounded visited set: exact up to a limit, then a Bloom filter
+"""
+
+import asyncio
+import hashlib
+import math
+import time
+from typing import Dict, Optional, Set
+from urllib.parse import parse_qsl, urlencode, urlparse, urlunparse
+
+
+# Query parameters that never change page content
+TRACKING_PARAMS = {
+    'utm_source', 'utm_medium', 'utm_campaign', 'utm_term', 'utm_content',
+    'gclid', 'fbclid', 'mc_cid', 'mc_eid', 'ref', 'ref_src'
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+
+def normalize_url(url: str) -> str:
+    """
+    Canonical form of a URL for de-duplication.
+
+    Lower-cases scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the query string and gives empty paths a "/".
+    """
+    parsed = urlparse(url.strip())
+    scheme = parsed.scheme.lower()
+    host = (parsed.hostname or '').lower()
+
+    port = parsed.port
+    netloc = host
+    if port and DEFAULT_PORTS.get(scheme) != port:
+        netloc = f"{host}:{port}"
+    if parsed.username:
+        netloc = f"{parsed.username}@{netloc}"
+
+    query = urlencode(sorted(
+        (k, v) for k, v in parse_qsl(parsed.query, keep_blank_values=True)
+        if k.lower() not in TRACKING_PARAMS
+    ))
+
+    return urlunparse((scheme, netloc, parsed.path or '/', parsed.params, query, ''))
+
+
+class BloomFilter:
+    """Fixed-memory probabilistic set (false positives possible, no false negatives)."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        """
+        Args:
+            capacity: Expected number of items
+            error_rate: Target false-positive rate at capacity
+        """
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / (math.log(2) ** 2)))
+        self.num_hashes = max(1, int(round(self.num_bits / capacity * math.log(2))))
+        self._bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str) -> bool:
+        """Add item; returns False if it was (probably) already present."""
+        new = False
+        for pos in self._positions(item):
+            byte, bit = divmod(pos, 8)
+            if not self._bits[byte] & (1 << bit):
+                self._bits[byte] |= 1 << bit
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    def __contains__(self, item: str) -> bool:
+        return all(self._bits[pos // 8] & (1 << (pos % 8)) for pos in self._positions(item))
+
+
+class VisitedSet:
+    """
+    Set of seen URLs with bounded memory.
+
+    Exact until exact_limit URLs, after which new URLs go into a Bloom filter
+    sized for bloom_capacity (a tiny fraction of pages may be skipped as
+    false positives on huge crawls; nothing is ever crawled twice).
+    """
+
+    def __init__(self, exact_limit: int = 100_000, bloom_capacity: int = 10_000_000,
+                 error_rate: float = 0.001):
+        self.exact_limit = exact_limit
+        self.bloom_capacity = bloom_capacity
+        self.error_rate = error_rate
+        self._exact: Set[str] = set()
+        self._bloom: Optional[BloomFilter] = None
+
+    def add(self, url: str) -> bool:
+        """Mark url as seen; returns True if it was new."""
+        if url in self._exact:
+            return False
+        if self._bloom is not None:
+            return self._bloom.add(url)
+        if len(self._exact) >= self.exact_limit:
+            self._bloom = BloomFilter(self.bloom_capacity, self.error_rate)
+            return self._bloom.add(url)
+        self._exact.add(url)
+        return True
+
+    def __contains__(self, url: str) -> bool:
+        return url in self._exact or (self._bloom is not None and url in self._bloom)
+
+    def __len__(self) -> int:
+        return len(self._exact) + (self._bloom.count if self._bloom else 0)
+
+
+class HostRateLimiter:
+    """Per-host token buckets: each host gets `rate` requests/second with bursts of `burst`."""
+
+    def __init__(self, rate: float = 2.0, burst: int = 2):
+        self.rate = rate
+        self.burst = burst
+        self._buckets: Dict[str, list] = {}  # host -> [tokens, last_refill]
+
+    async def acquire(self, host: str):
+        """Wait until a request to host is allowed."""
+        if self.rate <= 0:
+            return
+
+        bucket = self._buckets.setdefault(host, [float(self.burst), time.monotonic()])
+        while True:
+            now = time.monotonic()
+            bucket[0] = min(self.burst, bucket[0] + (now - bucket[1]) * self.rate)
+            bucket[1] = now
+            if bucket[0] >= 1:
+                bucket[0] -= 1
+                return
+            await asyncio.sleep((1 - bucket[0]) / self.rate)
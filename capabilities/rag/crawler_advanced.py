@@ -13,6 +13,11 @@ from typing import List, Dict, Optional, Any
 from datetime import datetime
 import json
 
+try:
+    from crawl_cache import CrawlCache, get_crawl_cache
+except ImportError:
+    from .crawl_cache import CrawlCache, get_crawl_cache
+
 # Add Crawl4AI to path
 crawl4ai_path = Path("C:/Alfred the Batcomputer/crawl4ai-main")
 if crawl4ai_path.exists():
@@ -41,6 +46,11 @@ except ImportError as e:
     CRAWL4AI_AVAILABLE = False
 
 
+# Crawl cache namespace for this crawler's results: its 'links' is a list with
+# separate 'external_links', unlike WebIntelligence's 'page' entries
+CACHE_NAMESPACE = 'advanced'
+
+
 class AdvancedCrawler:
     """
     Advanced web crawler using Crawl4AI
@@ -51,7 +61,8 @@ class AdvancedCrawler:
         self,
         headless: bool = True,
         verbose: bool = False,
-        cache_mode: str = "enabled"
+        cache_mode: str = "enabled",
+        crawl_cache: Optional[CrawlCache] = None
     ):
         """
         Initialize advanced crawler
@@ -60,6 +71,7 @@ class AdvancedCrawler:
             headless: Run browser in headless mode
             verbose: Enable verbose logging
             cache_mode: Cache strategy ('enabled', 'disabled', 'bypass', 'read_only', 'write_only')
+            crawl_cache: Persistent page cache (default: shared process-wide cache)
         """
         if not CRAWL4AI_AVAILABLE:
             raise RuntimeError("Crawl4AI not available. Check installation.")
@@ -68,14 +80,18 @@ class AdvancedCrawler:
         self.verbose = verbose
 
         # Map cache mode string to enum
-        cache_modes = {
+        self._cache_modes = {
             'enabled': CacheMode.ENABLED,
             'disabled': CacheMode.DISABLED,
             'bypass': CacheMode.BYPASS,
             'read_only': CacheMode.READ_ONLY,
             'write_only': CacheMode.WRITE_ONLY
         }
-        self.cache_mode = cache_modes.get(cache_mode, CacheMode.ENABLED)
+        self.cache_mode_name = cache_mode if cache_mode in self._cache_modes else 'enabled'
+        self.cache_mode = self._cache_modes[self.cache_mode_name]
+
+        # Persistent cache file shared with WebIntelligence / CrawlerPowerUps (own namespace)
+        self.crawl_cache = crawl_cache if crawl_cache is not None else get_crawl_cache()
 
         # Browser configuration
         self.browser_config = BrowserConfig(
@@ -95,7 +111,8 @@ class AdvancedCrawler:
             'successful_crawls': 0,
             'failed_crawls': 0,
             'total_pages': 0,
-            'total_bytes': 0
+            'total_bytes': 0,
+            'cache_hits': 0
         }
 
         logging.info("Advanced crawler initialized with Crawl4AI")
@@ -144,12 +161,23 @@ class AdvancedCrawler:
         Returns:
             Crawl result with markdown, html, metadata
         """
+        # Determine cache mode
+        mode = cache_mode if cache_mode in self._cache_modes else self.cache_mode_name
+        cache = self._cache_modes[mode]
+
+        # Persistent page cache (a browser fetch can't revalidate, so only fresh entries count).
+        # Entries are keyed by URL alone and hold the plain page load, so a crawl that runs
+        # JavaScript or waits for a selector neither reads nor writes them
+        use_cache = not (js_code or wait_for_selector)
+        if use_cache and mode in ('enabled', 'read_only'):
+            cached = self.crawl_cache.get(url, namespace=CACHE_NAMESPACE)
+            if cached and cached['fresh']:
+                self.stats['cache_hits'] += 1
+                return self._shape_result(dict(cached['data'], from_cache=True), extract_markdown)
+
         if not self.crawler:
             await self.start()
 
-        # Determine cache mode
-        cache = cache_mode if cache_mode else self.cache_mode
-
         # Create run configuration
         config = CrawlerRunConfig(
             cache_mode=cache,
@@ -185,7 +213,7 @@ class AdvancedCrawler:
                 'url': url,
                 'success': result.success,
                 'status_code': result.status_code,
-                'markdown': result.markdown if extract_markdown else None,
+                'markdown': result.markdown,
                 'cleaned_html': result.cleaned_html,
                 'html': result.html,
                 'links': result.links.get('internal', []) if result.links else [],
@@ -200,8 +228,12 @@ class AdvancedCrawler:
                 'error': result.error_message if hasattr(result, 'error_message') and not result.success else None
             }
 
+            # Cache the full result (markdown included) so any extract_markdown can reuse it
+            if use_cache and result.success and mode in ('enabled', 'write_only'):
+                self.crawl_cache.put(url, crawl_data, namespace=CACHE_NAMESPACE)
+
             logging.info(f"Crawled {url}: {'SUCCESS' if result.success else 'FAILED'}")
-            return crawl_data
+            return self._shape_result(crawl_data, extract_markdown)
 
         except Exception as e:
             self.stats['failed_crawls'] += 1
@@ -214,6 +246,13 @@ class AdvancedCrawler:
                 'crawled_at': datetime.now().isoformat()
             }
 
+    @staticmethod
+    def _shape_result(crawl_data: Dict[str, Any], extract_markdown: bool) -> Dict[str, Any]:
+        """Drop the markdown from a crawl result unless it was requested"""
+        if extract_markdown:
+            return crawl_data
+        return dict(crawl_data, markdown=None)
+
     async def crawl_urls_batch(
         self,
         urls: List[str],
@@ -458,7 +497,8 @@ class AdvancedCrawler:
             'success_rate': (self.stats['successful_crawls'] / self.stats['total_crawls'] * 100)
             if self.stats['total_crawls'] > 0 else 0,
             'average_page_size': (self.stats['total_bytes'] / self.stats['total_pages'])
-            if self.stats['total_pages'] > 0 else 0
+            if self.stats['total_pages'] > 0 else 0,
+            'crawl_cache': self.crawl_cache.get_stats()
         }
 
 
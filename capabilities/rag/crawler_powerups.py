@@ -24,7 +24,7 @@ import asyncio
 import logging
 import hashlib
 import json
-from typing import List, Dict, Optional, Any, Callable
+from typing import List, Dict, Optional, Any, Callable, AsyncGenerator
 from datetime import datetime, timedelta
 from dataclasses import dataclass, field
 from enum import Enum
@@ -38,8 +38,10 @@ if crawl4ai_path.exists():
 
 try:
     from crawler_advanced import AdvancedCrawler, CRAWL4AI_AVAILABLE
+    from crawl_cache import CrawlCache, get_crawl_cache
 except ImportError:
     from .crawler_advanced import AdvancedCrawler, CRAWL4AI_AVAILABLE
+    from .crawl_cache import CrawlCache, get_crawl_cache
 
 
 class CrawlPriority(Enum):
@@ -82,7 +84,8 @@ class CrawlerPowerUps:
         base_crawler: Optional[AdvancedCrawler] = None,
         max_concurrent: int = 5,
         rate_limit_per_second: float = 2.0,
-        default_retry_delay: float = 1.0
+        default_retry_delay: float = 1.0,
+        crawl_cache: Optional[CrawlCache] = None
     ):
         """
         Initialize power-ups
@@ -92,6 +95,7 @@ class CrawlerPowerUps:
             max_concurrent: Maximum concurrent requests
             rate_limit_per_second: Max requests per second
             default_retry_delay: Initial retry delay in seconds
+            crawl_cache: Persistent cache for snapshots (default: shared process-wide cache)
         """
         self.crawler = base_crawler
         self.max_concurrent = max_concurrent
@@ -101,7 +105,8 @@ class CrawlerPowerUps:
         # Job queue
         self.job_queue: asyncio.PriorityQueue = asyncio.PriorityQueue()
 
-        # Content snapshots for monitoring
+        # Content snapshots for monitoring (persisted in the shared crawl cache)
+        self.crawl_cache = crawl_cache if crawl_cache is not None else get_crawl_cache()
         self.snapshots: Dict[str, ContentSnapshot] = {}
 
         # Rate limiting
@@ -231,7 +236,7 @@ class CrawlerPowerUps:
 
                 # Check for changes
                 changed = False
-                old_snapshot = self.snapshots.get(url)
+                old_snapshot = self.get_snapshot(url)
 
                 if old_snapshot and old_snapshot.content_hash != content_hash:
                     changed = True
@@ -241,12 +246,12 @@ class CrawlerPowerUps:
                         on_change(url, old_snapshot.content_hash, content_hash)
 
                 # Store new snapshot
-                self.snapshots[url] = ContentSnapshot(
+                self._store_snapshot(ContentSnapshot(
                     url=url,
                     content_hash=content_hash,
                     markdown=markdown,
                     captured_at=datetime.now()
-                )
+                ))
 
                 yield {
                     'url': url,
@@ -419,19 +424,51 @@ class CrawlerPowerUps:
         normalized = re.sub(r'\s+', ' ', content.strip())
         return hashlib.sha256(normalized.encode()).hexdigest()[:16]
 
+    def _store_snapshot(self, snapshot: ContentSnapshot):
+        """Keep a snapshot in memory and in the persistent cache"""
+        self.snapshots[snapshot.url] = snapshot
+        self.crawl_cache.put(snapshot.url, {
+            'url': snapshot.url,
+            'content_hash': snapshot.content_hash,
+            'markdown': snapshot.markdown,
+            'captured_at': snapshot.captured_at.isoformat(),
+            'metadata': snapshot.metadata
+        }, namespace='snapshot')
+
+    @staticmethod
+    def _snapshot_from_cache(data: Dict[str, Any]) -> ContentSnapshot:
+        return ContentSnapshot(
+            url=data['url'],
+            content_hash=data['content_hash'],
+            markdown=data['markdown'],
+            captured_at=datetime.fromisoformat(data['captured_at']),
+            metadata=data.get('metadata', {})
+        )
+
     def get_snapshot(self, url: str) -> Optional[ContentSnapshot]:
-        """Get stored snapshot for a URL"""
-        return self.snapshots.get(url)
+        """Get stored snapshot for a URL (survives restarts)"""
+        snapshot = self.snapshots.get(url)
+        if snapshot is None:
+            cached = self.crawl_cache.get(url, namespace='snapshot', ttl=float('inf'))
+            if cached:
+                snapshot = self.snapshots[url] = self._snapshot_from_cache(cached['data'])
+        return snapshot
 
     def get_all_snapshots(self) -> Dict[str, ContentSnapshot]:
         """Get all stored snapshots"""
-        return self.snapshots.copy()
+        snapshots = {
+            data['url']: self._snapshot_from_cache(data)
+            for _, data in self.crawl_cache.items('snapshot')
+        }
+        snapshots.update(self.snapshots)
+        return snapshots
 
     def get_stats(self) -> Dict[str, Any]:
         """Get power-up statistics"""
         return {
             **self.stats,
-            'snapshots_stored': len(self.snapshots),
+            'snapshots_stored': self.crawl_cache.count('snapshot'),
+            'crawl_cache': self.crawl_cache.get_stats(),
             'rate_limit': self.rate_limit,
             'max_concurrent': self.max_concurrent
         }
@@ -496,10 +533,6 @@ def convert_links_to_text(content: str) -> str:
     return re.sub(r'\[([^\]]+)\]\([^)]+\)', r'\1', content)
 
 
-# ============== ASYNC GENERATOR FIX ==============
-from typing import AsyncGenerator
-
-
 # ============== CONVENIENCE FUNCTIONS ==============
 
 async def smart_crawl(
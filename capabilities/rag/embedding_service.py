@@ -0,0 +1,299 @@
+#!/usr/bin/env python3
+"""
+Alfred Embedding Service - Batched, cached, off-the-event-loop embeddings
+
+Features:
+- Micro-batching: concurrent requests are merged into one model.encode call
+- Worker thread: callers (sync or async) never run the model themselves
+- Content-hash cache (in-memory LRU + SQLite): unchanged chunks are never re-encoded
+"""
+
+import asyncio
+import hashlib
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from array import array
+from collections import OrderedDict
+from concurrent.futures import Future
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+
+class EmbeddingService:
+    """
+    Shared front-end to a SentenceTransformer-style model.
+
+    Requests are queued; a single worker thread drains the queue (optionally
+    waiting up to max_wait for more requests), de-duplicates the texts, looks
+    them up in the cache and encodes only the misses in one batch. Requests
+    that arrive while the model is busy form the next batch. Requests fully
+    covered by the in-memory cache are answered without queueing.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        model_name: str = 'all-MiniLM-L6-v2',
+        cache_path: Optional[str] = None,
+        max_batch_size: int = 64,
+        max_wait: float = 0.0,
+        memory_entries: int = 10_000
+    ):
+        """
+        Initialize embedding service
+
+        Args:
+            model: Object with encode(List[str], batch_size=...) -> vectors
+            model_name: Part of the cache key (vectors differ per model)
+            cache_path: SQLite file for cached vectors (None = no disk cache)
+            max_batch_size: Texts per model.encode call
+            max_wait: Seconds to wait for more requests before encoding
+            memory_entries: Vectors kept in the in-memory LRU
+        """
+        self.model = model
+        self.model_name = model_name
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self.memory_entries = memory_entries
+
+        self._memory: "OrderedDict[str, array]" = OrderedDict()
+        self._memory_lock = threading.Lock()
+
+        self._queue: "queue.Queue[Optional[tuple]]" = queue.Queue()
+        self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+        self._closed = False
+        self._close_lock = threading.Lock()  # Nothing is queued after close()'s sentinel
+
+        self._stats_lock = threading.Lock()  # Updated by callers (fast path) and the worker
+        self.stats = {
+            'requests': 0,
+            'texts': 0,
+            'cache_hits': 0,
+            'encoded': 0,
+            'batches': 0,
+            'encode_seconds': 0.0
+        }
+
+        self._worker.start()
+
+    # ==================== PUBLIC API ====================
+
+    def submit(self, texts: Sequence[str]) -> Future:
+        """Queue texts for embedding; the future resolves to a list of vectors."""
+        if self._closed:
+            raise RuntimeError("Embedding service is closed")
+        future: Future = Future()
+        texts = list(texts)
+        if not texts:
+            future.set_result([])
+            return future
+
+        # Fast path: everything already in memory
+        vectors = self._memory_lookup([self._hash(text) for text in texts])
+        if len(vectors) == len(texts):
+            self._count(requests=1, texts=len(texts), cache_hits=len(texts))
+            future.set_result(vectors)
+            return future
+
+        with self._close_lock:
+            if self._closed:
+                raise RuntimeError("Embedding service is closed")
+            self._queue.put((texts, future))
+        return future
+
+    def embed(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts (blocking)."""
+        return self.submit(texts).result()
+
+    async def embed_async(self, texts: Sequence[str]) -> List[List[float]]:
+        """Embed texts without blocking the event loop."""
+        return await asyncio.wrap_future(self.submit(texts))
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Get service statistics."""
+        with self._stats_lock:
+            stats = dict(self.stats)
+        served = stats['cache_hits'] + stats['encoded']
+        return {
+            **stats,
+            'model': self.model_name,
+            'cache_hit_rate': stats['cache_hits'] / served if served else 0.0,
+            'avg_batch_size': stats['encoded'] / stats['batches'] if stats['batches'] else 0.0,
+            'chunks_per_sec': (
+                stats['encoded'] / stats['encode_seconds']
+                if stats['encode_seconds'] else 0.0
+            ),
+            'queued': self._queue.qsize(),
+            'cache_path': str(self.cache_path) if self.cache_path else None
+        }
+
+    def close(self, timeout: Optional[float] = 5.0):
+        """Finish queued requests and stop the worker."""
+        with self._close_lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(None)
+        self._worker.join(timeout)
+
+    def _count(self, **deltas):
+        with self._stats_lock:
+            for name, delta in deltas.items():
+                self.stats[name] += delta
+
+    # ==================== WORKER ====================
+
+    def _run(self):
+        conn = self._open_cache()
+        while True:
+            first = self._queue.get()
+            if first is None:
+                break
+
+            # Gather whatever else arrives within max_wait (up to a full batch)
+            batch = [first]
+            pending = len(first[0])
+            deadline = time.monotonic() + self.max_wait
+            stop = False
+            while pending < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    stop = True
+                    break
+                batch.append(item)
+                pending += len(item[0])
+
+            self._process(batch, conn)
+            if stop:
+                break
+
+        # Anything behind the sentinel would never be served: fail it, don't leave it hanging
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not None and item[1].set_running_or_notify_cancel():
+                item[1].set_exception(RuntimeError("Embedding service is closed"))
+
+        if conn is not None:
+            conn.close()
+
+    def _process(self, batch: List[tuple], conn: Optional[sqlite3.Connection]):
+        """Resolve one micro-batch of requests."""
+        live = [(texts, future) for texts, future in batch if future.set_running_or_notify_cancel()]
+        if not live:
+            return
+
+        try:
+            keys = {}
+            for texts, _ in live:
+                for text in texts:
+                    keys.setdefault(self._hash(text), text)
+
+            vectors = self._cache_lookup(conn, list(keys))
+            self._memory_store({key: vectors[key] for key in vectors})
+            misses = [key for key in keys if key not in vectors]
+
+            if misses:
+                start = time.perf_counter()
+                encoded = self.model.encode([keys[k] for k in misses], batch_size=self.max_batch_size)
+                self._count(encode_seconds=time.perf_counter() - start, batches=1, encoded=len(misses))
+                fresh = {key: [float(x) for x in vector] for key, vector in zip(misses, encoded)}
+                self._cache_store(conn, fresh)
+                self._memory_store(fresh)
+                vectors.update(fresh)
+
+            total = sum(len(texts) for texts, _ in live)
+            self._count(requests=len(live), texts=total, cache_hits=total - len(misses))
+
+            for texts, future in live:
+                future.set_result([vectors[self._hash(text)] for text in texts])
+
+        except Exception as e:
+            logging.error(f"Embedding batch failed: {e}")
+            for _, future in live:
+                future.set_exception(e)
+
+    # ==================== CACHE ====================
+
+    def _hash(self, text: str) -> str:
+        return hashlib.sha1(f"{self.model_name}\0{text}".encode('utf-8')).hexdigest()
+
+    def _memory_lookup(self, keys: List[str]) -> List[List[float]]:
+        """Vectors for keys, stopping at the first miss."""
+        found = []
+        with self._memory_lock:
+            for key in keys:
+                vector = self._memory.get(key)
+                if vector is None:
+                    break
+                self._memory.move_to_end(key)
+                found.append(vector.tolist())
+        return found
+
+    def _memory_store(self, vectors: Dict[str, List[float]]):
+        if not self.memory_entries:
+            return
+        with self._memory_lock:
+            for key, vector in vectors.items():
+                self._memory[key] = array('f', vector)
+                self._memory.move_to_end(key)
+            while len(self._memory) > self.memory_entries:
+                self._memory.popitem(last=False)
+
+    def _open_cache(self) -> Optional[sqlite3.Connection]:
+        """Open the vector cache (worker thread only)."""
+        if not self.cache_path:
+            return None
+        try:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.cache_path), timeout=10)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS embeddings (
+                    hash TEXT PRIMARY KEY,
+                    vector BLOB NOT NULL
+                )
+            """)
+            conn.commit()
+            return conn
+        except sqlite3.Error as e:
+            logging.warning(f"Embedding cache disabled: {e}")
+            return None
+
+    @staticmethod
+    def _cache_lookup(conn: Optional[sqlite3.Connection], keys: List[str]) -> Dict[str, List[float]]:
+        found: Dict[str, List[float]] = {}
+        if conn is None:
+            return found
+        for i in range(0, len(keys), 500):  # Stay under SQLite's variable limit
+            chunk = keys[i:i + 500]
+            rows = conn.execute(
+                f"SELECT hash, vector FROM embeddings WHERE hash IN ({','.join('?' * len(chunk))})", chunk
+            )
+            for key, blob in rows:
+                found[key] = array('f', blob).tolist()
+        return found
+
+    @staticmethod
+    def _cache_store(conn: Optional[sqlite3.Connection], vectors: Dict[str, List[float]]):
+        if conn is None or not vectors:
+            return
+        try:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (hash, vector) VALUES (?, ?)",
+                [(key, array('f', vector).tobytes()) for key, vector in vectors.items()]
+            )
+            conn.commit()
+        except sqlite3.Error as e:
+            logging.warning(f"Embedding cache write failed: {e}")
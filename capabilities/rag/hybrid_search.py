@@ -0,0 +1,288 @@
+#!/usr/bin/env python3
+"""
+Alfred Hybrid Search - Lexical sidecar index and rank fusion for RAG
+
+Features:
+- BM25 (SQLite FTS5) index over the same chunks as the vector store, so
+  exact identifiers (CVE IDs, tickers, function names) are never missed
+- Chroma-style metadata pre-filtering ({"url": ...}, $and, $in, $ne)
+- Reciprocal-rank fusion of lexical and dense rankings
+- Optional CPU cross-encoder reranker
+"""
+
+import json
+import logging
+import re
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from sentence_transformers import CrossEncoder
+    CROSS_ENCODER_AVAILABLE = True
+except ImportError:
+    CROSS_ENCODER_AVAILABLE = False
+
+
+STOPWORDS = {
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'can', 'did', 'do', 'does', 'for',
+    'from', 'how', 'i', 'in', 'is', 'it', 'me', 'of', 'on', 'or', 'tell', 'that', 'the',
+    'this', 'to', 'was', 'what', 'when', 'where', 'which', 'who', 'why', 'with', 'about'
+}
+
+# Identifiers: tokens joined by - _ . : / (CVE-2024-3094, parse_args, os.path.join),
+# all-caps tickers/acronyms (NVDA, RSI) and mixed letter-digit tokens (log4j, sha256)
+IDENTIFIER_RE = re.compile(
+    r"[^\W_]+(?:[-_.:/][^\W_]+)+"
+    r"|\b[A-Z][A-Z0-9]{1,5}\b"
+    r"|\b(?=[^\W_]*\d)(?=[^\W_]*[^\W\d_])[^\W_]+\b"
+)
+WORD_RE = re.compile(r"[^\W_]+")
+FILTER_KEY_RE = re.compile(r"^\w+$")
+
+
+def lexical_query(text: str, identifiers_only: bool = False) -> Optional[str]:
+    """
+    Convert a question into an FTS5 MATCH expression.
+
+    Identifiers become phrases (so "CVE-2024-3094" only matches that ID),
+    remaining words are OR-ed so BM25 can rank partial matches.
+
+    Args:
+        text: Question text
+        identifiers_only: Only match the identifier phrases
+    """
+    clauses = []
+    for ident in IDENTIFIER_RE.findall(text):
+        clauses.append('"' + " ".join(WORD_RE.findall(ident)) + '"')
+
+    if identifiers_only:
+        return " OR ".join(dict.fromkeys(clauses)) if clauses else None
+
+    for word in WORD_RE.findall(IDENTIFIER_RE.sub(" ", text)):
+        if word.lower() not in STOPWORDS:
+            clauses.append('"' + word + '"')
+
+    clauses = list(dict.fromkeys(clauses))
+    return " OR ".join(clauses) if clauses else None
+
+
+def _where_sql(where: Optional[Dict[str, Any]]) -> Tuple[str, List[Any]]:
+    """Translate a Chroma-style metadata filter into SQL over the metadata JSON."""
+    if not where:
+        return "1", []
+
+    clauses, params = [], []
+    for key, condition in where.items():
+        if key in ('$and', '$or'):
+            parts = [_where_sql(sub) for sub in condition]
+            joiner = " AND " if key == '$and' else " OR "
+            clauses.append("(" + joiner.join(sql for sql, _ in parts) + ")")
+            for _, sub_params in parts:
+                params.extend(sub_params)
+            continue
+
+        if not FILTER_KEY_RE.match(key):
+            raise ValueError(f"Invalid metadata filter key: {key!r}")
+        field = f"json_extract(c.metadata, '$.{key}')"
+
+        if isinstance(condition, dict):
+            for op, value in condition.items():
+                if op == '$eq':
+                    clauses.append(f"{field} = ?")
+                    params.append(value)
+                elif op == '$ne':
+                    clauses.append(f"({field} IS NULL OR {field} != ?)")
+                    params.append(value)
+                elif op in ('$in', '$nin'):
+                    marks = ",".join("?" * len(value))
+                    clauses.append(f"{field} {'IN' if op == '$in' else 'NOT IN'} ({marks})")
+                    params.extend(value)
+                else:
+                    raise ValueError(f"Unsupported metadata filter operator: {op}")
+        else:
+            clauses.append(f"{field} = ?")
+            params.append(condition)
+
+    return " AND ".join(clauses), params
+
+
+def chroma_where(where: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    """Chroma needs an explicit $and when filtering on several keys."""
+    if where and len(where) > 1:
+        return {'$and': [{key: value} for key, value in where.items()]}
+    return where or None
+
+
+class LexicalIndex:
+    """
+    BM25 sidecar for the vector store.
+
+    Chunks live in a plain table (id, text, metadata JSON); an external-content
+    FTS5 table is kept in sync by triggers, as in the brain database.
+    """
+
+    def __init__(self, path: str):
+        """
+        Initialize lexical index
+
+        Args:
+            path: SQLite file for the index
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(self.path), timeout=10, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                rowid INTEGER PRIMARY KEY,
+                id TEXT UNIQUE NOT NULL,
+                text TEXT NOT NULL,
+                metadata TEXT NOT NULL DEFAULT '{}'
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS chunks_fts USING fts5(
+                text, content='chunks', content_rowid='rowid',
+                tokenize='porter unicode61'
+            );
+            CREATE TRIGGER IF NOT EXISTS chunks_fts_insert AFTER INSERT ON chunks BEGIN
+                INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_fts_delete AFTER DELETE ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+            END;
+            CREATE TRIGGER IF NOT EXISTS chunks_fts_update AFTER UPDATE OF text ON chunks BEGIN
+                INSERT INTO chunks_fts(chunks_fts, rowid, text) VALUES ('delete', old.rowid, old.text);
+                INSERT INTO chunks_fts(rowid, text) VALUES (new.rowid, new.text);
+            END;
+        """)
+        self._conn.commit()
+
+    def upsert(self, ids: Sequence[str], texts: Sequence[str], metadatas: Optional[Sequence[Dict]] = None):
+        """Add or replace chunks."""
+        metadatas = metadatas or [{} for _ in ids]
+        rows = [(cid, text, json.dumps(meta or {}, default=str)) for cid, text, meta in zip(ids, texts, metadatas)]
+        with self._lock:
+            self._conn.executemany("""
+                INSERT INTO chunks (id, text, metadata) VALUES (?, ?, ?)
+                ON CONFLICT(id) DO UPDATE SET text = excluded.text, metadata = excluded.metadata
+            """, rows)
+            self._conn.commit()
+
+    def update_metadata(self, ids: Sequence[str], metadatas: Sequence[Dict]):
+        """Merge new metadata into existing chunks (text untouched)."""
+        rows = [(json.dumps(meta, default=str), cid) for cid, meta in zip(ids, metadatas)]
+        with self._lock:
+            self._conn.executemany(
+                "UPDATE chunks SET metadata = json_patch(metadata, ?) WHERE id = ?", rows
+            )
+            self._conn.commit()
+
+    def delete(self, ids: Sequence[str]):
+        """Remove chunks."""
+        with self._lock:
+            self._conn.executemany("DELETE FROM chunks WHERE id = ?", [(cid,) for cid in ids])
+            self._conn.commit()
+
+    def clear(self):
+        """Remove every chunk."""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+
+    def count(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM chunks").fetchone()[0]
+
+    def search(
+        self,
+        query: str,
+        n_results: int = 20,
+        where: Optional[Dict[str, Any]] = None,
+        identifiers_only: bool = False
+    ) -> List[Dict[str, Any]]:
+        """
+        BM25 search
+
+        Args:
+            query: Free-text query
+            n_results: Maximum hits
+            where: Chroma-style metadata filter applied before ranking
+            identifiers_only: Only return chunks containing an identifier from the query
+
+        Returns:
+            Hits (id, text, metadata, bm25 - higher is better), best first
+        """
+        match = lexical_query(query, identifiers_only)
+        if not match:
+            return []
+
+        filter_sql, params = _where_sql(where)
+        with self._lock:
+            try:
+                rows = self._conn.execute(f"""
+                    SELECT c.id, c.text, c.metadata, bm25(chunks_fts) AS score
+                    FROM chunks_fts
+                    JOIN chunks c ON c.rowid = chunks_fts.rowid
+                    WHERE chunks_fts MATCH ? AND {filter_sql}
+                    ORDER BY score
+                    LIMIT ?
+                """, [match, *params, n_results]).fetchall()
+            except sqlite3.OperationalError as e:
+                logging.warning(f"Lexical search failed for {query!r}: {e}")
+                return []
+
+        return [
+            {'id': cid, 'text': text, 'metadata': json.loads(meta), 'bm25': -score}
+            for cid, text, meta, score in rows
+        ]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def reciprocal_rank_fusion(
+    rankings: Sequence[Sequence[str]],
+    k: int = 60,
+    weights: Optional[Sequence[float]] = None
+) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked ID lists: score(d) = sum(w / (k + rank)).
+
+    Args:
+        rankings: One best-first ID list per retriever
+        k: Damping constant (60 is the usual choice)
+        weights: Optional per-retriever weights
+
+    Returns:
+        (id, score) pairs, best first
+    """
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = {}
+    for ranking, weight in zip(rankings, weights):
+        for rank, doc_id in enumerate(ranking, start=1):
+            scores[doc_id] = scores.get(doc_id, 0.0) + weight / (k + rank)
+    return sorted(scores.items(), key=lambda item: item[1], reverse=True)
+
+
+class CrossEncoderReranker:
+    """Lightweight CPU reranker (MiniLM cross-encoder, loaded on first use)."""
+
+    def __init__(self, model_name: str = 'cross-encoder/ms-marco-MiniLM-L-6-v2', max_length: int = 512):
+        if not CROSS_ENCODER_AVAILABLE:
+            raise RuntimeError("sentence-transformers not available. Install: pip install sentence-transformers")
+        self.model_name = model_name
+        self.max_length = max_length
+        self._model = None
+
+    def rerank(self, query: str, texts: Sequence[str]) -> List[float]:
+        """Relevance score per text (higher is better)."""
+        if not texts:
+            return []
+        if self._model is None:
+            self._model = CrossEncoder(self.model_name, max_length=self.max_length, device='cpu')
+        return [float(score) for score in self._model.predict([(query, text) for text in texts])]
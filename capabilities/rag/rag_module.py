@@ -16,6 +16,7 @@ from pathlib import Path
 
 # Import Alfred modules
 from vector_knowledge import VectorKnowledgeBase, DocumentChunker
+from hybrid_search import chroma_where
 from crawler_advanced import AdvancedCrawler
 
 # Try to import AI clients
@@ -49,7 +50,9 @@ class RAGSystem:
         crawler: Optional[AdvancedCrawler] = None,
         default_ai: str = "groq",
         chunk_size: int = 1000,
-        chunk_overlap: int = 200
+        chunk_overlap: int = 200,
+        reranker: Optional[Any] = None,
+        chunk_tokens: Optional[int] = None
     ):
         """
         Initialize RAG system
@@ -58,13 +61,18 @@ class RAGSystem:
             knowledge_base: Vector knowledge base instance
             crawler: Advanced crawler instance
             default_ai: Default AI provider ('groq', 'claude', 'openai')
-            chunk_size: Document chunk size
-            chunk_overlap: Overlap between chunks
+            chunk_size: Document chunk size in characters (used when the
+                embedding model exposes no tokenizer)
+            chunk_overlap: Overlap between chunks (same unit as chunk_size)
+            reranker: Optional reranker for ask() (e.g. hybrid_search.CrossEncoderReranker)
+            chunk_tokens: Chunk size in embedding-model tokens (default: the
+                model's max_seq_length, so chunks are never truncated)
         """
         # Initialize components
         self.kb = knowledge_base or VectorKnowledgeBase()
         self.crawler = crawler  # Crawler is optional (can be created per request)
-        self.chunker = DocumentChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+        self.chunker = self._make_chunker(chunk_size, chunk_overlap, chunk_tokens)
+        self.reranker = reranker
 
         self.default_ai = default_ai
 
@@ -88,6 +96,17 @@ class RAGSystem:
 
         logging.info("RAG system initialized")
 
+    def _make_chunker(self, chunk_size: int, chunk_overlap: int, chunk_tokens: Optional[int]) -> DocumentChunker:
+        """Size chunks by the embedding model's tokens when its tokenizer is available"""
+        model = self.kb.embedding_model
+        tokenizer = getattr(model, 'tokenizer', None)
+        if tokenizer is None:
+            return DocumentChunker(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
+
+        tokens = chunk_tokens or getattr(model, 'max_seq_length', None) or 256
+        overlap = tokens * chunk_overlap // max(chunk_size, 1)
+        return DocumentChunker(chunk_size=tokens, chunk_overlap=overlap, tokenizer=tokenizer)
+
     async def research_url(
         self,
         url: str,
@@ -147,26 +166,24 @@ class RAGSystem:
                 'status_code': result.get('status_code')
             })
 
-            # Store in knowledge base
+            # Store in knowledge base (incrementally: only changed chunks are embedded)
             doc_ids = []
+            sync = {'added': 0, 'unchanged': 0, 'deleted': 0}
             if store_in_kb:
                 if chunk_content and len(markdown) > 2000:
-                    # Chunk large content
-                    chunks = self.chunker.chunk_text(markdown, metadata=meta)
-                    texts = [c['text'] for c in chunks]
-                    metadatas = [c['metadata'] for c in chunks]
-
-                    doc_ids = self.kb.add_documents_batch(texts, metadatas=metadatas)
-                    logging.info(f"Stored {len(chunks)} chunks in knowledge base")
+                    # Chunks are produced lazily and embedded batch by batch
+                    chunks = self.chunker.iter_chunks(markdown, metadata=meta)
                 else:
                     # Store as single document
-                    doc_id = self.kb.add_document(markdown, metadata=meta)
-                    doc_ids = [doc_id]
-                    logging.info(f"Stored 1 document in knowledge base")
+                    chunks = [{'text': markdown, 'metadata': dict(meta)}]
+
+                sync = await self.kb.sync_url_chunk_stream(url, chunks)
+                doc_ids = sync['ids']
+                logging.info(f"Stored {len(doc_ids)} chunks in knowledge base ({sync['added']} new)")
 
             # Update statistics
             self.stats['urls_crawled'] += 1
-            self.stats['documents_stored'] += len(doc_ids)
+            self.stats['documents_stored'] += sync['added']
 
             return {
                 'url': url,
@@ -175,6 +192,9 @@ class RAGSystem:
                 'markdown_length': len(markdown),
                 'doc_ids': doc_ids,
                 'num_chunks': len(doc_ids),
+                'chunks_added': sync['added'],
+                'chunks_unchanged': sync['unchanged'],
+                'chunks_deleted': sync['deleted'],
                 'links': result.get('links', []),
                 'metadata': meta
             }
@@ -265,20 +285,19 @@ class RAGSystem:
                     }
 
                     # Chunk and store
-                    chunks = self.chunker.chunk_text(page['markdown'], metadata=meta)
-                    texts = [c['text'] for c in chunks]
-                    metadatas = [c['metadata'] for c in chunks]
-
-                    doc_ids = self.kb.add_documents_batch(texts, metadatas=metadatas)
+                    chunks = self.chunker.iter_chunks(page['markdown'], metadata=meta)
+                    sync = await self.kb.sync_url_chunk_stream(page['url'], chunks)
                     stored_docs.append({
                         'url': page['url'],
-                        'doc_ids': doc_ids,
-                        'num_chunks': len(doc_ids)
+                        'doc_ids': sync['ids'],
+                        'num_chunks': len(sync['ids']),
+                        'chunks_added': sync['added'],
+                        'chunks_deleted': sync['deleted']
                     })
 
             self.stats['research_sessions'] += 1
             self.stats['urls_crawled'] += len(crawled_pages)
-            self.stats['documents_stored'] += sum(len(d['doc_ids']) for d in stored_docs)
+            self.stats['documents_stored'] += sum(d['chunks_added'] for d in stored_docs)
 
             logging.info(f"Deep research complete: {len(stored_docs)} pages stored")
 
@@ -301,7 +320,9 @@ class RAGSystem:
         n_contexts: int = 5,
         ai_provider: Optional[str] = None,
         include_sources: bool = True,
-        min_similarity: float = 0.3
+        min_similarity: float = 0.3,
+        where: Optional[Dict[str, Any]] = None,
+        hybrid: bool = True
     ) -> Dict[str, Any]:
         """
         Ask a question using RAG (retrieve relevant context, generate answer)
@@ -311,13 +332,22 @@ class RAGSystem:
             n_contexts: Number of context chunks to retrieve
             ai_provider: AI provider to use ('groq', 'claude', 'openai')
             include_sources: Include source URLs in response
-            min_similarity: Minimum similarity score for context
+            min_similarity: Minimum dense similarity (exact identifier hits are exempt)
+            where: Metadata pre-filter (e.g. {"url": ...}, {"source": "deep_crawl"})
+            hybrid: Fuse BM25 and vector results (False = vector only)
 
         Returns:
             Answer with sources and context
         """
         # Search knowledge base for relevant context
-        search_results = self.kb.search(question, n_results=n_contexts)
+        if hybrid:
+            search_results = await self.kb.hybrid_search_async(
+                question, n_results=n_contexts, where=where, reranker=self.reranker
+            )
+        else:
+            search_results = await self.kb.search_async(
+                question, n_results=n_contexts, where=chroma_where(where)
+            )
 
         if not search_results['results']:
             return {
@@ -327,10 +357,11 @@ class RAGSystem:
                 'sources': []
             }
 
-        # Filter by similarity
+        # Filter by similarity (exact identifier hits are kept - a CVE ID or
+        # function name often has low dense similarity)
         contexts = [
             r for r in search_results['results']
-            if r.get('similarity', 0) >= min_similarity
+            if r.get('exact_match') or r.get('similarity', 0) >= min_similarity
         ]
 
         if not contexts:
@@ -7,11 +7,23 @@ Provides semantic search and storage for crawled content
 import chromadb
 from chromadb.config import Settings
 from sentence_transformers import SentenceTransformer
-from typing import List, Dict, Optional, Any
+from typing import Any, AsyncIterable, Dict, Iterable, List, Optional, Set, Union
 from pathlib import Path
+import asyncio
+import hashlib
 import json
 import logging
 from datetime import datetime
+from itertools import islice
+
+try:
+    from chunking import DocumentChunker, chunk_large_text
+    from embedding_service import EmbeddingService
+    from hybrid_search import LexicalIndex, reciprocal_rank_fusion, chroma_where
+except ImportError:
+    from .chunking import DocumentChunker, chunk_large_text
+    from .embedding_service import EmbeddingService
+    from .hybrid_search import LexicalIndex, reciprocal_rank_fusion, chroma_where
 
 
 class VectorKnowledgeBase:
@@ -20,13 +32,20 @@ class VectorKnowledgeBase:
     Uses ChromaDB for local persistent storage
     """
 
-    def __init__(self, data_dir: str = "alfred_data", collection_name: str = "alfred_knowledge"):
+    def __init__(
+        self,
+        data_dir: str = "alfred_data",
+        collection_name: str = "alfred_knowledge",
+        embedding_service: Optional[EmbeddingService] = None
+    ):
         """
         Initialize vector knowledge base
 
         Args:
             data_dir: Directory for ChromaDB storage
             collection_name: Name of the collection
+            embedding_service: Shared embedder (default: batched service with
+                a vector cache in data_dir)
         """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(parents=True, exist_ok=True)
@@ -43,9 +62,15 @@ class VectorKnowledgeBase:
         )
 
         # Initialize embedding model (lightweight, runs locally)
-        logging.info("Loading embedding model...")
-        self.embedding_model = SentenceTransformer('all-MiniLM-L6-v2')
+        if embedding_service is None:
+            logging.info("Loading embedding model...")
+            embedding_service = EmbeddingService(
+                SentenceTransformer('all-MiniLM-L6-v2'),
+                cache_path=str(self.data_dir / "embedding_cache.db")
+            )
         # Model info: 384 dimensions, 22M parameters, fast on CPU
+        self.embedder = embedding_service
+        self.embedding_model = embedding_service.model
 
         # Get or create collection
         self.collection = self.client.get_or_create_collection(
@@ -53,8 +78,24 @@ class VectorKnowledgeBase:
             metadata={"description": "Alfred's web crawl knowledge base"}
         )
 
+        # BM25 sidecar over the same chunks (exact identifiers, hybrid search)
+        self.lexical = LexicalIndex(str(self.data_dir / f"lexical_{collection_name}.db"))
+        if self.lexical.count() == 0 and self.collection.count() > 0:
+            self._backfill_lexical()
+
         logging.info(f"Vector knowledge base initialized: {collection_name}")
 
+    def _backfill_lexical(self, page_size: int = 1000):
+        """Index chunks stored before the lexical sidecar existed"""
+        offset = 0
+        while True:
+            page = self.collection.get(include=['documents', 'metadatas'], limit=page_size, offset=offset)
+            if not page['ids']:
+                break
+            self.lexical.upsert(page['ids'], page['documents'], page['metadatas'])
+            offset += len(page['ids'])
+        logging.info(f"Lexical index backfilled with {offset} chunks")
+
     def add_document(
         self,
         text: str,
@@ -84,8 +125,8 @@ class VectorKnowledgeBase:
         meta['added_at'] = datetime.now().isoformat()
         meta['char_count'] = len(text)
 
-        # Generate embedding
-        embedding = self.embedding_model.encode(text).tolist()
+        # Generate embedding (cached by content hash)
+        embedding = self.embedder.embed([text])[0]
 
         # Add to ChromaDB
         self.collection.add(
@@ -94,10 +135,25 @@ class VectorKnowledgeBase:
             metadatas=[meta],
             ids=[doc_id]
         )
+        self.lexical.upsert([doc_id], [text], [meta])
 
         logging.info(f"Added document {doc_id} ({len(text)} chars)")
         return doc_id
 
+    async def add_document_async(
+        self,
+        text: str,
+        metadata: Optional[Dict[str, Any]] = None,
+        doc_id: Optional[str] = None
+    ) -> str:
+        """add_document for async callers (embedding and storage run off the event loop)"""
+        if not text or not text.strip():
+            raise ValueError("Document text cannot be empty")
+
+        doc_id = doc_id or f"doc_{datetime.now().timestamp()}"
+        await self.add_documents_batch_async([text], [metadata or {}], [doc_id])
+        return doc_id
+
     def add_documents_batch(
         self,
         texts: List[str],
@@ -118,6 +174,31 @@ class VectorKnowledgeBase:
         if not texts:
             return []
 
+        # Generate embeddings in batch (micro-batched, unchanged chunks come from cache)
+        embeddings = self.embedder.embed(texts)
+        return self._store_batch(texts, embeddings, metadatas, ids)
+
+    async def add_documents_batch_async(
+        self,
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+        ids: Optional[List[str]] = None
+    ) -> List[str]:
+        """add_documents_batch for async callers (the event loop stays free)"""
+        if not texts:
+            return []
+
+        embeddings = await self.embedder.embed_async(texts)
+        return await asyncio.to_thread(self._store_batch, texts, embeddings, metadatas, ids)
+
+    def _store_batch(
+        self,
+        texts: List[str],
+        embeddings: List[List[float]],
+        metadatas: Optional[List[Dict[str, Any]]],
+        ids: Optional[List[str]]
+    ) -> List[str]:
+        """Write pre-computed embeddings to ChromaDB"""
         # Generate IDs if not provided
         if not ids:
             timestamp = datetime.now().timestamp()
@@ -125,15 +206,12 @@ class VectorKnowledgeBase:
 
         # Prepare metadatas
         if not metadatas:
-            metadatas = [{}] * len(texts)
+            metadatas = [{} for _ in texts]
 
         for i, meta in enumerate(metadatas):
             meta['added_at'] = datetime.now().isoformat()
             meta['char_count'] = len(texts[i])
 
-        # Generate embeddings in batch (much faster)
-        embeddings = self.embedding_model.encode(texts, show_progress_bar=True).tolist()
-
         # Add to ChromaDB
         self.collection.add(
             embeddings=embeddings,
@@ -141,6 +219,7 @@ class VectorKnowledgeBase:
             metadatas=metadatas,
             ids=ids
         )
+        self.lexical.upsert(ids, texts, metadatas)
 
         logging.info(f"Added {len(texts)} documents in batch")
         return ids
@@ -165,8 +244,29 @@ class VectorKnowledgeBase:
             Search results with documents, metadatas, distances
         """
         # Generate query embedding
-        query_embedding = self.embedding_model.encode(query).tolist()
+        query_embedding = self.embedder.embed([query])[0]
+        return self._query(query, query_embedding, n_results, where, include_distances)
+
+    async def search_async(
+        self,
+        query: str,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        include_distances: bool = True
+    ) -> Dict[str, Any]:
+        """search for async callers (the event loop stays free)"""
+        query_embedding = (await self.embedder.embed_async([query]))[0]
+        return await asyncio.to_thread(self._query, query, query_embedding, n_results, where, include_distances)
 
+    def _query(
+        self,
+        query: str,
+        query_embedding: List[float],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        include_distances: bool
+    ) -> Dict[str, Any]:
+        """Run a ChromaDB query and format the results"""
         # Search
         results = self.collection.query(
             query_embeddings=[query_embedding],
@@ -202,6 +302,100 @@ class VectorKnowledgeBase:
         logging.info(f"Search '{query}': {formatted['n_results']} results")
         return formatted
 
+    def hybrid_search(
+        self,
+        query: str,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        candidates: Optional[int] = None,
+        reranker: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """
+        Lexical (BM25) + dense search fused with reciprocal rank fusion
+
+        Chunks containing an exact identifier from the query (CVE ID,
+        function name, dotted name) rank ahead of the fused order.
+
+        Args:
+            query: Search query
+            n_results: Number of results to return
+            where: Metadata filter applied to both retrievers before ranking
+            candidates: Hits taken from each retriever (default: 4 x n_results)
+            reranker: Optional object with rerank(query, texts) -> scores
+
+        Returns:
+            Search results; each has rrf_score, and similarity / bm25 when
+            the respective retriever found it
+        """
+        query_embedding = self.embedder.embed([query])[0]
+        return self._hybrid(query, query_embedding, n_results, where, candidates, reranker)
+
+    async def hybrid_search_async(
+        self,
+        query: str,
+        n_results: int = 10,
+        where: Optional[Dict[str, Any]] = None,
+        candidates: Optional[int] = None,
+        reranker: Optional[Any] = None
+    ) -> Dict[str, Any]:
+        """hybrid_search for async callers (the event loop stays free)"""
+        query_embedding = (await self.embedder.embed_async([query]))[0]
+        return await asyncio.to_thread(
+            self._hybrid, query, query_embedding, n_results, where, candidates, reranker
+        )
+
+    def _hybrid(
+        self,
+        query: str,
+        query_embedding: List[float],
+        n_results: int,
+        where: Optional[Dict[str, Any]],
+        candidates: Optional[int],
+        reranker: Optional[Any]
+    ) -> Dict[str, Any]:
+        """Run both retrievers, fuse, optionally rerank"""
+        candidates = candidates or max(n_results * 4, 20)
+        available = self.collection.count()
+
+        dense = []
+        if available:
+            dense = self._query(
+                query, query_embedding, min(candidates, available), chroma_where(where), True
+            )['results']
+        lexical = self.lexical.search(query, candidates, where)
+
+        hits: Dict[str, Dict[str, Any]] = {}
+        for rank, hit in enumerate(dense, start=1):
+            hits[hit['id']] = {**hit, 'dense_rank': rank}
+        for rank, hit in enumerate(lexical, start=1):
+            entry = hits.setdefault(hit['id'], {'id': hit['id'], 'text': hit['text'], 'metadata': hit['metadata']})
+            entry['bm25'] = hit['bm25']
+            entry['lexical_rank'] = rank
+
+        exact = self.lexical.search(query, candidates, where, identifiers_only=True)
+        for hit in exact:
+            entry = hits.setdefault(hit['id'], {'id': hit['id'], 'text': hit['text'], 'metadata': hit['metadata']})
+            entry['exact_match'] = True
+
+        fused = dict(reciprocal_rank_fusion([[h['id'] for h in dense], [h['id'] for h in lexical]]))
+        for doc_id, hit in hits.items():
+            hit['rrf_score'] = fused.get(doc_id, 0.0)
+        results = sorted(hits.values(), key=lambda h: (h.get('exact_match', False), h['rrf_score']), reverse=True)
+
+        if reranker is not None and results:
+            pool = results[:max(n_results * 3, 10)]
+            for hit, score in zip(pool, reranker.rerank(query, [h['text'] for h in pool])):
+                hit['rerank_score'] = score
+            results = sorted(pool, key=lambda h: (h.get('exact_match', False), h['rerank_score']), reverse=True)
+
+        results = results[:n_results]
+        logging.info(f"Hybrid search '{query}': {len(dense)} dense + {len(lexical)} lexical -> {len(results)}")
+        return {
+            'query': query,
+            'n_results': len(results),
+            'results': results
+        }
+
     def get_document(self, doc_id: str) -> Optional[Dict[str, Any]]:
         """
         Get a specific document by ID
@@ -230,135 +424,227 @@ class VectorKnowledgeBase:
         """Delete a document by ID"""
         try:
             self.collection.delete(ids=[doc_id])
+            self.lexical.delete([doc_id])
             logging.info(f"Deleted document {doc_id}")
             return True
         except Exception as e:
             logging.error(f"Failed to delete {doc_id}: {e}")
             return False
 
-    def get_stats(self) -> Dict[str, Any]:
-        """Get knowledge base statistics"""
-        count = self.collection.count()
+    # ==================== INCREMENTAL RE-INDEXING ====================
 
-        return {
-            'collection': self.collection_name,
-            'total_documents': count,
-            'embedding_model': 'all-MiniLM-L6-v2',
-            'embedding_dimensions': 384,
-            'storage_path': str(self.data_dir / "chroma_db")
-        }
+    @staticmethod
+    def chunk_id(url: str, text: str) -> str:
+        """Stable, content-addressed ID for a chunk of a URL's content"""
+        url_hash = hashlib.sha1(url.encode('utf-8')).hexdigest()[:16]
+        content_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()[:16]
+        return f"{url_hash}_{content_hash}"
 
-    def clear(self) -> None:
-        """Clear all documents from the collection"""
-        self.client.delete_collection(self.collection_name)
-        self.collection = self.client.create_collection(
-            name=self.collection_name,
-            metadata={"description": "Alfred's web crawl knowledge base"}
-        )
-        logging.warning(f"Cleared all documents from {self.collection_name}")
+    def sync_url_chunks(
+        self,
+        url: str,
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """
+        Make the stored chunks for a URL match its current content
 
+        Chunks are keyed by URL + content hash, so only new chunks are
+        embedded and upserted, unchanged ones just get fresh metadata, and
+        chunks no longer on the page (including legacy timestamp-ID chunks)
+        are deleted.
 
-class DocumentChunker:
-    """
-    Chunks large documents into smaller pieces for better retrieval
-    """
+        Args:
+            url: Source URL (stored as the 'url' metadata field)
+            texts: Current chunk texts, in page order
+            metadatas: Optional metadata per chunk
 
-    def __init__(self, chunk_size: int = 1000, chunk_overlap: int = 200):
+        Returns:
+            Dict with ids (current chunk IDs), added, unchanged, deleted
         """
-        Initialize chunker
+        plan = self._plan_url_sync(url, texts, metadatas)
+        embeddings = self.embedder.embed([plan['chunks'][cid][0] for cid in plan['new']])
+        return self._apply_url_sync(url, plan, embeddings)
 
-        Args:
-            chunk_size: Target size of each chunk in characters
-            chunk_overlap: Overlap between chunks for context
-        """
-        self.chunk_size = chunk_size
-        self.chunk_overlap = chunk_overlap
+    async def sync_url_chunks_async(
+        self,
+        url: str,
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]] = None
+    ) -> Dict[str, Any]:
+        """sync_url_chunks for async callers (the event loop stays free)"""
+        plan = await asyncio.to_thread(self._plan_url_sync, url, texts, metadatas)
+        embeddings = await self.embedder.embed_async([plan['chunks'][cid][0] for cid in plan['new']])
+        return await asyncio.to_thread(self._apply_url_sync, url, plan, embeddings)
 
-    def chunk_text(self, text: str, metadata: Optional[Dict] = None) -> List[Dict[str, Any]]:
+    async def sync_url_chunk_stream(
+        self,
+        url: str,
+        chunks: Union[Iterable[Dict[str, Any]], AsyncIterable[Dict[str, Any]]],
+        batch_size: int = 64
+    ) -> Dict[str, Any]:
         """
-        Chunk text into overlapping segments
+        sync_url_chunks over a lazily produced chunk stream
+
+        Chunks (e.g. from DocumentChunker.iter_chunks) are consumed batch by
+        batch: each batch is embedded and written before the next is read,
+        so only chunk IDs are kept for the whole document. Chunks not seen by
+        the end of the stream are deleted. A synchronous iterable is read in a
+        worker thread, since producing chunks (tokenizing) would otherwise
+        block the event loop.
 
         Args:
-            text: Text to chunk
-            metadata: Metadata to include with each chunk
+            url: Source URL (stored as the 'url' metadata field)
+            chunks: Iterable or async iterable of {'text', 'metadata'} dicts
+            batch_size: Chunks per embedding/write batch
 
         Returns:
-            List of chunks with text and metadata
+            Dict with ids (current chunk IDs), added, unchanged, deleted
         """
-        if not text:
-            return []
+        stored = await asyncio.to_thread(self._stored_ids, url)
+        seen: Dict[str, None] = {}  # Ordered set of current chunk IDs
+        totals = {'added': 0, 'unchanged': 0}
+        batch: List[Dict[str, Any]] = []
+
+        async def flush():
+            plan = self._plan_url_sync(
+                url, [c['text'] for c in batch], [c.get('metadata') or {} for c in batch], stored
+            )
+            for key in ('new', 'unchanged'):
+                plan[key] = [cid for cid in plan[key] if cid not in seen]
+            plan['removed'] = []
+            seen.update(dict.fromkeys(plan['chunks']))
+            embeddings = await self.embedder.embed_async([plan['chunks'][cid][0] for cid in plan['new']])
+            result = await asyncio.to_thread(self._apply_url_sync, url, plan, embeddings)
+            totals['added'] += result['added']
+            totals['unchanged'] += result['unchanged']
+            batch.clear()
+
+        if hasattr(chunks, '__aiter__'):
+            async for chunk in chunks:
+                batch.append(chunk)
+                if len(batch) >= batch_size:
+                    await flush()
+        else:
+            iterator = iter(chunks)
+            while True:
+                batch.extend(await asyncio.to_thread(list, islice(iterator, batch_size)))
+                if not batch:
+                    break
+                await flush()
+        if batch:
+            await flush()
+
+        removed = sorted(stored - seen.keys())
+        if removed:
+            await asyncio.to_thread(self._delete_chunks, removed)
+
+        logging.info(
+            f"Stream-synced {url}: {totals['added']} added, {totals['unchanged']} unchanged, "
+            f"{len(removed)} deleted"
+        )
+        return {'ids': list(seen), **totals, 'deleted': len(removed)}
 
-        chunks = []
-        start = 0
-        chunk_num = 0
-
-        while start < len(text):
-            # Extract chunk
-            end = start + self.chunk_size
-            chunk_text = text[start:end]
-
-            # Try to break at sentence boundary
-            if end < len(text):
-                # Look for sentence endings
-                for sep in ['. ', '.\n', '! ', '?\n', '? ']:
-                    last_sep = chunk_text.rfind(sep)
-                    if last_sep > self.chunk_size * 0.7:  # At least 70% of chunk_size
-                        chunk_text = chunk_text[:last_sep + 1]
-                        break
-
-            # Create chunk metadata
-            chunk_meta = metadata.copy() if metadata else {}
-            chunk_meta.update({
-                'chunk_num': chunk_num,
-                'chunk_start': start,
-                'chunk_end': start + len(chunk_text),
-                'chunk_size': len(chunk_text)
-            })
-
-            chunks.append({
-                'text': chunk_text.strip(),
-                'metadata': chunk_meta
-            })
-
-            # Move to next chunk with overlap
-            advance = max(1, len(chunk_text) - self.chunk_overlap)  # Always advance at least 1 char
-            start = start + advance
-            chunk_num += 1
-
-            # Prevent infinite loop - if we're near the end, stop
-            if start >= len(text) - 1:
-                break
+    def _plan_url_sync(
+        self,
+        url: str,
+        texts: List[str],
+        metadatas: Optional[List[Dict[str, Any]]],
+        stored: Optional[Set[str]] = None
+    ) -> Dict[str, Any]:
+        """Diff the current chunks of a URL against what is stored"""
+        now = datetime.now().isoformat()
+        chunks: Dict[str, tuple] = {}  # id -> (text, metadata); identical chunks stored once
+
+        for text, meta in zip(texts, metadatas or [{} for _ in texts]):
+            if not text or not text.strip():
+                continue
+            cid = self.chunk_id(url, text)
+            if cid not in chunks:
+                chunks[cid] = (text, {
+                    **meta,
+                    'url': url,
+                    'content_hash': cid.split('_', 1)[1],
+                    'char_count': len(text),
+                    'indexed_at': now
+                })
+
+        if stored is None:
+            stored = self._stored_ids(url)
+        return {
+            'chunks': chunks,
+            'new': [cid for cid in chunks if cid not in stored],
+            'unchanged': [cid for cid in chunks if cid in stored],
+            'removed': sorted(stored - chunks.keys())
+        }
 
-        logging.info(f"Chunked text into {len(chunks)} pieces")
-        return chunks
+    def _stored_ids(self, url: str) -> Set[str]:
+        """IDs of every chunk currently stored for a URL"""
+        return set(self.collection.get(where={'url': url}, include=[])['ids'])
+
+    def _delete_chunks(self, ids: List[str]):
+        self.collection.delete(ids=ids)
+        self.lexical.delete(ids)
+
+    def _apply_url_sync(self, url: str, plan: Dict[str, Any], embeddings: List[List[float]]) -> Dict[str, Any]:
+        """Write a planned URL sync to ChromaDB"""
+        chunks = plan['chunks']
+
+        if plan['new']:
+            now = datetime.now().isoformat()
+            texts = [chunks[cid][0] for cid in plan['new']]
+            metadatas = [{**chunks[cid][1], 'added_at': now} for cid in plan['new']]
+            self.collection.upsert(
+                ids=plan['new'],
+                embeddings=embeddings,
+                documents=texts,
+                metadatas=metadatas
+            )
+            self.lexical.upsert(plan['new'], texts, metadatas)
 
-    def chunk_documents(
-        self,
-        documents: List[Dict[str, Any]],
-        text_key: str = 'text',
-        metadata_key: str = 'metadata'
-    ) -> List[Dict[str, Any]]:
-        """
-        Chunk multiple documents
+        if plan['unchanged']:
+            # Chunk positions and crawl time move; updating metadata never re-embeds
+            metadatas = [chunks[cid][1] for cid in plan['unchanged']]
+            self.collection.update(ids=plan['unchanged'], metadatas=metadatas)
+            self.lexical.update_metadata(plan['unchanged'], metadatas)
 
-        Args:
-            documents: List of documents with text and metadata
-            text_key: Key for text in document dict
-            metadata_key: Key for metadata in document dict
+        if plan['removed']:
+            self._delete_chunks(plan['removed'])
 
-        Returns:
-            List of chunked documents
-        """
-        all_chunks = []
+        logging.info(
+            f"Synced {url}: {len(plan['new'])} added, {len(plan['unchanged'])} unchanged, "
+            f"{len(plan['removed'])} deleted"
+        )
+        return {
+            'ids': list(chunks),
+            'added': len(plan['new']),
+            'unchanged': len(plan['unchanged']),
+            'deleted': len(plan['removed'])
+        }
 
-        for doc in documents:
-            text = doc.get(text_key, '')
-            metadata = doc.get(metadata_key, {})
+    def get_stats(self) -> Dict[str, Any]:
+        """Get knowledge base statistics"""
+        count = self.collection.count()
 
-            chunks = self.chunk_text(text, metadata)
-            all_chunks.extend(chunks)
+        return {
+            'collection': self.collection_name,
+            'total_documents': count,
+            'embedding_model': 'all-MiniLM-L6-v2',
+            'embedding_dimensions': 384,
+            'storage_path': str(self.data_dir / "chroma_db"),
+            'lexical_documents': self.lexical.count(),
+            'embedding_service': self.embedder.get_stats()
+        }
 
-        return all_chunks
+    def clear(self) -> None:
+        """Clear all documents from the collection"""
+        self.client.delete_collection(self.collection_name)
+        self.collection = self.client.create_collection(
+            name=self.collection_name,
+            metadata={"description": "Alfred's web crawl knowledge base"}
+        )
+        self.lexical.clear()
+        logging.warning(f"Cleared all documents from {self.collection_name}")
 
 
 # Convenience functions
@@ -367,13 +653,6 @@ def create_knowledge_base(data_dir: str = "alfred_data", collection: str = "alfr
     return VectorKnowledgeBase(data_dir, collection)
 
 
-def chunk_large_text(text: str, chunk_size: int = 1000) -> List[str]:
-    """Quick text chunking"""
-    chunker = DocumentChunker(chunk_size=chunk_size)
-    chunks = chunker.chunk_text(text)
-    return [c['text'] for c in chunks]
-
-
 if __name__ == "__main__":
     # Test the vector knowledge base
     print("=" * 80)
@@ -15,13 +15,21 @@ Part of ALFRED SYSTEMS Full Integration - Phase 1: Foundation
 
 import asyncio
 import logging
-from typing import List, Dict, Optional, Any, Set
+from collections import deque
+from typing import List, Dict, Optional, Any, Set, AsyncIterator
 from datetime import datetime
 from urllib.parse import urlparse, urljoin
 import json
-import hashlib
 import re
 
+try:
+    from .crawl_frontier import normalize_url, VisitedSet, HostRateLimiter
+    from .crawl_cache import CrawlCache, get_crawl_cache
+except ImportError:
+    # When running as script directly
+    from crawl_frontier import normalize_url, VisitedSet, HostRateLimiter
+    from crawl_cache import CrawlCache, get_crawl_cache
+
 # Core dependencies (all pip-installable without build issues)
 try:
     import httpx
@@ -73,7 +81,10 @@ class WebIntelligence:
         timeout: float = 30.0,
         max_concurrent: int = 10,
         user_agent: str = "ALFRED-WebIntelligence/1.0 (Compatible; Research Bot)",
-        respect_robots: bool = True
+        respect_robots: bool = True,
+        per_host_rate: float = 2.0,
+        host_burst: int = 2,
+        cache: Optional[CrawlCache] = None
     ):
         """
         Initialize web intelligence system.
@@ -83,6 +94,9 @@ class WebIntelligence:
             max_concurrent: Maximum concurrent requests
             user_agent: User agent string
             respect_robots: Whether to respect robots.txt
+            per_host_rate: Deep-crawl politeness - requests/second per host
+            host_burst: Requests a host may receive back-to-back
+            cache: Persistent page cache (default: shared process-wide cache)
         """
         if not WEB_INTELLIGENCE_AVAILABLE:
             raise RuntimeError(
@@ -95,6 +109,9 @@ class WebIntelligence:
         self.user_agent = user_agent
         self.respect_robots = respect_robots
 
+        # Per-host politeness for deep crawls (token buckets, not a global sleep)
+        self._host_limiter = HostRateLimiter(per_host_rate, host_burst)
+
         # HTTP client (created on demand)
         self._client: Optional[httpx.AsyncClient] = None
 
@@ -116,11 +133,12 @@ class WebIntelligence:
             'successful_requests': 0,
             'failed_requests': 0,
             'total_bytes': 0,
-            'cache_hits': 0
+            'cache_hits': 0,
+            'revalidated': 0
         }
 
-        # Simple cache
-        self._cache: Dict[str, Dict] = {}
+        # Persistent cache shared with the other crawlers
+        self.cache = cache if cache is not None else get_crawl_cache()
 
         logger.info("Web Intelligence initialized")
 
@@ -150,10 +168,6 @@ class WebIntelligence:
         """Async context manager exit."""
         await self.close()
 
-    def _cache_key(self, url: str) -> str:
-        """Generate cache key for URL."""
-        return hashlib.md5(url.encode()).hexdigest()
-
     def _extract_markdown_trafilatura(self, html: str, url: str) -> str:
         """Extract LLM-optimized markdown using trafilatura."""
         if not TRAFILATURA_AVAILABLE:
@@ -336,21 +350,25 @@ class WebIntelligence:
         Returns:
             Dict with markdown, links, media, metadata
         """
-        cache_key = self._cache_key(url)
-
-        # Check cache
-        if use_cache and cache_key in self._cache:
+        # Check cache - fresh entries skip the network entirely
+        cached = self.cache.get(url) if use_cache else None
+        if cached and cached['fresh']:
             self.stats['cache_hits'] += 1
-            cached = self._cache[cache_key].copy()
-            cached['from_cache'] = True
-            return cached
+            return dict(cached['data'], from_cache=True)
 
         self.stats['total_requests'] += 1
         client = await self._get_client()
 
         try:
-            # Fetch URL
-            response = await client.get(url)
+            # Fetch URL (conditionally, if we hold a stale copy)
+            response = await client.get(url, headers=self.cache.conditional_headers(cached))
+
+            if response.status_code == 304 and cached:
+                self.cache.renew(url)
+                self.stats['successful_requests'] += 1
+                self.stats['revalidated'] += 1
+                return dict(cached['data'], from_cache=True)
+
             response.raise_for_status()
 
             html = response.text
@@ -381,7 +399,11 @@ class WebIntelligence:
 
             # Cache result
             if use_cache:
-                self._cache[cache_key] = result
+                self.cache.put(
+                    url, result,
+                    etag=response.headers.get('etag'),
+                    last_modified=response.headers.get('last-modified')
+                )
 
             logger.info(f"Crawled {url}: {len(markdown)} chars markdown")
             return result
@@ -454,7 +476,8 @@ class WebIntelligence:
         max_pages: int = 50,
         same_domain_only: bool = True,
         url_patterns: Optional[List[str]] = None,
-        exclude_patterns: Optional[List[str]] = None
+        exclude_patterns: Optional[List[str]] = None,
+        max_concurrent: Optional[int] = None
     ) -> List[Dict[str, Any]]:
         """
         Deep crawl starting from a URL, following links.
@@ -466,15 +489,61 @@ class WebIntelligence:
             same_domain_only: Only crawl same domain
             url_patterns: URL patterns to include (regex)
             exclude_patterns: URL patterns to exclude (regex)
+            max_concurrent: Override default concurrency limit
 
         Returns:
-            List of crawled pages
+            List of crawled pages (in completion order)
         """
-        base_domain = urlparse(start_url).netloc
+        results = [
+            page async for page in self.deep_crawl_stream(
+                start_url,
+                max_depth=max_depth,
+                max_pages=max_pages,
+                same_domain_only=same_domain_only,
+                url_patterns=url_patterns,
+                exclude_patterns=exclude_patterns,
+                max_concurrent=max_concurrent
+            )
+        ]
+
+        logger.info(f"Deep crawl complete: {len(results)} pages from {start_url}")
+        return results
+
+    async def deep_crawl_stream(
+        self,
+        start_url: str,
+        max_depth: int = 2,
+        max_pages: int = 50,
+        same_domain_only: bool = True,
+        url_patterns: Optional[List[str]] = None,
+        exclude_patterns: Optional[List[str]] = None,
+        max_concurrent: Optional[int] = None,
+        visited_limit: int = 100_000
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Concurrent breadth-first deep crawl, yielding pages as they arrive.
 
-        visited: Set[str] = set()
-        to_visit: List[tuple] = [(start_url, 0)]  # (url, depth)
-        results: List[Dict[str, Any]] = []
+        Up to max_concurrent pages are in flight at once; each host is rate
+        limited by its own token bucket. URLs are normalized and de-duplicated
+        when discovered, so each page is fetched at most once. Stopping
+        iteration early cancels the remaining requests.
+
+        Args:
+            start_url: Starting URL
+            max_depth: Maximum crawl depth
+            max_pages: Maximum total pages to crawl
+            same_domain_only: Only crawl same domain
+            url_patterns: URL patterns to include (regex)
+            exclude_patterns: URL patterns to exclude (regex)
+            max_concurrent: Override default concurrency limit
+            visited_limit: URLs tracked exactly before switching to a Bloom filter
+
+        Yields:
+            Crawl results (each with a 'depth' key)
+        """
+        start_url = normalize_url(start_url)
+        base_domain = urlparse(start_url).netloc
+        concurrency = max_concurrent or self.max_concurrent
 
         # Compile patterns
         include_re = [re.compile(p) for p in (url_patterns or [])]
@@ -482,11 +551,11 @@ class WebIntelligence:
 
         def should_crawl(url: str) -> bool:
             """Check if URL should be crawled."""
-            if url in visited:
-                return False
-
             parsed = urlparse(url)
 
+            if parsed.scheme not in ('http', 'https'):
+                return False
+
             # Domain check
             if same_domain_only and parsed.netloc != base_domain:
                 return False
@@ -501,30 +570,53 @@ class WebIntelligence:
 
             return True
 
-        while to_visit and len(results) < max_pages:
-            url, depth = to_visit.pop(0)
-
-            if not should_crawl(url):
-                continue
-
-            visited.add(url)
+        async def polite_crawl(url: str) -> Dict[str, Any]:
+            await self._host_limiter.acquire(urlparse(url).netloc)
+            return await self.crawl_url(url)
 
-            # Crawl page
-            result = await self.crawl_url(url)
-            results.append(result)
+        seen = VisitedSet(exact_limit=visited_limit)
+        seen.add(start_url)
+        frontier = deque([(start_url, 0)])  # (url, depth) - FIFO = breadth-first
+        in_flight: Dict[asyncio.Task, tuple] = {}
+        scheduled = 0
 
-            # Add links to queue (if not at max depth)
-            if result['success'] and depth < max_depth:
-                internal_links = result.get('links', {}).get('internal', [])
-                for link in internal_links:
-                    if should_crawl(link):
-                        to_visit.append((link, depth + 1))
-
-            # Respect rate limiting
-            await asyncio.sleep(0.5)
-
-        logger.info(f"Deep crawl complete: {len(results)} pages from {start_url}")
-        return results
+        try:
+            while frontier or in_flight:
+                # Fill the pipeline up to the concurrency limit
+                while frontier and len(in_flight) < concurrency and scheduled < max_pages:
+                    url, depth = frontier.popleft()
+                    in_flight[asyncio.ensure_future(polite_crawl(url))] = (url, depth)
+                    scheduled += 1
+
+                if not in_flight:
+                    break
+
+                done, _ = await asyncio.wait(in_flight, return_when=asyncio.FIRST_COMPLETED)
+
+                for task in done:
+                    url, depth = in_flight.pop(task)
+                    try:
+                        result = task.result()
+                    except Exception as e:
+                        result = {
+                            'url': url,
+                            'success': False,
+                            'error': str(e),
+                            'crawled_at': datetime.now().isoformat()
+                        }
+                    result = dict(result, depth=depth)  # don't tag the cached copy
+
+                    # Queue newly discovered links (if not at max depth)
+                    if result.get('success') and depth < max_depth and scheduled < max_pages:
+                        for link in result.get('links', {}).get('internal', []):
+                            link = normalize_url(link)
+                            if should_crawl(link) and seen.add(link):
+                                frontier.append((link, depth + 1))
+
+                    yield result
+        finally:
+            for task in in_flight:
+                task.cancel()
 
     async def extract_structured(
         self,
@@ -586,7 +678,8 @@ class WebIntelligence:
                 self.stats['successful_requests'] / self.stats['total_requests'] * 100
                 if self.stats['total_requests'] > 0 else 0
             ),
-            'cache_size': len(self._cache),
+            'cache_size': self.cache.count('page'),
+            'crawl_cache': self.cache.get_stats(),
             'libraries': {
                 'httpx': HTTPX_AVAILABLE,
                 'trafilatura': TRAFILATURA_AVAILABLE,
@@ -597,8 +690,8 @@ class WebIntelligence:
         }
 
     def clear_cache(self):
-        """Clear the URL cache."""
-        self._cache.clear()
+        """Clear cached pages (shared with the other crawlers)."""
+        self.cache.clear('page')
         logger.info("Cache cleared")
 
 
@@ -25,6 +25,14 @@ from typing import List, Dict, Optional, Any, Tuple
 from collections import defaultdict, Counter
 import re
 
+try:
+    from core.near_duplicates import MinHashLSH, bounded_similarity, shingles
+    from core.knowledge_extractor import KnowledgeExtractor
+except ModuleNotFoundError:
+    # When running as script directly
+    from near_duplicates import MinHashLSH, bounded_similarity, shingles
+    from knowledge_extractor import KnowledgeExtractor
+
 
 class AlfredBrain:
     """
@@ -40,13 +48,52 @@ class AlfredBrain:
     - Knowledge consolidation
     """
 
-    def __init__(self, data_dir: Optional[str] = None):
-        """Initialize Alfred's brain"""
+    # Categories up to this size are compared pairwise; larger ones use MinHash/LSH
+    DEDUP_EXHAUSTIVE_LIMIT = 500
+
+    # Tables replicated by delta sync: (local key, natural key matching rows
+    # across brains, columns shipped and compared when merging)
+    SYNC_TABLES = {
+        "conversations": ("id", ("timestamp", "user_input"), (
+            "timestamp", "user_input", "alfred_response", "context", "topics",
+            "sentiment", "importance", "success")),
+        "knowledge": ("id", ("category", "key", "timestamp"), (
+            "timestamp", "category", "key", "value", "source", "confidence", "importance")),
+        "patterns": ("id", ("pattern_type", "pattern_data"), (
+            "pattern_type", "pattern_data", "frequency", "success_rate", "last_seen", "confidence")),
+        "skills": ("skill_name", ("skill_name",), (
+            "skill_name", "proficiency", "times_used", "success_count", "failure_count",
+            "last_used", "notes")),
+        "topics": ("topic", ("topic",), (
+            "topic", "frequency", "first_seen", "last_seen", "interest_level")),
+        "mistakes": ("id", ("timestamp", "error_type", "description"), (
+            "timestamp", "error_type", "description", "context", "solution", "learned")),
+    }
+
+    # Merged rows only replace local ones that are not newer by this column
+    SYNC_VERSION_COLUMNS = {"patterns": "last_seen", "skills": "last_used", "topics": "last_seen"}
+
+    def __init__(self, data_dir: Optional[str] = None, async_extraction: bool = False,
+                 write_behind: bool = False):
+        """
+        Initialize Alfred's brain
+
+        Args:
+            data_dir: Data directory (default: PathManager.DATA_DIR)
+            async_extraction: Run knowledge extraction on a background thread so
+                              store_conversation returns without waiting for it
+            write_behind: Journal conversation turns and store them in batches on a
+                          background writer (store_conversation returns immediately)
+        """
         try:
             from core.path_manager import PathManager
+            from core.db_pool import BrainConnectionPool
+            from core.conversation_journal import ConversationJournal
         except ModuleNotFoundError:
             # When running as script directly
             from path_manager import PathManager
+            from db_pool import BrainConnectionPool
+            from conversation_journal import ConversationJournal
 
         # Use PathManager.DATA_DIR if no custom path specified
         if data_dir is None:
@@ -59,13 +106,40 @@ class AlfredBrain:
         # Database paths
         self.db_path = self.data_dir / "alfred_brain.db"
 
+        # Pooled per-thread connections (WAL, tuned pragmas, statement cache)
+        self.pool = BrainConnectionPool(self.db_path)
+
         # In-memory caches for performance
         self.context_cache = []
         self.knowledge_cache = {}
         self.pattern_cache = defaultdict(list)
 
+        # Precompiled knowledge extraction (optionally off the request path)
+        self.extractor = KnowledgeExtractor()
+        self.async_extraction = async_extraction
+        self._extraction_executor = None
+        if async_extraction:
+            from concurrent.futures import ThreadPoolExecutor
+            self._extraction_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="brain-extract"
+            )
+
         # Initialize
         self.init_database()
+
+        # Write-behind journal (replays turns left over from a crash first)
+        self.write_behind = write_behind
+        self.journal = None
+        if write_behind:
+            self.journal = ConversationJournal(
+                self.data_dir / "conversation_journal.jsonl",
+                apply_batch=self._apply_journal_batch,
+                applied_seq=self._journal_applied_seq()
+            )
+            if self.journal.stats["replayed"]:
+                print(f"[Brain] Replaying {self.journal.stats['replayed']} journaled conversations")
+                self.journal.flush()
+
         self.load_caches()
 
         print("[OK] Alfred's Brain initialized - Ultra Mode")
@@ -75,549 +149,862 @@ class AlfredBrain:
         print(f"  Knowledge items: {stats['knowledge']}")
         print(f"  Learned patterns: {stats['patterns']}")
 
+    def _connect(self):
+        """Get this thread's pooled database connection (close() releases it)"""
+        return self.pool.acquire()
+
+    def close(self):
+        """Drain the write-behind journal, finish background extraction and close all pooled connections"""
+        if self.journal:
+            self.journal.close()
+            self.journal = None
+        if self._extraction_executor:
+            self._extraction_executor.shutdown(wait=True)
+            self._extraction_executor = None
+        self.pool.close_all()
+
     def init_database(self):
         """Initialize comprehensive database schema"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # ========================================
-        # CONVERSATIONS - Long-term memory
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS conversations (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                user_input TEXT NOT NULL,
-                alfred_response TEXT NOT NULL,
-                context TEXT,
-                models_used TEXT,
-                topics TEXT,
-                sentiment TEXT,
-                importance INTEGER DEFAULT 5,
-                success BOOLEAN DEFAULT 1,
-                execution_time REAL
-            )
-        """)
+            # ========================================
+            # CONVERSATIONS - Long-term memory
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS conversations (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    user_input TEXT NOT NULL,
+                    alfred_response TEXT NOT NULL,
+                    context TEXT,
+                    models_used TEXT,
+                    topics TEXT,
+                    sentiment TEXT,
+                    importance INTEGER DEFAULT 5,
+                    success BOOLEAN DEFAULT 1,
+                    execution_time REAL
+                )
+            """)
 
-        # ========================================
-        # KNOWLEDGE BASE - Learned facts
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS knowledge (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                category TEXT NOT NULL,
-                key TEXT NOT NULL,
-                value TEXT NOT NULL,
-                source TEXT,
-                confidence REAL DEFAULT 1.0,
-                times_accessed INTEGER DEFAULT 0,
-                last_accessed TEXT,
-                importance INTEGER DEFAULT 5
-            )
-        """)
+            # ========================================
+            # KNOWLEDGE BASE - Learned facts
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    key TEXT NOT NULL,
+                    value TEXT NOT NULL,
+                    source TEXT,
+                    confidence REAL DEFAULT 1.0,
+                    times_accessed INTEGER DEFAULT 0,
+                    last_accessed TEXT,
+                    importance INTEGER DEFAULT 5
+                )
+            """)
 
-        # Create index for faster lookups
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_knowledge_category_key
-            ON knowledge(category, key)
-        """)
+            # Create index for faster lookups
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_knowledge_category_key
+                ON knowledge(category, key)
+            """)
 
-        # ========================================
-        # USER PREFERENCES - Adaptive settings
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS preferences (
-                preference_key TEXT PRIMARY KEY,
-                preference_value TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                times_used INTEGER DEFAULT 0,
-                confidence REAL DEFAULT 1.0
-            )
-        """)
+            # ========================================
+            # USER PREFERENCES - Adaptive settings
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS preferences (
+                    preference_key TEXT PRIMARY KEY,
+                    preference_value TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    times_used INTEGER DEFAULT 0,
+                    confidence REAL DEFAULT 1.0
+                )
+            """)
 
-        # ========================================
-        # PATTERNS - Learned behavioral patterns
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS patterns (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                pattern_type TEXT NOT NULL,
-                pattern_data TEXT NOT NULL,
-                frequency INTEGER DEFAULT 1,
-                success_rate REAL DEFAULT 1.0,
-                last_seen TEXT NOT NULL,
-                confidence REAL DEFAULT 1.0
-            )
-        """)
+            # ========================================
+            # PATTERNS - Learned behavioral patterns
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS patterns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    pattern_type TEXT NOT NULL,
+                    pattern_data TEXT NOT NULL,
+                    frequency INTEGER DEFAULT 1,
+                    success_rate REAL DEFAULT 1.0,
+                    last_seen TEXT NOT NULL,
+                    confidence REAL DEFAULT 1.0
+                )
+            """)
 
-        # ========================================
-        # SKILLS - Capabilities and proficiency
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS skills (
-                skill_name TEXT PRIMARY KEY,
-                proficiency REAL DEFAULT 0.0,
-                times_used INTEGER DEFAULT 0,
-                success_count INTEGER DEFAULT 0,
-                failure_count INTEGER DEFAULT 0,
-                last_used TEXT,
-                notes TEXT
-            )
-        """)
+            # ========================================
+            # SKILLS - Capabilities and proficiency
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS skills (
+                    skill_name TEXT PRIMARY KEY,
+                    proficiency REAL DEFAULT 0.0,
+                    times_used INTEGER DEFAULT 0,
+                    success_count INTEGER DEFAULT 0,
+                    failure_count INTEGER DEFAULT 0,
+                    last_used TEXT,
+                    notes TEXT
+                )
+            """)
 
-        # ========================================
-        # MISTAKES - Learning from errors
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS mistakes (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                error_type TEXT NOT NULL,
-                description TEXT NOT NULL,
-                context TEXT,
-                solution TEXT,
-                learned BOOLEAN DEFAULT 0
-            )
-        """)
+            # ========================================
+            # MISTAKES - Learning from errors
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS mistakes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    error_type TEXT NOT NULL,
+                    description TEXT NOT NULL,
+                    context TEXT,
+                    solution TEXT,
+                    learned BOOLEAN DEFAULT 0
+                )
+            """)
 
-        # ========================================
-        # TOPICS - Subject tracking
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS topics (
-                topic TEXT PRIMARY KEY,
-                frequency INTEGER DEFAULT 1,
-                first_seen TEXT NOT NULL,
-                last_seen TEXT NOT NULL,
-                interest_level REAL DEFAULT 0.5
-            )
-        """)
+            # ========================================
+            # TOPICS - Subject tracking
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS topics (
+                    topic TEXT PRIMARY KEY,
+                    frequency INTEGER DEFAULT 1,
+                    first_seen TEXT NOT NULL,
+                    last_seen TEXT NOT NULL,
+                    interest_level REAL DEFAULT 0.5
+                )
+            """)
 
-        # ========================================
-        # CONTEXT WINDOWS - Recent activity
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS context_windows (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                window_data TEXT NOT NULL,
-                summary TEXT
-            )
-        """)
+            # ========================================
+            # CONTEXT WINDOWS - Recent activity
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS context_windows (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    window_data TEXT NOT NULL,
+                    summary TEXT
+                )
+            """)
 
-        # ========================================
-        # CONVERSATION ARCHIVES - Archived conversations
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS conversation_archives (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                archived_at TEXT NOT NULL,
-                original_id INTEGER NOT NULL,
-                archive_path TEXT NOT NULL,
-                reason TEXT
-            )
-        """)
+            # ========================================
+            # CONVERSATION ARCHIVES - Archived conversations
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_archives (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    archived_at TEXT NOT NULL,
+                    original_id INTEGER NOT NULL,
+                    archive_path TEXT NOT NULL,
+                    reason TEXT
+                )
+            """)
 
-        # ========================================
-        # EXTRACTION PATTERNS - Pattern tracking
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS extraction_patterns (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                pattern_name TEXT NOT NULL,
-                pattern_regex TEXT NOT NULL,
-                category TEXT NOT NULL,
-                key_template TEXT NOT NULL,
-                confidence_level REAL DEFAULT 0.8,
-                times_matched INTEGER DEFAULT 0,
-                success_rate REAL DEFAULT 1.0,
-                active BOOLEAN DEFAULT 1
-            )
-        """)
+            # ========================================
+            # EXTRACTION PATTERNS - Pattern tracking
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS extraction_patterns (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    pattern_name TEXT NOT NULL,
+                    pattern_regex TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    key_template TEXT NOT NULL,
+                    confidence_level REAL DEFAULT 0.8,
+                    times_matched INTEGER DEFAULT 0,
+                    success_rate REAL DEFAULT 1.0,
+                    active BOOLEAN DEFAULT 1
+                )
+            """)
 
-        # ========================================
-        # EXTRACTION HISTORY - Track extractions
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS extraction_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                conversation_id INTEGER,
-                pattern_id INTEGER,
-                extracted_knowledge_id INTEGER,
-                confidence REAL
-            )
-        """)
+            # ========================================
+            # EXTRACTION HISTORY - Track extractions
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS extraction_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    conversation_id INTEGER,
+                    pattern_id INTEGER,
+                    extracted_knowledge_id INTEGER,
+                    confidence REAL
+                )
+            """)
 
-        # ========================================
-        # KNOWLEDGE MERGES - Track merge history
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS knowledge_merges (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                primary_id INTEGER NOT NULL,
-                merged_ids TEXT NOT NULL,
-                similarity_score REAL,
-                merge_strategy TEXT,
-                original_values TEXT
-            )
-        """)
+            # ========================================
+            # KNOWLEDGE MERGES - Track merge history
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge_merges (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    primary_id INTEGER NOT NULL,
+                    merged_ids TEXT NOT NULL,
+                    similarity_score REAL,
+                    merge_strategy TEXT,
+                    original_values TEXT
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_knowledge_category_value
-            ON knowledge(category, value)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_knowledge_category_value
+                ON knowledge(category, value)
+            """)
 
-        # ========================================
-        # PRIORITY HISTORY - Track priority changes
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS priority_history (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                item_type TEXT NOT NULL,
-                item_id INTEGER NOT NULL,
-                old_score REAL,
-                new_score REAL,
-                reason TEXT
-            )
-        """)
+            # ========================================
+            # PRIORITY HISTORY - Track priority changes
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS priority_history (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    item_type TEXT NOT NULL,
+                    item_id INTEGER NOT NULL,
+                    old_score REAL,
+                    new_score REAL,
+                    reason TEXT
+                )
+            """)
 
-        # ========================================
-        # ARCHIVAL CONFIG - Archival tiers
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS archival_config (
-                tier TEXT PRIMARY KEY,
-                min_priority REAL NOT NULL,
-                max_priority REAL NOT NULL,
-                min_age_days INTEGER NOT NULL,
-                retention_days INTEGER NOT NULL,
-                description TEXT
-            )
-        """)
+            # ========================================
+            # ARCHIVAL CONFIG - Archival tiers
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS archival_config (
+                    tier TEXT PRIMARY KEY,
+                    min_priority REAL NOT NULL,
+                    max_priority REAL NOT NULL,
+                    min_age_days INTEGER NOT NULL,
+                    retention_days INTEGER NOT NULL,
+                    description TEXT
+                )
+            """)
 
-        # Insert default archival tiers
-        cursor.execute("""
-            INSERT OR IGNORE INTO archival_config VALUES
-                ('hot', 7.0, 10.0, 0, 36500, 'Critical items - never archive'),
-                ('warm', 4.0, 6.9, 30, 365, 'Important items - archive after 1 year'),
-                ('cold', 2.0, 3.9, 90, 180, 'Low priority - archive after 6 months'),
-                ('frozen', 0.0, 1.9, 30, 90, 'Very low priority - archive after 3 months')
-        """)
+            # Insert default archival tiers
+            cursor.execute("""
+                INSERT OR IGNORE INTO archival_config VALUES
+                    ('hot', 7.0, 10.0, 0, 36500, 'Critical items - never archive'),
+                    ('warm', 4.0, 6.9, 30, 365, 'Important items - archive after 1 year'),
+                    ('cold', 2.0, 3.9, 90, 180, 'Low priority - archive after 6 months'),
+                    ('frozen', 0.0, 1.9, 30, 90, 'Very low priority - archive after 3 months')
+            """)
 
-        # ========================================
-        # CONVERSATION SESSIONS - Session tracking
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS conversation_sessions (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                session_name TEXT,
-                start_time TEXT NOT NULL,
-                end_time TEXT,
-                message_count INTEGER DEFAULT 0,
-                topics TEXT,
-                avg_importance REAL,
-                success_rate REAL,
-                duration_minutes INTEGER,
-                summary TEXT
-            )
-        """)
+            # ========================================
+            # CONVERSATION SESSIONS - Session tracking
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_sessions (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    session_name TEXT,
+                    start_time TEXT NOT NULL,
+                    end_time TEXT,
+                    message_count INTEGER DEFAULT 0,
+                    topics TEXT,
+                    avg_importance REAL,
+                    success_rate REAL,
+                    duration_minutes INTEGER,
+                    summary TEXT
+                )
+            """)
 
-        # Note: idx_conversations_session index created in migrations section after column exists
+            # Note: idx_conversations_session index created in migrations section after column exists
 
-        # ========================================
-        # CONVERSATION RELATIONSHIPS - Conversation links
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS conversation_relationships (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                conversation_id INTEGER NOT NULL,
-                related_conversation_id INTEGER NOT NULL,
-                relationship_type TEXT NOT NULL,
-                strength REAL DEFAULT 1.0,
-                created_at TEXT NOT NULL,
-                FOREIGN KEY (conversation_id) REFERENCES conversations(id),
-                FOREIGN KEY (related_conversation_id) REFERENCES conversations(id)
-            )
-        """)
+            # ========================================
+            # CONVERSATION RELATIONSHIPS - Conversation links
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS conversation_relationships (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    conversation_id INTEGER NOT NULL,
+                    related_conversation_id INTEGER NOT NULL,
+                    relationship_type TEXT NOT NULL,
+                    strength REAL DEFAULT 1.0,
+                    created_at TEXT NOT NULL,
+                    FOREIGN KEY (conversation_id) REFERENCES conversations(id),
+                    FOREIGN KEY (related_conversation_id) REFERENCES conversations(id)
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_conversation_relationships
-            ON conversation_relationships(conversation_id, relationship_type)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_conversation_relationships
+                ON conversation_relationships(conversation_id, relationship_type)
+            """)
 
-        # ========================================
-        # KNOWLEDGE RELATIONSHIPS - Knowledge graph
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS knowledge_relationships (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                knowledge_id1 INTEGER NOT NULL,
-                knowledge_id2 INTEGER NOT NULL,
-                relationship_type TEXT NOT NULL,
-                strength REAL DEFAULT 1.0,
-                bidirectional BOOLEAN DEFAULT 1,
-                created_at TEXT NOT NULL,
-                created_by TEXT DEFAULT 'system',
-                verified BOOLEAN DEFAULT 0,
-                times_traversed INTEGER DEFAULT 0,
-                last_traversed TEXT,
-                FOREIGN KEY (knowledge_id1) REFERENCES knowledge(id),
-                FOREIGN KEY (knowledge_id2) REFERENCES knowledge(id)
-            )
-        """)
+            # ========================================
+            # KNOWLEDGE RELATIONSHIPS - Knowledge graph
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge_relationships (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    knowledge_id1 INTEGER NOT NULL,
+                    knowledge_id2 INTEGER NOT NULL,
+                    relationship_type TEXT NOT NULL,
+                    strength REAL DEFAULT 1.0,
+                    bidirectional BOOLEAN DEFAULT 1,
+                    created_at TEXT NOT NULL,
+                    created_by TEXT DEFAULT 'system',
+                    verified BOOLEAN DEFAULT 0,
+                    times_traversed INTEGER DEFAULT 0,
+                    last_traversed TEXT,
+                    FOREIGN KEY (knowledge_id1) REFERENCES knowledge(id),
+                    FOREIGN KEY (knowledge_id2) REFERENCES knowledge(id)
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_knowledge_relationships_id1
-            ON knowledge_relationships(knowledge_id1, relationship_type)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_knowledge_relationships_id1
+                ON knowledge_relationships(knowledge_id1, relationship_type)
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_knowledge_relationships_id2
-            ON knowledge_relationships(knowledge_id2, relationship_type)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_knowledge_relationships_id2
+                ON knowledge_relationships(knowledge_id2, relationship_type)
+            """)
 
-        # ========================================
-        # WEB CACHE - Crawled content storage
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS web_cache (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                url TEXT NOT NULL UNIQUE,
-                content TEXT NOT NULL,
-                metadata TEXT,
-                crawled_at TEXT NOT NULL,
-                content_hash TEXT,
-                links_extracted INTEGER DEFAULT 0,
-                times_accessed INTEGER DEFAULT 0,
-                last_accessed TEXT
-            )
-        """)
+            # ========================================
+            # WEB CACHE - Crawled content storage
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS web_cache (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    url TEXT NOT NULL UNIQUE,
+                    content TEXT NOT NULL,
+                    metadata TEXT,
+                    crawled_at TEXT NOT NULL,
+                    content_hash TEXT,
+                    links_extracted INTEGER DEFAULT 0,
+                    times_accessed INTEGER DEFAULT 0,
+                    last_accessed TEXT
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_web_cache_url
-            ON web_cache(url)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_web_cache_url
+                ON web_cache(url)
+            """)
 
-        # ========================================
-        # SECURITY SCANS - Security analysis results
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS security_scans (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                timestamp TEXT NOT NULL,
-                target TEXT NOT NULL,
-                scan_type TEXT NOT NULL,
-                findings TEXT NOT NULL,
-                severity_summary TEXT,
-                recommendations TEXT,
-                authorized BOOLEAN DEFAULT 0,
-                notes TEXT
-            )
-        """)
+            # ========================================
+            # SECURITY SCANS - Security analysis results
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS security_scans (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    timestamp TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    scan_type TEXT NOT NULL,
+                    findings TEXT NOT NULL,
+                    severity_summary TEXT,
+                    recommendations TEXT,
+                    authorized BOOLEAN DEFAULT 0,
+                    notes TEXT
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_security_scans_target
-            ON security_scans(target, scan_type)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_security_scans_target
+                ON security_scans(target, scan_type)
+            """)
 
-        # ========================================
-        # MARKET DATA - Financial data cache
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS market_data (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                symbol TEXT NOT NULL,
-                market TEXT NOT NULL,
-                data TEXT NOT NULL,
-                timestamp TEXT NOT NULL,
-                data_type TEXT,
-                source TEXT,
-                UNIQUE(symbol, market, timestamp)
-            )
-        """)
+            # ========================================
+            # MARKET DATA - Financial data cache
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS market_data (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    symbol TEXT NOT NULL,
+                    market TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    timestamp TEXT NOT NULL,
+                    data_type TEXT,
+                    source TEXT,
+                    UNIQUE(symbol, market, timestamp)
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_market_data_symbol
-            ON market_data(symbol, market)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_market_data_symbol
+                ON market_data(symbol, market)
+            """)
 
-        # ========================================
-        # CAMDAN PROJECTS - Engineering project tracking
-        # ========================================
-        cursor.execute("""
-            CREATE TABLE IF NOT EXISTS camdan_projects (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                project_name TEXT NOT NULL,
-                client_name TEXT,
-                location TEXT,
-                building_type TEXT,
-                square_footage INTEGER,
-                estimated_cost REAL,
-                actual_cost REAL,
-                status TEXT DEFAULT 'planning',
-                timeline_data TEXT,
-                compliance_issues TEXT,
-                brain_insights TEXT,
-                created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL,
-                completed_at TEXT,
-                importance INTEGER DEFAULT 7,
-                notes TEXT
-            )
-        """)
+            # ========================================
+            # CAMDAN PROJECTS - Engineering project tracking
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS camdan_projects (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    project_name TEXT NOT NULL,
+                    client_name TEXT,
+                    location TEXT,
+                    building_type TEXT,
+                    square_footage INTEGER,
+                    estimated_cost REAL,
+                    actual_cost REAL,
+                    status TEXT DEFAULT 'planning',
+                    timeline_data TEXT,
+                    compliance_issues TEXT,
+                    brain_insights TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    completed_at TEXT,
+                    importance INTEGER DEFAULT 7,
+                    notes TEXT
+                )
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_camdan_projects_client
-            ON camdan_projects(client_name, status)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_camdan_projects_client
+                ON camdan_projects(client_name, status)
+            """)
 
-        cursor.execute("""
-            CREATE INDEX IF NOT EXISTS idx_camdan_projects_status
-            ON camdan_projects(status, created_at DESC)
-        """)
+            cursor.execute("""
+                CREATE INDEX IF NOT EXISTS idx_camdan_projects_status
+                ON camdan_projects(status, created_at DESC)
+            """)
 
-        # ========================================
-        # SCHEMA MIGRATIONS - Add new columns to existing tables
-        # ========================================
+            # ========================================
+            # SCHEMA MIGRATIONS - Add new columns to existing tables
+            # ========================================
 
-        # Add new columns to conversations table (if they don't exist)
-        try:
-            cursor.execute("ALTER TABLE conversations ADD COLUMN retention_score REAL DEFAULT 1.0")
-        except sqlite3.OperationalError:
-            pass  # Column already exists
+            # Add new columns to conversations table (if they don't exist)
+            try:
+                cursor.execute("ALTER TABLE conversations ADD COLUMN retention_score REAL DEFAULT 1.0")
+            except sqlite3.OperationalError:
+                pass  # Column already exists
 
-        try:
-            cursor.execute("ALTER TABLE conversations ADD COLUMN times_accessed INTEGER DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass
+            try:
+                cursor.execute("ALTER TABLE conversations ADD COLUMN times_accessed INTEGER DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
 
-        try:
-            cursor.execute("ALTER TABLE conversations ADD COLUMN last_accessed TEXT")
-        except sqlite3.OperationalError:
-            pass
+            try:
+                cursor.execute("ALTER TABLE conversations ADD COLUMN last_accessed TEXT")
+            except sqlite3.OperationalError:
+                pass
 
-        try:
-            cursor.execute("ALTER TABLE conversations ADD COLUMN cluster_id INTEGER")
-        except sqlite3.OperationalError:
-            pass
+            try:
+                cursor.execute("ALTER TABLE conversations ADD COLUMN cluster_id INTEGER")
+            except sqlite3.OperationalError:
+                pass
 
-        try:
-            cursor.execute("ALTER TABLE conversations ADD COLUMN session_id INTEGER")
-        except sqlite3.OperationalError:
-            pass
+            try:
+                cursor.execute("ALTER TABLE conversations ADD COLUMN session_id INTEGER")
+            except sqlite3.OperationalError:
+                pass
 
-        # Create index for session_id after column is added
-        try:
+            # Create index for session_id after column is added
+            try:
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_conversations_session
+                    ON conversations(session_id, timestamp)
+                """)
+            except sqlite3.OperationalError:
+                pass
+
+            # Add new columns to knowledge table (if they don't exist)
+            try:
+                cursor.execute("ALTER TABLE knowledge ADD COLUMN extraction_method TEXT DEFAULT 'manual'")
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("ALTER TABLE knowledge ADD COLUMN verified BOOLEAN DEFAULT 0")
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("ALTER TABLE knowledge ADD COLUMN superseded_by INTEGER")
+            except sqlite3.OperationalError:
+                pass
+
+            # Add priority_score columns to tables (if they don't exist)
+            try:
+                cursor.execute("ALTER TABLE conversations ADD COLUMN priority_score REAL DEFAULT 5.0")
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("ALTER TABLE knowledge ADD COLUMN priority_score REAL DEFAULT 5.0")
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("ALTER TABLE patterns ADD COLUMN priority_score REAL DEFAULT 5.0")
+            except sqlite3.OperationalError:
+                pass
+
+            # Create indexes for priority queries
+            try:
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_conversations_priority
+                    ON conversations(priority_score DESC, timestamp DESC)
+                """)
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_knowledge_priority
+                    ON knowledge(priority_score DESC, last_accessed DESC)
+                """)
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("""
+                    CREATE INDEX IF NOT EXISTS idx_patterns_priority
+                    ON patterns(priority_score DESC, last_seen DESC)
+                """)
+            except sqlite3.OperationalError:
+                pass
+
+            # ========================================
+            # SCORE TRACKING - Incremental priority/retention updates
+            # ========================================
+            try:
+                cursor.execute("ALTER TABLE conversations ADD COLUMN scores_changed_at TEXT")
+            except sqlite3.OperationalError:
+                pass
+
+            try:
+                cursor.execute("ALTER TABLE knowledge ADD COLUMN scores_changed_at TEXT")
+            except sqlite3.OperationalError:
+                pass
+
+            # Stamp rows whose score inputs change (local time, same format as Python isoformat)
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_conversations_session
-                ON conversations(session_id, timestamp)
+                CREATE TRIGGER IF NOT EXISTS conversations_scores_changed
+                AFTER UPDATE OF importance, success, times_accessed, last_accessed ON conversations
+                BEGIN
+                    UPDATE conversations
+                    SET scores_changed_at = strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')
+                    WHERE id = new.id;
+                END
             """)
-        except sqlite3.OperationalError:
-            pass
 
-        # Add new columns to knowledge table (if they don't exist)
-        try:
-            cursor.execute("ALTER TABLE knowledge ADD COLUMN extraction_method TEXT DEFAULT 'manual'")
-        except sqlite3.OperationalError:
-            pass
+            cursor.execute("""
+                CREATE TRIGGER IF NOT EXISTS knowledge_scores_changed
+                AFTER UPDATE OF importance, confidence, times_accessed, last_accessed ON knowledge
+                BEGIN
+                    UPDATE knowledge
+                    SET scores_changed_at = strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')
+                    WHERE id = new.id;
+                END
+            """)
 
-        try:
-            cursor.execute("ALTER TABLE knowledge ADD COLUMN verified BOOLEAN DEFAULT 0")
-        except sqlite3.OperationalError:
-            pass
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS score_runs (
+                    score_name TEXT PRIMARY KEY,
+                    last_run TEXT NOT NULL,
+                    last_row_id INTEGER NOT NULL
+                )
+            """)
+
+            # ========================================
+            # SEMANTIC INDEX - Term postings for knowledge ranking
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge_postings (
+                    term TEXT NOT NULL,
+                    knowledge_id INTEGER NOT NULL,
+                    tf INTEGER NOT NULL,
+                    PRIMARY KEY (term, knowledge_id)
+                ) WITHOUT ROWID
+            """)
+
+            # Per-document length plus its distinct terms (so postings can be removed by key)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS knowledge_docs (
+                    knowledge_id INTEGER PRIMARY KEY,
+                    length INTEGER NOT NULL,
+                    terms TEXT NOT NULL
+                )
+            """)
+
+            # Index any knowledge added since the last run (or everything, first time)
+            cursor.execute("SELECT COALESCE(MAX(knowledge_id), 0) FROM knowledge_docs")
+            self._index_knowledge(cursor, "id > ?", (cursor.fetchone()[0],))
+
+            # ========================================
+            # WRITE-BEHIND JOURNAL - Last conversation turn applied from the journal
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS journal_state (
+                    journal TEXT PRIMARY KEY,
+                    applied_seq INTEGER NOT NULL
+                )
+            """)
+
+            # ========================================
+            # SYNC BATCHES - Edge uploads already ingested (exactly-once)
+            # ========================================
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS sync_batches (
+                    batch_key TEXT PRIMARY KEY,
+                    applied_at TEXT NOT NULL,
+                    result TEXT NOT NULL
+                )
+            """)
+
+            # ========================================
+            # CHANGE LOG - Delta sync cursors
+            # ========================================
+            self._init_change_log(cursor)
+
+            # ========================================
+            # FULL-TEXT SEARCH - FTS5 indexes
+            # ========================================
+            self.fts_enabled = self._init_fulltext_index(cursor)
+
+            conn.commit()
+
+    def _init_change_log(self, cursor):
+        """
+        Create the change log that delta sync pages through, kept current by triggers
+
+        Each synced row has at most one entry, moved to a new (higher) seq every
+        time the row changes, so a cursor only ever sees the rows changed after
+        it. Existing databases are backfilled once, when the log is first created.
+        changed_at lets a client that only knows a timestamp find its cursor.
+        """
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'change_log'")
+        existing = cursor.fetchone() is not None
+
+        # row_key has no type affinity so integer and text keys compare as stored
+        cursor.execute("""
+            CREATE TABLE IF NOT EXISTS change_log (
+                seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                table_name TEXT NOT NULL,
+                row_key NOT NULL,
+                op TEXT NOT NULL,
+                key_data TEXT,
+                origin TEXT,
+                changed_at TEXT
+            )
+        """)
 
         try:
-            cursor.execute("ALTER TABLE knowledge ADD COLUMN superseded_by INTEGER")
+            cursor.execute("ALTER TABLE change_log ADD COLUMN changed_at TEXT")
         except sqlite3.OperationalError:
             pass
 
-        # Add priority_score columns to tables (if they don't exist)
-        try:
-            cursor.execute("ALTER TABLE conversations ADD COLUMN priority_score REAL DEFAULT 5.0")
-        except sqlite3.OperationalError:
-            pass
+        cursor.execute("""
+            CREATE UNIQUE INDEX IF NOT EXISTS idx_change_log_row
+            ON change_log(table_name, row_key)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_change_log_changed_at
+            ON change_log(changed_at)
+        """)
+
+        # Natural-key lookups for merge_changes (skills/topics use their primary
+        # key, knowledge idx_knowledge_category_key); timestamps are near-unique,
+        # so conversations and mistakes don't need the long text columns indexed
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_conversations_timestamp
+            ON conversations(timestamp)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_patterns_type_data
+            ON patterns(pattern_type, pattern_data)
+        """)
+        cursor.execute("""
+            CREATE INDEX IF NOT EXISTS idx_mistakes_timestamp
+            ON mistakes(timestamp)
+        """)
+
+        # Local time, same format as Python isoformat (as scores_changed_at)
+        now = "strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')"
+        for table, (pk, natural_key, columns) in self.SYNC_TABLES.items():
+            # Delete + insert rather than OR REPLACE: an outer INSERT OR IGNORE
+            # would override the trigger's conflict clause and drop the change
+            log_row = f"""
+                DELETE FROM change_log WHERE table_name = '{table}' AND row_key = {{row}}.{pk};
+                INSERT INTO change_log (table_name, row_key, op, key_data, changed_at)
+                VALUES ('{table}', {{row}}.{pk}, {{op}}, {{key_data}}, {now});
+            """
+            # Recreated on every start so the definitions follow SYNC_TABLES
+            for event in ("insert", "update", "delete"):
+                cursor.execute(f"DROP TRIGGER IF EXISTS {table}_sync_{event}")
+
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_sync_insert
+                AFTER INSERT ON {table} BEGIN
+                    {log_row.format(row="new", op="'upsert'", key_data="NULL")}
+                END
+            """)
+            # Access counters and scores are local bookkeeping, not sync changes;
+            # rewrites that leave every synced column as it was (consolidation
+            # re-setting hot rows) are not changes either
+            changed = " OR ".join(f"old.{col} IS NOT new.{col}" for col in columns)
+            cursor.execute(f"""
+                CREATE TRIGGER IF NOT EXISTS {table}_sync_update
+                AFTER UPDATE OF {", ".join(columns)} ON {table}
+                WHEN {changed} BEGIN
+                    {log_row.format(row="new", op="'upsert'", key_data="NULL")}
+                END
+            """)
+            # Conversation deletes are archival, which stays local to each brain
+            if table != "conversations":
+                key_json = ", ".join(f"'{col}', old.{col}" for col in natural_key)
+                cursor.execute(f"""
+                    CREATE TRIGGER IF NOT EXISTS {table}_sync_delete
+                    AFTER DELETE ON {table} BEGIN
+                        {log_row.format(row="old", op="'delete'", key_data=f"json_object({key_json})")}
+                    END
+                """)
+
+        if not existing:
+            for table, (pk, _, _) in self.SYNC_TABLES.items():
+                cursor.execute(f"""
+                    INSERT INTO change_log (table_name, row_key, op, changed_at)
+                    SELECT '{table}', {pk}, 'upsert', {now} FROM {table}
+                """)
 
-        try:
-            cursor.execute("ALTER TABLE knowledge ADD COLUMN priority_score REAL DEFAULT 5.0")
-        except sqlite3.OperationalError:
-            pass
+    def _init_fulltext_index(self, cursor) -> bool:
+        """
+        Create FTS5 indexes over conversations and knowledge, kept in sync by triggers
 
-        try:
-            cursor.execute("ALTER TABLE patterns ADD COLUMN priority_score REAL DEFAULT 5.0")
-        except sqlite3.OperationalError:
-            pass
+        Existing databases are backfilled once, when the index is first created.
 
-        # Create indexes for priority queries
-        try:
-            cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_conversations_priority
-                ON conversations(priority_score DESC, timestamp DESC)
-            """)
-        except sqlite3.OperationalError:
-            pass
+        Returns:
+            True if FTS5 is available, False to fall back to LIKE scans
+        """
+        cursor.execute("""
+            SELECT name FROM sqlite_master
+            WHERE type = 'table' AND name IN ('conversations_fts', 'knowledge_fts')
+        """)
+        existing = {row[0] for row in cursor.fetchall()}
 
         try:
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_knowledge_priority
-                ON knowledge(priority_score DESC, last_accessed DESC)
+                CREATE VIRTUAL TABLE IF NOT EXISTS conversations_fts USING fts5(
+                    user_input, alfred_response,
+                    content='conversations', content_rowid='id',
+                    tokenize='porter unicode61'
+                )
             """)
-        except sqlite3.OperationalError:
-            pass
-
-        try:
             cursor.execute("""
-                CREATE INDEX IF NOT EXISTS idx_patterns_priority
-                ON patterns(priority_score DESC, last_seen DESC)
+                CREATE VIRTUAL TABLE IF NOT EXISTS knowledge_fts USING fts5(
+                    category, key, value,
+                    content='knowledge', content_rowid='id',
+                    tokenize='porter unicode61'
+                )
             """)
         except sqlite3.OperationalError:
-            pass
-
-        conn.commit()
-        conn.close()
+            return False  # SQLite built without FTS5
 
-    def load_caches(self):
-        """Load frequently accessed data into memory"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Load recent conversations into context cache
+        # Conversations: only re-index when the text columns change
         cursor.execute("""
-            SELECT user_input, alfred_response, topics, timestamp
-            FROM conversations
-            ORDER BY id DESC
-            LIMIT 50
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_insert
+            AFTER INSERT ON conversations BEGIN
+                INSERT INTO conversations_fts(rowid, user_input, alfred_response)
+                VALUES (new.id, new.user_input, new.alfred_response);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_delete
+            AFTER DELETE ON conversations BEGIN
+                INSERT INTO conversations_fts(conversations_fts, rowid, user_input, alfred_response)
+                VALUES ('delete', old.id, old.user_input, old.alfred_response);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS conversations_fts_update
+            AFTER UPDATE OF user_input, alfred_response ON conversations BEGIN
+                INSERT INTO conversations_fts(conversations_fts, rowid, user_input, alfred_response)
+                VALUES ('delete', old.id, old.user_input, old.alfred_response);
+                INSERT INTO conversations_fts(rowid, user_input, alfred_response)
+                VALUES (new.id, new.user_input, new.alfred_response);
+            END
         """)
 
-        self.context_cache = [
-            {"user": row[0], "alfred": row[1], "topics": row[2], "timestamp": row[3]}
-            for row in cursor.fetchall()
-        ]
-
-        # Load high-importance knowledge
+        # Knowledge: access-count and score updates don't touch the index
         cursor.execute("""
-            SELECT category, key, value
-            FROM knowledge
-            WHERE importance >= 7
-            ORDER BY importance DESC, times_accessed DESC
-            LIMIT 100
+            CREATE TRIGGER IF NOT EXISTS knowledge_fts_insert
+            AFTER INSERT ON knowledge BEGIN
+                INSERT INTO knowledge_fts(rowid, category, key, value)
+                VALUES (new.id, new.category, new.key, new.value);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS knowledge_fts_delete
+            AFTER DELETE ON knowledge BEGIN
+                INSERT INTO knowledge_fts(knowledge_fts, rowid, category, key, value)
+                VALUES ('delete', old.id, old.category, old.key, old.value);
+            END
+        """)
+        cursor.execute("""
+            CREATE TRIGGER IF NOT EXISTS knowledge_fts_update
+            AFTER UPDATE OF category, key, value ON knowledge BEGIN
+                INSERT INTO knowledge_fts(knowledge_fts, rowid, category, key, value)
+                VALUES ('delete', old.id, old.category, old.key, old.value);
+                INSERT INTO knowledge_fts(rowid, category, key, value)
+                VALUES (new.id, new.category, new.key, new.value);
+            END
         """)
 
-        for row in cursor.fetchall():
-            cat_key = f"{row[0]}:{row[1]}"
-            self.knowledge_cache[cat_key] = row[2]
+        # One-shot backfill for databases that predate the index
+        if 'conversations_fts' not in existing:
+            cursor.execute("INSERT INTO conversations_fts(conversations_fts) VALUES ('rebuild')")
+        if 'knowledge_fts' not in existing:
+            cursor.execute("INSERT INTO knowledge_fts(knowledge_fts) VALUES ('rebuild')")
+
+        return True
+
+    @staticmethod
+    def _fts_query(query: str) -> Optional[str]:
+        """Convert free text into a safe FTS5 MATCH expression (all terms, quoted)"""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return None
+        return " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+
+    def load_caches(self):
+        """Load frequently accessed data into memory"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+
+            # Load recent conversations into context cache
+            cursor.execute("""
+                SELECT user_input, alfred_response, topics, timestamp
+                FROM conversations
+                ORDER BY id DESC
+                LIMIT 50
+            """)
+
+            self.context_cache = [
+                {"user": row[0], "alfred": row[1], "topics": row[2], "timestamp": row[3]}
+                for row in cursor.fetchall()
+            ]
+
+            # Load high-importance knowledge
+            cursor.execute("""
+                SELECT category, key, value
+                FROM knowledge
+                WHERE importance >= 7
+                ORDER BY importance DESC, times_accessed DESC
+                LIMIT 100
+            """)
 
-        conn.close()
+            for row in cursor.fetchall():
+                cat_key = f"{row[0]}:{row[1]}"
+                self.knowledge_cache[cat_key] = row[2]
 
     # ============================================================================
     # CONVERSATION MEMORY
     # ============================================================================
 
-    def _get_or_create_session(self, cursor) -> int:
+    def _get_or_create_session(self, cursor, now: Optional[datetime] = None) -> int:
         """Get current session or create new one based on 30-minute time gap"""
+        now = now or datetime.now()
+
         # Get most recent conversation
         cursor.execute("""
             SELECT id, timestamp, session_id
@@ -630,7 +1017,7 @@ class AlfredBrain:
 
         if row:
             last_conv_time = datetime.fromisoformat(row[1])
-            time_gap = (datetime.now() - last_conv_time).total_seconds() / 60
+            time_gap = (now - last_conv_time).total_seconds() / 60
 
             # If within 30 minutes, continue current session
             if time_gap < 30 and row[2]:
@@ -640,14 +1027,14 @@ class AlfredBrain:
                 cursor.execute("""
                     INSERT INTO conversation_sessions (session_name, start_time)
                     VALUES (?, ?)
-                """, (None, datetime.now().isoformat()))
+                """, (None, now.isoformat()))
                 return cursor.lastrowid
         else:
             # First conversation ever - create session
             cursor.execute("""
                 INSERT INTO conversation_sessions (session_name, start_time)
                 VALUES (?, ?)
-            """, (None, datetime.now().isoformat()))
+            """, (None, now.isoformat()))
             return cursor.lastrowid
 
     def store_conversation(
@@ -675,12 +1062,60 @@ class AlfredBrain:
             importance: 1-10 scale
             success: Whether interaction was successful
             execution_time: Time taken to respond
+
+        Returns:
+            Conversation ID, or None when queued on the write-behind journal
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        now = datetime.now().isoformat()
+        entry = {
+            "timestamp": now,
+            "user_input": user_input,
+            "alfred_response": alfred_response,
+            "context": context,
+            "models_used": models_used,
+            "topics": topics,
+            "sentiment": sentiment,
+            "importance": importance,
+            "success": success,
+            "execution_time": execution_time,
+        }
+
+        if self.journal:
+            self.journal.append(entry)
+            conv_id = None
+        else:
+            with self._connect() as conn:
+                cursor = conn.cursor()
+
+                conv_id = self._insert_conversation(cursor, entry)
+
+                # Auto-extract and store knowledge
+                if self._extraction_executor:
+                    self._extraction_executor.submit(self._extract_in_background, user_input, alfred_response)
+                else:
+                    self._auto_extract_knowledge(cursor, user_input, alfred_response)
+
+                conn.commit()
+
+        # Update context cache
+        self.context_cache.insert(0, {
+            "user": user_input,
+            "alfred": alfred_response,
+            "topics": json.dumps(topics) if topics else None,
+            "timestamp": now
+        })
+        self.context_cache = self.context_cache[:50]  # Keep last 50
+
+        return conv_id
+
+    def _insert_conversation(self, cursor, entry: Dict) -> int:
+        """Insert one conversation turn (session detection + topic tracking)"""
+        timestamp = entry["timestamp"]
+        importance = entry.get("importance", 5)
+        topics = entry.get("topics")
 
         # Get or create session (30-minute gap detection)
-        session_id = self._get_or_create_session(cursor)
+        session_id = self._get_or_create_session(cursor, datetime.fromisoformat(timestamp))
 
         # Calculate initial priority score
         initial_priority = importance * 0.5  # Scale to 0-5 range
@@ -691,18 +1126,18 @@ class AlfredBrain:
              sentiment, importance, success, execution_time, retention_score, last_accessed, priority_score, session_id)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
         """, (
-            datetime.now().isoformat(),
-            user_input,
-            alfred_response,
-            json.dumps(context) if context else None,
-            json.dumps(models_used) if models_used else None,
+            timestamp,
+            entry["user_input"],
+            entry["alfred_response"],
+            json.dumps(entry["context"]) if entry.get("context") else None,
+            json.dumps(entry["models_used"]) if entry.get("models_used") else None,
             json.dumps(topics) if topics else None,
-            sentiment,
+            entry.get("sentiment", "neutral"),
             importance,
-            success,
-            execution_time,
+            entry.get("success", True),
+            entry.get("execution_time", 0.0),
             1.0,  # Initial retention_score
-            datetime.now().isoformat(),  # last_accessed
+            timestamp,  # last_accessed
             initial_priority,  # priority_score
             session_id  # session_id
         ))
@@ -714,50 +1149,443 @@ class AlfredBrain:
             for topic in topics:
                 self._update_topic(cursor, topic)
 
-        # Auto-extract and store knowledge
-        self._auto_extract_knowledge(cursor, user_input, alfred_response)
+        return conv_id
 
-        conn.commit()
-        conn.close()
+    def _journal_applied_seq(self) -> int:
+        """Highest journal sequence number already stored in the database"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT applied_seq FROM journal_state WHERE journal = 'conversations'")
+            row = cursor.fetchone()
+        return row[0] if row else 0
 
-        # Update context cache
-        self.context_cache.insert(0, {
-            "user": user_input,
-            "alfred": alfred_response,
-            "topics": json.dumps(topics) if topics else None,
-            "timestamp": datetime.now().isoformat()
-        })
-        self.context_cache = self.context_cache[:50]  # Keep last 50
+    def _apply_journal_batch(self, entries: List[Dict]):
+        """Store a batch of journaled turns in one transaction (journal writer thread)"""
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            for entry in entries:
+                self._insert_conversation(cursor, entry)
+                self._auto_extract_knowledge(cursor, entry["user_input"], entry["alfred_response"])
 
-        return conv_id
+            # Recorded atomically with the batch so replay never stores a turn twice
+            cursor.execute("""
+                INSERT OR REPLACE INTO journal_state (journal, applied_seq)
+                VALUES ('conversations', ?)
+            """, (entries[-1]["seq"],))
 
-    def get_conversation_context(self, limit: int = 10) -> List[Dict]:
-        """Get recent conversation context and update access tracking"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+            conn.commit()
+        finally:
+            conn.close()
 
-        # Get IDs of recent conversations
-        cursor.execute("""
-            SELECT id FROM conversations
-            ORDER BY id DESC
-            LIMIT ?
-        """, (limit,))
+    def ingest_batch(
+        self,
+        conversations: List[Dict],
+        knowledge: List[Dict],
+        batch_key: Optional[str] = None,
+        item_ids: Optional[List[str]] = None,
+        origin: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Store a synced batch of conversations and knowledge in one transaction
+
+        Knowledge whose latest stored value is identical is skipped; a
+        differing value only replaces one of higher importance. Rows stored
+        here are tagged with origin, as in merge_changes, so delta sync does
+        not send an upload back to the device it came from.
+
+        Args:
+            conversations: Entries shaped like store_conversation's arguments
+            knowledge: Dicts with category, key, value (source, confidence, importance optional)
+            batch_key: Upload identifier; a batch already ingested under it is
+                       not applied again and its original result is returned
+            item_ids: Edge item IDs acknowledged with this batch (kept in the result)
+            origin: Where the batch came from (e.g. a device ID)
+
+        Returns:
+            Counts of stored rows, duplicates skipped and conflicts
+        """
+        now = datetime.now().isoformat()
+        result = {
+            "conversations_uploaded": 0,
+            "knowledge_uploaded": 0,
+            "duplicates": 0,
+            "conflicts": []
+        }
+        if item_ids is not None:
+            result["item_ids"] = list(item_ids)
+
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            head = self._begin_logged_write(conn)
+
+            if batch_key:
+                cursor.execute("SELECT result FROM sync_batches WHERE batch_key = ?", (batch_key,))
+                row = cursor.fetchone()
+                if row:
+                    conn.rollback()
+                    return dict(json.loads(row[0]), duplicate=True)
+
+            for conv in conversations:
+                entry = dict(conv)
+                entry.setdefault("timestamp", now)
+                self._insert_conversation(cursor, entry)
+                self._auto_extract_knowledge(cursor, entry["user_input"], entry["alfred_response"])
+                result["conversations_uploaded"] += 1
+
+            rows = []
+            latest = {}  # (category, key) -> (value, importance), including rows added by this batch
+            for item in knowledge:
+                cat_key = (item["category"], item["key"])
+                if cat_key not in latest:
+                    cursor.execute("""
+                        SELECT value, importance FROM knowledge
+                        WHERE category = ? AND key = ?
+                        ORDER BY timestamp DESC
+                        LIMIT 1
+                    """, cat_key)
+                    latest[cat_key] = cursor.fetchone()
+                existing = latest[cat_key]
+
+                importance = item.get("importance", 5)
+                if existing and existing[0] == item["value"]:
+                    result["duplicates"] += 1
+                    continue
+                if existing and existing[1] > importance:
+                    result["conflicts"].append({
+                        "type": "knowledge",
+                        "category": item["category"],
+                        "key": item["key"],
+                        "reason": "existing knowledge has higher importance",
+                        "existing_importance": existing[1],
+                        "new_importance": importance
+                    })
+                    continue
+
+                confidence = item.get("confidence", 1.0)
+                rows.append((
+                    now, item["category"], item["key"], item["value"], item.get("source", "sync"),
+                    confidence, importance, now, (importance * 0.5) + (confidence * 2.5)
+                ))
+                latest[cat_key] = (item["value"], importance)
+
+            if rows:
+                cursor.execute("SELECT COALESCE(MAX(id), 0) FROM knowledge")
+                last_knowledge_id = cursor.fetchone()[0]
+                cursor.executemany("""
+                    INSERT INTO knowledge
+                    (timestamp, category, key, value, source, confidence, importance, last_accessed, priority_score)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                """, rows)
+                self._index_knowledge(cursor, "id > ?", (last_knowledge_id,))
+                result["knowledge_uploaded"] = len(rows)
+
+            # Recorded atomically with the rows so a retried upload is never applied twice
+            if batch_key:
+                cursor.execute("""
+                    INSERT INTO sync_batches (batch_key, applied_at, result)
+                    VALUES (?, ?, ?)
+                """, (batch_key, now, json.dumps(result)))
+
+            # Everything logged by this transaction came from the upload
+            self._tag_origin(cursor, origin, head)
+
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        for row in rows:
+            if row[6] >= 7:
+                self.knowledge_cache[f"{row[1]}:{row[2]}"] = row[3]
+
+        return result
+
+    def get_sync_batch(self, batch_key: str) -> Optional[Dict[str, Any]]:
+        """Result recorded for an already ingested sync batch (None if not ingested)"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT result FROM sync_batches WHERE batch_key = ?", (batch_key,))
+            row = cursor.fetchone()
+        return json.loads(row[0]) if row else None
+
+    # ==================== DELTA SYNC ====================
+
+    def get_change_cursor(self, since: Optional[str] = None) -> int:
+        """
+        Change log cursor
+
+        Args:
+            since: ISO 8601 time; returns the cursor just before the first
+                   change after it (None: the latest cursor, fully up to date)
+
+        Returns:
+            Sequence number to pass to get_changes
+        """
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log")
+            seq = cursor.fetchone()[0]
+            if since is not None:
+                # changed_at has millisecond precision: include that whole
+                # millisecond (re-sending a change is harmless, merges are idempotent)
+                cursor.execute("SELECT MIN(seq) FROM change_log WHERE changed_at >= ?", (since[:23],))
+                first = cursor.fetchone()[0]
+                seq = first - 1 if first is not None else seq
+        return seq
+
+    def get_changes(
+        self,
+        since: int = 0,
+        limit: int = 500,
+        tables: Optional[List[str]] = None,
+        exclude_origin: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        Page through rows changed after a change log cursor
+
+        Only rows that changed are read, so the cost of a sync follows the
+        number of changes rather than the size of the tables. A row changed
+        several times since the cursor is returned once, in its latest state.
+
+        Args:
+            since: Cursor from a previous page (0 for everything)
+            limit: Max changes per page
+            tables: Restrict to these sync tables (default: all of SYNC_TABLES)
+            exclude_origin: Skip changes merged from this origin (no echo back)
+
+        Returns:
+            {"changes": {table: [rows]}, "deletes": {table: [natural keys]},
+             "next_cursor": cursor for the next page, "has_more": bool}
+        """
+        since = since or 0
+        tables = [t for t in (tables or self.SYNC_TABLES) if t in self.SYNC_TABLES]
+        page = {
+            "changes": {table: [] for table in tables},
+            "deletes": {table: [] for table in tables},
+            "next_cursor": since,
+            "has_more": False
+        }
+        if not tables:
+            return page
+
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        conv_ids = [row[0] for row in cursor.fetchall()]
+            # Bound the page by the current head so changes committed meanwhile
+            # are left for the next call instead of being skipped
+            cursor.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log")
+            head = cursor.fetchone()[0]
+
+            where = f"seq > ? AND seq <= ? AND table_name IN ({','.join('?' * len(tables))})"
+            params = [since, head, *tables]
+            if exclude_origin is not None:
+                where += " AND origin IS NOT ?"
+                params.append(exclude_origin)
 
-        # Update access tracking for these conversations
-        if conv_ids:
-            placeholders = ','.join('?' * len(conv_ids))
             cursor.execute(f"""
-                UPDATE conversations
-                SET times_accessed = times_accessed + 1,
-                    last_accessed = ?
-                WHERE id IN ({placeholders})
-            """, [datetime.now().isoformat()] + conv_ids)
+                SELECT seq, table_name, row_key, op, key_data
+                FROM change_log
+                WHERE {where}
+                ORDER BY seq
+                LIMIT ?
+            """, (*params, limit + 1))
+            entries = cursor.fetchall()
+
+            page["has_more"] = len(entries) > limit
+            entries = entries[:limit]
+            page["next_cursor"] = entries[-1][0] if page["has_more"] else max(head, since)
+
+            upserts = defaultdict(list)
+            for _, table, row_key, op, key_data in entries:
+                if op == "delete":
+                    page["deletes"][table].append(json.loads(key_data))
+                else:
+                    upserts[table].append(row_key)
+
+            for table, row_keys in upserts.items():
+                pk, _, columns = self.SYNC_TABLES[table]
+                rows = {}
+                # Chunk to stay under SQLite's bound-parameter limit
+                for i in range(0, len(row_keys), 500):
+                    chunk = row_keys[i:i + 500]
+                    cursor.execute(f"""
+                        SELECT {pk}, {", ".join(columns)}
+                        FROM {table}
+                        WHERE {pk} IN ({','.join('?' * len(chunk))})
+                    """, chunk)
+                    for row in cursor.fetchall():
+                        rows[row[0]] = dict(zip(columns, row[1:]))
+                # Log order; rows deleted without a tombstone (archived) are gone
+                page["changes"][table] = [rows[key] for key in row_keys if key in rows]
+        return page
+
+    @staticmethod
+    def _begin_logged_write(conn) -> int:
+        """
+        Start a write transaction and return the change-log head it starts from
+
+        BEGIN IMMEDIATE takes the write lock up front, so no other connection
+        (e.g. the journal writer) can log changes between reading the head
+        and the end of this transaction: every row logged above the head is
+        this transaction's own.
+        """
+        if not conn.in_transaction:
+            conn.execute("BEGIN IMMEDIATE")
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM change_log").fetchone()[0]
+
+    @staticmethod
+    def _tag_origin(cursor, origin: Optional[str], head: int):
+        """Tag the change-log rows written since head with where they came from"""
+        if origin is not None:
+            cursor.execute("UPDATE change_log SET origin = ? WHERE seq > ?", (origin, head))
+
+    def merge_changes(
+        self,
+        changes: Dict[str, List[Dict]],
+        deletes: Optional[Dict[str, List[Dict]]] = None,
+        origin: Optional[str] = None
+    ) -> Dict[str, int]:
+        """
+        Merge a page of changes from another brain in one transaction
+
+        Rows are matched on their natural key, so merging the same page twice
+        (e.g. after a lost acknowledgement) changes nothing. Identical rows
+        are skipped; for patterns, skills and topics a row only replaces a
+        local one that is not newer. Changes applied here are tagged with
+        origin so they are not sent back to where they came from.
+
+        Args:
+            changes: {table: [rows]} as returned by get_changes
+            deletes: {table: [natural keys]} as returned by get_changes
+            origin: Where the changes came from (e.g. a device ID)
+
+        Returns:
+            Rows merged per table, plus "deleted" and "unchanged" counts
+        """
+        merged = {table: 0 for table in self.SYNC_TABLES}
+        merged["deleted"] = 0
+        merged["unchanged"] = 0
+        knowledge_updated = []
+
+        conn = self._connect()
+        try:
+            cursor = conn.cursor()
+            head = self._begin_logged_write(conn)
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM knowledge")
+            last_knowledge_id = cursor.fetchone()[0]
+
+            for table, keys in (deletes or {}).items():
+                if table not in self.SYNC_TABLES or table == "conversations":
+                    continue
+                _, natural_key, _ = self.SYNC_TABLES[table]
+                match = " AND ".join(f"{col} = ?" for col in natural_key)
+                for key in keys:
+                    params = tuple(key.get(col) for col in natural_key)
+                    if table == "knowledge":
+                        cursor.execute(f"SELECT id FROM knowledge WHERE {match}", params)
+                        self._unindex_knowledge(cursor, [row[0] for row in cursor.fetchall()])
+                    cursor.execute(f"DELETE FROM {table} WHERE {match}", params)
+                    merged["deleted"] += cursor.rowcount
+
+            for table, rows in changes.items():
+                if table not in self.SYNC_TABLES:
+                    continue
+                pk, natural_key, columns = self.SYNC_TABLES[table]
+                version = self.SYNC_VERSION_COLUMNS.get(table)
+                match = " AND ".join(f"{col} = ?" for col in natural_key)
+
+                for row in rows:
+                    values = tuple(row.get(col) for col in columns)
+                    cursor.execute(f"""
+                        SELECT {pk}, {", ".join(columns)}
+                        FROM {table}
+                        WHERE {match}
+                        LIMIT 1
+                    """, tuple(row.get(col) for col in natural_key))
+                    existing = cursor.fetchone()
+
+                    if existing is None:
+                        cursor.execute(f"""
+                            INSERT INTO {table} ({", ".join(columns)})
+                            VALUES ({", ".join("?" * len(columns))})
+                        """, values)
+                        merged[table] += 1
+                        continue
+
+                    local = dict(zip(columns, existing[1:]))
+                    stale = version and (row.get(version) or "") < (local[version] or "")
+                    if tuple(existing[1:]) == values or stale:
+                        merged["unchanged"] += 1
+                        continue
+
+                    cursor.execute(f"""
+                        UPDATE {table}
+                        SET {", ".join(f"{col} = ?" for col in columns)}
+                        WHERE {pk} = ?
+                    """, (*values, existing[0]))
+                    merged[table] += 1
+                    if table == "knowledge":
+                        knowledge_updated.append(existing[0])
+
+            self._index_knowledge(cursor, "id > ?", (last_knowledge_id,))
+            for kid in knowledge_updated:
+                self._index_knowledge(cursor, "id = ?", (kid,))
+
+            # Everything logged by this transaction came from the merge
+            self._tag_origin(cursor, origin, head)
 
             conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        return merged
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until queued conversations and background extraction are stored
+
+        Args:
+            timeout: Max seconds to wait for the journal (None waits indefinitely)
+
+        Returns:
+            True if everything queued so far has been written
+        """
+        drained = self.journal.flush(timeout) if self.journal else True
+        self.wait_for_extraction(timeout)
+        return drained
+
+    def get_conversation_context(self, limit: int = 10) -> List[Dict]:
+        """Get recent conversation context and update access tracking"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+
+            # Get IDs of recent conversations
+            cursor.execute("""
+                SELECT id FROM conversations
+                ORDER BY id DESC
+                LIMIT ?
+            """, (limit,))
 
-        conn.close()
+            conv_ids = [row[0] for row in cursor.fetchall()]
+
+            # Update access tracking for these conversations
+            if conv_ids:
+                placeholders = ','.join('?' * len(conv_ids))
+                cursor.execute(f"""
+                    UPDATE conversations
+                    SET times_accessed = times_accessed + 1,
+                        last_accessed = ?
+                    WHERE id IN ({placeholders})
+                """, [datetime.now().isoformat()] + conv_ids)
+
+                conn.commit()
 
         return self.context_cache[:limit]
 
@@ -778,31 +1606,43 @@ class AlfredBrain:
         Returns:
             List of matching conversations
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        query_pattern = f"%{query}%"
+            match = self._fts_query(query) if self.fts_enabled else None
 
-        cursor.execute("""
-            SELECT timestamp, user_input, alfred_response, topics, importance
-            FROM conversations
-            WHERE (user_input LIKE ? OR alfred_response LIKE ?)
-            AND importance >= ?
-            ORDER BY importance DESC, timestamp DESC
-            LIMIT ?
-        """, (query_pattern, query_pattern, min_importance, limit))
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "timestamp": row[0],
-                "user_input": row[1],
-                "alfred_response": row[2],
-                "topics": json.loads(row[3]) if row[3] else [],
-                "importance": row[4]
-            })
+            if match:
+                # BM25 relevance (lower is better) boosted by importance
+                cursor.execute("""
+                    SELECT c.timestamp, c.user_input, c.alfred_response, c.topics, c.importance
+                    FROM conversations_fts
+                    JOIN conversations c ON c.id = conversations_fts.rowid
+                    WHERE conversations_fts MATCH ?
+                    AND c.importance >= ?
+                    ORDER BY bm25(conversations_fts) * (1.0 + c.importance / 10.0), c.timestamp DESC
+                    LIMIT ?
+                """, (match, min_importance, limit))
+            else:
+                query_pattern = f"%{query}%"
+
+                cursor.execute("""
+                    SELECT timestamp, user_input, alfred_response, topics, importance
+                    FROM conversations
+                    WHERE (user_input LIKE ? OR alfred_response LIKE ?)
+                    AND importance >= ?
+                    ORDER BY importance DESC, timestamp DESC
+                    LIMIT ?
+                """, (query_pattern, query_pattern, min_importance, limit))
 
-        conn.close()
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    "timestamp": row[0],
+                    "user_input": row[1],
+                    "alfred_response": row[2],
+                    "topics": json.loads(row[3]) if row[3] else [],
+                    "importance": row[4]
+                })
         return results
 
     # ============================================================================
@@ -829,30 +1669,31 @@ class AlfredBrain:
             confidence: 0.0-1.0 confidence score
             importance: 1-10 importance scale
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Calculate initial priority score
-        initial_priority = (importance * 0.5) + (confidence * 2.5)  # Scale to 0-10
+            # Calculate initial priority score
+            initial_priority = (importance * 0.5) + (confidence * 2.5)  # Scale to 0-10
 
-        cursor.execute("""
-            INSERT INTO knowledge
-            (timestamp, category, key, value, source, confidence, importance, last_accessed, priority_score)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            datetime.now().isoformat(),
-            category,
-            key,
-            value,
-            source,
-            confidence,
-            importance,
-            datetime.now().isoformat(),
-            initial_priority
-        ))
+            cursor.execute("""
+                INSERT INTO knowledge
+                (timestamp, category, key, value, source, confidence, importance, last_accessed, priority_score)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                datetime.now().isoformat(),
+                category,
+                key,
+                value,
+                source,
+                confidence,
+                importance,
+                datetime.now().isoformat(),
+                initial_priority
+            ))
+
+            self._index_knowledge(cursor, "id = ?", (cursor.lastrowid,))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
         # Update cache if high importance
         if importance >= 7:
@@ -875,54 +1716,52 @@ class AlfredBrain:
 
         Returns:
             Knowledge value(s)
-        """
-        # Check cache first
-        if key:
-            cat_key = f"{category}:{key}"
-            if cat_key in self.knowledge_cache:
-                self._increment_access_count(category, key)
-                return self.knowledge_cache[cat_key]
-
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        if key:
-            cursor.execute("""
-                SELECT value, confidence, times_accessed
-                FROM knowledge
-                WHERE category = ? AND key = ? AND confidence >= ?
-                ORDER BY timestamp DESC
-                LIMIT 1
-            """, (category, key, min_confidence))
-
-            row = cursor.fetchone()
-            if row:
-                # Update access count
-                cursor.execute("""
-                    UPDATE knowledge
-                    SET times_accessed = ?, last_accessed = ?
-                    WHERE category = ? AND key = ?
-                """, (row[2] + 1, datetime.now().isoformat(), category, key))
-                conn.commit()
-
-                result = row[0]
-            else:
-                result = None
-        else:
-            # Get all knowledge in category
-            cursor.execute("""
-                SELECT key, value, confidence
-                FROM knowledge
-                WHERE category = ? AND confidence >= ?
-                ORDER BY importance DESC, times_accessed DESC
-            """, (category, min_confidence))
+        """
+        # Check cache first
+        if key:
+            cat_key = f"{category}:{key}"
+            if cat_key in self.knowledge_cache:
+                self._increment_access_count(category, key)
+                return self.knowledge_cache[cat_key]
 
-            result = {
-                row[0]: row[1]
-                for row in cursor.fetchall()
-            }
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        conn.close()
+            if key:
+                cursor.execute("""
+                    SELECT value, confidence, times_accessed
+                    FROM knowledge
+                    WHERE category = ? AND key = ? AND confidence >= ?
+                    ORDER BY timestamp DESC
+                    LIMIT 1
+                """, (category, key, min_confidence))
+
+                row = cursor.fetchone()
+                if row:
+                    # Update access count
+                    cursor.execute("""
+                        UPDATE knowledge
+                        SET times_accessed = ?, last_accessed = ?
+                        WHERE category = ? AND key = ?
+                    """, (row[2] + 1, datetime.now().isoformat(), category, key))
+                    conn.commit()
+
+                    result = row[0]
+                else:
+                    result = None
+            else:
+                # Get all knowledge in category
+                cursor.execute("""
+                    SELECT key, value, confidence
+                    FROM knowledge
+                    WHERE category = ? AND confidence >= ?
+                    ORDER BY importance DESC, times_accessed DESC
+                """, (category, min_confidence))
+
+                result = {
+                    row[0]: row[1]
+                    for row in cursor.fetchall()
+                }
         return result
 
 
@@ -945,140 +1784,237 @@ class AlfredBrain:
         Returns:
             List of knowledge dictionaries with all fields
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        if category:
-            cursor.execute("""
-                SELECT id, category, key, value, source, confidence,
-                       times_accessed, last_accessed, importance, timestamp
-                FROM knowledge
-                WHERE category = ?
-                  AND confidence >= ?
-                  AND importance >= ?
-                  AND superseded_by IS NULL
-                ORDER BY importance DESC, confidence DESC, times_accessed DESC
-                LIMIT ?
-            """, (category, min_confidence, min_importance, limit))
-        else:
-            cursor.execute("""
-                SELECT id, category, key, value, source, confidence,
-                       times_accessed, last_accessed, importance, timestamp
-                FROM knowledge
-                WHERE confidence >= ?
-                  AND importance >= ?
-                  AND superseded_by IS NULL
-                ORDER BY importance DESC, confidence DESC, times_accessed DESC
-                LIMIT ?
-            """, (min_confidence, min_importance, limit))
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "id": row[0],
-                "category": row[1],
-                "key": row[2],
-                "value": row[3],
-                "source": row[4],
-                "confidence": row[5],
-                "times_accessed": row[6],
-                "last_accessed": row[7],
-                "importance": row[8],
-                "timestamp": row[9]
-            })
-
-        conn.close()
-        return results
-
-    def search_knowledge(self, query: str, limit: int = 10, semantic: bool = True) -> List[Dict]:
-        """Search knowledge base with optional semantic ranking"""
-        if not semantic:
-            # Simple keyword search
-            conn = sqlite3.connect(self.db_path)
+        with self._connect() as conn:
             cursor = conn.cursor()
 
-            query_pattern = f"%{query}%"
-
-            cursor.execute("""
-                SELECT category, key, value, confidence, importance
-                FROM knowledge
-                WHERE key LIKE ? OR value LIKE ?
-                ORDER BY importance DESC, confidence DESC, times_accessed DESC
-                LIMIT ?
-            """, (query_pattern, query_pattern, limit))
+            if category:
+                cursor.execute("""
+                    SELECT id, category, key, value, source, confidence,
+                           times_accessed, last_accessed, importance, timestamp
+                    FROM knowledge
+                    WHERE category = ?
+                      AND confidence >= ?
+                      AND importance >= ?
+                      AND superseded_by IS NULL
+                    ORDER BY importance DESC, confidence DESC, times_accessed DESC
+                    LIMIT ?
+                """, (category, min_confidence, min_importance, limit))
+            else:
+                cursor.execute("""
+                    SELECT id, category, key, value, source, confidence,
+                           times_accessed, last_accessed, importance, timestamp
+                    FROM knowledge
+                    WHERE confidence >= ?
+                      AND importance >= ?
+                      AND superseded_by IS NULL
+                    ORDER BY importance DESC, confidence DESC, times_accessed DESC
+                    LIMIT ?
+                """, (min_confidence, min_importance, limit))
 
             results = []
             for row in cursor.fetchall():
                 results.append({
-                    "category": row[0],
-                    "key": row[1],
-                    "value": row[2],
-                    "confidence": row[3],
-                    "importance": row[4]
+                    "id": row[0],
+                    "category": row[1],
+                    "key": row[2],
+                    "value": row[3],
+                    "source": row[4],
+                    "confidence": row[5],
+                    "times_accessed": row[6],
+                    "last_accessed": row[7],
+                    "importance": row[8],
+                    "timestamp": row[9]
                 })
+        return results
 
-            conn.close()
+    def search_knowledge(self, query: str, limit: int = 10, semantic: bool = True) -> List[Dict]:
+        """Search knowledge base with optional semantic ranking"""
+        if not semantic:
+            # Simple keyword search
+            with self._connect() as conn:
+                cursor = conn.cursor()
+
+                match = self._fts_query(query) if self.fts_enabled else None
+
+                if match:
+                    # BM25 relevance (lower is better) boosted by importance and confidence
+                    cursor.execute("""
+                        SELECT k.category, k.key, k.value, k.confidence, k.importance
+                        FROM knowledge_fts
+                        JOIN knowledge k ON k.id = knowledge_fts.rowid
+                        WHERE knowledge_fts MATCH ?
+                        ORDER BY bm25(knowledge_fts) * (1.0 + k.importance / 10.0) * (0.5 + k.confidence / 2.0),
+                                 k.times_accessed DESC
+                        LIMIT ?
+                    """, (match, limit))
+                else:
+                    query_pattern = f"%{query}%"
+
+                    cursor.execute("""
+                        SELECT category, key, value, confidence, importance
+                        FROM knowledge
+                        WHERE key LIKE ? OR value LIKE ?
+                        ORDER BY importance DESC, confidence DESC, times_accessed DESC
+                        LIMIT ?
+                    """, (query_pattern, query_pattern, limit))
+
+                results = []
+                for row in cursor.fetchall():
+                    results.append({
+                        "category": row[0],
+                        "key": row[1],
+                        "value": row[2],
+                        "confidence": row[3],
+                        "importance": row[4]
+                    })
             return results
         else:
             # Semantic search with relevance scoring
             return self._search_semantic(query, limit)
 
     def _search_semantic(self, query: str, limit: int = 10) -> List[Dict]:
-        """Semantic search with relevance ranking"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        query_terms = query.lower().split()
+        """Semantic search with relevance ranking (touches only matching postings)"""
+        import heapq
+        import math
 
-        # Get all knowledge items
-        cursor.execute("""
-            SELECT id, category, key, value, importance, confidence, times_accessed
-            FROM knowledge
-        """)
+        query_terms = sorted(set(self._tokenize(query)))
+        if not query_terms:
+            return []
 
-        results_with_scores = []
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        for row in cursor.fetchall():
-            kid, category, key, value, importance, confidence, times_accessed = row
+            # Sum term frequencies per matching document
+            placeholders = ','.join('?' * len(query_terms))
+            cursor.execute(f"""
+                SELECT p.knowledge_id, SUM(p.tf), d.length,
+                       k.importance, k.confidence, k.times_accessed
+                FROM knowledge_postings p
+                JOIN knowledge_docs d ON d.knowledge_id = p.knowledge_id
+                JOIN knowledge k ON k.id = p.knowledge_id
+                WHERE p.term IN ({placeholders})
+                GROUP BY p.knowledge_id
+            """, query_terms)
+
+            log_50 = math.log(50)
+            scored = []
+
+            for kid, tf, doc_length, importance, confidence, times_accessed in cursor.fetchall():
+                # Normalize by document length
+                tf_score = tf / max(doc_length, 1)
+
+                # Combine with other signals
+                access_score = min(1.0, math.log((times_accessed or 0) + 1) / log_50)
+
+                relevance_score = (
+                    0.5 * tf_score * 10 +  # TF score (scaled)
+                    0.2 * (importance / 10.0) * 10 +
+                    0.15 * confidence * 10 +
+                    0.15 * access_score * 10
+                )
+
+                if relevance_score > 0.1:  # Minimum threshold
+                    scored.append((relevance_score, kid, importance, confidence))
+
+            top = heapq.nlargest(limit, scored)
+
+            # Fetch text only for the winners
+            texts = {}
+            if top:
+                id_placeholders = ','.join('?' * len(top))
+                cursor.execute(f"""
+                    SELECT id, category, key, value
+                    FROM knowledge
+                    WHERE id IN ({id_placeholders})
+                """, [item[1] for item in top])
+                texts = {row[0]: row[1:] for row in cursor.fetchall()}
 
-            # Calculate relevance score
-            doc = f"{category} {key} {value}".lower()
+        results_with_scores = []
+        for relevance_score, kid, importance, confidence in top:
+            category, key, value = texts[kid]
+            results_with_scores.append({
+                'id': kid,
+                'category': category,
+                'key': key,
+                'value': value,
+                'importance': importance,
+                'confidence': confidence,
+                'relevance_score': relevance_score
+            })
 
-            # Term frequency scoring
-            tf_score = sum(doc.count(term) for term in query_terms)
+        return results_with_scores
 
-            # Normalize by document length
-            doc_length = len(doc.split())
-            tf_score = tf_score / max(doc_length, 1)
+    @staticmethod
+    def _tokenize(text: str) -> List[str]:
+        """Lower-cased word tokens used by the semantic index"""
+        return re.findall(r"\w+", text.lower())
 
-            # Combine with other signals
-            import math
-            access_score = min(1.0, math.log(times_accessed + 1) / math.log(50))
+    def _index_knowledge(self, cursor, where: str, params: tuple = ()) -> int:
+        """
+        (Re)build semantic index postings for the knowledge rows matching a WHERE clause
 
-            relevance_score = (
-                0.5 * tf_score * 10 +  # TF score (scaled)
-                0.2 * (importance / 10.0) * 10 +
-                0.15 * confidence * 10 +
-                0.15 * access_score * 10
-            )
+        Args:
+            cursor: Open database cursor (caller commits)
+            where: SQL condition on the knowledge table, e.g. "id = ?"
+            params: Parameters for the condition
 
-            if relevance_score > 0.1:  # Minimum threshold
-                results_with_scores.append({
-                    'id': kid,
-                    'category': category,
-                    'key': key,
-                    'value': value,
-                    'importance': importance,
-                    'confidence': confidence,
-                    'relevance_score': relevance_score
-                })
+        Returns:
+            Number of knowledge rows indexed
+        """
+        cursor.execute(f"""
+            SELECT id, category, key, value
+            FROM knowledge
+            WHERE {where}
+        """, params)
+        rows = cursor.fetchall()
+        if not rows:
+            return 0
+
+        self._unindex_knowledge(cursor, [row[0] for row in rows])
+
+        postings = []
+        docs = []
+        for kid, category, key, value in rows:
+            terms = self._tokenize(f"{category} {key} {value}")
+            term_counts = Counter(terms)
+            docs.append((kid, len(terms), " ".join(term_counts)))
+            postings.extend((term, kid, tf) for term, tf in term_counts.items())
+
+        postings.sort()  # Insert in primary-key order for B-tree locality
+        cursor.executemany("""
+            INSERT INTO knowledge_postings (term, knowledge_id, tf)
+            VALUES (?, ?, ?)
+        """, postings)
+        cursor.executemany("""
+            INSERT INTO knowledge_docs (knowledge_id, length, terms)
+            VALUES (?, ?, ?)
+        """, docs)
 
-        conn.close()
+        return len(rows)
 
-        # Sort by relevance score
-        results_with_scores.sort(key=lambda x: x['relevance_score'], reverse=True)
+    def _unindex_knowledge(self, cursor, knowledge_ids: List[int]):
+        """Drop semantic index postings for the given knowledge IDs"""
+        # Chunk to stay under SQLite's bound-parameter limit
+        for i in range(0, len(knowledge_ids), 500):
+            chunk = knowledge_ids[i:i + 500]
+            placeholders = ','.join('?' * len(chunk))
+            cursor.execute(f"""
+                SELECT knowledge_id, terms
+                FROM knowledge_docs
+                WHERE knowledge_id IN ({placeholders})
+            """, chunk)
+            indexed = cursor.fetchall()
+            if not indexed:
+                continue
 
-        return results_with_scores[:limit]
+            cursor.executemany("""
+                DELETE FROM knowledge_postings
+                WHERE term = ? AND knowledge_id = ?
+            """, [(term, kid) for kid, terms in indexed for term in terms.split()])
+            cursor.executemany("""
+                DELETE FROM knowledge_docs
+                WHERE knowledge_id = ?
+            """, [(kid,) for kid, _ in indexed])
 
     def levenshtein_distance(self, s1: str, s2: str) -> int:
         """Calculate edit distance between two strings"""
@@ -1150,50 +2086,90 @@ class AlfredBrain:
         Returns:
             List of (id1, id2, similarity_score) tuples
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Get all knowledge items
-        cursor.execute("""
-            SELECT id, category, key, value, confidence
-            FROM knowledge
-            ORDER BY category, key
-        """)
+            # Get all knowledge items
+            cursor.execute("""
+                SELECT id, category, key, value, confidence
+                FROM knowledge
+                ORDER BY category, key
+            """)
 
-        items = []
-        for row in cursor.fetchall():
-            items.append({
-                'id': row[0],
-                'category': row[1],
-                'key': row[2],
-                'value': row[3],
-                'confidence': row[4]
-            })
+            items = []
+            for row in cursor.fetchall():
+                items.append({
+                    'id': row[0],
+                    'category': row[1],
+                    'key': row[2],
+                    'value': row[3],
+                    'confidence': row[4]
+                })
 
-        conn.close()
+        # Only items in the same category can be duplicates
+        by_category = defaultdict(list)
+        for item in items:
+            by_category[item['category']].append(item)
 
-        # Find similar pairs
         duplicates = []
 
-        for i in range(len(items)):
-            for j in range(i + 1, len(items)):
-                # Only compare items in same category
-                if items[i]['category'] != items[j]['category']:
-                    continue
-
-                similarity = self.calculate_knowledge_similarity(items[i], items[j])
+        for category_items in by_category.values():
+            count = len(category_items)
 
-                if similarity >= similarity_threshold:
+            if count <= self.DEDUP_EXHAUSTIVE_LIMIT:
+                pairs = ((i, j) for i in range(count) for j in range(i + 1, count))
+            else:
+                # Block with MinHash/LSH so only plausible pairs are verified
+                lsh = MinHashLSH()
+                for idx, item in enumerate(category_items):
+                    lsh.add(idx, shingles(f"{item['key']} {item['value']}"))
+                pairs = sorted(lsh.candidate_pairs())
+
+            for i, j in pairs:
+                similarity = self._similarity_at_least(
+                    category_items[i], category_items[j], similarity_threshold
+                )
+
+                if similarity is not None:
                     duplicates.append((
-                        items[i]['id'],
-                        items[j]['id'],
+                        category_items[i]['id'],
+                        category_items[j]['id'],
                         similarity,
-                        items[i],
-                        items[j]
+                        category_items[i],
+                        category_items[j]
                     ))
 
         return duplicates
 
+    def _similarity_at_least(self, k1: Dict, k2: Dict, threshold: float) -> Optional[float]:
+        """
+        calculate_knowledge_similarity with early exit below threshold
+
+        Each field's edit distance is bounded by the most it could be while the
+        weighted total (0.4 * key + 0.3 * value + 0.3) still reaches threshold.
+
+        Returns:
+            Similarity score, or None if it is below threshold
+        """
+        if k1['category'] != k2['category']:
+            return None
+
+        key_similarity = bounded_similarity(
+            k1['key'].lower(), k2['key'].lower(), (threshold - 0.6) / 0.4
+        )
+        if key_similarity is None:
+            return None
+
+        value_similarity = bounded_similarity(
+            str(k1['value']).lower(), str(k2['value']).lower(),
+            (threshold - 0.3 - 0.4 * key_similarity) / 0.3
+        )
+        if value_similarity is None:
+            return None
+
+        similarity = (0.4 * key_similarity) + (0.3 * value_similarity) + 0.3
+        return similarity if similarity >= threshold else None
+
     def merge_knowledge_items(self, primary_id: int, duplicate_ids: List[int],
                               strategy: str = "keep_highest_confidence") -> int:
         """
@@ -1207,84 +2183,86 @@ class AlfredBrain:
         Returns:
             Number of items merged
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Get all items to merge
-        all_ids = [primary_id] + duplicate_ids
-        placeholders = ','.join('?' * len(all_ids))
+            # Get all items to merge
+            all_ids = [primary_id] + duplicate_ids
+            placeholders = ','.join('?' * len(all_ids))
 
-        cursor.execute(f"""
-            SELECT id, value, confidence, timestamp, times_accessed
-            FROM knowledge
-            WHERE id IN ({placeholders})
-        """, all_ids)
-
-        items = cursor.fetchall()
-
-        # Determine final value based on strategy
-        if strategy == "keep_highest_confidence":
-            final_item = max(items, key=lambda x: x[2])  # Max confidence
-        elif strategy == "keep_newest":
-            final_item = max(items, key=lambda x: x[3])  # Max timestamp
-        elif strategy == "combine_values":
-            # Combine unique values (comma-separated)
-            values = [item[1] for item in items]
-            unique_values = list(dict.fromkeys(values))  # Preserve order, remove duplicates
-            combined_value = ", ".join(unique_values)
-            final_item = (primary_id, combined_value, max(items, key=lambda x: x[2])[2],
-                         max(items, key=lambda x: x[3])[3], sum(item[4] for item in items))
-        else:
-            final_item = items[0]
+            cursor.execute(f"""
+                SELECT id, value, confidence, timestamp, times_accessed
+                FROM knowledge
+                WHERE id IN ({placeholders})
+            """, all_ids)
 
-        # Update primary item with merged data
-        cursor.execute("""
-            UPDATE knowledge
-            SET value = ?,
-                confidence = ?,
-                times_accessed = ?,
-                last_accessed = ?
-            WHERE id = ?
-        """, (
-            final_item[1],  # value
-            final_item[2],  # confidence
-            sum(item[4] for item in items),  # sum of times_accessed
-            datetime.now().isoformat(),
-            primary_id
-        ))
+            items = cursor.fetchall()
 
-        # Backup merged items
-        original_values = json.dumps([
-            {"id": item[0], "value": item[1], "confidence": item[2]}
-            for item in items
-        ])
+            # Determine final value based on strategy
+            if strategy == "keep_highest_confidence":
+                final_item = max(items, key=lambda x: x[2])  # Max confidence
+            elif strategy == "keep_newest":
+                final_item = max(items, key=lambda x: x[3])  # Max timestamp
+            elif strategy == "combine_values":
+                # Combine unique values (comma-separated)
+                values = [item[1] for item in items]
+                unique_values = list(dict.fromkeys(values))  # Preserve order, remove duplicates
+                combined_value = ", ".join(unique_values)
+                final_item = (primary_id, combined_value, max(items, key=lambda x: x[2])[2],
+                             max(items, key=lambda x: x[3])[3], sum(item[4] for item in items))
+            else:
+                final_item = items[0]
 
-        cursor.execute("""
-            INSERT INTO knowledge_merges
-            (timestamp, primary_id, merged_ids, merge_strategy, original_values)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            datetime.now().isoformat(),
-            primary_id,
-            json.dumps(duplicate_ids),
-            strategy,
-            original_values
-        ))
+            # Update primary item with merged data
+            cursor.execute("""
+                UPDATE knowledge
+                SET value = ?,
+                    confidence = ?,
+                    times_accessed = ?,
+                    last_accessed = ?
+                WHERE id = ?
+            """, (
+                final_item[1],  # value
+                final_item[2],  # confidence
+                sum(item[4] for item in items),  # sum of times_accessed
+                datetime.now().isoformat(),
+                primary_id
+            ))
+
+            # Backup merged items
+            original_values = json.dumps([
+                {"id": item[0], "value": item[1], "confidence": item[2]}
+                for item in items
+            ])
 
-        # Delete duplicate items
-        if duplicate_ids:
-            dup_placeholders = ','.join('?' * len(duplicate_ids))
-            cursor.execute(f"""
-                DELETE FROM knowledge
-                WHERE id IN ({dup_placeholders})
-            """, duplicate_ids)
+            cursor.execute("""
+                INSERT INTO knowledge_merges
+                (timestamp, primary_id, merged_ids, merge_strategy, original_values)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                datetime.now().isoformat(),
+                primary_id,
+                json.dumps(duplicate_ids),
+                strategy,
+                original_values
+            ))
+
+            # Delete duplicate items
+            if duplicate_ids:
+                dup_placeholders = ','.join('?' * len(duplicate_ids))
+                cursor.execute(f"""
+                    DELETE FROM knowledge
+                    WHERE id IN ({dup_placeholders})
+                """, duplicate_ids)
 
-            deleted_count = cursor.rowcount
-        else:
-            deleted_count = 0
+                deleted_count = cursor.rowcount
+            else:
+                deleted_count = 0
+
+            self._unindex_knowledge(cursor, duplicate_ids)
+            self._index_knowledge(cursor, "id = ?", (primary_id,))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
         return deleted_count
 
@@ -1358,33 +2336,31 @@ class AlfredBrain:
 
         Relationship types: related_to, prerequisite_of, contradicts, supports, part_of
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            INSERT INTO knowledge_relationships
-            (knowledge_id1, knowledge_id2, relationship_type, strength, created_at)
-            VALUES (?, ?, ?, ?, ?)
-        """, (knowledge_id1, knowledge_id2, relationship_type, strength,
-              datetime.now().isoformat()))
+            cursor.execute("""
+                INSERT INTO knowledge_relationships
+                (knowledge_id1, knowledge_id2, relationship_type, strength, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """, (knowledge_id1, knowledge_id2, relationship_type, strength,
+                  datetime.now().isoformat()))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def _increment_access_count(self, category: str, key: str):
         """Increment access count for knowledge item"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            UPDATE knowledge
-            SET times_accessed = times_accessed + 1,
-                last_accessed = ?
-            WHERE category = ? AND key = ?
-        """, (datetime.now().isoformat(), category, key))
+            cursor.execute("""
+                UPDATE knowledge
+                SET times_accessed = times_accessed + 1,
+                    last_accessed = ?
+                WHERE category = ? AND key = ?
+            """, (datetime.now().isoformat(), category, key))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def _auto_extract_knowledge(
         self,
@@ -1393,346 +2369,77 @@ class AlfredBrain:
         alfred_response: str
     ):
         """Auto-extract knowledge from conversations using enhanced patterns"""
-
-        extraction_count = 0
+        now = datetime.now().isoformat()
+        rows = []
 
         # Check for corrections first (highest priority)
-        extraction_count += self._detect_corrections(cursor, user_input)
-
-        # Extract from user input
-        extraction_count += self._extract_preferences(cursor, user_input, "user_input")
-        extraction_count += self._extract_facts(cursor, user_input, "user_input")
-        extraction_count += self._extract_learning_goals(cursor, user_input, "user_input")
-        extraction_count += self._extract_habits(cursor, user_input, "user_input")
-        extraction_count += self._extract_expertise(cursor, user_input, "user_input")
-        extraction_count += self._extract_relationships(cursor, user_input, "user_input")
-        extraction_count += self._extract_context_preferences(cursor, user_input, "user_input")
-
-        # Extract from Alfred's response (things learned from external sources)
-        extraction_count += self._extract_facts(cursor, alfred_response, "alfred_response")
-
-        return extraction_count
-
-    def _extract_preferences(self, cursor, text: str, source: str) -> int:
-        """Enhanced preference extraction"""
-        count = 0
-
-        patterns = [
-            # Existing patterns
-            (r"i (?:prefer|like|want|need) (.+)", "preference", 1.0),
-            (r"my (?:favorite|preferred) (.+) is (.+)", "preference", 1.0),
-            (r"i (?:don't|do not) like (.+)", "dislike", 1.0),
-
-            # New patterns
-            (r"i (?:always|usually|typically|normally) (.+)", "habit", 0.8),
-            (r"i tend to (.+)", "tendency", 0.7),
-            (r"i'd rather (.+) than (.+)", "preference_comparison", 0.9),
-            (r"(?:can you|please) (?:always|remember to) (.+)", "standing_request", 1.0),
-            (r"i (?:hate|love|enjoy) (.+)", "strong_preference", 1.0),
-            (r"(?:never|don't ever) (.+)", "aversion", 1.0),
-        ]
-
-        for pattern, pref_type, confidence in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                value = match.group(1).strip()
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "user_preferences",
-                    pref_type,
-                    value,
-                    source,
-                    confidence,
-                    7,  # Important
-                    "auto-extract-v2",
-                    datetime.now().isoformat()
-                ))
-                count += 1
-
-        return count
-
-    def _extract_facts(self, cursor, text: str, source: str) -> int:
-        """Enhanced fact extraction"""
-        count = 0
-
-        patterns = [
-            # Personal info (existing)
-            (r"(?:my name is|i'm|i am) ([A-Z][a-z]+(?: [A-Z][a-z]+)*)", "user_name", 9, 1.0),
-            (r"i live in ([A-Z][a-z]+(?: [A-Z][a-z]+)*)", "user_location", 8, 1.0),
-            (r"i work (?:as|at) (.+)", "user_occupation", 8, 1.0),
-
-            # New patterns
-            (r"my (?:email|email address) is ([\w\.-]+@[\w\.-]+)", "user_email", 9, 1.0),
-            (r"my (?:phone|number) is ([\d\-\(\) ]+)", "user_phone", 8, 0.9),
-            (r"i'm (\d+) years old", "user_age", 7, 1.0),
-            (r"i speak ([A-Z][a-z]+(?: and [A-Z][a-z]+)*)", "user_languages", 7, 0.9),
-            (r"i (?:graduated from|studied at) ([A-Z][a-z\s]+)", "user_education", 7, 0.9),
-            (r"i've been (?:working|doing) (.+) for (\d+) (?:years|months)", "user_experience", 8, 0.9),
-            (r"i use ([A-Z][a-zA-Z0-9\s]+) (?:for|to) (.+)", "user_tools", 6, 0.8),
-            (r"my timezone is ([A-Z]{3,})", "user_timezone", 8, 1.0),
-            (r"i'm (?:located in|based in|from) (.+)", "user_location_detailed", 8, 0.9),
-        ]
-
-        for pattern, fact_type, importance, confidence in patterns:
-            match = re.search(pattern, text, re.IGNORECASE if fact_type.startswith("user_") else 0)
-            if match:
-                value = match.group(1).strip()
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "user_info",
-                    fact_type,
-                    value,
-                    source,
-                    confidence,
-                    importance,
-                    "auto-extract-v2",
-                    datetime.now().isoformat()
-                ))
-                count += 1
-
-        return count
-
-    def _extract_learning_goals(self, cursor, text: str, source: str) -> int:
-        """Extract learning goals and aspirations"""
-        count = 0
-
-        patterns = [
-            (r"i want to learn (?:about |how to )?(.+)", "learning_goal", 8, 0.9),
-            (r"i'm trying to (?:learn|understand|master) (.+)", "learning_goal", 8, 0.9),
-            (r"(?:teach me|help me learn|show me) (.+)", "learning_request", 8, 0.9),
-            (r"i need to (?:learn|understand|know) (.+)", "learning_need", 8, 0.9),
-            (r"i'd like to become (.+)", "aspiration", 7, 0.8),
-            (r"my goal is to (.+)", "goal", 8, 1.0),
-        ]
-
-        for pattern, goal_type, importance, confidence in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                value = match.group(1).strip()
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "learning_goals",
-                    goal_type,
-                    value,
-                    source,
-                    confidence,
-                    importance,
-                    "auto-extract-v2",
-                    datetime.now().isoformat()
-                ))
-                count += 1
-
-        return count
-
-    def _extract_habits(self, cursor, text: str, source: str) -> int:
-        """Extract behavioral habits and routines"""
-        count = 0
-
-        patterns = [
-            (r"i (?:always|usually|typically|normally) (.+)", "habit", 7, 0.8),
-            (r"every (?:day|morning|evening|week) i (.+)", "routine", 7, 0.9),
-            (r"i (?:tend to|often) (.+)", "tendency", 6, 0.7),
-            (r"i'm (?:usually|typically|generally) (.+)", "characteristic", 6, 0.7),
-            (r"i rarely (.+)", "rare_behavior", 6, 0.8),
-            (r"i never (.+)", "avoidance", 7, 0.9),
-        ]
-
-        for pattern, habit_type, importance, confidence in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                value = match.group(1).strip()
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "user_habits",
-                    habit_type,
-                    value,
-                    source,
-                    confidence,
-                    importance,
-                    "auto-extract-v2",
-                    datetime.now().isoformat()
-                ))
-                count += 1
-
-        return count
-
-    def _extract_expertise(self, cursor, text: str, source: str) -> int:
-        """Extract user expertise and skill areas"""
-        count = 0
-
-        patterns = [
-            (r"i'm (?:experienced in|an expert in|skilled in|good at) (.+)", "expertise", 8, 0.9),
-            (r"i (?:know|understand) (.+) (?:well|very well)", "knowledge_area", 7, 0.8),
-            (r"i specialize in (.+)", "specialization", 9, 1.0),
-            (r"i've (?:worked with|used) (.+) for (?:\d+) (?:years|months)", "long_term_skill", 8, 0.9),
-            (r"i'm (?:not good at|weak in|bad at) (.+)", "skill_gap", 7, 0.9),
-            (r"i'm learning (.+)", "developing_skill", 6, 0.8),
-        ]
-
-        for pattern, skill_type, importance, confidence in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                value = match.group(1).strip()
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "user_expertise",
-                    skill_type,
-                    value,
-                    source,
-                    confidence,
-                    importance,
-                    "auto-extract-v2",
-                    datetime.now().isoformat()
-                ))
-                count += 1
-
-        return count
-
-    def _extract_relationships(self, cursor, text: str, source: str) -> int:
-        """Extract mentions of people, teams, companies"""
-        count = 0
-
-        patterns = [
-            (r"my (?:colleague|coworker|teammate) ([A-Z][a-z]+)", "colleague", 6, 0.8),
-            (r"(?:working with|working on) the ([A-Z][a-zA-Z\s]+) team", "team", 7, 0.9),
-            (r"my (?:boss|manager|supervisor) ([A-Z][a-z]+)", "manager", 7, 0.9),
-            (r"i work (?:at|for) ([A-Z][a-zA-Z0-9\s]+)", "company", 8, 1.0),
-            (r"my (?:friend|partner) ([A-Z][a-z]+)", "personal_contact", 5, 0.8),
-        ]
-
-        for pattern, relation_type, importance, confidence in patterns:
-            match = re.search(pattern, text)
-            if match:
-                value = match.group(1).strip()
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "user_relationships",
-                    relation_type,
-                    value,
-                    source,
-                    confidence,
-                    importance,
-                    "auto-extract-v2",
-                    datetime.now().isoformat()
-                ))
-                count += 1
-
-        return count
-
-    def _extract_context_preferences(self, cursor, text: str, source: str) -> int:
-        """Extract time preferences, work patterns, etc."""
-        count = 0
-
-        patterns = [
-            (r"i work (?:from |)(\d+(?:am|pm)) to (\d+(?:am|pm))", "work_hours", 8, 0.9),
-            (r"i'm (?:most productive|at my best) (?:in the |during the |)(\w+)", "productivity_time", 7, 0.8),
-            (r"i prefer (?:to work|working) (?:in the |during the |)(\w+)", "work_time_preference", 7, 0.8),
-            (r"i'm in (?:the |)([A-Z]{3,}|UTC[+-]\d+) (?:timezone|time zone)", "timezone", 9, 1.0),
-            (r"i take breaks (?:every |)(\d+) (?:minutes|hours)", "break_pattern", 6, 0.7),
-        ]
-
-        for pattern, context_type, importance, confidence in patterns:
-            match = re.search(pattern, text.lower())
-            if match:
-                value = match.group(1).strip()
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "user_context",
-                    context_type,
-                    value,
-                    source,
-                    confidence,
-                    importance,
-                    "auto-extract-v2",
-                    datetime.now().isoformat()
-                ))
-                count += 1
-
-        return count
-
-    def _detect_corrections(self, cursor, user_input: str) -> int:
-        """Detect corrections to previous knowledge"""
-        count = 0
-
-        correction_patterns = [
-            r"actually,? (?:it's|i meant|i said) (.+)",
-            r"(?:no|nope),? (?:it's|i meant) (.+)",
-            r"(?:sorry|my bad),? (?:it's|i meant) (.+)",
-            r"correction:? (.+)",
-            r"i meant to say (.+)",
-        ]
-
-        for pattern in correction_patterns:
-            match = re.search(pattern, user_input.lower())
-            if match:
-                correction_value = match.group(1).strip()
-
-                # Mark recent knowledge as superseded
-                cursor.execute("""
-                    UPDATE knowledge
-                    SET verified = 0,
-                        confidence = confidence * 0.5
+        for correction_value in self.extractor.extract_corrections(user_input):
+            # Mark recent knowledge as superseded
+            # (subquery instead of UPDATE ... LIMIT, which most SQLite builds reject)
+            cursor.execute("""
+                UPDATE knowledge
+                SET verified = 0,
+                    confidence = confidence * 0.5
+                WHERE id IN (
+                    SELECT id FROM knowledge
                     WHERE timestamp > ? AND verified = 0
                     ORDER BY timestamp DESC
                     LIMIT 3
-                """, ((datetime.now() - timedelta(minutes=5)).isoformat(),))
+                )
+            """, ((datetime.now() - timedelta(minutes=5)).isoformat(),))
 
-                # Store the correction with high confidence
-                cursor.execute("""
-                    INSERT INTO knowledge
-                    (timestamp, category, key, value, source, confidence, importance,
-                     extraction_method, verified, last_accessed)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    datetime.now().isoformat(),
-                    "corrections",
-                    "user_correction",
-                    correction_value,
-                    "user_correction",
-                    1.0,
-                    9,  # Very important
-                    "correction-detection",
-                    1,  # Verified
-                    datetime.now().isoformat()
-                ))
-                count += 1
+            # Store the correction with high confidence
+            rows.append((
+                now, "corrections", "user_correction", correction_value, "user_correction",
+                1.0, 9, "correction-detection", 1, now
+            ))
+
+        # Extract from user input
+        for category, key, value, importance, confidence in self.extractor.extract(user_input):
+            rows.append((
+                now, category, key, value, "user_input",
+                confidence, importance, "auto-extract-v2", 0, now
+            ))
+
+        # Extract from Alfred's response (things learned from external sources)
+        for category, key, value, importance, confidence in self.extractor.extract(
+            alfred_response, categories=("user_info",)
+        ):
+            rows.append((
+                now, category, key, value, "alfred_response",
+                confidence, importance, "auto-extract-v2", 0, now
+            ))
+
+        if rows:
+            cursor.execute("SELECT COALESCE(MAX(id), 0) FROM knowledge")
+            last_knowledge_id = cursor.fetchone()[0]
+
+            cursor.executemany("""
+                INSERT INTO knowledge
+                (timestamp, category, key, value, source, confidence, importance,
+                 extraction_method, verified, last_accessed)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, rows)
+
+            self._index_knowledge(cursor, "id > ?", (last_knowledge_id,))
+
+        return len(rows)
+
+    def _extract_in_background(self, user_input: str, alfred_response: str):
+        """Run knowledge extraction on the extraction worker thread"""
+        conn = self._connect()
+        try:
+            self._auto_extract_knowledge(conn.cursor(), user_input, alfred_response)
+            conn.commit()
+        except Exception as e:
+            print(f"[Brain] Background knowledge extraction failed: {e}")
+        finally:
+            conn.close()
 
-        return count
+    def wait_for_extraction(self, timeout: Optional[float] = None):
+        """Block until queued background extractions have been stored"""
+        if self._extraction_executor:
+            self._extraction_executor.submit(lambda: None).result(timeout=timeout)
 
     # ============================================================================
     # USER PREFERENCES
@@ -1740,38 +2447,36 @@ class AlfredBrain:
 
     def set_preference(self, key: str, value: str, confidence: float = 1.0):
         """Set user preference"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            INSERT OR REPLACE INTO preferences
-            (preference_key, preference_value, updated_at, times_used, confidence)
-            VALUES (?, ?, ?, COALESCE((SELECT times_used FROM preferences WHERE preference_key = ?), 0), ?)
-        """, (key, value, datetime.now().isoformat(), key, confidence))
+            cursor.execute("""
+                INSERT OR REPLACE INTO preferences
+                (preference_key, preference_value, updated_at, times_used, confidence)
+                VALUES (?, ?, ?, COALESCE((SELECT times_used FROM preferences WHERE preference_key = ?), 0), ?)
+            """, (key, value, datetime.now().isoformat(), key, confidence))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def get_preference(self, key: str, default: Any = None) -> Any:
         """Get user preference"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            UPDATE preferences
-            SET times_used = times_used + 1
-            WHERE preference_key = ?
-        """, (key,))
+            cursor.execute("""
+                UPDATE preferences
+                SET times_used = times_used + 1
+                WHERE preference_key = ?
+            """, (key,))
 
-        cursor.execute("""
-            SELECT preference_value, confidence
-            FROM preferences
-            WHERE preference_key = ?
-        """, (key,))
+            cursor.execute("""
+                SELECT preference_value, confidence
+                FROM preferences
+                WHERE preference_key = ?
+            """, (key,))
 
-        row = cursor.fetchone()
-        conn.commit()
-        conn.close()
+            row = cursor.fetchone()
+            conn.commit()
 
         if row:
             return row[0]
@@ -1795,78 +2500,75 @@ class AlfredBrain:
             pattern_data: Pattern data
             success: Whether pattern led to success
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        pattern_json = json.dumps(pattern_data)
-        pattern_hash = hashlib.md5(pattern_json.encode()).hexdigest()
+            pattern_json = json.dumps(pattern_data)
+            pattern_hash = hashlib.md5(pattern_json.encode()).hexdigest()
 
-        # Check if pattern exists
-        cursor.execute("""
-            SELECT id, frequency, success_rate
-            FROM patterns
-            WHERE pattern_type = ? AND pattern_data = ?
-        """, (pattern_type, pattern_json))
+            # Check if pattern exists
+            cursor.execute("""
+                SELECT id, frequency, success_rate
+                FROM patterns
+                WHERE pattern_type = ? AND pattern_data = ?
+            """, (pattern_type, pattern_json))
 
-        row = cursor.fetchone()
+            row = cursor.fetchone()
 
-        if row:
-            # Update existing pattern
-            pattern_id, frequency, success_rate = row
-            new_frequency = frequency + 1
-            new_success_rate = (success_rate * frequency + (1.0 if success else 0.0)) / new_frequency
+            if row:
+                # Update existing pattern
+                pattern_id, frequency, success_rate = row
+                new_frequency = frequency + 1
+                new_success_rate = (success_rate * frequency + (1.0 if success else 0.0)) / new_frequency
 
-            cursor.execute("""
-                UPDATE patterns
-                SET frequency = ?, success_rate = ?, last_seen = ?
-                WHERE id = ?
-            """, (new_frequency, new_success_rate, datetime.now().isoformat(), pattern_id))
-        else:
-            # Insert new pattern
-            cursor.execute("""
-                INSERT INTO patterns
-                (pattern_type, pattern_data, frequency, success_rate, last_seen)
-                VALUES (?, ?, 1, ?, ?)
-            """, (pattern_type, pattern_json, 1.0 if success else 0.0, datetime.now().isoformat()))
+                cursor.execute("""
+                    UPDATE patterns
+                    SET frequency = ?, success_rate = ?, last_seen = ?
+                    WHERE id = ?
+                """, (new_frequency, new_success_rate, datetime.now().isoformat(), pattern_id))
+            else:
+                # Insert new pattern
+                cursor.execute("""
+                    INSERT INTO patterns
+                    (pattern_type, pattern_data, frequency, success_rate, last_seen)
+                    VALUES (?, ?, 1, ?, ?)
+                """, (pattern_type, pattern_json, 1.0 if success else 0.0, datetime.now().isoformat()))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def get_patterns(
         self,
         pattern_type: Optional[str] = None,
         min_frequency: int = 1,
-        min_success_rate: float = 0.5
-    ) -> List[Dict]:
-        """Get learned patterns"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        if pattern_type:
-            cursor.execute("""
-                SELECT pattern_type, pattern_data, frequency, success_rate
-                FROM patterns
-                WHERE pattern_type = ? AND frequency >= ? AND success_rate >= ?
-                ORDER BY frequency DESC, success_rate DESC
-            """, (pattern_type, min_frequency, min_success_rate))
-        else:
-            cursor.execute("""
-                SELECT pattern_type, pattern_data, frequency, success_rate
-                FROM patterns
-                WHERE frequency >= ? AND success_rate >= ?
-                ORDER BY frequency DESC, success_rate DESC
-            """, (min_frequency, min_success_rate))
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "type": row[0],
-                "data": json.loads(row[1]),
-                "frequency": row[2],
-                "success_rate": row[3]
-            })
+        min_success_rate: float = 0.5
+    ) -> List[Dict]:
+        """Get learned patterns"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+
+            if pattern_type:
+                cursor.execute("""
+                    SELECT pattern_type, pattern_data, frequency, success_rate
+                    FROM patterns
+                    WHERE pattern_type = ? AND frequency >= ? AND success_rate >= ?
+                    ORDER BY frequency DESC, success_rate DESC
+                """, (pattern_type, min_frequency, min_success_rate))
+            else:
+                cursor.execute("""
+                    SELECT pattern_type, pattern_data, frequency, success_rate
+                    FROM patterns
+                    WHERE frequency >= ? AND success_rate >= ?
+                    ORDER BY frequency DESC, success_rate DESC
+                """, (min_frequency, min_success_rate))
 
-        conn.close()
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    "type": row[0],
+                    "data": json.loads(row[1]),
+                    "frequency": row[2],
+                    "success_rate": row[3]
+                })
         return results
 
     # ============================================================================
@@ -1887,70 +2589,66 @@ class AlfredBrain:
             success: Whether skill was used successfully
             notes: Optional notes
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            INSERT INTO skills (skill_name, last_used)
-            VALUES (?, ?)
-            ON CONFLICT(skill_name) DO UPDATE SET
-                times_used = times_used + 1,
-                success_count = success_count + CASE WHEN ? THEN 1 ELSE 0 END,
-                failure_count = failure_count + CASE WHEN ? THEN 0 ELSE 1 END,
-                proficiency = CAST(success_count AS REAL) / CAST(times_used AS REAL),
-                last_used = ?,
-                notes = COALESCE(?, notes)
-        """, (
-            skill_name,
-            datetime.now().isoformat(),
-            success,
-            success,
-            datetime.now().isoformat(),
-            notes
-        ))
+            cursor.execute("""
+                INSERT INTO skills (skill_name, last_used)
+                VALUES (?, ?)
+                ON CONFLICT(skill_name) DO UPDATE SET
+                    times_used = times_used + 1,
+                    success_count = success_count + CASE WHEN ? THEN 1 ELSE 0 END,
+                    failure_count = failure_count + CASE WHEN ? THEN 0 ELSE 1 END,
+                    proficiency = CAST(success_count AS REAL) / CAST(times_used AS REAL),
+                    last_used = ?,
+                    notes = COALESCE(?, notes)
+            """, (
+                skill_name,
+                datetime.now().isoformat(),
+                success,
+                success,
+                datetime.now().isoformat(),
+                notes
+            ))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def get_skill_proficiency(self, skill_name: str) -> Optional[float]:
         """Get proficiency level for a skill (0.0-1.0)"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT proficiency
-            FROM skills
-            WHERE skill_name = ?
-        """, (skill_name,))
+            cursor.execute("""
+                SELECT proficiency
+                FROM skills
+                WHERE skill_name = ?
+            """, (skill_name,))
 
-        row = cursor.fetchone()
-        conn.close()
+            row = cursor.fetchone()
 
         return row[0] if row else None
 
     def get_all_skills(self, min_proficiency: float = 0.0) -> List[Dict]:
         """Get all tracked skills"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT skill_name, proficiency, times_used, success_count, failure_count
-            FROM skills
-            WHERE proficiency >= ?
-            ORDER BY proficiency DESC, times_used DESC
-        """, (min_proficiency,))
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "skill": row[0],
-                "proficiency": row[1],
-                "times_used": row[2],
-                "successes": row[3],
-                "failures": row[4]
-            })
+            cursor.execute("""
+                SELECT skill_name, proficiency, times_used, success_count, failure_count
+                FROM skills
+                WHERE proficiency >= ?
+                ORDER BY proficiency DESC, times_used DESC
+            """, (min_proficiency,))
 
-        conn.close()
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    "skill": row[0],
+                    "proficiency": row[1],
+                    "times_used": row[2],
+                    "successes": row[3],
+                    "failures": row[4]
+                })
         return results
 
     # ============================================================================
@@ -1965,61 +2663,57 @@ class AlfredBrain:
         solution: Optional[str] = None
     ):
         """Record a mistake to learn from"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            INSERT INTO mistakes
-            (timestamp, error_type, description, context, solution)
-            VALUES (?, ?, ?, ?, ?)
-        """, (
-            datetime.now().isoformat(),
-            error_type,
-            description,
-            context,
-            solution
-        ))
+            cursor.execute("""
+                INSERT INTO mistakes
+                (timestamp, error_type, description, context, solution)
+                VALUES (?, ?, ?, ?, ?)
+            """, (
+                datetime.now().isoformat(),
+                error_type,
+                description,
+                context,
+                solution
+            ))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def mark_mistake_learned(self, mistake_id: int):
         """Mark a mistake as learned from"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            UPDATE mistakes
-            SET learned = 1
-            WHERE id = ?
-        """, (mistake_id,))
+            cursor.execute("""
+                UPDATE mistakes
+                SET learned = 1
+                WHERE id = ?
+            """, (mistake_id,))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
     def get_unlearned_mistakes(self) -> List[Dict]:
         """Get mistakes that haven't been learned from yet"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        cursor.execute("""
-            SELECT id, error_type, description, context, solution
-            FROM mistakes
-            WHERE learned = 0
-            ORDER BY timestamp DESC
-        """)
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "id": row[0],
-                "error_type": row[1],
-                "description": row[2],
-                "context": row[3],
-                "solution": row[4]
-            })
+            cursor.execute("""
+                SELECT id, error_type, description, context, solution
+                FROM mistakes
+                WHERE learned = 0
+                ORDER BY timestamp DESC
+            """)
 
-        conn.close()
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    "id": row[0],
+                    "error_type": row[1],
+                    "description": row[2],
+                    "context": row[3],
+                    "solution": row[4]
+                })
         return results
 
     # ============================================================================
@@ -2041,26 +2735,24 @@ class AlfredBrain:
 
     def get_top_topics(self, limit: int = 10) -> List[Dict]:
         """Get most discussed topics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT topic, frequency, interest_level, last_seen
-            FROM topics
-            ORDER BY interest_level DESC, frequency DESC
-            LIMIT ?
-        """, (limit,))
-
-        results = []
-        for row in cursor.fetchall():
-            results.append({
-                "topic": row[0],
-                "frequency": row[1],
-                "interest": row[2],
-                "last_seen": row[3]
-            })
+            cursor.execute("""
+                SELECT topic, frequency, interest_level, last_seen
+                FROM topics
+                ORDER BY interest_level DESC, frequency DESC
+                LIMIT ?
+            """, (limit,))
 
-        conn.close()
+            results = []
+            for row in cursor.fetchall():
+                results.append({
+                    "topic": row[0],
+                    "frequency": row[1],
+                    "interest": row[2],
+                    "last_seen": row[3]
+                })
         return results
 
     # ============================================================================
@@ -2089,32 +2781,31 @@ class AlfredBrain:
             authorized: Whether scan was authorized
             notes: Additional notes or commentary
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Convert findings dict to JSON string
-        findings_json = json.dumps(findings) if isinstance(findings, dict) else str(findings)
+            # Convert findings dict to JSON string
+            findings_json = json.dumps(findings) if isinstance(findings, dict) else str(findings)
 
-        # Convert recommendations list to JSON string
-        recommendations_json = json.dumps(recommendations) if recommendations else None
+            # Convert recommendations list to JSON string
+            recommendations_json = json.dumps(recommendations) if recommendations else None
 
-        cursor.execute("""
-            INSERT INTO security_scans
-            (timestamp, target, scan_type, findings, severity_summary, recommendations, authorized, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            datetime.now().isoformat(),
-            target,
-            scan_type,
-            findings_json,
-            severity_summary,
-            recommendations_json,
-            authorized,
-            notes
-        ))
+            cursor.execute("""
+                INSERT INTO security_scans
+                (timestamp, target, scan_type, findings, severity_summary, recommendations, authorized, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                datetime.now().isoformat(),
+                target,
+                scan_type,
+                findings_json,
+                severity_summary,
+                recommendations_json,
+                authorized,
+                notes
+            ))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
         print(f"[Brain] Stored security scan: {target} ({scan_type})")
 
@@ -2135,45 +2826,43 @@ class AlfredBrain:
         Returns:
             List of security scan dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        query = "SELECT * FROM security_scans WHERE 1=1"
-        params = []
+            query = "SELECT * FROM security_scans WHERE 1=1"
+            params = []
 
-        if target:
-            query += " AND target LIKE ?"
-            params.append(f"%{target}%")
+            if target:
+                query += " AND target LIKE ?"
+                params.append(f"%{target}%")
 
-        if scan_type:
-            query += " AND scan_type = ?"
-            params.append(scan_type)
+            if scan_type:
+                query += " AND scan_type = ?"
+                params.append(scan_type)
 
-        query += " ORDER BY timestamp DESC LIMIT ?"
-        params.append(limit)
+            query += " ORDER BY timestamp DESC LIMIT ?"
+            params.append(limit)
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
 
-        results = []
-        for row in rows:
-            # Parse JSON fields
-            findings = json.loads(row[4]) if row[4] else {}
-            recommendations = json.loads(row[6]) if row[6] else []
-
-            results.append({
-                "id": row[0],
-                "timestamp": row[1],
-                "target": row[2],
-                "scan_type": row[3],
-                "findings": findings,
-                "severity_summary": row[5],
-                "recommendations": recommendations,
-                "authorized": bool(row[7]),
-                "notes": row[8]
-            })
+            results = []
+            for row in rows:
+                # Parse JSON fields
+                findings = json.loads(row[4]) if row[4] else {}
+                recommendations = json.loads(row[6]) if row[6] else []
 
-        conn.close()
+                results.append({
+                    "id": row[0],
+                    "timestamp": row[1],
+                    "target": row[2],
+                    "scan_type": row[3],
+                    "findings": findings,
+                    "severity_summary": row[5],
+                    "recommendations": recommendations,
+                    "authorized": bool(row[7]),
+                    "notes": row[8]
+                })
         return results
 
     def get_latest_scan(self, target: str) -> Optional[Dict]:
@@ -2196,56 +2885,54 @@ class AlfredBrain:
         Returns:
             Dictionary with statistics on security scans
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Total scans
-        cursor.execute("SELECT COUNT(*) FROM security_scans")
-        total_scans = cursor.fetchone()[0]
-
-        # Scans by type
-        cursor.execute("""
-            SELECT scan_type, COUNT(*)
-            FROM security_scans
-            GROUP BY scan_type
-        """)
-        scans_by_type = {row[0]: row[1] for row in cursor.fetchall()}
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Recent scans (last 7 days)
-        week_ago = (datetime.now() - timedelta(days=7)).isoformat()
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM security_scans
-            WHERE timestamp > ?
-        """, (week_ago,))
-        recent_scans = cursor.fetchone()[0]
-
-        # Get all findings to parse severity
-        cursor.execute("SELECT findings FROM security_scans")
-        rows = cursor.fetchall()
+            # Total scans
+            cursor.execute("SELECT COUNT(*) FROM security_scans")
+            total_scans = cursor.fetchone()[0]
 
-        total_vulnerabilities = 0
-        severity_totals = {
-            'critical': 0,
-            'high': 0,
-            'medium': 0,
-            'low': 0,
-            'info': 0
-        }
+            # Scans by type
+            cursor.execute("""
+                SELECT scan_type, COUNT(*)
+                FROM security_scans
+                GROUP BY scan_type
+            """)
+            scans_by_type = {row[0]: row[1] for row in cursor.fetchall()}
 
-        for row in rows:
-            try:
-                findings = json.loads(row[0]) if row[0] else {}
-                if 'severity_summary' in findings:
-                    summary = findings['severity_summary']
-                    for severity, count in summary.items():
-                        if severity in severity_totals:
-                            severity_totals[severity] += count
-                            total_vulnerabilities += count
-            except:
-                pass
+            # Recent scans (last 7 days)
+            week_ago = (datetime.now() - timedelta(days=7)).isoformat()
+            cursor.execute("""
+                SELECT COUNT(*)
+                FROM security_scans
+                WHERE timestamp > ?
+            """, (week_ago,))
+            recent_scans = cursor.fetchone()[0]
+
+            # Get all findings to parse severity
+            cursor.execute("SELECT findings FROM security_scans")
+            rows = cursor.fetchall()
+
+            total_vulnerabilities = 0
+            severity_totals = {
+                'critical': 0,
+                'high': 0,
+                'medium': 0,
+                'low': 0,
+                'info': 0
+            }
 
-        conn.close()
+            for row in rows:
+                try:
+                    findings = json.loads(row[0]) if row[0] else {}
+                    if 'severity_summary' in findings:
+                        summary = findings['severity_summary']
+                        for severity, count in summary.items():
+                            if severity in severity_totals:
+                                severity_totals[severity] += count
+                                total_vulnerabilities += count
+                except:
+                    pass
 
         return {
             'total_scans': total_scans,
@@ -2290,30 +2977,29 @@ class AlfredBrain:
         Returns:
             Project ID
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        now = datetime.now().isoformat()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Convert dicts/lists to JSON
-        timeline_json = json.dumps(timeline_data) if timeline_data else None
-        compliance_json = json.dumps(compliance_issues) if compliance_issues else None
+            now = datetime.now().isoformat()
 
-        cursor.execute("""
-            INSERT INTO camdan_projects
-            (project_name, client_name, location, building_type, square_footage,
-             estimated_cost, status, timeline_data, compliance_issues,
-             created_at, updated_at, notes)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-        """, (
-            project_name, client_name, location, building_type, square_footage,
-            estimated_cost, status, timeline_json, compliance_json,
-            now, now, notes
-        ))
+            # Convert dicts/lists to JSON
+            timeline_json = json.dumps(timeline_data) if timeline_data else None
+            compliance_json = json.dumps(compliance_issues) if compliance_issues else None
 
-        project_id = cursor.lastrowid
-        conn.commit()
-        conn.close()
+            cursor.execute("""
+                INSERT INTO camdan_projects
+                (project_name, client_name, location, building_type, square_footage,
+                 estimated_cost, status, timeline_data, compliance_issues,
+                 created_at, updated_at, notes)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (
+                project_name, client_name, location, building_type, square_footage,
+                estimated_cost, status, timeline_json, compliance_json,
+                now, now, notes
+            ))
+
+            project_id = cursor.lastrowid
+            conn.commit()
 
         self.logger.info(f"[Brain] Stored CAMDAN project: {project_name} (ID: {project_id})")
         return project_id
@@ -2340,49 +3026,48 @@ class AlfredBrain:
             brain_insights: Alfred's learned insights about the project
             notes: Updated notes
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        updates = []
-        params = []
+            updates = []
+            params = []
 
-        if actual_cost is not None:
-            updates.append("actual_cost = ?")
-            params.append(actual_cost)
+            if actual_cost is not None:
+                updates.append("actual_cost = ?")
+                params.append(actual_cost)
 
-        if status:
-            updates.append("status = ?")
-            params.append(status)
-            if status == "completed":
-                updates.append("completed_at = ?")
-                params.append(datetime.now().isoformat())
+            if status:
+                updates.append("status = ?")
+                params.append(status)
+                if status == "completed":
+                    updates.append("completed_at = ?")
+                    params.append(datetime.now().isoformat())
 
-        if timeline_data:
-            updates.append("timeline_data = ?")
-            params.append(json.dumps(timeline_data))
+            if timeline_data:
+                updates.append("timeline_data = ?")
+                params.append(json.dumps(timeline_data))
 
-        if compliance_issues:
-            updates.append("compliance_issues = ?")
-            params.append(json.dumps(compliance_issues))
+            if compliance_issues:
+                updates.append("compliance_issues = ?")
+                params.append(json.dumps(compliance_issues))
 
-        if brain_insights:
-            updates.append("brain_insights = ?")
-            params.append(json.dumps(brain_insights))
+            if brain_insights:
+                updates.append("brain_insights = ?")
+                params.append(json.dumps(brain_insights))
 
-        if notes:
-            updates.append("notes = ?")
-            params.append(notes)
+            if notes:
+                updates.append("notes = ?")
+                params.append(notes)
 
-        updates.append("updated_at = ?")
-        params.append(datetime.now().isoformat())
+            updates.append("updated_at = ?")
+            params.append(datetime.now().isoformat())
 
-        params.append(project_id)
+            params.append(project_id)
 
-        query = f"UPDATE camdan_projects SET {', '.join(updates)} WHERE id = ?"
-        cursor.execute(query, params)
+            query = f"UPDATE camdan_projects SET {', '.join(updates)} WHERE id = ?"
+            cursor.execute(query, params)
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
         self.logger.info(f"[Brain] Updated CAMDAN project ID: {project_id}")
 
@@ -2403,54 +3088,52 @@ class AlfredBrain:
         Returns:
             List of project dictionaries
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        query = "SELECT * FROM camdan_projects WHERE 1=1"
-        params = []
-
-        if client_name:
-            query += " AND client_name LIKE ?"
-            params.append(f"%{client_name}%")
-
-        if status:
-            query += " AND status = ?"
-            params.append(status)
-
-        query += " ORDER BY created_at DESC LIMIT ?"
-        params.append(limit)
-
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-
-        projects = []
-        for row in rows:
-            # Parse JSON fields
-            timeline = json.loads(row[9]) if row[9] else None
-            compliance = json.loads(row[10]) if row[10] else None
-            insights = json.loads(row[11]) if row[11] else None
-
-            projects.append({
-                "id": row[0],
-                "project_name": row[1],
-                "client_name": row[2],
-                "location": row[3],
-                "building_type": row[4],
-                "square_footage": row[5],
-                "estimated_cost": row[6],
-                "actual_cost": row[7],
-                "status": row[8],
-                "timeline_data": timeline,
-                "compliance_issues": compliance,
-                "brain_insights": insights,
-                "created_at": row[12],
-                "updated_at": row[13],
-                "completed_at": row[14],
-                "importance": row[15],
-                "notes": row[16]
-            })
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        conn.close()
+            query = "SELECT * FROM camdan_projects WHERE 1=1"
+            params = []
+
+            if client_name:
+                query += " AND client_name LIKE ?"
+                params.append(f"%{client_name}%")
+
+            if status:
+                query += " AND status = ?"
+                params.append(status)
+
+            query += " ORDER BY created_at DESC LIMIT ?"
+            params.append(limit)
+
+            cursor.execute(query, params)
+            rows = cursor.fetchall()
+
+            projects = []
+            for row in rows:
+                # Parse JSON fields
+                timeline = json.loads(row[9]) if row[9] else None
+                compliance = json.loads(row[10]) if row[10] else None
+                insights = json.loads(row[11]) if row[11] else None
+
+                projects.append({
+                    "id": row[0],
+                    "project_name": row[1],
+                    "client_name": row[2],
+                    "location": row[3],
+                    "building_type": row[4],
+                    "square_footage": row[5],
+                    "estimated_cost": row[6],
+                    "actual_cost": row[7],
+                    "status": row[8],
+                    "timeline_data": timeline,
+                    "compliance_issues": compliance,
+                    "brain_insights": insights,
+                    "created_at": row[12],
+                    "updated_at": row[13],
+                    "completed_at": row[14],
+                    "importance": row[15],
+                    "notes": row[16]
+                })
         return projects
 
     def get_camdan_project_summary(self) -> Dict[str, Any]:
@@ -2460,41 +3143,39 @@ class AlfredBrain:
         Returns:
             Dictionary with project statistics
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Total projects
-        cursor.execute("SELECT COUNT(*) FROM camdan_projects")
-        total_projects = cursor.fetchone()[0]
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Projects by status
-        cursor.execute("""
-            SELECT status, COUNT(*)
-            FROM camdan_projects
-            GROUP BY status
-        """)
-        by_status = {row[0]: row[1] for row in cursor.fetchall()}
+            # Total projects
+            cursor.execute("SELECT COUNT(*) FROM camdan_projects")
+            total_projects = cursor.fetchone()[0]
 
-        # Total estimated vs actual costs
-        cursor.execute("""
-            SELECT SUM(estimated_cost), SUM(actual_cost)
-            FROM camdan_projects
-            WHERE estimated_cost IS NOT NULL OR actual_cost IS NOT NULL
-        """)
-        costs = cursor.fetchone()
-        total_estimated = costs[0] or 0
-        total_actual = costs[1] or 0
+            # Projects by status
+            cursor.execute("""
+                SELECT status, COUNT(*)
+                FROM camdan_projects
+                GROUP BY status
+            """)
+            by_status = {row[0]: row[1] for row in cursor.fetchall()}
 
-        # Projects by client
-        cursor.execute("""
-            SELECT client_name, COUNT(*)
-            FROM camdan_projects
-            WHERE client_name IS NOT NULL
-            GROUP BY client_name
-        """)
-        by_client = {row[0]: row[1] for row in cursor.fetchall()}
+            # Total estimated vs actual costs
+            cursor.execute("""
+                SELECT SUM(estimated_cost), SUM(actual_cost)
+                FROM camdan_projects
+                WHERE estimated_cost IS NOT NULL OR actual_cost IS NOT NULL
+            """)
+            costs = cursor.fetchone()
+            total_estimated = costs[0] or 0
+            total_actual = costs[1] or 0
 
-        conn.close()
+            # Projects by client
+            cursor.execute("""
+                SELECT client_name, COUNT(*)
+                FROM camdan_projects
+                WHERE client_name IS NOT NULL
+                GROUP BY client_name
+            """)
+            by_client = {row[0]: row[1] for row in cursor.fetchall()}
 
         return {
             "total_projects": total_projects,
@@ -2524,24 +3205,41 @@ class AlfredBrain:
         Returns:
             0.0-10.0 score
         """
+        if 'success_rate' in item:
+            reliability = item['success_rate']
+        elif 'success' in item:
+            reliability = 1.0 if item['success'] else 0.0
+        else:
+            reliability = 0.5  # Neutral
+
+        return self._priority_from_fields(
+            item.get('importance', 5),
+            item.get('confidence', 0.5),
+            item.get('timestamp') or item.get('last_accessed'),
+            item.get('times_accessed', 0),
+            reliability,
+            datetime.now()
+        )
+
+    @staticmethod
+    def _priority_from_fields(importance, confidence, timestamp_str, times_accessed,
+                              reliability, now: datetime) -> float:
+        """Priority score formula over raw column values (shared with SQL bulk updates)"""
         import math
 
         score = 0.0
 
         # Factor 1: Importance (weight: 0.3, range: 1-10)
-        importance = item.get('importance', 5)
         score += (importance / 10.0) * 3.0  # Contribution: 0-3.0
 
         # Factor 2: Confidence (weight: 0.2, range: 0.0-1.0)
-        confidence = item.get('confidence', 0.5)
         score += confidence * 2.0  # Contribution: 0-2.0
 
         # Factor 3: Recency (weight: 0.2, exponential decay)
-        timestamp_str = item.get('timestamp') or item.get('last_accessed')
         if timestamp_str:
             try:
                 item_time = datetime.fromisoformat(timestamp_str)
-                age_days = (datetime.now() - item_time).days
+                age_days = (now - item_time).days
                 # Exponential decay: e^(-age/365) scaled to 0-2.0
                 recency_score = 2.0 * (2.71828 ** (-age_days / 365.0))
                 score += recency_score  # Contribution: 0-2.0
@@ -2551,18 +3249,12 @@ class AlfredBrain:
             score += 1.0
 
         # Factor 4: Access frequency (weight: 0.15)
-        times_accessed = item.get('times_accessed', 0)
         # Logarithmic scaling to prevent domination
         access_score = 1.5 * min(1.0, math.log(times_accessed + 1) / math.log(50))
         score += access_score  # Contribution: 0-1.5
 
         # Factor 5: Success rate (weight: 0.1)
-        if 'success_rate' in item:
-            score += item['success_rate'] * 1.0  # Contribution: 0-1.0
-        elif 'success' in item:
-            score += (1.0 if item['success'] else 0.0) * 1.0
-        else:
-            score += 0.5  # Neutral
+        score += reliability * 1.0  # Contribution: 0-1.0
 
         # Factor 6: Topic relevance (weight: 0.05) - simplified
         score += 0.25  # Default neutral contribution
@@ -2570,79 +3262,117 @@ class AlfredBrain:
         # Ensure score is in valid range
         return max(0.0, min(10.0, score))
 
-    def update_priority_scores(self, item_type: str = "all") -> int:
+    def _register_score_functions(self, conn, now: datetime):
+        """Expose the priority and retention formulas to SQL as alfred_priority/alfred_retention"""
+        conn.create_function(
+            "alfred_priority", 5,
+            lambda importance, confidence, timestamp_str, times_accessed, reliability:
+                self._priority_from_fields(importance, confidence, timestamp_str,
+                                           times_accessed, reliability, now)
+        )
+        conn.create_function(
+            "alfred_retention", 3,
+            lambda importance, last_accessed, times_accessed:
+                self._retention_from_fields(importance, last_accessed, times_accessed, now)
+        )
+
+    def _score_candidates(self, cursor, score_name: str, age_column: str,
+                          now: datetime) -> Tuple[str, tuple]:
+        """
+        WHERE clause selecting rows whose score inputs changed since the last run
+
+        A row is a candidate if it was inserted or had an input column updated
+        since the run, or if its age crossed a whole-day boundary (recency decay).
+
+        Returns:
+            (where_sql, params) - "1" (all rows) if the score has never been run
+        """
+        cursor.execute("""
+            SELECT last_run, last_row_id
+            FROM score_runs
+            WHERE score_name = ?
+        """, (score_name,))
+        row = cursor.fetchone()
+
+        if not row:
+            return "1", ()
+
+        last_run, last_row_id = row
+        # Trigger stamps have millisecond precision - truncate so same-ms changes aren't missed
+        changed_since = last_run[:23]
+        where = f"""
+            id > ?
+            OR scores_changed_at >= ?
+            OR CAST(julianday(?) - julianday({age_column}) AS INTEGER)
+               != CAST(julianday(?) - julianday({age_column}) AS INTEGER)
+        """
+        return where, (last_row_id, changed_since, now.isoformat(), last_run)
+
+    def _record_score_run(self, cursor, score_name: str, table: str, now: datetime):
+        """Remember when a score was last recomputed (for incremental runs)"""
+        cursor.execute(f"""
+            INSERT OR REPLACE INTO score_runs (score_name, last_run, last_row_id)
+            VALUES (?, ?, (SELECT COALESCE(MAX(id), 0) FROM {table}))
+        """, (score_name, now.isoformat()))
+
+    def update_priority_scores(self, item_type: str = "all", incremental: bool = False) -> int:
         """
         Update priority scores for all items or specific type
 
+        Scores are recomputed set-based in a single UPDATE per table, using the
+        alfred_priority SQL function.
+
         Args:
             item_type: "conversations", "knowledge", "patterns", or "all"
+            incremental: Only rescore rows whose inputs changed since the last run
 
         Returns:
             Number of items updated
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        updated_count = 0
-        types_to_update = []
+        now = datetime.now()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            self._register_score_functions(conn, now)
 
-        if item_type == "all":
-            types_to_update = ["conversations", "knowledge"]
-        else:
-            types_to_update = [item_type]
+            updated_count = 0
+            types_to_update = []
 
-        for ttype in types_to_update:
-            # Get items to update
-            if ttype == "conversations":
-                cursor.execute("""
-                    SELECT id, timestamp, importance, success, times_accessed, topics
-                    FROM conversations
-                """)
-            elif ttype == "knowledge":
-                cursor.execute("""
-                    SELECT id, timestamp, importance, confidence, times_accessed,
-                           last_accessed, category
-                    FROM knowledge
-                """)
+            if item_type == "all":
+                types_to_update = ["conversations", "knowledge"]
             else:
-                continue
-
-            items = cursor.fetchall()
+                types_to_update = [item_type]
 
-            # Calculate and update scores
-            for item_data in items:
+            for ttype in types_to_update:
                 if ttype == "conversations":
-                    item = {
-                        'id': item_data[0],
-                        'timestamp': item_data[1],
-                        'importance': item_data[2],
-                        'success': item_data[3],
-                        'times_accessed': item_data[4] if item_data[4] else 0,
-                        'confidence': 0.8  # Default for conversations
-                    }
+                    # Conversations have no confidence column - default 0.8
+                    score_sql = """alfred_priority(
+                        importance, 0.8, COALESCE(timestamp, last_accessed),
+                        COALESCE(times_accessed, 0), CASE WHEN success THEN 1.0 ELSE 0.0 END
+                    )"""
                 elif ttype == "knowledge":
-                    item = {
-                        'id': item_data[0],
-                        'timestamp': item_data[1],
-                        'importance': item_data[2],
-                        'confidence': item_data[3],
-                        'times_accessed': item_data[4],
-                        'last_accessed': item_data[5]
-                    }
-
-                new_score = self.calculate_priority_score(item)
-
-                # Update in database
+                    score_sql = """alfred_priority(
+                        importance, confidence, COALESCE(timestamp, last_accessed),
+                        COALESCE(times_accessed, 0), 0.5
+                    )"""
+                else:
+                    continue
+
+                score_name = f"priority:{ttype}"
+                if incremental:
+                    where, params = self._score_candidates(cursor, score_name, "timestamp", now)
+                else:
+                    where, params = "1", ()
+
                 cursor.execute(f"""
                     UPDATE {ttype}
-                    SET priority_score = ?
-                    WHERE id = ?
-                """, (new_score, item['id']))
+                    SET priority_score = {score_sql}
+                    WHERE {where}
+                """, params)
 
-                updated_count += 1
+                updated_count += cursor.rowcount
+                self._record_score_run(cursor, score_name, ttype, now)
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
         print(f"[Brain] Updated priority scores for {updated_count} items")
         return updated_count
@@ -2660,28 +3390,31 @@ class AlfredBrain:
         Returns:
             0.0-1.0 score indicating whether to keep
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT importance, last_accessed, times_accessed
-            FROM conversations
-            WHERE id = ?
-        """, (conversation_id,))
+            cursor.execute("""
+                SELECT importance, last_accessed, times_accessed
+                FROM conversations
+                WHERE id = ?
+            """, (conversation_id,))
 
-        row = cursor.fetchone()
-        conn.close()
+            row = cursor.fetchone()
 
         if not row:
             return 0.0
 
         importance, last_accessed, times_accessed = row
+        return self._retention_from_fields(importance, last_accessed, times_accessed, datetime.now())
 
+    @staticmethod
+    def _retention_from_fields(importance, last_accessed, times_accessed, now: datetime) -> float:
+        """Retention score formula over raw column values (shared with SQL bulk updates)"""
         # Calculate days since last access
         if last_accessed:
             try:
                 last_access_time = datetime.fromisoformat(last_accessed)
-                days_since_access = (datetime.now() - last_access_time).days
+                days_since_access = (now - last_access_time).days
             except:
                 days_since_access = 365  # Default to old
         else:
@@ -2714,17 +3447,16 @@ class AlfredBrain:
         Returns:
             List of clusters (each cluster is list of conversation IDs)
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        cursor.execute("""
-            SELECT id, timestamp
-            FROM conversations
-            ORDER BY timestamp ASC
-        """)
+            cursor.execute("""
+                SELECT id, timestamp
+                FROM conversations
+                ORDER BY timestamp ASC
+            """)
 
-        conversations = cursor.fetchall()
-        conn.close()
+            conversations = cursor.fetchall()
 
         if not conversations:
             return []
@@ -2773,148 +3505,149 @@ class AlfredBrain:
             archive_path: Optional custom archive path
             reason: Reason for archival
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Get conversation data
-        cursor.execute("""
-            SELECT timestamp, user_input, alfred_response, context, models_used,
-                   topics, sentiment, importance, success, execution_time
-            FROM conversations
-            WHERE id = ?
-        """, (conv_id,))
+            # Get conversation data
+            cursor.execute("""
+                SELECT timestamp, user_input, alfred_response, context, models_used,
+                       topics, sentiment, importance, success, execution_time
+                FROM conversations
+                WHERE id = ?
+            """, (conv_id,))
 
-        row = cursor.fetchone()
+            row = cursor.fetchone()
 
-        if not row:
-            conn.close()
-            return
-
-        # Create archive directory
-        archive_dir = self.data_dir / "archives" / "conversations"
-        archive_dir.mkdir(parents=True, exist_ok=True)
-
-        # Generate archive filename
-        if archive_path is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            archive_path = str(archive_dir / f"conv_{conv_id}_{timestamp}.json")
-
-        # Prepare conversation data
-        conv_data = {
-            "id": conv_id,
-            "timestamp": row[0],
-            "user_input": row[1],
-            "alfred_response": row[2],
-            "context": json.loads(row[3]) if row[3] else None,
-            "models_used": json.loads(row[4]) if row[4] else None,
-            "topics": json.loads(row[5]) if row[5] else None,
-            "sentiment": row[6],
-            "importance": row[7],
-            "success": bool(row[8]),
-            "execution_time": row[9],
-            "archived_at": datetime.now().isoformat(),
-            "archive_reason": reason
-        }
+            if not row:
+                return
 
-        # Write to JSON file
-        with open(archive_path, 'w', encoding='utf-8') as f:
-            json.dump(conv_data, f, indent=2, ensure_ascii=False)
+            # Create archive directory
+            archive_dir = self.data_dir / "archives" / "conversations"
+            archive_dir.mkdir(parents=True, exist_ok=True)
 
-        # Record archival in database
-        cursor.execute("""
-            INSERT INTO conversation_archives
-            (archived_at, original_id, archive_path, reason)
-            VALUES (?, ?, ?, ?)
-        """, (datetime.now().isoformat(), conv_id, archive_path, reason))
+            # Generate archive filename
+            if archive_path is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                archive_path = str(archive_dir / f"conv_{conv_id}_{timestamp}.json")
+
+            # Prepare conversation data
+            conv_data = {
+                "id": conv_id,
+                "timestamp": row[0],
+                "user_input": row[1],
+                "alfred_response": row[2],
+                "context": json.loads(row[3]) if row[3] else None,
+                "models_used": json.loads(row[4]) if row[4] else None,
+                "topics": json.loads(row[5]) if row[5] else None,
+                "sentiment": row[6],
+                "importance": row[7],
+                "success": bool(row[8]),
+                "execution_time": row[9],
+                "archived_at": datetime.now().isoformat(),
+                "archive_reason": reason
+            }
+
+            # Write to JSON file
+            with open(archive_path, 'w', encoding='utf-8') as f:
+                json.dump(conv_data, f, indent=2, ensure_ascii=False)
+
+            # Record archival in database
+            cursor.execute("""
+                INSERT INTO conversation_archives
+                (archived_at, original_id, archive_path, reason)
+                VALUES (?, ?, ?, ?)
+            """, (datetime.now().isoformat(), conv_id, archive_path, reason))
 
-        # Delete from conversations table
-        cursor.execute("DELETE FROM conversations WHERE id = ?", (conv_id,))
+            # Delete from conversations table
+            cursor.execute("DELETE FROM conversations WHERE id = ?", (conv_id,))
 
-        conn.commit()
-        conn.close()
+            conn.commit()
 
         print(f"[Brain] Archived conversation {conv_id} to {archive_path}")
 
-    def consolidate_memory_advanced(self, dry_run: bool = False, retention_threshold: float = 0.3) -> Dict:
+    def consolidate_memory_advanced(self, dry_run: bool = False, retention_threshold: float = 0.3,
+                                    incremental: bool = False) -> Dict:
         """
         Advanced consolidation with exponential decay and clustering
 
         Args:
             dry_run: Preview what would be deleted without actually deleting
             retention_threshold: Minimum retention score to keep (0.0-1.0)
+            incremental: Only rescore conversations whose inputs changed since the last run
 
         Returns:
             Statistics about consolidation actions
         """
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        # Step 1: Update retention scores for all conversations
-        cursor.execute("SELECT id FROM conversations")
-        conv_ids = [row[0] for row in cursor.fetchall()]
+        now = datetime.now()
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            self._register_score_functions(conn, now)
 
-        updated_scores = 0
-        for conv_id in conv_ids:
-            retention_score = self.calculate_retention_score(conv_id)
+            # Step 1: Update retention scores (set-based, one statement)
+            if incremental:
+                where, params = self._score_candidates(cursor, "retention:conversations", "last_accessed", now)
+            else:
+                where, params = "1", ()
 
-            cursor.execute("""
+            cursor.execute(f"""
                 UPDATE conversations
-                SET retention_score = ?
-                WHERE id = ?
-            """, (retention_score, conv_id))
-
-            updated_scores += 1
+                SET retention_score = alfred_retention(importance, last_accessed, COALESCE(times_accessed, 0))
+                WHERE {where}
+            """, params)
 
-        if not dry_run:
-            conn.commit()
+            updated_scores = cursor.rowcount
 
-        # Step 2: Identify temporal clusters
-        clusters = self.identify_temporal_clusters(days=7)
+            if not dry_run:
+                self._record_score_run(cursor, "retention:conversations", "conversations", now)
+                conn.commit()
 
-        # Assign cluster IDs
-        for cluster_idx, cluster_conv_ids in enumerate(clusters):
-            for conv_id in cluster_conv_ids:
-                cursor.execute("""
-                    UPDATE conversations
-                    SET cluster_id = ?
-                    WHERE id = ?
-                """, (cluster_idx, conv_id))
+            # Step 2: Identify temporal clusters
+            clusters = self.identify_temporal_clusters(days=7)
 
-        if not dry_run:
-            conn.commit()
+            # Assign cluster IDs
+            cursor.executemany("""
+                UPDATE conversations
+                SET cluster_id = ?
+                WHERE id = ?
+            """, (
+                (cluster_idx, conv_id)
+                for cluster_idx, cluster_conv_ids in enumerate(clusters)
+                for conv_id in cluster_conv_ids
+            ))
 
-        # Step 3: Archive low-retention conversations (with age check)
-        cutoff_date = (datetime.now() - timedelta(days=90)).isoformat()
+            if not dry_run:
+                conn.commit()
 
-        cursor.execute("""
-            SELECT id, retention_score
-            FROM conversations
-            WHERE retention_score < ? AND timestamp < ?
-            ORDER BY retention_score ASC
-        """, (retention_threshold, cutoff_date))
+            # Step 3: Archive low-retention conversations (with age check)
+            cutoff_date = (datetime.now() - timedelta(days=90)).isoformat()
 
-        candidates = cursor.fetchall()
-        archived_count = 0
+            cursor.execute("""
+                SELECT id, retention_score
+                FROM conversations
+                WHERE retention_score < ? AND timestamp < ?
+                ORDER BY retention_score ASC
+            """, (retention_threshold, cutoff_date))
 
-        for conv_id, retention_score in candidates:
-            if not dry_run:
-                self.archive_conversation(conv_id, reason=f"low_retention_{retention_score:.3f}")
-            archived_count += 1
+            candidates = cursor.fetchall()
+            archived_count = 0
 
-        # Step 4: Strengthen frequently accessed knowledge
-        cursor.execute("""
-            UPDATE knowledge
-            SET confidence = MIN(1.0, confidence + 0.1),
-                importance = MIN(10, importance + 1)
-            WHERE times_accessed > 10
-        """)
+            for conv_id, retention_score in candidates:
+                if not dry_run:
+                    self.archive_conversation(conv_id, reason=f"low_retention_{retention_score:.3f}")
+                archived_count += 1
 
-        strengthened = cursor.rowcount
+            # Step 4: Strengthen frequently accessed knowledge
+            cursor.execute("""
+                UPDATE knowledge
+                SET confidence = MIN(1.0, confidence + 0.1),
+                    importance = MIN(10, importance + 1)
+                WHERE times_accessed > 10
+            """)
 
-        if not dry_run:
-            conn.commit()
+            strengthened = cursor.rowcount
 
-        conn.close()
+            if not dry_run:
+                conn.commit()
 
         # Step 5: Smart deduplication with fuzzy matching
         dedup_stats = self.deduplicate_knowledge(
@@ -2958,45 +3691,43 @@ class AlfredBrain:
 
     def get_memory_stats(self) -> Dict:
         """Get comprehensive memory statistics"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-
-        stats = {}
+        with self._connect() as conn:
+            cursor = conn.cursor()
 
-        # Count tables
-        tables = [
-            "conversations", "knowledge", "preferences",
-            "patterns", "skills", "mistakes", "topics"
-        ]
+            stats = {}
 
-        for table in tables:
-            cursor.execute(f"SELECT COUNT(*) FROM {table}")
-            stats[table] = cursor.fetchone()[0]
+            # Count tables
+            tables = [
+                "conversations", "knowledge", "preferences",
+                "patterns", "skills", "mistakes", "topics"
+            ]
 
-        # Additional stats
-        cursor.execute("""
-            SELECT AVG(importance), AVG(success)
-            FROM conversations
-        """)
-        row = cursor.fetchone()
-        stats["avg_importance"] = round(row[0], 2) if row[0] else 0
-        stats["success_rate"] = round(row[1] * 100, 1) if row[1] else 0
+            for table in tables:
+                cursor.execute(f"SELECT COUNT(*) FROM {table}")
+                stats[table] = cursor.fetchone()[0]
 
-        cursor.execute("""
-            SELECT AVG(proficiency)
-            FROM skills
-        """)
-        row = cursor.fetchone()
-        stats["avg_skill_proficiency"] = round(row[0], 2) if row[0] else 0
+            # Additional stats
+            cursor.execute("""
+                SELECT AVG(importance), AVG(success)
+                FROM conversations
+            """)
+            row = cursor.fetchone()
+            stats["avg_importance"] = round(row[0], 2) if row[0] else 0
+            stats["success_rate"] = round(row[1] * 100, 1) if row[1] else 0
 
-        cursor.execute("""
-            SELECT COUNT(*)
-            FROM mistakes
-            WHERE learned = 0
-        """)
-        stats["unlearned_mistakes"] = cursor.fetchone()[0]
+            cursor.execute("""
+                SELECT AVG(proficiency)
+                FROM skills
+            """)
+            row = cursor.fetchone()
+            stats["avg_skill_proficiency"] = round(row[0], 2) if row[0] else 0
 
-        conn.close()
+            cursor.execute("""
+                SELECT COUNT(*)
+                FROM mistakes
+                WHERE learned = 0
+            """)
+            stats["unlearned_mistakes"] = cursor.fetchone()[0]
 
         return stats
 
@@ -0,0 +1,282 @@
+"""
+Conversation Journal - Write-behind storage for Alfred Brain conversations
+Turns are appended to a durable journal and applied to the database in batches
+by a background writer, so the chat hot path never waits on SQLite
+Author: Daniel J Rita (BATDAN)
+"""
+
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, Union
+
+
+class ConversationJournal:
+    """
+    Append-only, crash-safe write-behind queue.
+
+    Key Features:
+    - append() writes one JSON line (flushed, optionally fsynced) and returns
+    - A background writer drains the queue in batches via apply_batch()
+    - apply_batch() records the last applied sequence number in the same
+      transaction as the batch, so replay after a crash is exactly-once
+    - The journal file is truncated whenever everything has been applied
+    - After a failed batch its entries are applied one at a time; an entry
+      that fails max_attempts times is moved to a dead-letter file so it
+      never blocks the turns behind it
+    """
+
+    def __init__(
+        self,
+        path: Union[str, Path],
+        apply_batch: Callable[[List[Dict]], None],
+        applied_seq: int = 0,
+        batch_size: int = 64,
+        flush_interval: float = 0.05,
+        fsync: bool = True,
+        max_attempts: int = 3,
+        dead_letter_path: Optional[Union[str, Path]] = None
+    ):
+        """
+        Initialize journal
+
+        Args:
+            path: Journal file (JSON lines)
+            apply_batch: Called with a list of entries; must persist them together
+                         with the highest entry["seq"] atomically
+            applied_seq: Highest sequence number already persisted
+            batch_size: Max entries applied per transaction
+            flush_interval: Seconds the writer waits to gather a batch
+            fsync: fsync the journal on every append (durable across power loss)
+            max_attempts: Failures before an entry is dead-lettered
+            dead_letter_path: JSON lines file for entries that keep failing
+                              (default: <journal>.dead.jsonl next to the journal)
+        """
+        self.path = Path(path)
+        self.apply_batch = apply_batch
+        self.applied_seq = applied_seq
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.fsync = fsync
+        self.max_attempts = max(1, max_attempts)
+        self.dead_letter_path = (Path(dead_letter_path) if dead_letter_path
+                                 else self.path.with_name(f"{self.path.stem}.dead.jsonl"))
+        self._attempts: Dict[int, int] = {}  # seq -> failed attempts
+
+        self._queue: List[Dict] = []
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._closed = False
+
+        self.stats = {
+            "appended": 0,
+            "applied": 0,
+            "batches": 0,
+            "replayed": 0,
+            "errors": 0,
+            "dead_lettered": 0,
+        }
+
+        # Recover anything written but not applied before the last shutdown
+        pending = self._read_pending()
+        self._seq = max([applied_seq] + [entry["seq"] for entry in pending])
+        self._queue.extend(pending)
+        self.stats["replayed"] = len(pending)
+
+        self._file = open(self.path, "a", encoding="utf-8")
+        if not pending:
+            self._truncate()
+
+        self._writer = threading.Thread(
+            target=self._run, name="brain-journal", daemon=True
+        )
+        self._writer.start()
+
+    def _read_pending(self) -> List[Dict]:
+        """Journal entries newer than applied_seq that were not dead-lettered"""
+        dead = {entry.get("seq") for entry in self._read_lines(self.dead_letter_path)}
+        pending = [
+            entry for entry in self._read_lines(self.path)
+            if entry.get("seq", 0) > self.applied_seq and entry["seq"] not in dead
+        ]
+
+        pending.sort(key=lambda entry: entry["seq"])
+        return pending
+
+    @staticmethod
+    def _read_lines(path: Path) -> List[Dict]:
+        """JSON-object lines of a file (a torn final line is ignored)"""
+        if not path.exists():
+            return []
+
+        entries = []
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                try:
+                    entry = json.loads(line)
+                except ValueError:
+                    continue  # Partially written line from a crash
+                if isinstance(entry, dict):
+                    entries.append(entry)
+        return entries
+
+    def _truncate(self):
+        """Empty the journal file (caller holds the lock or owns the file)"""
+        self._file.seek(0)
+        self._file.truncate()
+        self._file.flush()
+
+    def append(self, entry: Dict) -> int:
+        """
+        Durably queue an entry
+
+        Args:
+            entry: JSON-serializable dict (a "seq" key is assigned)
+
+        Returns:
+            Sequence number of the entry
+        """
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Conversation journal is closed")
+
+            self._seq += 1
+            entry = dict(entry, seq=self._seq)
+
+            self._file.write(json.dumps(entry) + "\n")
+            self._file.flush()
+            if self.fsync:
+                os.fsync(self._file.fileno())
+
+            self._queue.append(entry)
+            self.stats["appended"] += 1
+            self._cond.notify_all()
+            return entry["seq"]
+
+    def _run(self):
+        """Background writer: apply queued entries in batches"""
+        while True:
+            with self._cond:
+                while not self._queue and not self._closed:
+                    self._cond.wait()
+                if not self._queue and self._closed:
+                    return
+
+                # Give concurrent turns a moment to join the batch
+                if len(self._queue) < self.batch_size and not self._closed:
+                    self._cond.wait(self.flush_interval)
+
+                batch = self._queue[:self.batch_size]
+                del self._queue[:self.batch_size]
+                self._in_flight = len(batch)
+
+            done, dead = self._apply(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                if done:
+                    self.applied_seq = batch[done - 1]["seq"]
+                    self.stats["applied"] += done - dead
+                    self.stats["dead_lettered"] += dead
+                    self.stats["batches"] += 1
+                if done < len(batch):
+                    self.stats["errors"] += 1
+                    self._queue[:0] = batch[done:]
+                elif not self._queue:
+                    self._truncate()
+                self._cond.notify_all()
+
+            if done < len(batch):
+                # Back off so a persistent failure doesn't spin (attempts are
+                # bounded, so close() still drains)
+                with self._cond:
+                    self._cond.wait(max(self.flush_interval, 0.5))
+
+    def _apply(self, batch: List[Dict]) -> Tuple[int, int]:
+        """
+        Apply a batch; if it fails, apply its entries one at a time
+
+        Returns:
+            (leading entries applied or dead-lettered, how many were dead-lettered)
+        """
+        try:
+            self.apply_batch(batch)
+            for entry in batch:
+                self._attempts.pop(entry["seq"], None)
+            return len(batch), 0
+        except Exception as e:
+            if len(batch) > 1:
+                print(f"[Brain] Journal batch failed, applying entries one at a time: {e}")
+
+        done = dead = 0
+        for entry in batch:
+            try:
+                self.apply_batch([entry])
+                self._attempts.pop(entry["seq"], None)
+            except Exception as e:
+                attempts = self._attempts.get(entry["seq"], 0) + 1
+                if attempts < self.max_attempts:
+                    self._attempts[entry["seq"]] = attempts
+                    print(f"[Brain] Journal entry {entry['seq']} failed (attempt {attempts}), will retry: {e}")
+                    return done, dead
+                self._attempts.pop(entry["seq"], None)
+                self._dead_letter(entry, e)
+                dead += 1
+            done += 1
+        return done, dead
+
+    def _dead_letter(self, entry: Dict, error: Exception):
+        """Set aside an entry that keeps failing (kept for inspection, skipped on replay)"""
+        print(f"[Brain] Journal entry {entry['seq']} failed {self.max_attempts} times, "
+              f"moved to {self.dead_letter_path.name}: {error}")
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(dict(entry, error=str(error))) + "\n")
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+
+    def pending(self) -> int:
+        """Entries appended but not yet applied"""
+        with self._cond:
+            return len(self._queue) + self._in_flight
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until every entry appended so far has been applied
+
+        Args:
+            timeout: Max seconds to wait (None waits indefinitely)
+
+        Returns:
+            True if the queue drained, False on timeout
+        """
+        with self._cond:
+            target = self._seq
+            self._cond.notify_all()
+            return self._cond.wait_for(
+                lambda: self.applied_seq >= target or not self._writer.is_alive(),
+                timeout
+            ) and self.applied_seq >= target
+
+    def close(self, timeout: Optional[float] = None):
+        """Drain the queue, stop the writer and close the journal file"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+
+        self._writer.join(timeout)
+
+        with self._cond:
+            self._file.close()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get journal statistics"""
+        with self._cond:
+            return {
+                **self.stats,
+                "pending": len(self._queue) + self._in_flight,
+                "applied_seq": self.applied_seq,
+            }
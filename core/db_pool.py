@@ -0,0 +1,228 @@
+"""
+DB Pool - Pooled SQLite connections for Alfred Brain
+Keeps one tuned, long-lived connection per thread instead of connect-per-call
+Author: Daniel J Rita (BATDAN)
+"""
+
+import sqlite3
+import threading
+from pathlib import Path
+from typing import Dict, Optional, Union
+
+
+# Applied to every pooled connection when it is first opened.
+# journal_mode=WAL is persistent in the database file; the rest are per-connection.
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",      # Safe with WAL, avoids an fsync per commit
+    "mmap_size": 268435456,       # 256MB memory-mapped reads
+    "cache_size": -16000,         # ~16MB page cache (negative = KiB)
+    "temp_store": "MEMORY",
+    "busy_timeout": 5000,         # ms to wait on a locked database
+    "foreign_keys": "OFF",
+}
+
+
+class PooledConnection:
+    """
+    Lightweight handle to a thread's pooled sqlite3 connection.
+
+    Behaves like a sqlite3.Connection, except close() returns the connection
+    to the pool. Uncommitted work is rolled back when the outermost handle is
+    closed, matching the semantics of closing a private connection.
+
+    Use it as a context manager (`with brain._connect() as conn:`) so the
+    handle is released even when the block raises; leaving the block does
+    not commit. A handle that is never closed is released when it is
+    garbage collected.
+    """
+
+    __slots__ = ("_pool", "_state", "_conn", "_closed")
+
+    def __init__(self, pool: "BrainConnectionPool", state: "_ThreadState"):
+        self._pool = pool
+        self._state = state
+        self._conn = state.conn
+        self._closed = False
+
+    def cursor(self) -> sqlite3.Cursor:
+        return self._conn.cursor()
+
+    def execute(self, sql: str, parameters=()) -> sqlite3.Cursor:
+        return self._conn.execute(sql, parameters)
+
+    def executemany(self, sql: str, seq_of_parameters) -> sqlite3.Cursor:
+        return self._conn.executemany(sql, seq_of_parameters)
+
+    def commit(self):
+        self._conn.commit()
+
+    def rollback(self):
+        self._conn.rollback()
+
+    def close(self):
+        """Release the handle back to the pool (does not close the socket/file)"""
+        if not self._closed:
+            self._closed = True
+            self._pool._release(self._state)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def __del__(self):
+        # Last resort for handles abandoned by an exception between acquire and close
+        try:
+            self.close()
+        except Exception:
+            pass
+
+
+class _ThreadState:
+    """A thread's pooled connection and how many handles to it are open"""
+
+    __slots__ = ("conn", "depth", "thread", "lock")
+
+    def __init__(self, conn: sqlite3.Connection):
+        self.conn = conn
+        self.depth = 0
+        self.thread = threading.current_thread()
+        self.lock = threading.Lock()
+
+
+class BrainConnectionPool:
+    """
+    Per-thread SQLite connection pool with WAL journaling and tuned pragmas.
+
+    Key Features:
+    - One connection per thread, reused across calls (no connect/close per method)
+    - WAL journaling so readers never block the writer
+    - Larger prepared-statement cache so hot queries are compiled once
+    - Re-entrant: nested acquire() calls in the same thread share the connection
+    - Connections of threads that have exited are closed on the next open
+    """
+
+    def __init__(
+        self,
+        db_path: Union[str, Path],
+        pragmas: Optional[Dict[str, Union[str, int]]] = None,
+        cached_statements: int = 256,
+        timeout: float = 5.0
+    ):
+        """
+        Initialize connection pool
+
+        Args:
+            db_path: Path to SQLite database
+            pragmas: PRAGMA overrides (merged over DEFAULT_PRAGMAS)
+            cached_statements: Prepared statements cached per connection
+            timeout: Seconds to wait for a database lock
+        """
+        self.db_path = str(db_path)
+        self.pragmas = dict(DEFAULT_PRAGMAS)
+        if pragmas:
+            self.pragmas.update(pragmas)
+        self.cached_statements = cached_statements
+        self.timeout = timeout
+
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._connections: Dict[int, _ThreadState] = {}
+
+        self.stats = {
+            "connections_opened": 0,
+            "connections_reaped": 0,
+            "acquires": 0,
+        }
+
+    def _open(self) -> _ThreadState:
+        """Open and configure a new connection for the current thread"""
+        conn = sqlite3.connect(
+            self.db_path,
+            timeout=self.timeout,
+            cached_statements=self.cached_statements,
+            check_same_thread=False  # Pool guarantees per-thread use; allows close_all()
+        )
+
+        for name, value in self.pragmas.items():
+            try:
+                conn.execute(f"PRAGMA {name} = {value}")
+            except sqlite3.DatabaseError:
+                pass  # Unsupported pragma on this build - keep defaults
+
+        state = _ThreadState(conn)
+        with self._lock:
+            dead = self._reap_dead_threads()
+            self._connections[id(state)] = state
+            self.stats["connections_opened"] += 1
+
+        for old in dead:
+            self._close_quietly(old.conn)
+
+        return state
+
+    def _reap_dead_threads(self) -> list:
+        """Drop states whose thread has exited (caller holds _lock and closes them)"""
+        dead = [key for key, state in self._connections.items() if not state.thread.is_alive()]
+        self.stats["connections_reaped"] += len(dead)
+        return [self._connections.pop(key) for key in dead]
+
+    @staticmethod
+    def _close_quietly(conn: sqlite3.Connection):
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+    def acquire(self) -> PooledConnection:
+        """Get a handle to this thread's connection (opening it on first use)"""
+        local = self._local
+        state = getattr(local, "state", None)
+        if state is None:
+            state = self._open()
+            local.state = state
+
+        with state.lock:
+            state.depth += 1
+        self.stats["acquires"] += 1
+        return PooledConnection(self, state)
+
+    def _release(self, state: _ThreadState):
+        """Return a handle; roll back stray work once the outermost caller is done"""
+        with state.lock:
+            state.depth = max(0, state.depth - 1)
+            if state.depth > 0:
+                return
+            try:
+                if state.conn.in_transaction:
+                    state.conn.rollback()
+            except sqlite3.ProgrammingError:
+                pass  # Already closed by close_all()
+
+    def close_all(self):
+        """Close every pooled connection (call on shutdown)"""
+        with self._lock:
+            states = list(self._connections.values())
+            self._connections.clear()
+
+        for state in states:
+            self._close_quietly(state.conn)
+
+        self._local = threading.local()
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get pool statistics"""
+        with self._lock:
+            for state in self._reap_dead_threads():
+                self._close_quietly(state.conn)
+            open_connections = len(self._connections)
+        return {
+            **self.stats,
+            "open_connections": open_connections,
+        }
@@ -0,0 +1,209 @@
+"""
+Knowledge Extractor - Precompiled single-pass knowledge extraction for Alfred Brain
+Patterns are compiled once and guarded by a combined-alternation prefilter, so
+most conversation turns are rejected with a single regex scan
+Author: Daniel J Rita (BATDAN)
+"""
+
+import re
+from collections import namedtuple
+from typing import Dict, FrozenSet, Iterable, List, Optional, Tuple
+
+
+# How a rule's pattern is applied to the text
+LOWER = "lower"          # Search the lower-cased text
+IGNORECASE = "icase"     # Case-insensitive search of the original text (keeps value casing)
+EXACT = "exact"          # Case-sensitive search of the original text
+
+ExtractionRule = namedtuple(
+    "ExtractionRule", ["category", "key", "pattern", "importance", "confidence", "mode"]
+)
+
+
+# Ordered as the extraction passes ran historically:
+# preferences, facts, learning goals, habits, expertise, relationships, context
+EXTRACTION_RULES = [
+    # ---- user_preferences ----
+    ExtractionRule("user_preferences", "preference", r"i (?:prefer|like|want|need) (.+)", 7, 1.0, LOWER),
+    ExtractionRule("user_preferences", "preference", r"my (?:favorite|preferred) (.+) is (.+)", 7, 1.0, LOWER),
+    ExtractionRule("user_preferences", "dislike", r"i (?:don't|do not) like (.+)", 7, 1.0, LOWER),
+    ExtractionRule("user_preferences", "habit", r"i (?:always|usually|typically|normally) (.+)", 7, 0.8, LOWER),
+    ExtractionRule("user_preferences", "tendency", r"i tend to (.+)", 7, 0.7, LOWER),
+    ExtractionRule("user_preferences", "preference_comparison", r"i'd rather (.+) than (.+)", 7, 0.9, LOWER),
+    ExtractionRule("user_preferences", "standing_request", r"(?:can you|please) (?:always|remember to) (.+)", 7, 1.0, LOWER),
+    ExtractionRule("user_preferences", "strong_preference", r"i (?:hate|love|enjoy) (.+)", 7, 1.0, LOWER),
+    ExtractionRule("user_preferences", "aversion", r"(?:never|don't ever) (.+)", 7, 1.0, LOWER),
+
+    # ---- user_info ----
+    ExtractionRule("user_info", "user_name", r"(?:my name is|i'm|i am) ([A-Z][a-z]+(?: [A-Z][a-z]+)*)", 9, 1.0, IGNORECASE),
+    ExtractionRule("user_info", "user_location", r"i live in ([A-Z][a-z]+(?: [A-Z][a-z]+)*)", 8, 1.0, IGNORECASE),
+    ExtractionRule("user_info", "user_occupation", r"i work (?:as|at) (.+)", 8, 1.0, IGNORECASE),
+    ExtractionRule("user_info", "user_email", r"my (?:email|email address) is ([\w\.-]+@[\w\.-]+)", 9, 1.0, IGNORECASE),
+    ExtractionRule("user_info", "user_phone", r"my (?:phone|number) is ([\d\-\(\) ]+)", 8, 0.9, IGNORECASE),
+    ExtractionRule("user_info", "user_age", r"i'm (\d+) years old", 7, 1.0, IGNORECASE),
+    ExtractionRule("user_info", "user_languages", r"i speak ([A-Z][a-z]+(?: and [A-Z][a-z]+)*)", 7, 0.9, IGNORECASE),
+    ExtractionRule("user_info", "user_education", r"i (?:graduated from|studied at) ([A-Z][a-z\s]+)", 7, 0.9, IGNORECASE),
+    ExtractionRule("user_info", "user_experience", r"i've been (?:working|doing) (.+) for (\d+) (?:years|months)", 8, 0.9, IGNORECASE),
+    ExtractionRule("user_info", "user_tools", r"i use ([A-Z][a-zA-Z0-9\s]+) (?:for|to) (.+)", 6, 0.8, IGNORECASE),
+    ExtractionRule("user_info", "user_timezone", r"my timezone is ([A-Z]{3,})", 8, 1.0, IGNORECASE),
+    ExtractionRule("user_info", "user_location_detailed", r"i'm (?:located in|based in|from) (.+)", 8, 0.9, IGNORECASE),
+
+    # ---- learning_goals ----
+    ExtractionRule("learning_goals", "learning_goal", r"i want to learn (?:about |how to )?(.+)", 8, 0.9, LOWER),
+    ExtractionRule("learning_goals", "learning_goal", r"i'm trying to (?:learn|understand|master) (.+)", 8, 0.9, LOWER),
+    ExtractionRule("learning_goals", "learning_request", r"(?:teach me|help me learn|show me) (.+)", 8, 0.9, LOWER),
+    ExtractionRule("learning_goals", "learning_need", r"i need to (?:learn|understand|know) (.+)", 8, 0.9, LOWER),
+    ExtractionRule("learning_goals", "aspiration", r"i'd like to become (.+)", 7, 0.8, LOWER),
+    ExtractionRule("learning_goals", "goal", r"my goal is to (.+)", 8, 1.0, LOWER),
+
+    # ---- user_habits ----
+    ExtractionRule("user_habits", "habit", r"i (?:always|usually|typically|normally) (.+)", 7, 0.8, LOWER),
+    ExtractionRule("user_habits", "routine", r"every (?:day|morning|evening|week) i (.+)", 7, 0.9, LOWER),
+    ExtractionRule("user_habits", "tendency", r"i (?:tend to|often) (.+)", 6, 0.7, LOWER),
+    ExtractionRule("user_habits", "characteristic", r"i'm (?:usually|typically|generally) (.+)", 6, 0.7, LOWER),
+    ExtractionRule("user_habits", "rare_behavior", r"i rarely (.+)", 6, 0.8, LOWER),
+    ExtractionRule("user_habits", "avoidance", r"i never (.+)", 7, 0.9, LOWER),
+
+    # ---- user_expertise ----
+    ExtractionRule("user_expertise", "expertise", r"i'm (?:experienced in|an expert in|skilled in|good at) (.+)", 8, 0.9, LOWER),
+    ExtractionRule("user_expertise", "knowledge_area", r"i (?:know|understand) (.+) (?:well|very well)", 7, 0.8, LOWER),
+    ExtractionRule("user_expertise", "specialization", r"i specialize in (.+)", 9, 1.0, LOWER),
+    ExtractionRule("user_expertise", "long_term_skill", r"i've (?:worked with|used) (.+) for (?:\d+) (?:years|months)", 8, 0.9, LOWER),
+    ExtractionRule("user_expertise", "skill_gap", r"i'm (?:not good at|weak in|bad at) (.+)", 7, 0.9, LOWER),
+    ExtractionRule("user_expertise", "developing_skill", r"i'm learning (.+)", 6, 0.8, LOWER),
+
+    # ---- user_relationships ----
+    ExtractionRule("user_relationships", "colleague", r"my (?:colleague|coworker|teammate) ([A-Z][a-z]+)", 6, 0.8, EXACT),
+    ExtractionRule("user_relationships", "team", r"(?:working with|working on) the ([A-Z][a-zA-Z\s]+) team", 7, 0.9, EXACT),
+    ExtractionRule("user_relationships", "manager", r"my (?:boss|manager|supervisor) ([A-Z][a-z]+)", 7, 0.9, EXACT),
+    ExtractionRule("user_relationships", "company", r"i work (?:at|for) ([A-Z][a-zA-Z0-9\s]+)", 8, 1.0, EXACT),
+    ExtractionRule("user_relationships", "personal_contact", r"my (?:friend|partner) ([A-Z][a-z]+)", 5, 0.8, EXACT),
+
+    # ---- user_context ----
+    ExtractionRule("user_context", "work_hours", r"i work (?:from |)(\d+(?:am|pm)) to (\d+(?:am|pm))", 8, 0.9, LOWER),
+    ExtractionRule("user_context", "productivity_time", r"i'm (?:most productive|at my best) (?:in the |during the |)(\w+)", 7, 0.8, LOWER),
+    ExtractionRule("user_context", "work_time_preference", r"i prefer (?:to work|working) (?:in the |during the |)(\w+)", 7, 0.8, LOWER),
+    ExtractionRule("user_context", "timezone", r"i'm in (?:the |)([A-Z]{3,}|UTC[+-]\d+) (?:timezone|time zone)", 9, 1.0, LOWER),
+    ExtractionRule("user_context", "break_pattern", r"i take breaks (?:every |)(\d+) (?:minutes|hours)", 6, 0.7, LOWER),
+]
+
+# Applied to the lower-cased user input
+CORRECTION_PATTERNS = [
+    r"actually,? (?:it's|i meant|i said) (.+)",
+    r"(?:no|nope),? (?:it's|i meant) (.+)",
+    r"(?:sorry|my bad),? (?:it's|i meant) (.+)",
+    r"correction:? (.+)",
+    r"i meant to say (.+)",
+]
+
+
+def _union(patterns: Iterable[str], flags: int = 0) -> "re.Pattern":
+    """Compile patterns into a single alternation (used only to test for any match)"""
+    return re.compile("|".join(f"(?:{pattern})" for pattern in patterns), flags)
+
+
+class KnowledgeExtractor:
+    """
+    Single-pass knowledge extractor.
+
+    Key Features:
+    - Every pattern compiled once at construction
+    - Text lower-cased once per call, not once per pattern
+    - Combined-alternation prefilter per matching mode: texts that match no
+      rule are rejected after one scan, without running individual patterns
+    """
+
+    def __init__(self, rules: Optional[List[ExtractionRule]] = None,
+                 correction_patterns: Optional[List[str]] = None):
+        """
+        Initialize extractor
+
+        Args:
+            rules: Extraction rules (default: EXTRACTION_RULES)
+            correction_patterns: Correction patterns (default: CORRECTION_PATTERNS)
+        """
+        self.rules = list(rules if rules is not None else EXTRACTION_RULES)
+        self._compiled = [
+            (rule, re.compile(rule.pattern, re.IGNORECASE if rule.mode == IGNORECASE else 0))
+            for rule in self.rules
+        ]
+
+        corrections = correction_patterns if correction_patterns is not None else CORRECTION_PATTERNS
+        self._corrections = [re.compile(pattern) for pattern in corrections]
+        self._corrections_prefilter = _union(corrections)
+
+        self._prefilters: Dict[Tuple[str, Optional[FrozenSet[str]]], "re.Pattern"] = {}
+
+    def _prefilter(self, mode: str, categories: Optional[FrozenSet[str]]) -> "re.Pattern":
+        """Combined alternation over every rule with this mode (and category subset)"""
+        cache_key = (mode, categories)
+        prefilter = self._prefilters.get(cache_key)
+        if prefilter is None:
+            patterns = [
+                rule.pattern for rule in self.rules
+                if rule.mode == mode and (categories is None or rule.category in categories)
+            ]
+            prefilter = _union(patterns, re.IGNORECASE if mode == IGNORECASE else 0)
+            self._prefilters[cache_key] = prefilter
+        return prefilter
+
+    def extract(self, text: str,
+                categories: Optional[Iterable[str]] = None) -> List[Tuple[str, str, str, int, float]]:
+        """
+        Extract knowledge from text
+
+        Args:
+            text: Text to scan
+            categories: Restrict to these categories (None for all)
+
+        Returns:
+            List of (category, key, value, importance, confidence) in rule order
+        """
+        if not text:
+            return []
+
+        categories = frozenset(categories) if categories is not None else None
+        lowered = text.lower()
+        subjects = {LOWER: lowered, IGNORECASE: text, EXACT: text}
+        mode_passes: Dict[str, bool] = {}
+
+        results = []
+        for rule, regex in self._compiled:
+            if categories is not None and rule.category not in categories:
+                continue
+
+            subject = subjects[rule.mode]
+            passes = mode_passes.get(rule.mode)
+            if passes is None:
+                passes = bool(self._prefilter(rule.mode, categories).search(subject))
+                mode_passes[rule.mode] = passes
+            if not passes:
+                continue
+
+            match = regex.search(subject)
+            if match:
+                results.append((
+                    rule.category,
+                    rule.key,
+                    match.group(1).strip(),
+                    rule.importance,
+                    rule.confidence
+                ))
+
+        return results
+
+    def extract_corrections(self, text: str) -> List[str]:
+        """Corrected values stated in user input (one per matching pattern)"""
+        if not text:
+            return []
+
+        lowered = text.lower()
+        if not self._corrections_prefilter.search(lowered):
+            return []
+
+        values = []
+        for regex in self._corrections:
+            match = regex.search(lowered)
+            if match:
+                values.append(match.group(1).strip())
+        return values
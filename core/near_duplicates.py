@@ -0,0 +1,186 @@
+"""
+Near Duplicates - Candidate generation and bounded similarity for knowledge dedup
+MinHash/LSH blocking so only plausible pairs reach the exact edit-distance check
+Author: Daniel J Rita (BATDAN)
+"""
+
+import random
+import zlib
+from collections import defaultdict
+from typing import Dict, Hashable, Iterable, List, Optional, Set, Tuple
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+
+_MERSENNE_PRIME = (1 << 61) - 1
+_MAX_HASH = (1 << 32) - 1
+
+# Coefficients stay below 2**32: with 32-bit shingle hashes a * h + b then fits
+# in a uint64, so the NumPy path never wraps and matches the pure-Python one
+_MAX_COEFFICIENT = 1 << 32
+
+
+def bounded_levenshtein(s1: str, s2: str, max_distance: int) -> int:
+    """
+    Edit distance with early exit once it must exceed max_distance
+
+    Only the diagonal band of width 2*max_distance+1 is computed, and the scan
+    stops as soon as a whole row exceeds the bound.
+
+    Returns:
+        The exact distance if <= max_distance, otherwise max_distance + 1
+    """
+    if s1 == s2:
+        return 0
+    if max_distance < 0:
+        return max_distance + 1
+
+    if len(s1) < len(s2):
+        s1, s2 = s2, s1
+
+    n1, n2 = len(s1), len(s2)
+    over = max_distance + 1
+
+    if n1 - n2 > max_distance:
+        return over
+    if n2 == 0:
+        return n1
+
+    previous_row = [j if j <= max_distance else over for j in range(n2 + 1)]
+
+    for i in range(1, n1 + 1):
+        c1 = s1[i - 1]
+        lo = max(1, i - max_distance)
+        hi = min(n2, i + max_distance)
+
+        current_row = [over] * (n2 + 1)
+        current_row[0] = i if i <= max_distance else over
+        row_min = current_row[0]
+
+        for j in range(lo, hi + 1):
+            # Cost of insertions, deletions, or substitutions
+            value = min(
+                previous_row[j] + 1,
+                current_row[j - 1] + 1,
+                previous_row[j - 1] + (c1 != s2[j - 1])
+            )
+            if value > over:
+                value = over
+            current_row[j] = value
+            if value < row_min:
+                row_min = value
+
+        if row_min > max_distance:
+            return over
+
+        previous_row = current_row
+
+    return min(previous_row[n2], over)
+
+
+def shingles(text: str, size: int = 3) -> Set[str]:
+    """Character n-gram shingles of a lower-cased string"""
+    text = " ".join(text.lower().split())
+    if len(text) <= size:
+        return {text}
+    return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+
+class MinHashLSH:
+    """
+    MinHash signatures with banded locality-sensitive hashing.
+
+    Items whose shingle sets have Jaccard similarity above roughly
+    (1 / bands) ** (1 / rows) land in a shared bucket with high probability;
+    everything else is never compared.
+    """
+
+    def __init__(self, num_perm: int = 64, bands: int = 16, seed: int = 1):
+        """
+        Initialize LSH index
+
+        Args:
+            num_perm: Number of hash permutations per signature
+            bands: Number of bands (num_perm must divide evenly)
+            seed: Seed for the permutation coefficients
+        """
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+
+        rng = random.Random(seed)
+        self._a = [rng.randrange(1, _MAX_COEFFICIENT) for _ in range(num_perm)]
+        self._b = [rng.randrange(0, _MAX_COEFFICIENT) for _ in range(num_perm)]
+
+        if NUMPY_AVAILABLE:
+            self._a_np = np.array(self._a, dtype=np.uint64)[:, None]
+            self._b_np = np.array(self._b, dtype=np.uint64)[:, None]
+
+        self._buckets: Dict[Tuple, List[Hashable]] = defaultdict(list)
+
+    def signature(self, items: Iterable[str]) -> Tuple[int, ...]:
+        """Compute the MinHash signature of a shingle set"""
+        hashes = [zlib.crc32(item.encode("utf-8")) for item in items] or [0]
+
+        if NUMPY_AVAILABLE:
+            values = np.array(hashes, dtype=np.uint64)[None, :]
+            permuted = (self._a_np * values + self._b_np) % np.uint64(_MERSENNE_PRIME)
+            return tuple((permuted & np.uint64(_MAX_HASH)).min(axis=1).tolist())
+
+        return tuple(
+            min(((a * h + b) % _MERSENNE_PRIME) & _MAX_HASH for h in hashes)
+            for a, b in zip(self._a, self._b)
+        )
+
+    def add(self, key: Hashable, items: Iterable[str]):
+        """Insert an item into the band buckets"""
+        signature = self.signature(items)
+        for band in range(self.bands):
+            start = band * self.rows
+            self._buckets[(band,) + signature[start:start + self.rows]].append(key)
+
+    def candidate_pairs(self) -> Set[Tuple[Hashable, Hashable]]:
+        """All pairs of keys that share at least one bucket"""
+        pairs = set()
+        for members in self._buckets.values():
+            if len(members) < 2:
+                continue
+            for i in range(len(members)):
+                for j in range(i + 1, len(members)):
+                    a, b = members[i], members[j]
+                    pairs.add((a, b) if a < b else (b, a))
+        return pairs
+
+
+def bounded_similarity(s1: str, s2: str, min_similarity: float) -> Optional[float]:
+    """
+    Normalized edit similarity (1 - distance / max_len), or None if below min_similarity
+
+    Mirrors AlfredBrain.calculate_knowledge_similarity's per-field formula.
+    """
+    if s1 == s2:
+        return 1.0
+
+    max_len = max(len(s1), len(s2))
+    if max_len == 0:
+        return 0.0 if min_similarity <= 0.0 else None
+
+    if min_similarity <= 0.0:
+        max_distance = max_len
+    else:
+        # Small epsilon so float rounding never rejects a qualifying pair
+        max_distance = int((1.0 - min_similarity) * max_len + 1e-9)
+
+    distance = bounded_levenshtein(s1, s2, max_distance)
+    if distance > max_distance:
+        return None
+
+    similarity = 1.0 - (distance / max_len)
+    return similarity if similarity >= min_similarity - 1e-9 else None
@@ -0,0 +1,311 @@
+"""
+Sync Batch Receiver - Resumable batched uploads from edge devices
+A batch is a compressed JSON-lines payload uploaded in parts at explicit
+offsets; once complete it is ingested into the brain in one transaction
+Author: Daniel J Rita (BATDAN)
+"""
+
+import base64
+import json
+import re
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+# Device and batch identifiers double as spool file names
+_ID_RE = re.compile(r"^[\w.-]{1,64}$")
+
+# Knowledge importance for site observations by severity
+SEVERITY_IMPORTANCE = {"info": 5, "warning": 7, "critical": 9}
+
+# Text fields a record of each kind must carry (as in the /sync/upload models)
+REQUIRED_FIELDS = {
+    "conversation": ("user_input", "alfred_response"),
+    "knowledge": ("category", "key", "value")
+}
+
+
+def decode_batch(payload: bytes, encoding: str = "zlib") -> List[Dict]:
+    """
+    Decode a batch payload into records
+
+    Args:
+        payload: Complete batch bytes
+        encoding: 'zlib' (deflate with zlib header) or 'identity'
+
+    Returns:
+        One dict per non-empty line
+
+    Raises:
+        ValueError: Unknown encoding or corrupt payload
+    """
+    if encoding == "zlib":
+        try:
+            payload = zlib.decompress(payload)
+        except zlib.error as e:
+            raise ValueError(f"Corrupt batch: {e}")
+    elif encoding != "identity":
+        raise ValueError(f"Unknown batch encoding: {encoding}")
+
+    records = []
+    for line in payload.splitlines():
+        if line.strip():
+            record = json.loads(line)
+            if not isinstance(record, dict):
+                raise ValueError("Batch records must be JSON objects")
+            records.append(record)
+    return records
+
+
+class BatchReceiver:
+    """
+    Server side of the edge batch protocol.
+
+    Key Features:
+    - Parts are appended to a spool file only at the offset already
+      received, so an interrupted upload resumes where it stopped
+    - A completed batch is ingested with AlfredBrain.ingest_batch (one
+      transaction, recorded under the batch key)
+    - Re-sending a batch that was already ingested returns the original
+      acknowledgement instead of storing it twice
+    """
+
+    def __init__(
+        self,
+        brain,
+        spool_dir: Optional[Union[str, Path]] = None,
+        max_batch_bytes: int = 32 * 1024 * 1024,
+        spool_ttl: float = 24 * 60 * 60
+    ):
+        """
+        Initialize receiver
+
+        Args:
+            brain: AlfredBrain to ingest into
+            spool_dir: Partial uploads and voice audio (default: <brain data dir>/sync_spool)
+            max_batch_bytes: Largest accepted batch payload
+            spool_ttl: Seconds before an abandoned partial upload is deleted
+        """
+        self.brain = brain
+        self.spool_dir = Path(spool_dir) if spool_dir else Path(brain.data_dir) / "sync_spool"
+        self.audio_dir = self.spool_dir.parent / "edge_audio"
+        self.max_batch_bytes = max_batch_bytes
+        self.spool_ttl = spool_ttl
+        self._lock = threading.Lock()
+
+        self.spool_dir.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def _check_id(value: str, name: str) -> str:
+        if not _ID_RE.match(value or ""):
+            raise ValueError(f"Invalid {name}: {value!r}")
+        return value
+
+    def _spool_path(self, device_id: str, batch_id: str) -> Path:
+        self._check_id(device_id, "device_id")
+        self._check_id(batch_id, "batch_id")
+        return self.spool_dir / f"{device_id}__{batch_id}.part"
+
+    def status(self, device_id: str, batch_id: str) -> Dict[str, Any]:
+        """Bytes received so far for a batch (complete=True once ingested)"""
+        path = self._spool_path(device_id, batch_id)
+        done = self.brain.get_sync_batch(f"{device_id}:{batch_id}")
+        if done is not None:
+            return {"success": True, "complete": True, "duplicate": True, **done}
+        return {"success": True, "complete": False, "received": path.stat().st_size if path.exists() else 0}
+
+    def receive(
+        self,
+        device_id: str,
+        batch_id: str,
+        offset: int,
+        total: int,
+        data: bytes,
+        encoding: str = "zlib"
+    ) -> Dict[str, Any]:
+        """
+        Accept one part of a batch
+
+        Args:
+            device_id: Uploading device
+            batch_id: Batch identifier (stable across retries)
+            offset: Byte offset of this part within the batch
+            total: Size of the complete batch payload
+            data: Part bytes
+            encoding: Batch payload encoding (see decode_batch)
+
+        Returns:
+            {"success", "received"} while incomplete; with "complete" and the
+            ingest result once the last part arrives. A part at the wrong
+            offset is rejected with the offset the sender should resume at.
+
+        Raises:
+            ValueError: Invalid identifiers, sizes or records (the partial
+                upload is discarded)
+        """
+        path = self._spool_path(device_id, batch_id)
+        batch_key = f"{device_id}:{batch_id}"
+        if not 0 < total <= self.max_batch_bytes:
+            raise ValueError(f"Batch size out of range: {total}")
+
+        with self._lock:
+            done = self.brain.get_sync_batch(batch_key)
+            if done is not None:
+                # Acknowledgement was lost; the batch is already stored
+                return {"success": True, "complete": True, "received": total, "duplicate": True, **done}
+
+            if offset == 0:
+                self._purge_stale()
+
+            received = path.stat().st_size if path.exists() else 0
+            if offset != received:
+                return {"success": False, "received": received, "error": "Offset mismatch"}
+            if received + len(data) > total:
+                path.unlink(missing_ok=True)
+                raise ValueError("Part overruns the declared batch size")
+
+            with open(path, "ab") as f:
+                f.write(data)
+            received += len(data)
+            if received < total:
+                return {"success": True, "received": received}
+
+            payload = path.read_bytes()
+            try:
+                records = decode_batch(payload, encoding)
+            except ValueError as e:
+                path.unlink(missing_ok=True)
+                return {"success": False, "received": 0, "error": str(e)}
+
+            try:
+                conversations, knowledge, item_ids = self.to_brain_records(records, device_id)
+            except ValueError:
+                # Re-sending the same batch cannot succeed
+                path.unlink(missing_ok=True)
+                raise
+            result = self.brain.ingest_batch(conversations, knowledge, batch_key=batch_key,
+                                             item_ids=item_ids, origin=device_id)
+            path.unlink(missing_ok=True)
+
+        return {"success": True, "complete": True, "received": total, **result}
+
+    def _purge_stale(self):
+        cutoff = time.time() - self.spool_ttl
+        for part in self.spool_dir.glob("*.part"):
+            try:
+                if part.stat().st_mtime < cutoff:
+                    part.unlink()
+            except OSError:
+                pass
+
+    # ==================== RECORD MAPPING ====================
+
+    def to_brain_records(self, records: List[Dict], device_id: str) -> Tuple[List[Dict], List[Dict], List[str]]:
+        """
+        Split batch records into brain conversations and knowledge
+
+        Records with kind 'conversation' or 'knowledge' use the /sync/upload
+        field names; anything else is an ALFRED Edge item (note, observation,
+        voice_note, task_update) keyed by its item ID.
+
+        Returns:
+            (conversations, knowledge, edge item IDs)
+
+        Raises:
+            ValueError: A conversation or knowledge record lacks a required field
+        """
+        conversations = []
+        knowledge = []
+        item_ids = []
+        source = f"edge:{device_id}"
+
+        for i, record in enumerate(records):
+            kind = record.get("kind")
+            missing = [f for f in REQUIRED_FIELDS.get(kind, ()) if not isinstance(record.get(f), str)]
+            if missing:
+                raise ValueError(f"Record {i} ({kind}) missing {', '.join(missing)}")
+
+            if kind == "conversation":
+                conversations.append({
+                    "user_input": record["user_input"],
+                    "alfred_response": record["alfred_response"],
+                    "context": {
+                        "source": record.get("source", "offline"),
+                        "device_id": device_id,
+                        "offline_timestamp": record.get("timestamp")
+                    },
+                    "topics": record.get("topics") or None,
+                    "importance": record.get("importance", 5),
+                    "success": True
+                })
+            elif kind == "knowledge":
+                knowledge.append({
+                    "category": record["category"],
+                    "key": record["key"],
+                    "value": record["value"],
+                    "importance": record.get("importance", 5),
+                    "source": source
+                })
+            else:
+                entry = self._edge_item(record, source)
+                if entry is not None:
+                    knowledge.append(entry)
+
+            if record.get("id") is not None:
+                item_ids.append(record["id"])
+
+        return conversations, knowledge, item_ids
+
+    def _edge_item(self, item: Dict, source: str) -> Optional[Dict]:
+        """Knowledge row for one ALFRED Edge item"""
+        item_type = item.get("type", "note")
+        item_id = item.get("id")
+        if item_id is None:
+            return None
+
+        who = item.get("worker_name") or item.get("worker_id") or "unknown worker"
+        if item_type == "observation":
+            location = f" @ {item['location']}" if item.get("location") else ""
+            return {
+                "category": "site_observations",
+                "key": item_id,
+                "value": f"[{item.get('severity', 'info')}] {item.get('description', '')}{location} ({who})",
+                "importance": SEVERITY_IMPORTANCE.get(item.get("severity"), 5),
+                "source": source
+            }
+        if item_type == "task_update":
+            notes = f" - {item['notes']}" if item.get("notes") else ""
+            return {
+                "category": "task_updates",
+                "key": item_id,
+                "value": f"Task {item.get('task_id')}: {item.get('status')}{notes} ({who})",
+                "importance": 6,
+                "source": source
+            }
+        if item_type == "voice_note":
+            audio_path = self._save_audio(item_id, item.get("audio_data"))
+            return {
+                "category": "voice_notes",
+                "key": item_id,
+                "value": f"Voice note, {item.get('duration', 0)}s {item.get('format', '')} ({who}) -> {audio_path}",
+                "importance": 5,
+                "source": source
+            }
+        return {
+            "category": f"edge_{item.get('category', 'general')}",
+            "key": item_id,
+            "value": f"{item.get('content', '')} ({who})",
+            "importance": 5,
+            "source": source
+        }
+
+    def _save_audio(self, item_id: str, audio_b64: Optional[str]) -> Optional[str]:
+        if not audio_b64:
+            return None
+        self.audio_dir.mkdir(parents=True, exist_ok=True)
+        safe_id = re.sub(r"[^\w.-]", "_", str(item_id))[:64]
+        path = self.audio_dir / f"{safe_id}.pcm"
+        path.write_bytes(base64.b64decode(audio_b64))
+        return str(path)
@@ -2,14 +2,22 @@
 Local Brain - Offline Storage for ALFRED Edge
 ==============================================
 Lightweight persistent storage for M5 Cardputer.
-Uses JSON files on flash storage (SQLite not available on MicroPython).
+Uses append-only JSON-lines logs on flash storage (SQLite not available
+on MicroPython).
 
 Features:
 - Persistent storage across reboots
 - Automatic ID generation
 - Sync status tracking
-- Memory-efficient batch operations
-- Corruption recovery
+- Append-only writes: storing or syncing an item never rewrites the file
+- In-RAM index of unsynced records (pending reads are O(pending))
+- Periodic compaction of superseded records
+- Corruption recovery (torn writes, interrupted compaction)
+
+Log format (one JSON object per line, per item type):
+    {"id": ..., ...}                      item (a later line with the same id replaces it)
+    {"_patch": id, "fields": {...}}       field update (tasks)
+    {"_synced": [id, ...], "at": time}    sync tombstone
 
 Author: Daniel J. Rita (BATDAN)
 """
@@ -21,12 +29,30 @@ import gc
 
 # Storage paths on M5 Cardputer flash
 STORAGE_PATH = "/data"
-NOTES_FILE = f"{STORAGE_PATH}/notes.json"
-VOICE_FILE = f"{STORAGE_PATH}/voice.json"
-OBSERVATIONS_FILE = f"{STORAGE_PATH}/observations.json"
-TASKS_FILE = f"{STORAGE_PATH}/tasks.json"
-TASK_UPDATES_FILE = f"{STORAGE_PATH}/task_updates.json"
-SEQUENCE_FILE = f"{STORAGE_PATH}/sequence.json"
+SEQUENCE_FILE = "sequence.json"
+
+LOG_FILES = {
+    "note": "notes.log",
+    "voice_note": "voice.log",
+    "observation": "observations.log",
+    "task": "tasks.log",
+    "task_update": "task_updates.log"
+}
+
+# Pre-log storage (one JSON array per type), migrated on first boot
+LEGACY_FILES = {
+    "note": "notes.json",
+    "voice_note": "voice.json",
+    "observation": "observations.json",
+    "task": "tasks.json",
+    "task_update": "task_updates.json"
+}
+
+# Item types uploaded to the server (tasks come from it)
+SYNC_TYPES = ("note", "voice_note", "observation", "task_update")
+
+# Compact a log once it holds this many superseded records, and no fewer than live ones
+COMPACT_MIN_DEAD = 64
 
 
 class LocalBrain:
@@ -37,36 +63,47 @@ class LocalBrain:
     locally until they can be synced to the main ALFRED brain.
     """
 
-    def __init__(self):
-        """Initialize local brain storage."""
+    def __init__(self, storage_path=STORAGE_PATH):
+        """
+        Initialize local brain storage.
+
+        Args:
+            storage_path: Directory on flash for the logs
+        """
         print("[INFO] Initializing Local Brain...")
 
+        self.storage_path = storage_path
+
         # Ensure storage directory exists
         self._ensure_storage()
 
         # Load sequence counter
         self._sequence = self._load_sequence()
 
-        # Cache for pending counts (avoid frequent file reads)
-        self._pending_cache = None
-        self._cache_time = 0
+        # Per log: size in bytes, live items, superseded records, oldest sync time
+        self._size = {}
+        self._live = {}
+        self._dead = {}
+        self._oldest_synced = {}
+
+        # Unsynced item ID -> (log path, offset of its record)
+        self._pending = {}
+        self._task_ids = set()
 
-        print(f"[OK] Local Brain ready (seq: {self._sequence})")
+        for item_type in LOG_FILES:
+            self._migrate_legacy(item_type)
+            self._open_log(item_type)
+
+        print(f"[OK] Local Brain ready (seq: {self._sequence}, pending: {len(self._pending)})")
 
     def _ensure_storage(self):
-        """Ensure storage directory and files exist."""
+        """Ensure storage directory exists."""
         try:
-            os.mkdir(STORAGE_PATH)
-            print(f"[OK] Created {STORAGE_PATH}")
+            os.mkdir(self.storage_path)
+            print(f"[OK] Created {self.storage_path}")
         except OSError:
             pass  # Directory exists
 
-        # Initialize empty files if they don't exist
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASKS_FILE, TASK_UPDATES_FILE]:
-            if not self._file_exists(filepath):
-                self._write_json(filepath, [])
-
     def _file_exists(self, path):
         """Check if file exists."""
         try:
@@ -75,10 +112,13 @@ class LocalBrain:
         except OSError:
             return False
 
+    def _path(self, name):
+        return f"{self.storage_path}/{name}"
+
     def _load_sequence(self):
         """Load or initialize sequence counter."""
         try:
-            with open(SEQUENCE_FILE, 'r') as f:
+            with open(self._path(SEQUENCE_FILE), 'r') as f:
                 data = json.load(f)
                 return data.get("sequence", 0)
         except:
@@ -87,60 +127,247 @@ class LocalBrain:
     def _save_sequence(self):
         """Save sequence counter."""
         try:
-            with open(SEQUENCE_FILE, 'w') as f:
+            with open(self._path(SEQUENCE_FILE), 'w') as f:
                 json.dump({"sequence": self._sequence}, f)
         except Exception as e:
             print(f"[WARN] Could not save sequence: {e}")
 
     def _next_id(self):
-        """Generate next unique ID."""
+        """
+        Generate next unique ID.
+
+        The counter is only persisted at compaction; on boot it is
+        recovered from the highest ID in the logs.
+        """
         self._sequence += 1
-        self._save_sequence()
         return f"edge_{int(time.time())}_{self._sequence}"
 
+    def _note_sequence(self, item_id):
+        """Advance the counter past an ID found in a log."""
+        if isinstance(item_id, str) and item_id.startswith("edge_"):
+            try:
+                self._sequence = max(self._sequence, int(item_id.rsplit("_", 1)[1]))
+            except ValueError:
+                pass
+
     def _read_json(self, filepath):
         """Read JSON file with error recovery."""
         try:
             with open(filepath, 'r') as f:
                 return json.load(f)
-        except json.JSONDecodeError:
-            print(f"[WARN] Corrupted file {filepath}, resetting")
-            self._write_json(filepath, [])
+        except ValueError:
+            print(f"[WARN] Corrupted file {filepath}, skipping")
             return []
         except Exception as e:
             print(f"[ERROR] Read failed {filepath}: {e}")
             return []
 
-    def _write_json(self, filepath, data):
-        """Write JSON file safely."""
+    def _get_file_for_type(self, item_type):
+        """Get storage file path for item type."""
+        return self._path(LOG_FILES.get(item_type, LOG_FILES["note"]))
+
+    # ========================================
+    # Log Internals
+    # ========================================
+
+    def _parse(self, line):
+        """Decode one log line; None for a torn or damaged record."""
+        if not line.endswith(b"\n"):
+            return None
         try:
-            # Write to temp file first
-            temp_path = filepath + ".tmp"
-            with open(temp_path, 'w') as f:
-                json.dump(data, f)
+            record = json.loads(line.decode())
+        except (ValueError, UnicodeError):
+            return None
+        if not isinstance(record, dict):
+            return None
+        if "id" in record or "_patch" in record or "_synced" in record:
+            return record
+        return None
 
-            # Rename to target (atomic on most filesystems)
-            try:
-                os.remove(filepath)
-            except:
-                pass
-            os.rename(temp_path, filepath)
+    def _scan(self, path):
+        """
+        Replay a log without keeping the items.
 
-            return True
+        Args:
+            path: Log file path
+
+        Returns:
+            tuple: (state, size, dead, clean) - state maps each live ID to
+            [record offset, patched fields or None, synced_at or None];
+            clean is False if a damaged record was skipped
+        """
+        state = {}
+        offset = 0
+        dead = 0
+        clean = True
+
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return state, 0, 0, True
+
+        try:
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                record = self._parse(line)
+
+                if record is None:
+                    clean = False
+                    dead += 1
+                elif "_synced" in record:
+                    dead += 1
+                    for item_id in record["_synced"]:
+                        entry = state.get(item_id)
+                        if entry:
+                            entry[2] = record.get("at", 0)
+                elif "_patch" in record:
+                    dead += 1
+                    entry = state.get(record["_patch"])
+                    if entry:
+                        if entry[1] is None:
+                            entry[1] = {}
+                        entry[1].update(record.get("fields", {}))
+                else:
+                    if record["id"] in state:
+                        dead += 1
+                    synced_at = record.get("synced_at", 0) if record.get("synced") else None
+                    state[record["id"]] = [offset, None, synced_at]
+
+                offset += len(line)
+        finally:
+            f.close()
+
+        return state, offset, dead, clean
+
+    def _materialise(self, line, entry):
+        """Item from its record with later patches and sync state applied."""
+        item = json.loads(line.decode())
+        if entry[1]:
+            item.update(entry[1])
+        if entry[2] is not None:
+            item["synced"] = True
+            item["synced_at"] = entry[2]
+        return item
+
+    def _items(self, item_type):
+        """Yield the current items of a type, in storage order (full log read)."""
+        path = self._get_file_for_type(item_type)
+        state = self._scan(path)[0]
+        live = {}
+        for entry in state.values():
+            live[entry[0]] = entry
+        del state
+
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return
+
+        try:
+            offset = 0
+            while True:
+                line = f.readline()
+                if not line:
+                    break
+                entry = live.get(offset)
+                offset += len(line)
+                if entry is not None:
+                    yield self._materialise(line, entry)
+        finally:
+            f.close()
+
+    def _open_log(self, item_type):
+        """Recover a log if needed and index its unsynced records."""
+        path = self._get_file_for_type(item_type)
+
+        # Compaction interrupted between removing the log and renaming its replacement
+        if not self._file_exists(path) and self._file_exists(path + ".tmp"):
+            os.rename(path + ".tmp", path)
+
+        state, size, dead, clean = self._scan(path)
+        self._size[path] = size
+        self._live[path] = len(state)
+        self._dead[path] = dead
+
+        oldest = None
+        for item_id, entry in state.items():
+            self._note_sequence(item_id)
+            if item_type == "task":
+                self._task_ids.add(item_id)
+            elif entry[2] is None:
+                self._pending[item_id] = (path, entry[0])
+            elif oldest is None or entry[2] < oldest:
+                oldest = entry[2]
+        self._oldest_synced[path] = oldest
+
+        del state
+        gc.collect()
+
+        # Anything appended after a torn record would be lost with it
+        if not clean:
+            print(f"[WARN] Damaged records in {path}, compacting")
+            self.compact(item_type)
+
+    def _migrate_legacy(self, item_type):
+        """Move items from a pre-log JSON array file into the log."""
+        legacy = self._path(LEGACY_FILES[item_type])
+        if not self._file_exists(legacy):
+            return
+
+        items = [i for i in self._read_json(legacy) if isinstance(i, dict) and "id" in i]
+        if items and self._append(self._get_file_for_type(item_type), items) is None:
+            return  # Keep the old file; retry next boot
+
+        os.remove(legacy)
+        if items:
+            print(f"[OK] Migrated {len(items)} {item_type} items to log")
+
+    def _append(self, path, records):
+        """
+        Append records to a log.
+
+        Returns:
+            list: Offset of each record, or None on failure
+        """
+        offsets = []
+        offset = self._size.get(path, 0)
+        chunks = []
+        for record in records:
+            data = (json.dumps(record) + "\n").encode()
+            offsets.append(offset)
+            offset += len(data)
+            chunks.append(data)
+
+        try:
+            with open(path, "ab") as f:
+                for data in chunks:
+                    f.write(data)
         except Exception as e:
-            print(f"[ERROR] Write failed {filepath}: {e}")
-            return False
+            print(f"[ERROR] Write failed {path}: {e}")
+            # A partial write leaves a torn record; re-index (and repair) the log
+            self._reindex(path)
+            return None
 
-    def _get_file_for_type(self, item_type):
-        """Get storage file path for item type."""
-        type_map = {
-            "note": NOTES_FILE,
-            "voice_note": VOICE_FILE,
-            "observation": OBSERVATIONS_FILE,
-            "task": TASKS_FILE,
-            "task_update": TASK_UPDATES_FILE
-        }
-        return type_map.get(item_type, NOTES_FILE)
+        self._size[path] = offset
+        return offsets
+
+    def _reindex(self, path):
+        for item_type in LOG_FILES:
+            if self._get_file_for_type(item_type) == path:
+                for item_id in [i for i, (p, _) in self._pending.items() if p == path]:
+                    del self._pending[item_id]
+                self._open_log(item_type)
+
+    def _superseded(self, path, count=1):
+        """Count dead records and compact the log once they dominate."""
+        self._dead[path] = self._dead.get(path, 0) + count
+        dead = self._dead[path]
+        if dead >= COMPACT_MIN_DEAD and dead >= self._live.get(path, 0):
+            for item_type in LOG_FILES:
+                if self._get_file_for_type(item_type) == path:
+                    self.compact(item_type)
 
     # ========================================
     # Store Operations
@@ -166,44 +393,45 @@ class LocalBrain:
         item["synced"] = False
 
         # Get appropriate file
-        filepath = self._get_file_for_type(item.get("type", "note"))
-
-        # Load existing data
-        data = self._read_json(filepath)
+        item_type = item.get("type", "note")
+        filepath = self._get_file_for_type(item_type)
 
-        # Append new item
-        data.append(item)
-
-        # Save
-        if self._write_json(filepath, data):
-            # Invalidate cache
-            self._pending_cache = None
-            print(f"[OK] Stored {item['type']}: {item['id']}")
-            return item["id"]
-        else:
+        offsets = self._append(filepath, [item])
+        if offsets is None:
             print(f"[ERROR] Failed to store {item['type']}")
             return None
 
+        if item["id"] in self._pending:
+            self._superseded(filepath)
+        else:
+            self._live[filepath] = self._live.get(filepath, 0) + 1
+        if item_type in SYNC_TYPES:
+            self._pending[item["id"]] = (filepath, offsets[0])
+
+        print(f"[OK] Stored {item['type']}: {item['id']}")
+        return item["id"]
+
     def store_task(self, task):
         """Store a task received from server."""
         task["type"] = "task"
         task["received_at"] = time.time()
         task["status"] = task.get("status", "pending")
 
+        path = self._get_file_for_type("task")
+
         # Check if task already exists
-        tasks = self._read_json(TASKS_FILE)
-        for existing in tasks:
-            if existing.get("id") == task.get("id"):
-                # Update existing task
-                existing.update(task)
-                self._write_json(TASKS_FILE, tasks)
+        if task.get("id") in self._task_ids:
+            # Update existing task
+            if self._append(path, [{"_patch": task["id"], "fields": task}]) is not None:
+                self._superseded(path)
                 print(f"[OK] Updated task: {task['id']}")
-                return task["id"]
+            return task["id"]
 
         # New task
-        tasks.append(task)
-        self._write_json(TASKS_FILE, tasks)
-        print(f"[OK] Stored new task: {task['id']}")
+        if self._append(path, [task]) is not None:
+            self._task_ids.add(task["id"])
+            self._live[path] = self._live.get(path, 0) + 1
+            print(f"[OK] Stored new task: {task['id']}")
         return task["id"]
 
     # ========================================
@@ -214,17 +442,27 @@ class LocalBrain:
         """
         Get all items pending sync.
 
+        Reads only the indexed unsynced records, one seek per item.
+
         Returns:
             list: All unsynced items from all storage files
         """
-        pending = []
+        by_path = {}
+        for path, offset in self._pending.values():
+            by_path.setdefault(path, []).append(offset)
 
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASK_UPDATES_FILE]:
-            items = self._read_json(filepath)
-            for item in items:
-                if not item.get("synced", False):
-                    pending.append(item)
+        pending = []
+        for path, offsets in by_path.items():
+            offsets.sort()
+            try:
+                with open(path, "rb") as f:
+                    for offset in offsets:
+                        f.seek(offset)
+                        record = self._parse(f.readline())
+                        if record is not None:
+                            pending.append(record)
+            except OSError as e:
+                print(f"[ERROR] Read failed {path}: {e}")
 
         # Sort by timestamp
         pending.sort(key=lambda x: x.get("timestamp", 0))
@@ -233,30 +471,12 @@ class LocalBrain:
 
     def get_pending_count(self):
         """
-        Get count of pending items (cached for performance).
+        Get count of pending items (from the in-RAM index).
 
         Returns:
             int: Number of unsynced items
         """
-        # Use cache if fresh (< 5 seconds old)
-        if self._pending_cache is not None:
-            if time.time() - self._cache_time < 5:
-                return self._pending_cache
-
-        # Count pending items
-        count = 0
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASK_UPDATES_FILE]:
-            items = self._read_json(filepath)
-            for item in items:
-                if not item.get("synced", False):
-                    count += 1
-
-        # Update cache
-        self._pending_cache = count
-        self._cache_time = time.time()
-
-        return count
+        return len(self._pending)
 
     def get_tasks(self):
         """
@@ -265,9 +485,8 @@ class LocalBrain:
         Returns:
             list: All tasks from server
         """
-        tasks = self._read_json(TASKS_FILE)
         # Filter out completed/cancelled tasks
-        active = [t for t in tasks if t.get("status") not in ["completed", "cancelled"]]
+        active = [t for t in self._items("task") if t.get("status") not in ["completed", "cancelled"]]
         return active
 
     def get_recent_notes(self, limit=10):
@@ -280,7 +499,7 @@ class LocalBrain:
         Returns:
             list: Recent notes
         """
-        notes = self._read_json(NOTES_FILE)
+        notes = list(self._items("note"))
         notes.sort(key=lambda x: x.get("timestamp", 0), reverse=True)
         return notes[:limit]
 
@@ -294,10 +513,17 @@ class LocalBrain:
         Returns:
             dict or None: Found item
         """
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASKS_FILE, TASK_UPDATES_FILE]:
-            items = self._read_json(filepath)
-            for item in items:
+        if item_id in self._pending:
+            path, offset = self._pending[item_id]
+            try:
+                with open(path, "rb") as f:
+                    f.seek(offset)
+                    return self._parse(f.readline())
+            except OSError:
+                return None
+
+        for item_type in LOG_FILES:
+            for item in self._items(item_type):
                 if item.get("id") == item_id:
                     return item
         return None
@@ -316,56 +542,41 @@ class LocalBrain:
         Returns:
             bool: Success
         """
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASK_UPDATES_FILE]:
-            items = self._read_json(filepath)
-            modified = False
-
-            for item in items:
-                if item.get("id") == item_id:
-                    item["synced"] = True
-                    item["synced_at"] = time.time()
-                    modified = True
-                    break
-
-            if modified:
-                if self._write_json(filepath, items):
-                    self._pending_cache = None  # Invalidate cache
-                    return True
-                return False
-
-        print(f"[WARN] Item not found for sync mark: {item_id}")
-        return False
+        if item_id not in self._pending:
+            print(f"[WARN] Item not pending for sync mark: {item_id}")
+            return False
+        return self.mark_all_synced([item_id]) == 1
 
     def mark_all_synced(self, item_ids):
         """
         Mark multiple items as synced (batch operation).
 
+        Appends one tombstone record per log instead of rewriting it.
+
         Args:
             item_ids: List of item IDs
 
         Returns:
             int: Number of items marked
         """
-        marked = 0
+        by_path = {}
+        for item_id in item_ids:
+            entry = self._pending.get(item_id)
+            if entry is not None:
+                by_path.setdefault(entry[0], []).append(item_id)
 
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASK_UPDATES_FILE]:
-            items = self._read_json(filepath)
-            modified = False
-
-            for item in items:
-                if item.get("id") in item_ids:
-                    if not item.get("synced", False):
-                        item["synced"] = True
-                        item["synced_at"] = time.time()
-                        marked += 1
-                        modified = True
-
-            if modified:
-                self._write_json(filepath, items)
+        marked = 0
+        now = time.time()
+        for path, ids in by_path.items():
+            if self._append(path, [{"_synced": ids, "at": now}]) is None:
+                continue
+            for item_id in ids:
+                self._pending.pop(item_id, None)
+            marked += len(ids)
+            if self._oldest_synced.get(path) is None:
+                self._oldest_synced[path] = now
+            self._superseded(path)
 
-        self._pending_cache = None  # Invalidate cache
         return marked
 
     def update_task_status(self, task_id, status):
@@ -379,20 +590,110 @@ class LocalBrain:
         Returns:
             bool: Success
         """
-        tasks = self._read_json(TASKS_FILE)
-
-        for task in tasks:
-            if task.get("id") == task_id:
-                task["status"] = status
-                task["updated_at"] = time.time()
-                return self._write_json(TASKS_FILE, tasks)
+        if task_id not in self._task_ids:
+            return False
 
-        return False
+        path = self._get_file_for_type("task")
+        patch = {"_patch": task_id, "fields": {"status": status, "updated_at": time.time()}}
+        if self._append(path, [patch]) is None:
+            return False
+        self._superseded(path)
+        return True
 
     # ========================================
     # Delete Operations
     # ========================================
 
+    def compact(self, item_type, keep=None):
+        """
+        Rewrite a log with one record per live item.
+
+        Folds patches and sync tombstones into the items and drops
+        superseded records. Streams the log, so only the per-item index
+        is held in RAM.
+
+        Args:
+            item_type: Item type whose log to compact
+            keep: Optional predicate; items it rejects are dropped
+
+        Returns:
+            int: Number of items dropped by keep
+        """
+        path = self._get_file_for_type(item_type)
+        temp_path = path + ".tmp"
+        state = self._scan(path)[0]
+        live = {}
+        for entry in state.values():
+            live[entry[0]] = entry
+        del state
+
+        kept_ids = []
+        pending = []
+        oldest = None
+        dropped = 0
+        size = 0
+
+        try:
+            with open(temp_path, "wb") as dst:
+                try:
+                    src = open(path, "rb")
+                except OSError:
+                    src = None
+                if src is not None:
+                    try:
+                        offset = 0
+                        while True:
+                            line = src.readline()
+                            if not line:
+                                break
+                            entry = live.get(offset)
+                            offset += len(line)
+                            if entry is None:
+                                continue
+
+                            item = self._materialise(line, entry)
+                            if keep is not None and not keep(item):
+                                dropped += 1
+                                continue
+
+                            data = (json.dumps(item) + "\n").encode()
+                            dst.write(data)
+                            kept_ids.append(item["id"])
+                            if item_type in SYNC_TYPES and not item.get("synced"):
+                                pending.append((item["id"], size))
+                            elif item.get("synced") and (oldest is None or item.get("synced_at", 0) < oldest):
+                                oldest = item.get("synced_at", 0)
+                            size += len(data)
+                    finally:
+                        src.close()
+
+            # Rename to target (atomic on most filesystems)
+            try:
+                os.remove(path)
+            except:
+                pass
+            os.rename(temp_path, path)
+        except Exception as e:
+            print(f"[ERROR] Compaction failed {path}: {e}")
+            return 0
+
+        # Offsets changed: rebuild this log's part of the index
+        for item_id in [i for i, (p, _) in self._pending.items() if p == path]:
+            del self._pending[item_id]
+        for item_id, offset in pending:
+            self._pending[item_id] = (path, offset)
+        if item_type == "task":
+            self._task_ids = set(kept_ids)
+
+        self._size[path] = size
+        self._live[path] = len(kept_ids)
+        self._dead[path] = 0
+        self._oldest_synced[path] = oldest
+        self._save_sequence()
+
+        gc.collect()
+        return dropped
+
     def delete_synced(self, older_than_days=7):
         """
         Delete old synced items to free space.
@@ -406,18 +707,15 @@ class LocalBrain:
         cutoff = time.time() - (older_than_days * 24 * 60 * 60)
         deleted = 0
 
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASK_UPDATES_FILE]:
-            items = self._read_json(filepath)
-            original_count = len(items)
+        # Keep unsynced items and recent synced items
+        def keep(item):
+            return not item.get("synced", False) or item.get("synced_at", time.time()) > cutoff
 
-            # Keep unsynced items and recent synced items
-            items = [i for i in items if not i.get("synced", False) or
-                    i.get("synced_at", time.time()) > cutoff]
-
-            if len(items) < original_count:
-                self._write_json(filepath, items)
-                deleted += original_count - len(items)
+        for item_type in SYNC_TYPES:
+            # Only rewrite logs holding an expired item
+            oldest = self._oldest_synced.get(self._get_file_for_type(item_type))
+            if oldest is not None and oldest <= cutoff:
+                deleted += self.compact(item_type, keep)
 
         if deleted > 0:
             gc.collect()  # Free memory
@@ -425,19 +723,31 @@ class LocalBrain:
 
         return deleted
 
+    def _pending_in(self, path):
+        return sum(1 for p, _ in self._pending.values() if p == path)
+
     def clear_all(self):
         """
         Clear all local data (factory reset).
 
         WARNING: This deletes all unsynced data!
         """
-        for filepath in [NOTES_FILE, VOICE_FILE, OBSERVATIONS_FILE,
-                        TASKS_FILE, TASK_UPDATES_FILE]:
-            self._write_json(filepath, [])
-
+        for item_type in LOG_FILES:
+            path = self._get_file_for_type(item_type)
+            try:
+                with open(path, "wb"):
+                    pass
+            except Exception as e:
+                print(f"[ERROR] Could not clear {path}: {e}")
+            self._size[path] = 0
+            self._live[path] = 0
+            self._dead[path] = 0
+            self._oldest_synced[path] = None
+
+        self._pending = {}
+        self._task_ids = set()
         self._sequence = 0
         self._save_sequence()
-        self._pending_cache = None
 
         gc.collect()
         print("[OK] All local data cleared")
@@ -459,42 +769,22 @@ class LocalBrain:
             "observations": {"total": 0, "pending": 0},
             "task_updates": {"total": 0, "pending": 0},
             "tasks": {"total": 0, "active": 0},
-            "total_pending": 0,
+            "total_pending": len(self._pending),
             "sequence": self._sequence
         }
 
-        # Count notes
-        items = self._read_json(NOTES_FILE)
-        stats["notes"]["total"] = len(items)
-        stats["notes"]["pending"] = sum(1 for i in items if not i.get("synced", False))
-
-        # Count voice notes
-        items = self._read_json(VOICE_FILE)
-        stats["voice"]["total"] = len(items)
-        stats["voice"]["pending"] = sum(1 for i in items if not i.get("synced", False))
-
-        # Count observations
-        items = self._read_json(OBSERVATIONS_FILE)
-        stats["observations"]["total"] = len(items)
-        stats["observations"]["pending"] = sum(1 for i in items if not i.get("synced", False))
-
-        # Count task updates
-        items = self._read_json(TASK_UPDATES_FILE)
-        stats["task_updates"]["total"] = len(items)
-        stats["task_updates"]["pending"] = sum(1 for i in items if not i.get("synced", False))
+        for key, item_type in (("notes", "note"), ("voice", "voice_note"),
+                               ("observations", "observation"), ("task_updates", "task_update")):
+            path = self._get_file_for_type(item_type)
+            stats[key]["total"] = self._live.get(path, 0)
+            stats[key]["pending"] = self._pending_in(path)
 
         # Count tasks
-        tasks = self._read_json(TASKS_FILE)
+        tasks = list(self._items("task"))
         stats["tasks"]["total"] = len(tasks)
         stats["tasks"]["active"] = sum(1 for t in tasks
                                        if t.get("status") not in ["completed", "cancelled"])
 
-        # Total pending
-        stats["total_pending"] = (stats["notes"]["pending"] +
-                                  stats["voice"]["pending"] +
-                                  stats["observations"]["pending"] +
-                                  stats["task_updates"]["pending"])
-
         return stats
 
     def get_storage_usage(self):
@@ -506,7 +796,7 @@ class LocalBrain:
         """
         try:
             # Get filesystem stats
-            statvfs = os.statvfs(STORAGE_PATH)
+            statvfs = os.statvfs(self.storage_path)
             block_size = statvfs[0]
             total_blocks = statvfs[2]
             free_blocks = statvfs[3]
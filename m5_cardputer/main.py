@@ -386,23 +386,20 @@ class AlfredEdge:
 
             print(f"[INFO] Syncing {len(pending)} items...")
 
-            # Sync to server
-            result = self.sync.upload(pending)
+            # Sync to server; acknowledged batches are marked synced as they complete
+            result = self.sync.upload(pending, CONFIG["device_name"],
+                                      on_batch=self.brain.mark_all_synced)
+            self.pending_sync_count = self.brain.get_pending_count()
 
-            if result["success"]:
-                # Mark items as synced
-                for item in pending:
-                    self.brain.mark_synced(item["id"])
+            # Check for any tasks/messages from server
+            if result.get("tasks"):
+                self._process_server_tasks(result["tasks"])
 
+            if result["success"]:
                 self.last_sync = time.time()
-                self.pending_sync_count = 0
-
-                print(f"[OK] Synced {len(pending)} items")
-                self.ui.show_status(f"Synced {len(pending)} items")
 
-                # Check for any tasks/messages from server
-                if result.get("tasks"):
-                    self._process_server_tasks(result["tasks"])
+                print(f"[OK] Synced {result['synced']} items")
+                self.ui.show_status(f"Synced {result['synced']} items")
 
                 return True
             else:
@@ -7,7 +7,9 @@ Uploads collected data and downloads assigned tasks.
 Protocol:
 - HTTP REST API over WiFi
 - JSON payloads with gzip compression
-- Chunked uploads for large voice files
+- Uploads as zlib-compressed JSON-lines batches, sent in parts at explicit
+  offsets (POST /sync/batch/<id>); an interrupted sync resumes at the last
+  acknowledged byte, and each acknowledged batch is marked synced locally
 - Automatic retry with backoff
 
 Author: Daniel J. Rita (BATDAN)
@@ -23,13 +25,25 @@ try:
 except ImportError:
     import requests
 
-# Optional compression (if available)
+# Optional compression (if available; some MicroPython builds only decompress)
 try:
     import zlib
-    COMPRESSION_AVAILABLE = True
+    COMPRESSION_AVAILABLE = hasattr(zlib, "compress")
 except ImportError:
     COMPRESSION_AVAILABLE = False
 
+# Batch IDs are content hashes so a rebuilt batch resumes on the server
+try:
+    import hashlib
+    import binascii
+    HASH_AVAILABLE = True
+except ImportError:
+    HASH_AVAILABLE = False
+
+BATCH_BYTES = 48 * 1024   # Raw JSON per batch (a larger item gets a batch of its own)
+BATCH_ITEMS = 100         # Items per batch
+PART_BYTES = 16 * 1024    # Bytes per upload request
+
 
 class SyncClient:
     """
@@ -50,10 +64,12 @@ class SyncClient:
         self.timeout = 30  # seconds
         self.max_retries = 3
         self.retry_delay = 2  # seconds
+        self.device_id = None  # Set by register_device
 
         # Endpoints
         self.endpoints = {
             "upload": f"{self.server_url}/api/edge/upload",
+            "batch": f"{self.server_url}/sync/batch",
             "tasks": f"{self.server_url}/api/edge/tasks",
             "register": f"{self.server_url}/api/edge/register",
             "health": f"{self.server_url}/api/health"
@@ -61,7 +77,7 @@ class SyncClient:
 
         print(f"[INFO] Sync client initialized: {self.server_url}")
 
-    def _make_request(self, method, url, data=None, headers=None):
+    def _make_request(self, method, url, data=None, headers=None, raw=None):
         """
         Make HTTP request with retry logic.
 
@@ -70,15 +86,19 @@ class SyncClient:
             url: Full URL
             data: Request body (dict)
             headers: Optional headers
+            raw: Request body as bytes (sent as-is instead of data)
 
         Returns:
             dict: Response JSON or error dict
         """
         if headers is None:
-            headers = {"Content-Type": "application/json"}
+            if raw is not None:
+                headers = {"Content-Type": "application/octet-stream"}
+            else:
+                headers = {"Content-Type": "application/json"}
 
-        payload = None
-        if data:
+        payload = raw
+        if data and raw is None:
             payload = json.dumps(data)
 
             # Compress if available and payload is large
@@ -157,6 +177,7 @@ class SyncClient:
             dict: Registration response
         """
         print(f"[INFO] Registering device: {device_info.get('device_name')}")
+        self.device_id = device_info.get("device_name")
 
         result = self._make_request("POST", self.endpoints["register"], {
             "device_name": device_info.get("device_name"),
@@ -179,111 +200,138 @@ class SyncClient:
     # Upload Operations
     # ========================================
 
-    def upload(self, items):
+    def upload(self, items, device_id=None, on_batch=None):
         """
-        Upload items to ALFRED server.
+        Upload items to ALFRED server in compressed, resumable batches.
 
         Args:
             items: List of items to upload (notes, voice, observations, etc.)
+            device_id: Uploading device (default: name given to register_device)
+            on_batch: Called with the item IDs of each acknowledged batch, e.g.
+                      LocalBrain.mark_all_synced - a sync that fails part-way
+                      then resumes after the last acknowledged batch
 
         Returns:
-            dict: Upload result with success flag and any tasks from server
+            dict: Upload result with success flag, synced count/IDs and any
+            tasks from server
         """
         if not items:
-            return {"success": True, "synced": 0, "tasks": []}
+            return {"success": True, "synced": 0, "synced_ids": [], "tasks": []}
 
+        device_id = device_id or self.device_id or "alfred_edge"
         print(f"[INFO] Uploading {len(items)} items...")
 
-        # Separate voice notes (they're larger)
-        voice_items = [i for i in items if i.get("type") == "voice_note"]
-        other_items = [i for i in items if i.get("type") != "voice_note"]
-
-        synced_count = 0
+        synced_ids = []
         all_tasks = []
 
-        # Upload non-voice items in batch
-        if other_items:
-            result = self._upload_batch(other_items)
-            if result.get("success"):
-                synced_count += len(other_items)
-                all_tasks.extend(result.get("tasks", []))
-            else:
-                return result
+        for batch in self._batches(items):
+            result = self._send_batch(batch, device_id)
+            gc.collect()
 
-        # Upload voice items individually (they're large)
-        for voice in voice_items:
-            result = self._upload_voice(voice)
-            if result.get("success"):
-                synced_count += 1
-            else:
-                print(f"[WARN] Voice upload failed: {voice.get('id')}")
+            if not result.get("success"):
+                print(f"[WARN] Batch upload stopped: {result.get('error')}")
+                return {
+                    "success": False,
+                    "error": result.get("error"),
+                    "synced": len(synced_ids),
+                    "synced_ids": synced_ids,
+                    "tasks": all_tasks
+                }
+
+            ids = result.get("item_ids", [])
+            if on_batch and ids:
+                on_batch(ids)
+            synced_ids.extend(ids)
+            all_tasks.extend(result.get("tasks", []))
 
         return {
             "success": True,
-            "synced": synced_count,
+            "synced": len(synced_ids),
+            "synced_ids": synced_ids,
             "tasks": all_tasks
         }
 
-    def _upload_batch(self, items):
-        """Upload batch of items (non-voice)."""
-        return self._make_request("POST", self.endpoints["upload"], {
-            "items": items,
-            "timestamp": time.time(),
-            "batch_size": len(items)
-        })
-
-    def _upload_voice(self, voice_item):
+    def _batches(self, items):
+        """Yield lists of JSON lines, at most BATCH_BYTES / BATCH_ITEMS each."""
+        batch = []
+        size = 0
+        for item in items:
+            line = json.dumps(item)
+            if batch and (size + len(line) > BATCH_BYTES or len(batch) >= BATCH_ITEMS):
+                yield batch
+                batch = []
+                size = 0
+            batch.append(line)
+            size += len(line) + 1
+        if batch:
+            yield batch
+
+    def _encode_batch(self, lines):
         """
-        Upload voice note (potentially large).
+        Encode batch lines for upload.
 
-        Uses chunked upload if item is very large.
+        Returns:
+            tuple: (batch_id, payload bytes, encoding)
         """
-        # Check size - if under 50KB, upload normally
-        audio_data = voice_item.get("audio_data", "")
-        if len(audio_data) < 50 * 1024:
-            return self._make_request("POST", self.endpoints["upload"], {
-                "items": [voice_item],
-                "timestamp": time.time()
-            })
-
-        # Chunked upload for large files
-        chunk_size = 32 * 1024  # 32KB chunks
-        chunks = []
-        for i in range(0, len(audio_data), chunk_size):
-            chunks.append(audio_data[i:i + chunk_size])
-
-        # Start chunked upload
-        init_result = self._make_request("POST", f"{self.endpoints['upload']}/chunked/start", {
-            "item_id": voice_item.get("id"),
-            "type": "voice_note",
-            "total_chunks": len(chunks),
-            "metadata": {k: v for k, v in voice_item.items() if k != "audio_data"}
-        })
-
-        if not init_result.get("success"):
-            return init_result
-
-        upload_id = init_result.get("upload_id")
+        payload = "\n".join(lines).encode()
+        encoding = "identity"
+        if COMPRESSION_AVAILABLE:
+            compressed = zlib.compress(payload)
+            if len(compressed) < len(payload):
+                payload = compressed
+                encoding = "zlib"
+
+        if HASH_AVAILABLE:
+            batch_id = binascii.hexlify(hashlib.sha256(payload).digest()[:8]).decode()
+        else:
+            batch_id = f"{int(time.time())}_{len(payload)}"
+        return batch_id, payload, encoding
 
-        # Upload chunks
-        for i, chunk in enumerate(chunks):
-            chunk_result = self._make_request("POST", f"{self.endpoints['upload']}/chunked/chunk", {
-                "upload_id": upload_id,
-                "chunk_index": i,
-                "data": chunk
-            })
+    def _send_batch(self, lines, device_id):
+        """
+        Upload one batch part by part.
 
-            if not chunk_result.get("success"):
-                return chunk_result
+        Multi-part batches ask the server how much it already holds first,
+        so a batch interrupted by a dropped connection (or reboot) continues
+        from there.
 
-            # Free memory between chunks
+        Returns:
+            dict: Server acknowledgement (item_ids, counts) or error dict
+        """
+        batch_id, payload, encoding = self._encode_batch(lines)
+        total = len(payload)
+        url = f"{self.endpoints['batch']}/{batch_id}"
+
+        offset = 0
+        if total > PART_BYTES:
+            status = self._make_request("GET", f"{url}?device_id={device_id}")
+            if status.get("complete"):
+                return status
+            offset = status.get("received", 0)
+            if offset:
+                print(f"[INFO] Resuming batch {batch_id} at {offset}/{total} bytes")
+
+        rejected = 0
+        while True:
+            part = payload[offset:offset + PART_BYTES]
+            result = self._make_request(
+                "POST",
+                f"{url}?device_id={device_id}&offset={offset}&total={total}&encoding={encoding}",
+                raw=part
+            )
+            if result.get("complete"):
+                return result
+            if "received" not in result:
+                return result  # Network/server error after retries
+
+            if not result.get("success"):
+                # Server holds a different amount than assumed: continue from there
+                rejected += 1
+                if rejected > self.max_retries:
+                    return {"success": False, "error": result.get("error", "Batch rejected")}
+            offset = result["received"]
             gc.collect()
 
-        # Complete upload
-        return self._make_request("POST", f"{self.endpoints['upload']}/chunked/complete", {
-            "upload_id": upload_id
-        })
-
     # ========================================
     # Download Operations
     # ========================================
@@ -370,21 +418,19 @@ class SyncClient:
         pending = local_brain.get_pending()
         if pending:
             print(f"\n[SYNC] Uploading {len(pending)} items...")
-            result = self.upload(pending)
-
-            if result.get("success"):
-                # Mark as synced
-                synced_count = result.get("synced", 0)
-                for item in pending[:synced_count]:
-                    local_brain.mark_synced(item["id"])
-                summary["uploaded"] = synced_count
-
-                # Process any tasks returned
-                if result.get("tasks"):
-                    for task in result["tasks"]:
-                        local_brain.store_task(task)
-                    summary["tasks_received"] = len(result["tasks"])
-            else:
+            # Acknowledged batches are marked synced as they complete
+            result = self.upload(pending, device_config.get("device_name"),
+                                 on_batch=local_brain.mark_all_synced)
+            del pending
+            summary["uploaded"] = result.get("synced", 0)
+
+            # Process any tasks returned
+            if result.get("tasks"):
+                for task in result["tasks"]:
+                    local_brain.store_task(task)
+                summary["tasks_received"] = len(result["tasks"])
+
+            if not result.get("success"):
                 summary["errors"].append(f"Upload failed: {result.get('error')}")
 
         # 4. Fetch new tasks
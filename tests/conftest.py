@@ -0,0 +1,21 @@
+"""
+Shared pytest setup
+Author: Daniel J Rita (BATDAN)
+"""
+
+import os
+import shutil
+import tempfile
+
+
+def pytest_configure(config):
+    """
+    Point ALFRED_HOME at a throwaway directory before any test module is imported
+
+    The API and sync servers build their brain (database, write-behind
+    journal, response cache) at import time under PathManager's root, which
+    is fixed the first time core.path_manager is imported.
+    """
+    home = tempfile.mkdtemp(prefix="alfred_home_")
+    os.environ["ALFRED_HOME"] = home
+    config.add_cleanup(lambda: shutil.rmtree(home, ignore_errors=True))
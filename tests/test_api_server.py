@@ -0,0 +1,147 @@
+"""
+Test OpenAI-compatible API server (streamed chat completions)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+# The server builds its brain at import time: keep it out of the real data dir
+# (under pytest, conftest.py has already set this)
+if "ALFRED_HOME" not in os.environ:
+    os.environ["ALFRED_HOME"] = tempfile.mkdtemp(prefix="alfred_home_")
+
+from fastapi.testclient import TestClient
+
+import alfred_api_server
+from core.brain import AlfredBrain
+from ai.multimodel import MultiModelOrchestrator, CloudProvider
+from ai.local.ollama_client import OllamaStreamError
+
+
+class FakeStreamClient:
+    """Ollama stand-in that streams chunks and can fail after `fail_after` of them"""
+
+    def __init__(self, chunks, available=True, fail_after=None):
+        self.model = 'ollama'
+        self.chunks = chunks
+        self.available = available
+        self.fail_after = fail_after
+
+    def is_available(self) -> bool:
+        return self.available
+
+    def get_status(self):
+        return {'available': self.available, 'model': self.model}
+
+    def _build_prompt_with_context(self, prompt, context):
+        return prompt
+
+    def generate(self, prompt, context=None, temperature=0.7, max_tokens=100):
+        return "".join(self.chunks) if self.available else None
+
+    def generate_stream(self, prompt, temperature=0.7, max_tokens=500, raise_errors=False):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise OllamaStreamError("connection reset")
+            yield chunk
+
+
+class FakeCloudClient:
+    """Cloud provider stand-in with a fixed answer"""
+
+    def __init__(self, text):
+        self.model = 'cloud'
+        self.text = text
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_status(self):
+        return {'available': True, 'model': self.model}
+
+    def generate(self, prompt, context=None, temperature=0.7, max_tokens=100):
+        return self.text
+
+
+def make_ai(ollama) -> MultiModelOrchestrator:
+    """Orchestrator with a fake Ollama and a single fake cloud provider"""
+    ai = MultiModelOrchestrator(auto_lookup=False)
+    ai.ollama = ollama
+    ai.claude = FakeCloudClient("Good evening, sir. The cloud is listening.")
+    ai.gemini = ai.groq = ai.openai = None
+    ai._can_use_cloud = lambda provider: provider == CloudProvider.CLAUDE
+    return ai
+
+
+def stream_chat(client, prompt):
+    """POST a stream=true chat completion and return its SSE data payloads"""
+    response = client.post("/v1/chat/completions", json={
+        "model": "alfred", "stream": True,
+        "messages": [{"role": "user", "content": prompt}]
+    })
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = [event for event in response.text.split("\n\n") if event]
+    assert all(event.startswith("data: ") for event in events), events
+    return [event[len("data: "):] for event in events]
+
+
+def test_stream_chat_completion(tmp_path):
+    """SSE chunks follow the OpenAI format, end with [DONE] and fall back without Ollama"""
+    print("\n[TEST] Streamed Chat Completion")
+    print("-" * 40)
+
+    real_brain, real_ai = alfred_api_server.brain, alfred_api_server.ai
+    alfred_api_server.brain = AlfredBrain(data_dir=str(tmp_path))
+    try:
+        _stream_cases(TestClient(alfred_api_server.app))
+    finally:
+        alfred_api_server.brain.close()
+        alfred_api_server.brain, alfred_api_server.ai = real_brain, real_ai
+
+
+def _stream_cases(client):
+    brain = alfred_api_server.brain
+
+    alfred_api_server.ai = make_ai(FakeStreamClient(["Good ", "evening, ", "sir."]))
+    payloads = stream_chat(client, "Good evening, Alfred")
+    assert payloads[-1] == "[DONE]"
+    chunks = [json.loads(p) for p in payloads[:-1]]
+    assert all(c["object"] == "chat.completion.chunk" and c["model"] == "alfred" for c in chunks)
+    assert len({c["id"] for c in chunks}) == 1
+    deltas = [c["choices"][0]["delta"] for c in chunks]
+    assert deltas[0] == {"role": "assistant"} and deltas[-1] == {}
+    assert [d["content"] for d in deltas[1:-1]] == ["Good ", "evening, ", "sir."]
+    assert [c["choices"][0]["finish_reason"] for c in chunks] == [None] * 4 + ["stop"]
+    assert brain.get_conversation_context(limit=1)[0]["alfred"] == "Good evening, sir."
+    print("✅ Role, content and stop chunks, then [DONE]; reply stored")
+
+    alfred_api_server.ai = make_ai(FakeStreamClient(["unused"], available=False))
+    payloads = stream_chat(client, "Is anyone there?")
+    contents = [json.loads(p)["choices"][0]["delta"].get("content") for p in payloads[:-1]]
+    assert [c for c in contents if c] == ["Good evening, sir. The cloud is listening."]
+    assert payloads[-1] == "[DONE]"
+    print("✅ Ollama unavailable: full cloud reply sent as one chunk")
+
+    stored = brain.get_memory_stats()["conversations"]
+    alfred_api_server.ai = make_ai(FakeStreamClient(["Half ", "a reply"], fail_after=1))
+    payloads = stream_chat(client, "Tell me a story")
+    assert payloads[-1] == "[DONE]"
+    events = [json.loads(p) for p in payloads[:-1]]
+    assert events[-1]["error"]["type"] == "stream_error" and "connection reset" in events[-1]["error"]["message"]
+    assert [c["choices"][0]["delta"].get("content") for c in events[:-1]] == [None, "Half "]
+    assert not any(c["choices"][0]["finish_reason"] for c in events[:-1])
+    assert brain.get_memory_stats()["conversations"] == stored
+    print("✅ Mid-stream failure ends with an error event, no stop chunk; partial reply not stored")
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        test_stream_chat_completion(Path(tmp))
@@ -0,0 +1,121 @@
+"""
+Test Autonomous Agent ReAct loop (parallel actions, tool cache, incremental prompts)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.autonomous_agents import AutonomousAgent, AgentTool, TaskStatus
+
+
+class SlowLookupTool(AgentTool):
+    """Cacheable tool that takes a while, counting real executions"""
+
+    cache_ttl = 60.0
+
+    def __init__(self):
+        self.calls = 0
+
+    @property
+    def name(self) -> str:
+        return "lookup"
+
+    @property
+    def description(self) -> str:
+        return "Look something up"
+
+    @property
+    def parameters(self):
+        return {"topic": {"type": "string", "description": "Topic"}}
+
+    async def execute(self, topic: str) -> str:
+        self.calls += 1
+        await asyncio.sleep(0.3)
+        return f"facts about {topic}"
+
+
+class ScriptedOllama:
+    """Stands in for OllamaAI: replays replies and records prompts/contexts"""
+
+    primary_model = "scripted"
+
+    def __init__(self, replies):
+        self.replies = list(replies)
+        self.prompts = []
+        self.contexts = []
+
+    def generate_with_context(self, prompt, context=None, model=None):
+        self.prompts.append(prompt)
+        self.contexts.append(context)
+        return self.replies.pop(0), [len(self.prompts)]
+
+
+def make_agent(replies):
+    agent = AutonomousAgent("Tester", max_steps=5)
+    agent.ollama = ScriptedOllama(replies)
+    lookup = SlowLookupTool()
+    agent.register_tool(lookup)
+    return agent, lookup
+
+
+def test_parallel_actions_and_incremental_prompt():
+    """Independent actions in one reply run concurrently; later prompts reuse the context"""
+    print("\n[TEST] Parallel Actions")
+    print("-" * 40)
+
+    agent, lookup = make_agent([
+        'THOUGHT: Two lookups\nACTION: lookup\nACTION_INPUT: {"topic": "a"}\n'
+        'ACTION: lookup\nACTION_INPUT: {"topic": "b"}\nACTION: calculator\nACTION_INPUT: {"expression": "6*7"}',
+        'THOUGHT: Done\nACTION: final_answer\nACTION_INPUT: {"answer": "a, b and 42"}',
+    ])
+
+    start = time.perf_counter()
+    task = asyncio.run(agent.execute_task("Compare a and b"))
+    elapsed = time.perf_counter() - start
+
+    assert task.status == TaskStatus.COMPLETED and task.result == "a, b and 42"
+    assert [t.action for t in task.thoughts] == ["lookup", "lookup", "calculator", "final_answer"]
+    assert task.thoughts[2].observation == "42"
+    assert elapsed < 0.55, f"Lookups ran sequentially ({elapsed:.2f}s)"
+    print(f"✅ 3 actions in one step, finished in {elapsed:.2f}s")
+
+    first, second = agent.ollama.prompts
+    assert "AVAILABLE TOOLS" in first and agent.ollama.contexts[0] is None
+    assert "AVAILABLE TOOLS" not in second and agent.ollama.contexts[1] == [1]
+    assert "facts about b" in second and "OBSERVATION (calculator): 42" in second
+    print("✅ Second prompt sends only new observations with the Ollama context")
+
+
+def test_tool_cache():
+    """Identical idempotent calls are memoized within and across tasks"""
+    print("\n[TEST] Tool Cache")
+    print("-" * 40)
+
+    same_twice = ('THOUGHT: x\nACTION: lookup\nACTION_INPUT: {"topic": "a"}\n'
+                  'ACTION: lookup\nACTION_INPUT: {"topic": "a"}')
+    finish = 'THOUGHT: y\nACTION: final_answer\nACTION_INPUT: {"answer": "ok"}'
+    agent, lookup = make_agent([same_twice, finish, same_twice, finish])
+
+    asyncio.run(agent.execute_task("first"))
+    assert lookup.calls == 1
+    print("✅ Duplicate call in one step executed once")
+
+    asyncio.run(agent.execute_task("second"))
+    assert lookup.calls == 1 and agent.stats['cache_hits'] == 3
+    print("✅ Second task served from cache")
+
+    assert asyncio.run(agent._execute_action("calculator", {"expression": "1/0"})).startswith("Calculation error")
+    assert not any(key[0] == "calculator" for key in agent._tool_cache)
+    assert asyncio.run(agent._execute_action("write_file", {})).startswith("Tool error")
+    print("✅ Errors and side-effecting tools are not cached")
+
+
+if __name__ == "__main__":
+    test_parallel_actions_and_incremental_prompt()
+    test_tool_cache()
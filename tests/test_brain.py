@@ -0,0 +1,395 @@
+"""
+Test Alfred Brain Storage Layer
+Author: Daniel J Rita (BATDAN)
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.brain import AlfredBrain
+
+
+def make_brain(tmp_path) -> AlfredBrain:
+    """Create a brain backed by a throwaway data directory"""
+    return AlfredBrain(data_dir=str(tmp_path))
+
+
+def test_pooled_connection_reuse(tmp_path):
+    """Pooled connections are reused per thread and run in WAL mode"""
+    print("\n[TEST] Pooled Connections")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+
+    for i in range(20):
+        brain.store_conversation(f"Question {i}", f"Answer {i}")
+        brain.get_conversation_context(limit=5)
+
+    stats = brain.pool.get_stats()
+    assert stats["connections_opened"] == 1, "Single thread should reuse one connection"
+    print(f"✅ {stats['acquires']} acquires served by {stats['connections_opened']} connection")
+
+    conn = brain._connect()
+    mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+    conn.close()
+    assert mode.lower() == "wal", f"Expected WAL journal, got {mode}"
+    print("✅ Database in WAL mode")
+
+    brain.close()
+
+
+def test_pooled_connection_rollback_on_close(tmp_path):
+    """Closing the outermost handle discards uncommitted work"""
+    print("\n[TEST] Rollback On Close")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+
+    outer = brain._connect()
+    outer.execute("INSERT INTO topics (topic, first_seen, last_seen) VALUES ('x', 'now', 'now')")
+
+    # Nested use in the same thread shares the transaction and must not roll it back
+    inner = brain._connect()
+    count = inner.execute("SELECT COUNT(*) FROM topics").fetchone()[0]
+    inner.close()
+    assert count == 1, "Nested handle should see the outer transaction"
+
+    outer.close()
+    assert brain.get_top_topics() == [], "Uncommitted insert should be rolled back"
+    print("✅ Uncommitted work rolled back when released")
+
+    brain.close()
+
+
+def test_pooled_connection_released_on_error(tmp_path):
+    """A method that raises mid-transaction releases its handle; dead threads' connections are closed"""
+    print("\n[TEST] Release On Error")
+    print("-" * 40)
+
+    import threading
+
+    brain = make_brain(tmp_path)
+    try:
+        brain.store_conversation("hi", "hello", context={"x": object()})
+    except TypeError:
+        pass
+    else:
+        raise AssertionError("Unserialisable context should raise")
+
+    errors = []
+    worker = threading.Thread(target=lambda: _set_preference(brain, errors))
+    worker.start()
+    worker.join()
+    assert errors == [] and brain.get_preference("theme") == "dark"
+    print("✅ Write lock released after the failed call")
+
+    opened = brain.pool.get_stats()["connections_opened"]
+    assert opened == 2 and brain.pool.get_stats()["open_connections"] == 1
+    print("✅ Exited thread's connection closed")
+
+    brain.close()
+
+
+def _set_preference(brain, errors):
+    try:
+        brain.set_preference("theme", "dark")
+    except Exception as e:
+        errors.append(e)
+
+
+def test_fulltext_search(tmp_path):
+    """FTS5 search finds conversations and knowledge and tracks updates/deletes"""
+    print("\n[TEST] Full-Text Search")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+    assert brain.fts_enabled, "SQLite build should support FTS5"
+
+    brain.store_conversation("How do I patch CVE-2024-3094?", "Upgrade xz-utils, sir.", importance=8)
+    brain.store_conversation("What's the weather?", "Sunny, sir.", importance=3)
+    brain.store_knowledge("security", "xz_backdoor", "CVE-2024-3094 affects xz-utils 5.6.0")
+
+    results = brain.search_conversations("xz-utils")
+    assert len(results) == 1 and "CVE-2024-3094" in results[0]["user_input"]
+    print("✅ Conversation search via FTS5")
+
+    results = brain.search_knowledge("xz backdoor", semantic=False)
+    assert results and results[0]["key"] == "xz_backdoor"
+    print("✅ Knowledge search via FTS5")
+
+    conn = brain._connect()
+    conn.execute("UPDATE knowledge SET value = 'patched' WHERE key = 'xz_backdoor'")
+    conn.commit()
+    conn.close()
+    assert brain.search_knowledge("CVE", semantic=False) == []
+    print("✅ Index follows updates")
+
+    brain.close()
+
+
+def test_fulltext_backfill(tmp_path):
+    """Databases created before the FTS index are backfilled on startup"""
+    print("\n[TEST] Full-Text Backfill")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+    brain.store_conversation("Remember the Batcave wifi password", "Noted, sir.")
+    conn = brain._connect()
+    conn.execute("DROP TABLE conversations_fts")
+    conn.execute("DROP TRIGGER conversations_fts_insert")
+    conn.commit()
+    conn.close()
+    brain.close()
+
+    brain = make_brain(tmp_path)
+    assert len(brain.search_conversations("batcave")) == 1
+    print("✅ Existing conversations indexed on first startup")
+
+    brain.close()
+
+
+def test_semantic_index(tmp_path):
+    """Semantic search uses the postings index and stays in sync with merges"""
+    print("\n[TEST] Semantic Index")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+
+    brain.store_knowledge("tools", "editor", "Neovim with lua config", importance=6)
+    brain.store_knowledge("tools", "editor_dup", "Neovim with lua configs", importance=5)
+    brain.store_knowledge("food", "breakfast", "Eggs and toast", importance=5)
+    brain.store_conversation("I specialize in reverse engineering", "Splendid, sir.")
+
+    results = brain.search_knowledge("neovim")
+    assert [r["key"] for r in results] == ["editor", "editor_dup"]
+    assert all(r["relevance_score"] > 0 for r in results)
+    print("✅ Only matching documents returned, ranked by relevance")
+
+    results = brain.search_knowledge("reverse engineering")
+    assert results and results[0]["key"] == "specialization"
+    print("✅ Auto-extracted knowledge is indexed")
+
+    brain.merge_knowledge_items(results[0]["id"], [])
+    primary = brain.search_knowledge("neovim")[0]["id"]
+    duplicate = brain.search_knowledge("neovim")[1]["id"]
+    brain.merge_knowledge_items(primary, [duplicate])
+    assert len(brain.search_knowledge("neovim")) == 1
+    print("✅ Merged duplicates removed from index")
+
+    brain.close()
+
+
+def test_bounded_levenshtein():
+    """Bounded edit distance agrees with the full computation within the bound"""
+    print("\n[TEST] Bounded Levenshtein")
+    print("-" * 40)
+
+    import random
+    from core.near_duplicates import bounded_levenshtein
+
+    brain = AlfredBrain.__new__(AlfredBrain)  # levenshtein_distance needs no database
+    rng = random.Random(0)
+
+    for _ in range(500):
+        s1 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+        s2 = "".join(rng.choice("abc") for _ in range(rng.randint(0, 12)))
+        k = rng.randint(0, 6)
+        exact = brain.levenshtein_distance(s1, s2)
+        expected = exact if exact <= k else k + 1
+        assert bounded_levenshtein(s1, s2, k) == expected, (s1, s2, k)
+
+    print("✅ Matches full Levenshtein on 500 random pairs")
+
+
+def test_find_duplicates_lsh(tmp_path):
+    """LSH blocking finds the same near-duplicates as the pairwise scan"""
+    print("\n[TEST] Duplicate Detection")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+
+    brain.store_knowledge("user_info", "favorite_editor", "neovim with lua plugins")
+    brain.store_knowledge("user_info", "favourite_editor", "neovim with lua plugin")
+    brain.store_knowledge("user_info", "home_city", "Gotham")
+    brain.store_knowledge("user_habits", "favorite_editor", "neovim with lua plugins")
+
+    exhaustive = [(a, b, round(s, 6)) for a, b, s, *_ in brain.find_duplicate_knowledge()]
+
+    brain.DEDUP_EXHAUSTIVE_LIMIT = 0
+    blocked = [(a, b, round(s, 6)) for a, b, s, *_ in brain.find_duplicate_knowledge()]
+
+    assert len(exhaustive) == 1, "Only the same-category typo pair should match"
+    assert blocked == exhaustive
+    print("✅ LSH and pairwise scan agree")
+
+    brain.close()
+
+    from core import near_duplicates
+    if near_duplicates.NUMPY_AVAILABLE:
+        lsh = near_duplicates.MinHashLSH()
+        items = near_duplicates.shingles("neovim with lua plugins and a long tail of text")
+        vectorized = lsh.signature(items)
+        near_duplicates.NUMPY_AVAILABLE = False
+        try:
+            assert lsh.signature(items) == vectorized
+        finally:
+            near_duplicates.NUMPY_AVAILABLE = True
+        print("✅ NumPy and pure-Python signatures identical")
+
+
+def test_bulk_score_updates(tmp_path):
+    """Set-based score updates match the per-item formulas; incremental runs skip unchanged rows"""
+    print("\n[TEST] Bulk Score Updates")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+
+    for i in range(5):
+        brain.store_conversation(f"Question {i}", f"Answer {i}", importance=3 + i)
+        brain.store_knowledge("facts", f"fact_{i}", f"value {i}", confidence=0.2 * i)
+
+    assert brain.update_priority_scores() == 10
+
+    conn = brain._connect()
+    rows = conn.execute("""
+        SELECT timestamp, importance, confidence, times_accessed, last_accessed, priority_score
+        FROM knowledge
+    """).fetchall()
+    conn.close()
+    for timestamp, importance, confidence, times_accessed, last_accessed, score in rows:
+        expected = brain.calculate_priority_score({
+            'timestamp': timestamp, 'importance': importance, 'confidence': confidence,
+            'times_accessed': times_accessed, 'last_accessed': last_accessed
+        })
+        assert abs(score - expected) < 1e-9
+    print("✅ Bulk priority scores match calculate_priority_score")
+
+    assert brain.update_priority_scores(incremental=True) == 0
+    brain.recall_knowledge("facts", "fact_4")
+    assert brain.update_priority_scores(incremental=True) == 1
+    print("✅ Incremental run only rescored the accessed row")
+
+    result = brain.consolidate_memory_advanced(incremental=True)
+    assert result["retention_scores_updated"] == 5
+    assert brain.consolidate_memory_advanced(incremental=True)["retention_scores_updated"] == 0
+    print("✅ Incremental retention scoring")
+
+    brain.close()
+
+
+def test_knowledge_extraction(tmp_path):
+    """Extraction stores facts, handles corrections, and can run off the request path"""
+    print("\n[TEST] Knowledge Extraction")
+    print("-" * 40)
+
+    brain = make_brain(tmp_path)
+    brain.store_conversation("My name is Bruce", "Very good, sir.")
+    assert brain.recall_knowledge("user_info", "user_name") == "Bruce"
+    print("✅ Facts extracted synchronously")
+
+    brain.store_conversation("Actually, it's Metropolis", "My apologies, sir.")
+    assert brain.recall_knowledge("corrections", "user_correction") == "metropolis"
+    print("✅ Corrections stored")
+    brain.close()
+
+    brain = AlfredBrain(data_dir=str(tmp_path / "async"), async_extraction=True)
+    brain.store_conversation("I specialize in cryptography", "Splendid, sir.")
+    brain.wait_for_extraction(timeout=10)
+    assert brain.recall_knowledge("user_expertise", "specialization") == "cryptography"
+    print("✅ Background extraction stored knowledge")
+    brain.close()
+
+
+def test_write_behind_journal(tmp_path):
+    """Journaled turns are stored in batches and replayed exactly once after a crash"""
+    print("\n[TEST] Write-Behind Journal")
+    print("-" * 40)
+
+    brain = AlfredBrain(data_dir=str(tmp_path), write_behind=True)
+    for i in range(30):
+        assert brain.store_conversation(f"Question {i}", f"Answer {i}") is None
+    assert brain.get_conversation_context(limit=1)[0]["user"] == "Question 29"
+    assert brain.flush(timeout=10)
+    assert brain.get_memory_stats()["conversations"] == 30
+    stats = brain.journal.get_stats()
+    assert stats["pending"] == 0 and stats["batches"] < 30
+    print(f"✅ 30 turns stored in {stats['batches']} batches")
+    brain.close()
+
+    # Simulate a crash: turns journaled but never applied, plus a torn final line
+    journal_path = tmp_path / "conversation_journal.jsonl"
+    assert journal_path.read_text() == ""
+    with open(journal_path, "w") as f:
+        for seq in (31, 32):
+            f.write(json.dumps({
+                "seq": seq, "timestamp": "2025-01-01T09:00:00",
+                "user_input": f"Lost question {seq}", "alfred_response": "Lost answer",
+                "importance": 5
+            }) + "\n")
+        f.write('{"seq": 33, "user_in')
+
+    brain = AlfredBrain(data_dir=str(tmp_path), write_behind=True)
+    assert brain.get_memory_stats()["conversations"] == 32
+    print("✅ Journal replayed on startup")
+    brain.close()
+
+    brain = AlfredBrain(data_dir=str(tmp_path), write_behind=True)
+    assert brain.get_memory_stats()["conversations"] == 32
+    print("✅ Replay is not repeated")
+    brain.close()
+
+
+def test_journal_poisoned_entry(tmp_path):
+    """An entry that always fails is dead-lettered instead of blocking later turns"""
+    print("\n[TEST] Journal Poisoned Entry")
+    print("-" * 40)
+
+    tmp_path.mkdir(parents=True, exist_ok=True)
+    journal_path = tmp_path / "conversation_journal.jsonl"
+    with open(journal_path, "w") as f:
+        for seq in (1, 2, 3):
+            entry = {"seq": seq, "timestamp": f"2025-01-01T09:00:0{seq}",
+                     "user_input": f"Question {seq}", "alfred_response": "Answer", "importance": 5}
+            if seq == 2:
+                del entry["user_input"]  # Fails in _insert_conversation every time
+            f.write(json.dumps(entry) + "\n")
+
+    brain = AlfredBrain(data_dir=str(tmp_path), write_behind=True)
+    assert brain.get_memory_stats()["conversations"] == 2
+    stats = brain.journal.get_stats()
+    assert stats["dead_lettered"] == 1 and stats["applied_seq"] == 3 and stats["pending"] == 0
+    dead = [json.loads(line) for line in (tmp_path / "conversation_journal.dead.jsonl").read_text().splitlines()]
+    assert [entry["seq"] for entry in dead] == [2] and "user_input" in dead[0]["error"]
+    print("✅ Replay stored the good turns; poisoned entry dead-lettered")
+
+    brain.store_conversation("Question 4", "Answer")
+    assert brain.flush(timeout=10)
+    assert brain.get_memory_stats()["conversations"] == 3
+    brain.close()
+
+    brain = AlfredBrain(data_dir=str(tmp_path), write_behind=True)
+    assert brain.journal.get_stats()["replayed"] == 0
+    assert brain.get_memory_stats()["conversations"] == 3
+    print("✅ Later turns stored; dead entry not replayed after restart")
+    brain.close()
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as tmp:
+        test_pooled_connection_reuse(Path(tmp) / "reuse")
+        test_pooled_connection_rollback_on_close(Path(tmp) / "rollback")
+        test_pooled_connection_released_on_error(Path(tmp) / "release")
+        test_fulltext_search(Path(tmp) / "fts")
+        test_fulltext_backfill(Path(tmp) / "backfill")
+        test_semantic_index(Path(tmp) / "semantic")
+        test_bounded_levenshtein()
+        test_find_duplicates_lsh(Path(tmp) / "dedup")
+        test_bulk_score_updates(Path(tmp) / "scores")
+        test_journal_poisoned_entry(Path(tmp) / "poisoned")
+        test_knowledge_extraction(Path(tmp) / "extract")
+        test_write_behind_journal(Path(tmp) / "journal")
@@ -0,0 +1,115 @@
+"""
+Test Document Chunker (streaming, token-aware, markdown-aware)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import io
+import sys
+from pathlib import Path
+
+# RAG modules import each other as scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "capabilities" / "rag"))
+
+from chunking import DocumentChunker, token_counter
+
+GUIDE = """# Guide
+
+Intro paragraph. It has two sentences.
+
+## Install
+
+```bash
+pip install alfred
+
+alfred --init
+```
+
+## Usage
+
+""" + "Use the tool carefully. " * 120 + "\n\n### Tips\n\nShort tip.\n"
+
+
+def test_markdown_chunking():
+    """Chunks respect size, headings and code fences, and carry overlap"""
+    print("\n[TEST] Markdown Chunking")
+    print("-" * 40)
+
+    chunker = DocumentChunker(chunk_size=300, chunk_overlap=60)
+    chunks = chunker.chunk_text(GUIDE, metadata={"url": "https://example.com"})
+
+    assert all(len(c["text"]) <= 300 for c in chunks)
+    assert [c["metadata"]["chunk_num"] for c in chunks] == list(range(len(chunks)))
+    assert all(c["metadata"]["url"] == "https://example.com" for c in chunks)
+    print(f"✅ {len(chunks)} chunks, all within 300 chars")
+
+    code = next(c for c in chunks if "```bash" in c["text"])
+    assert "alfred --init\n```" in code["text"], "Code block split at its blank line"
+    assert not any(c["text"].rstrip().endswith("## Usage") for c in chunks)
+    print("✅ Code fence kept whole, headings never left dangling")
+
+    usage = [c for c in chunks if c["metadata"].get("section") == "Guide > Usage"]
+    assert usage[0]["text"].startswith("## Usage")
+    assert usage[1]["text"].split("\n\n")[0] in usage[0]["text"], "No overlap between chunks"
+    print("✅ Heading path recorded, overlap carried between chunks")
+
+    nested = ("# Site\n\nIntro.\n\n## Crane\n\n### Inspection\n\n"
+              + " ".join(f"Check item {i} before lifting." for i in range(30)) + "\n")
+    split = DocumentChunker(chunk_size=181, chunk_overlap=5).chunk_text(nested)
+    assert all(len(c["text"]) <= 181 for c in split)
+    assert any(c["text"].startswith("## Crane\n\n### Inspection\n\nCheck item 0") for c in split)
+    print("✅ Headings before an oversized paragraph kept with its first piece")
+
+
+def test_streaming_input():
+    """Strings, files and arbitrary pieces produce identical chunks"""
+    print("\n[TEST] Streaming Input")
+    print("-" * 40)
+
+    chunker = DocumentChunker(chunk_size=300, chunk_overlap=60)
+    expected = [(c["text"], c["metadata"]) for c in chunker.iter_chunks(GUIDE)]
+    pieces = (GUIDE[i:i + 7] for i in range(0, len(GUIDE), 7))
+
+    assert [(c["text"], c["metadata"]) for c in chunker.iter_chunks(pieces)] == expected
+    assert [(c["text"], c["metadata"]) for c in chunker.iter_chunks(io.StringIO(GUIDE))] == expected
+    print("✅ Same chunks and offsets from text, file and 7-char pieces")
+
+    first = expected[0][1]
+    assert GUIDE[first["chunk_start"]:first["chunk_end"]].startswith("# Guide")
+
+    def endless():
+        for i in range(100_000):
+            yield f"Paragraph {i} of a very long page.\n\n"
+
+    stream = chunker.iter_chunks(endless())
+    assert next(stream)["text"].startswith("Paragraph 0")
+    print("✅ Chunks are yielded lazily from a generator")
+
+
+def test_token_sizing():
+    """Chunks are sized by the tokenizer, oversized text is split"""
+    print("\n[TEST] Token Sizing")
+    print("-" * 40)
+
+    class WordTokenizer:
+        def encode(self, text, add_special_tokens=True):
+            return text.split()
+
+    assert token_counter(None)("abc") == 3
+    assert token_counter(WordTokenizer())("a b c") == 3
+    assert token_counter(lambda text: 7)("x") == 7
+
+    chunker = DocumentChunker(chunk_size=20, chunk_overlap=5, tokenizer=WordTokenizer())
+    chunks = chunker.chunk_text("word " * 100 + "\n\nThe end.")
+    assert all(c["metadata"]["chunk_tokens"] <= 20 for c in chunks)
+    assert chunks[-1]["text"].endswith("The end.")
+    print(f"✅ {len(chunks)} chunks of at most 20 tokens")
+
+    huge = DocumentChunker(chunk_size=1000, chunk_overlap=0).chunk_text("x" * 50_000)
+    assert all(len(c["text"]) <= 1000 for c in huge) and sum(len(c["text"]) for c in huge) == 50_000
+    print("✅ A single 50KB token is hard-cut")
+
+
+if __name__ == "__main__":
+    test_markdown_chunking()
+    test_streaming_input()
+    test_token_sizing()
@@ -0,0 +1,81 @@
+"""
+Test Code Scanner (parallel, incremental fallback scanning)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import os
+import sys
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from agents.code_scanner import CodeScanner, LineIndex, scan_text
+
+SOURCE = '''import os
+
+def run(cmd):
+    os.SYSTEM(cmd)
+
+PASSWORD = "hunter2"
+'''
+
+
+def test_scan_text():
+    """Patterns are case-insensitive and report correct lines"""
+    print("\n[TEST] Scan Text")
+    print("-" * 40)
+
+    index = LineIndex("a\nb\n\nc")
+    assert [index.line_of(pos) for pos in (0, 1, 2, 4, 5)] == [1, 1, 2, 3, 4]
+
+    hits = scan_text(SOURCE)
+    assert ("Command Injection", 4, "os.SYSTEM(") in hits
+    assert ("Hardcoded Secrets", 6, 'PASSWORD = "hunter2"') in hits
+    assert scan_text("İ" * 3 + "\neval(x)") == [("Command Injection", 2, "eval(")]
+    print(f"✅ {len(hits)} hits with original-case snippets and line numbers")
+
+
+def test_incremental_parallel_scan(tmp_path):
+    """Every file is scanned (pool or not), unchanged files come from the cache"""
+    print("\n[TEST] Incremental Parallel Scan")
+    print("-" * 40)
+
+    tree = tmp_path / "repo"
+    for i in range(150):
+        module = tree / f"pkg{i % 5}" / f"mod{i}.py"
+        module.parent.mkdir(parents=True, exist_ok=True)
+        module.write_text(SOURCE if i % 3 == 0 else "x = 1\n")
+    (tree / "node_modules").mkdir()
+    (tree / "node_modules" / "dep.js").write_text("eval(x)")
+
+    old = 1_000_000_000  # Well outside the racy-mtime window
+    for path in tree.rglob("*.py"):
+        os.utime(path, ns=(old, old))
+
+    scanner = CodeScanner(cache_path=str(tmp_path / "cache.db"), max_workers=2, parallel_threshold=10)
+    first = scanner.scan(str(tree))
+    assert first["files_scanned"] == 150 and first["cache_hits"] == 0
+    assert len(first["findings"]) == 50 * len(scan_text(SOURCE))
+    assert not any("node_modules" in f["path"] for f in first["findings"])
+    print(f"✅ 150 files scanned (no 100-file cap) in {first['elapsed']:.2f}s")
+
+    second = scanner.scan(str(tree))
+    assert second["cache_hits"] == 150 and second["findings"] == first["findings"]
+    print(f"✅ Re-scan served from cache in {second['elapsed'] * 1000:.1f}ms")
+
+    changed = tree / "pkg1" / "mod1.py"
+    changed.write_text("eval(data)\n")
+    third = scanner.scan(str(tree))
+    assert third["cache_hits"] == 149
+    assert {"path": str(changed), "type": "Command Injection", "line": 1, "snippet": "eval("} in third["findings"]
+    print("✅ Only the edited file is re-scanned")
+    scanner.close()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_scan_text()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_incremental_parallel_scan(Path(tmp))
@@ -0,0 +1,230 @@
+"""
+Test change-log delta sync between brains (cursors, idempotent merge, BrainSyncClient)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import sqlite3
+import sys
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from urllib.parse import urlparse
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.brain import AlfredBrain
+import brain_sync_client
+from brain_sync_client import BrainSyncClient
+
+
+class FakeResponse:
+    def __init__(self, payload, status_code=200):
+        self.payload = payload
+        self.status_code = status_code
+        self.text = str(payload)
+
+    def json(self):
+        return self.payload
+
+
+class LoopbackServer:
+    """Stands in for requests: /sync/push and /sync/pull served from a brain"""
+
+    exceptions = brain_sync_client.requests.exceptions
+
+    def __init__(self, brain, fail_after=None):
+        self.brain = brain
+        self.fail_after = fail_after
+        self.pushes = 0
+
+    def post(self, url, json=None, timeout=None):
+        if self.fail_after is not None and self.pushes >= self.fail_after:
+            raise self.exceptions.ConnectionError("link down")
+        self.pushes += 1
+        assert urlparse(url).path == "/sync/push"
+        merged = self.brain.merge_changes(json["changes"], json["deletes"], json["device_id"])
+        return FakeResponse({"status": "success", "merged": merged})
+
+    def get(self, url, params=None, timeout=None):
+        assert urlparse(url).path == "/sync/pull"
+        return FakeResponse(self.brain.get_changes(
+            params["cursor"], params["limit"], exclude_origin=params["device_id"]))
+
+
+def test_change_log(tmp_path):
+    """Triggers log each changed row once; bookkeeping updates are not changes"""
+    print("\n[TEST] Change Log")
+    print("-" * 40)
+
+    brain = AlfredBrain(data_dir=str(tmp_path))
+    start = brain.get_change_cursor()
+    for i in range(5):
+        brain.store_knowledge("site", f"fact{i}", f"value {i}")
+    brain.track_skill_use("python")
+    brain.track_skill_use("python")
+    brain.recall_knowledge("site", "fact0")
+
+    page = brain.get_changes(start)
+    assert [k["key"] for k in page["changes"]["knowledge"]] == [f"fact{i}" for i in range(5)]
+    assert page["changes"]["skills"][0]["times_used"] == 1 and not page["has_more"]
+    print("✅ Inserts and updates logged, skill updated twice returned once")
+
+    cursor = page["next_cursor"]
+    brain.get_conversation_context()
+    brain.update_priority_scores()
+    assert brain.get_changes(cursor)["next_cursor"] == cursor
+    print("✅ Access tracking and score updates are not sync changes")
+
+    first = brain.get_changes(start, limit=3)
+    rest = brain.get_changes(first["next_cursor"], limit=3)
+    assert first["has_more"] and not rest["has_more"]
+    assert len(first["changes"]["knowledge"]) + len(rest["changes"]["knowledge"]) == 5
+    print("✅ Cursor paging")
+
+    later = datetime.now().isoformat()
+    brain.store_knowledge("site", "fact5", "value 5")
+    since = brain.get_change_cursor(later)
+    assert [k["key"] for k in brain.get_changes(since)["changes"]["knowledge"]] == ["fact5"]
+    assert brain.get_change_cursor("2999-01-01T00:00:00") == brain.get_change_cursor()
+    print("✅ Timestamp translated to a starting cursor")
+
+    cursor = brain.get_change_cursor()
+    conn = sqlite3.connect(brain.db_path)
+    conn.execute("UPDATE knowledge SET confidence = MIN(1.0, confidence), importance = importance")
+    conn.commit()
+    assert brain.get_changes(cursor)["next_cursor"] == cursor
+    conn.execute("UPDATE knowledge SET importance = importance + 1 WHERE key = 'fact2'")
+    conn.commit()
+    conn.close()
+    assert [k["key"] for k in brain.get_changes(cursor)["changes"]["knowledge"]] == ["fact2"]
+    print("✅ Rewrites that change no synced column are not logged")
+
+    conn = sqlite3.connect(brain.db_path)
+    for table, (_, natural_key, _) in brain.SYNC_TABLES.items():
+        match = " AND ".join(f"{col} = ?" for col in natural_key)
+        plan = conn.execute(f"EXPLAIN QUERY PLAN SELECT * FROM {table} WHERE {match}",
+                            ("x",) * len(natural_key)).fetchall()
+        assert all("SCAN" not in row[-1] for row in plan), (table, plan)
+    print("✅ Merge lookups use indexes")
+
+    conn.execute("DELETE FROM knowledge WHERE key = 'fact1'")
+    conn.execute("DROP TABLE change_log")
+    conn.commit()
+    conn.close()
+    reopened = AlfredBrain(data_dir=str(tmp_path))
+    assert len(reopened.get_changes(0)["changes"]["knowledge"]) == 5
+    print("✅ Existing databases backfilled once")
+
+
+def test_merge_changes(tmp_path):
+    """Merging is idempotent, does not echo, keeps newer rows and applies deletes"""
+    print("\n[TEST] Idempotent Merge")
+    print("-" * 40)
+
+    a = AlfredBrain(data_dir=str(tmp_path / "a"))
+    b = AlfredBrain(data_dir=str(tmp_path / "b"))
+    a.store_conversation("Where is the crane?", "North side", topics=["site"])
+    a.store_knowledge("site", "gate_code", "1234", importance=8)
+    a.record_pattern("time_of_day", {"hour": 9})
+
+    page = a.get_changes(0)
+    merged = b.merge_changes(page["changes"], page["deletes"], origin="a")
+    assert merged["conversations"] == 1 and merged["knowledge"] >= 1 and merged["patterns"] == 1
+    assert b.recall_knowledge("site", "gate_code") == "1234"
+    again = b.merge_changes(page["changes"], page["deletes"], origin="a")
+    assert sum(again[t] for t in b.SYNC_TABLES) == 0 and again["unchanged"] > 0
+    print("✅ Same page merged twice changes nothing")
+
+    assert b.get_changes(0, exclude_origin="a")["next_cursor"] == b.get_change_cursor()
+    assert not any(b.get_changes(0, exclude_origin="a")["changes"].values())
+    print("✅ Merged rows are not sent back to their origin")
+
+    old = dict(page["changes"]["patterns"][0], frequency=1, last_seen="2000-01-01T00:00:00")
+    b.record_pattern("time_of_day", {"hour": 9})
+    assert b.merge_changes({"patterns": [old]})["unchanged"] == 1
+    assert b.get_patterns("time_of_day")[0]["frequency"] == 2
+    print("✅ Older row does not overwrite a newer one")
+
+    a.store_knowledge("site", "gate", "1234", importance=8)
+    page = a.get_changes(page["next_cursor"])
+    b.merge_changes(page["changes"], page["deletes"])
+    cursor = a.get_change_cursor()
+    gate_ids = [k["id"] for k in a.get_top_knowledge(category="site") if k["key"] in ("gate", "gate_code")]
+    assert a.merge_knowledge_items(gate_ids[0], gate_ids[1:]) == 1
+    delta = a.get_changes(cursor)
+    assert len(delta["deletes"]["knowledge"]) == 1
+    assert b.merge_changes(delta["changes"], delta["deletes"])["deleted"] == 1
+    assert len([k for k in b.get_top_knowledge(category="site") if k["key"] in ("gate", "gate_code")]) == 1
+    print("✅ Deletes propagate as tombstones")
+
+    # A local write racing the merge must not be tagged with the pushing device
+    local = threading.Thread(target=b.store_knowledge, args=("site", "local_note", "mine"))
+    unindex = b._unindex_knowledge
+
+    def racing_unindex(cursor, knowledge_ids):
+        b._unindex_knowledge = unindex
+        local.start()
+        local.join(0.3)
+        unindex(cursor, knowledge_ids)
+
+    b._unindex_knowledge = racing_unindex
+    cursor = b.get_change_cursor()
+    gate = next(k for k in b.get_top_knowledge(category="site") if k["key"] in ("gate", "gate_code"))
+    tombstone = {"category": "site", "key": gate["key"], "timestamp": gate["timestamp"]}
+    assert b.merge_changes({}, {"knowledge": [tombstone]}, origin="a")["deleted"] == 1
+    local.join()
+    pulled = b.get_changes(cursor, exclude_origin="a")["changes"]["knowledge"]
+    assert [k["key"] for k in pulled] == ["local_note"]
+    print("✅ Concurrent local write is not tagged with the merge origin")
+
+
+def test_client_push_pull(tmp_path):
+    """BrainSyncClient pages both ways from persisted cursors and resumes after a drop"""
+    print("\n[TEST] BrainSyncClient Cursors")
+    print("-" * 40)
+
+    server = AlfredBrain(data_dir=str(tmp_path / "server"))
+    pc1 = BrainSyncClient("http://server", page_size=2, brain=AlfredBrain(data_dir=str(tmp_path / "pc1")))
+    pc2 = BrainSyncClient("http://server", page_size=2, brain=AlfredBrain(data_dir=str(tmp_path / "pc2")))
+    pc2.device_id = "pc-2"
+
+    for i in range(5):
+        pc1.brain.store_knowledge("project", f"task{i}", f"step {i}")
+    real_requests = brain_sync_client.requests
+    try:
+        _push_and_pull(server, pc1, pc2)
+    finally:
+        brain_sync_client.requests = real_requests
+
+
+def _push_and_pull(server, pc1, pc2):
+    brain_sync_client.requests = LoopbackServer(server, fail_after=1)
+    assert not pc1.push()
+    assert pc1._load_sync_state()["push_cursor"] > 0
+    print("✅ Push dropped after one page; cursor kept")
+
+    loopback = LoopbackServer(server)
+    brain_sync_client.requests = loopback
+    assert pc1.push() and loopback.pushes == 2
+    assert {k["key"] for k in server.get_top_knowledge(category="project", limit=10)} == {
+        f"task{i}" for i in range(5)}
+    print("✅ Resumed from cursor: remaining pages only")
+
+    assert pc2.pull()
+    assert pc2.brain.recall_knowledge("project", "task4") == "step 4"
+    assert pc2.push() and loopback.pushes == 2
+    print("✅ Pulled rows are not pushed back")
+
+    assert pc1.pull() and pc1.brain.get_memory_stats()["knowledge"] == 5
+    pc1.brain.store_knowledge("project", "task5", "step 5")
+    assert pc1.push() and loopback.pushes == 3
+    assert pc2.pull() and pc2.brain.recall_knowledge("project", "task5") == "step 5"
+    print("✅ Next sync sends only the new change")
+
+
+if __name__ == "__main__":
+    for test in (test_change_log, test_merge_changes, test_client_push_pull):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
@@ -0,0 +1,154 @@
+"""
+Test Embedding Service (micro-batching + vector cache)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import asyncio
+import sys
+import threading
+import time
+from pathlib import Path
+
+# RAG modules import each other as scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "capabilities" / "rag"))
+
+from embedding_service import EmbeddingService
+
+
+class FakeModel:
+    """SentenceTransformer stand-in: fixed cost per encode call"""
+
+    def __init__(self, call_cost: float = 0.05):
+        self.call_cost = call_cost
+        self.calls = []
+
+    def encode(self, texts, batch_size=32):
+        self.calls.append(len(texts))
+        time.sleep(self.call_cost)
+        return [[float(len(text)), float(sum(map(ord, text)) % 97)] for text in texts]
+
+
+def test_micro_batching():
+    """Concurrent callers share encode calls; duplicates are encoded once"""
+    print("\n[TEST] Embedding Micro-Batching")
+    print("-" * 40)
+
+    model = FakeModel()
+    service = EmbeddingService(model, max_wait=0.02)
+    results = {}
+
+    def worker(i):
+        results[i] = service.embed([f"chunk {i}", "shared boilerplate"])
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(20)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert all(results[i][0] == [float(len(f"chunk {i}")), float(sum(map(ord, f"chunk {i}")) % 97)] for i in range(20))
+    assert len(model.calls) <= 4, model.calls
+    assert sum(model.calls) == 21, "Each distinct text should be encoded once"
+    print(f"✅ 20 callers served by {len(model.calls)} encode calls")
+
+    async def main():
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                ticks += 1
+                await asyncio.sleep(0.005)
+
+        tick_task = asyncio.create_task(ticker())
+        vectors = await asyncio.gather(*(service.embed_async([f"async {i}"]) for i in range(10)))
+        tick_task.cancel()
+        return vectors, ticks
+
+    vectors, ticks = asyncio.run(main())
+    assert len(vectors) == 10 and ticks >= 5
+    print(f"✅ Async callers awaited without blocking the loop ({ticks} ticks)")
+    service.close()
+
+
+def test_embedding_cache(tmp_path):
+    """Vectors persist by content hash; unchanged chunks are never re-encoded"""
+    print("\n[TEST] Embedding Cache")
+    print("-" * 40)
+
+    texts = [f"Wayne Enterprises report section {i}" for i in range(50)]
+    model = FakeModel(call_cost=0)
+    service = EmbeddingService(model, cache_path=str(tmp_path / "embeddings.db"))
+    first = service.embed(texts)
+    service.close()
+
+    model = FakeModel(call_cost=0)
+    service = EmbeddingService(model, cache_path=str(tmp_path / "embeddings.db"))
+    again = service.embed(texts + ["a brand new paragraph"])
+    assert again[:50] == first and model.calls == [1]
+    assert service.get_stats()['cache_hits'] == 50
+    print("✅ Re-crawl only encoded the changed chunk")
+
+    other = EmbeddingService(FakeModel(call_cost=0), model_name="other-model",
+                             cache_path=str(tmp_path / "embeddings.db"))
+    other.embed(texts[:1])
+    assert other.get_stats()['encoded'] == 1, "Cache keys must include the model name"
+    print("✅ Cache is per model")
+    service.close()
+    other.close()
+
+
+def test_close_race():
+    """Requests racing close() always resolve; counters survive concurrent callers"""
+    print("\n[TEST] Embedding Service Shutdown")
+    print("-" * 40)
+
+    service = EmbeddingService(FakeModel(call_cost=0))
+    service.embed(["warm"])
+
+    def hammer():
+        for _ in range(2000):
+            service.submit(["warm"])
+
+    threads = [threading.Thread(target=hammer) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert service.get_stats()['requests'] == 1 + 8 * 2000
+    print("✅ Fast-path counters exact under 8 concurrent callers")
+    service.close()
+
+    # Stall a request between submit's closed check and its put, and close meanwhile
+    service = EmbeddingService(FakeModel(call_cost=0))
+    put = service._queue.put
+
+    def slow_put(item, *args, **kwargs):
+        if item is not None:
+            time.sleep(0.1)
+        put(item, *args, **kwargs)
+
+    service._queue.put = slow_put
+    late = []
+    submitter = threading.Thread(target=lambda: late.append(service.submit(["late"])))
+    submitter.start()
+    time.sleep(0.02)
+    service.close()
+    submitter.join()
+    assert late[0].result(timeout=2) == [[4.0, float(sum(map(ord, "late")) % 97)]]
+    try:
+        service.submit(["after"])
+    except RuntimeError:
+        pass
+    else:
+        raise AssertionError("submit after close() should be rejected")
+    print("✅ Request racing close() served before the worker stops; later ones rejected")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_micro_batching()
+    test_close_race()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_embedding_cache(Path(tmp))
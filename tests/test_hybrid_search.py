@@ -0,0 +1,73 @@
+"""
+Test Hybrid Search (BM25 sidecar + rank fusion)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import sys
+from pathlib import Path
+
+# RAG modules import each other as scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "capabilities" / "rag"))
+
+from hybrid_search import LexicalIndex, lexical_query, reciprocal_rank_fusion, chroma_where
+
+
+def test_lexical_index(tmp_path):
+    """Identifiers match exactly, filters apply before ranking, updates stay in sync"""
+    print("\n[TEST] Lexical Index")
+    print("-" * 40)
+
+    assert lexical_query("What is CVE-2024-3094?") == '"CVE 2024 3094"'
+    assert lexical_query("what is the") is None
+    print("✅ Identifiers become phrase queries, stopwords dropped")
+
+    index = LexicalIndex(str(tmp_path / "lexical.db"))
+    index.upsert(
+        ["xz", "generic", "cli", "ticker"],
+        [
+            "CVE-2024-3094: backdoor in xz liblzma 5.6.0",
+            "A 2024 vulnerability roundup covering 3094 advisories and CVE trends",
+            "parse_args() builds the argparse namespace for the CLI",
+            "NVDA closed higher after earnings",
+        ],
+        [{"url": "a", "source": "nvd"}, {"url": "b", "source": "blog"},
+         {"url": "c", "source": "docs"}, {"url": "d", "source": "market"}],
+    )
+
+    assert [hit["id"] for hit in index.search("Tell me about CVE-2024-3094")] == ["xz"]
+    assert index.search("parse_args")[0]["id"] == "cli"
+    assert index.search("NVDA earnings")[0]["id"] == "ticker"
+    print("✅ CVE IDs, function names and tickers found by exact match")
+
+    assert index.search("roundup", where={"source": "nvd"}) == []
+    assert sorted(h["id"] for h in index.search("CVE", where={"source": {"$in": ["blog", "nvd"]}})) == ["generic", "xz"]
+    assert index.search("CVE", where={"$and": [{"url": "a"}, {"source": {"$ne": "nvd"}}]}) == []
+    print("✅ Metadata pre-filter")
+
+    index.update_metadata(["xz"], [{"chunk_num": 3}])
+    assert index.search("liblzma")[0]["metadata"] == {"url": "a", "source": "nvd", "chunk_num": 3}
+    index.delete(["xz"])
+    assert index.search("liblzma") == [] and index.count() == 3
+    print("✅ Metadata merges and deletes stay in sync with FTS")
+    index.close()
+
+
+def test_rank_fusion():
+    """RRF rewards documents both retrievers agree on"""
+    print("\n[TEST] Reciprocal Rank Fusion")
+    print("-" * 40)
+
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["c", "d", "a"]])
+    assert [doc for doc, _ in fused][:2] == ["a", "c"]
+    assert fused[0][1] == 1 / 61 + 1 / 63
+    assert chroma_where({"url": "a", "source": "b"}) == {"$and": [{"url": "a"}, {"source": "b"}]}
+    assert chroma_where({"url": "a"}) == {"url": "a"} and chroma_where({}) is None
+    print("✅ Fused ranking and Chroma filter translation")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_lexical_index(Path(tmp))
+    test_rank_fusion()
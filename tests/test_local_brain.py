@@ -0,0 +1,116 @@
+"""
+Test M5 Cardputer LocalBrain append-only log store
+Author: Daniel J Rita (BATDAN)
+"""
+
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Add m5_cardputer directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent / "m5_cardputer"))
+
+from local_brain import LocalBrain, COMPACT_MIN_DEAD
+
+
+def test_store_and_sync(tmp_path):
+    """store appends, pending comes from the index, syncing appends a tombstone"""
+    print("\n[TEST] Store and Sync")
+    print("-" * 40)
+
+    brain = LocalBrain(str(tmp_path))
+    ids = [brain.store({"type": "note", "content": f"note {i}", "timestamp": i}) for i in range(5)]
+    obs = brain.store({"type": "observation", "description": "crack", "timestamp": 10})
+
+    notes_log = tmp_path / "notes.log"
+    assert len(notes_log.read_text().splitlines()) == 5
+    assert brain.get_pending_count() == 6
+    assert [p["id"] for p in brain.get_pending()] == ids + [obs]
+    print("✅ 6 items appended and pending")
+
+    size = notes_log.stat().st_size
+    assert brain.mark_all_synced(ids[:3]) == 3
+    assert brain.mark_synced(obs) and not brain.mark_synced(obs)
+    assert notes_log.stat().st_size > size and len(notes_log.read_text().splitlines()) == 6
+    assert [p["id"] for p in brain.get_pending()] == ids[3:]
+    print("✅ Sync marks appended as tombstones")
+
+    reopened = LocalBrain(str(tmp_path))
+    assert [p["id"] for p in reopened.get_pending()] == ids[3:]
+    assert reopened.get_by_id(ids[0])["synced"] is True
+    new_id = reopened.store({"type": "note", "content": "after reboot"})
+    assert int(new_id.rsplit("_", 1)[1]) == 7
+    stats = reopened.get_stats()
+    assert stats["notes"] == {"total": 6, "pending": 3} and stats["total_pending"] == 3
+    print("✅ Index, sync state and sequence recovered after reboot")
+
+
+def test_compaction_and_cleanup(tmp_path):
+    """Dead records trigger compaction; delete_synced drops expired items"""
+    print("\n[TEST] Compaction")
+    print("-" * 40)
+
+    brain = LocalBrain(str(tmp_path))
+    ids = [brain.store({"type": "note", "content": f"n{i}"}) for i in range(COMPACT_MIN_DEAD)]
+    for item_id in ids:
+        brain.mark_synced(item_id)
+
+    lines = (tmp_path / "notes.log").read_text().splitlines()
+    assert len(lines) == COMPACT_MIN_DEAD
+    assert all(json.loads(line).get("synced") for line in lines)
+    print(f"✅ Compacted to {len(lines)} records")
+
+    keep = brain.store({"type": "note", "content": "unsynced"})
+    assert brain.delete_synced(older_than_days=7) == 0
+    assert brain.delete_synced(older_than_days=-1) == COMPACT_MIN_DEAD
+    assert [p["id"] for p in brain.get_pending()] == [keep]
+    assert len((tmp_path / "notes.log").read_text().splitlines()) == 1
+    print("✅ Expired synced items deleted, pending item kept")
+
+
+def test_tasks_and_recovery(tmp_path):
+    """Task updates are patches; torn writes and legacy files are recovered"""
+    print("\n[TEST] Tasks and Recovery")
+    print("-" * 40)
+
+    (tmp_path / "voice.json").write_text(json.dumps([
+        {"id": "edge_1_41", "type": "voice_note", "synced": False, "timestamp": 1},
+        {"id": "edge_1_42", "type": "voice_note", "synced": True, "synced_at": time.time()},
+    ]))
+    brain = LocalBrain(str(tmp_path))
+    assert not (tmp_path / "voice.json").exists()
+    assert [p["id"] for p in brain.get_pending()] == ["edge_1_41"]
+    assert brain._sequence == 42
+    print("✅ Legacy JSON array migrated")
+
+    brain.store_task({"id": "t1", "title": "Pour slab"})
+    brain.store_task({"id": "t1", "title": "Pour slab east"})
+    assert brain.update_task_status("t1", "completed")
+    assert not brain.update_task_status("missing", "completed")
+    assert brain.get_tasks() == []
+    task = brain.get_by_id("t1")
+    assert task["title"] == "Pour slab east" and task["status"] == "completed"
+    print("✅ Task updates applied as patches")
+
+    note = brain.store({"type": "note", "content": "kept"})
+    with open(tmp_path / "notes.log", "ab") as f:
+        f.write(b'{"id": "torn", "content": "half wri')
+
+    recovered = LocalBrain(str(tmp_path))
+    assert {p["id"] for p in recovered.get_pending()} == {"edge_1_41", note}
+    after = recovered.store({"type": "note", "content": "after crash"})
+    assert recovered.get_by_id(after)["content"] == "after crash"
+    assert all(line.endswith("}") for line in (tmp_path / "notes.log").read_text().splitlines())
+    print("✅ Torn record dropped, log still appendable")
+
+    recovered.clear_all()
+    assert LocalBrain(str(tmp_path)).get_pending_count() == 0
+    print("✅ clear_all")
+
+
+if __name__ == "__main__":
+    for test in (test_store_and_sync, test_compaction_and_cleanup, test_tasks_and_recovery):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
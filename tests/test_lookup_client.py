@@ -0,0 +1,158 @@
+"""
+Test Knowledge Lookup Client (shared session + TTL cache)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.brain import AlfredBrain
+from capabilities.knowledge.lookup_client import LookupClient, LookupResponse
+from capabilities.knowledge.tech_pulse import TechPulse
+
+
+class CountingHandler(BaseHTTPRequestHandler):
+    """Returns a JSON counter so tests can see which responses were live"""
+    hits = 0
+
+    def do_GET(self):
+        CountingHandler.hits += 1
+        body = json.dumps({"hit": CountingHandler.hits}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class ETagHandler(BaseHTTPRequestHandler):
+    """Serves a fixed body with an ETag and honours If-None-Match"""
+    full = 0
+    not_modified = 0
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == '"v1"':
+            ETagHandler.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        ETagHandler.full += 1
+        body = b'{"tag_name": "v1.0"}'
+        self.send_response(200)
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handler=CountingHandler):
+    server = HTTPServer(("127.0.0.1", 0), handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_lookup_client_cache(tmp_path):
+    """TTL hits, stale-while-revalidate, and persistence into web_cache"""
+    print("\n[TEST] Lookup Client")
+    print("-" * 40)
+
+    brain = AlfredBrain(data_dir=str(tmp_path))
+    server, base = start_server()
+    try:
+        client = LookupClient(db_path=brain.db_path, ttls=[(r"/quote", 0.3)])
+
+        first = client.get(f"{base}/quote", params={"q": "AAPL", "apiKey": "secret"})
+        again = client.get(f"{base}/quote", params={"q": "AAPL", "apiKey": "other"})
+        assert again.from_cache and again.json() == first.json()
+        assert CountingHandler.hits == 1
+        print("✅ Fresh entry served from cache (credentials not in key)")
+
+        time.sleep(0.4)
+        stale = client.get(f"{base}/quote", params={"q": "AAPL"})
+        assert stale.stale and stale.json() == {"hit": 1}
+        deadline = time.time() + 5
+        while client.stats["revalidations"] < 1 and time.time() < deadline:
+            time.sleep(0.05)
+        assert client.get(f"{base}/quote", params={"q": "AAPL"}).json() == {"hit": 2}
+        print("✅ Stale entry served while revalidating in background")
+
+        restarted = LookupClient(db_path=brain.db_path, ttls=[(r"/quote", 60)])
+        assert restarted.get(f"{base}/quote", params={"q": "AAPL"}).from_cache
+        conn = brain._connect()
+        stored_url = conn.execute("SELECT url FROM web_cache").fetchone()[0]
+        conn.close()
+        assert "secret" not in stored_url
+        print("✅ Responses persisted in web_cache")
+
+        client.record_market_data("AAPL", "stocks", {"price": 1.0, "timestamp": "2025-01-01T00:00:00"})
+        conn = brain._connect()
+        assert conn.execute("SELECT COUNT(*) FROM market_data").fetchone()[0] == 1
+        conn.close()
+        print("✅ Quotes recorded in market_data")
+
+        client.close()
+        restarted.close()
+    finally:
+        server.shutdown()
+        brain.close()
+
+
+class SlowHTTP:
+    """Fake lookup client: every request takes 0.2s"""
+
+    def get(self, url, params=None, headers=None, timeout=10, ttl=None):
+        time.sleep(0.2)
+        if url.endswith("topstories.json"):
+            return LookupResponse(200, json.dumps(list(range(1, 11))))
+        story_id = int(url.rsplit("/", 1)[1].split(".")[0])
+        return LookupResponse(200, json.dumps({"type": "story", "title": f"Story {story_id}"}))
+
+
+def test_tech_pulse_parallel_and_etag():
+    """Hacker News items fetch concurrently; GitHub calls revalidate with ETags"""
+    print("\n[TEST] Tech Pulse Fetching")
+    print("-" * 40)
+
+    pulse = TechPulse()
+    pulse.http = SlowHTTP()
+    start = time.monotonic()
+    stories = pulse.get_hacker_news_top(limit=10)
+    elapsed = time.monotonic() - start
+    assert [story["title"] for story in stories] == [f"Story {i}" for i in range(1, 11)]
+    assert elapsed < 1.0, f"Items fetched serially ({elapsed:.2f}s)"
+    print(f"✅ 11 requests in {elapsed:.2f}s, order preserved")
+
+    server, base = start_server(ETagHandler)
+    try:
+        client = LookupClient(ttls=[(r".", 0.1)], stale_factor=0)
+        assert client.get(f"{base}/repos/x/releases/latest").json()["tag_name"] == "v1.0"
+        time.sleep(0.15)
+        renewed = client.get(f"{base}/repos/x/releases/latest")
+        assert renewed.status_code == 200 and renewed.json()["tag_name"] == "v1.0"
+        assert ETagHandler.full == 1 and ETagHandler.not_modified == 1
+        assert client.stats["not_modified"] == 1
+        print("✅ Expired entry renewed by a 304")
+        client.close()
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    with tempfile.TemporaryDirectory() as tmp:
+        test_lookup_client_cache(Path(tmp))
+    test_tech_pulse_parallel_and_etag()
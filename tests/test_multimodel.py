@@ -0,0 +1,235 @@
+"""
+Test Multi-Model Orchestrator
+Author: Daniel J Rita (BATDAN)
+"""
+
+import sys
+import time
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from ai.multimodel import MultiModelOrchestrator
+from ai.local.ollama_client import OllamaStreamError
+from ai.response_cache import ResponseCache
+
+
+class FakeClient:
+    """Stand-in provider with a fixed latency and answer"""
+
+    def __init__(self, name: str, delay: float, text: str):
+        self.model = name
+        self.delay = delay
+        self.text = text
+        self.calls = 0
+
+    def is_available(self) -> bool:
+        return True
+
+    def get_status(self):
+        return {'available': True, 'model': self.model}
+
+    def generate(self, prompt, context=None, temperature=0.7, max_tokens=100):
+        self.calls += 1
+        time.sleep(self.delay)
+        return self.text
+
+
+def make_orchestrator(**kwargs) -> MultiModelOrchestrator:
+    """Orchestrator wired to fake providers (no network)"""
+    ai = MultiModelOrchestrator(auto_lookup=False, **kwargs)
+    ai.ollama = FakeClient('ollama', 0.3, "Paris is the capital of France.")
+    ai.claude = FakeClient('claude', 0.05, "The capital of France is Paris.")
+    ai.gemini = FakeClient('gemini', 2.0, "Paris.")
+    ai.groq = FakeClient('groq', 0.1, "The capital of France is Paris!")
+    ai.openai = FakeClient('openai', 2.0, "Lyon, probably.")
+    ai._can_use_cloud = lambda provider: True
+    return ai
+
+
+def test_consensus_strategies():
+    """first_k exits early, hedged fires backups, deadlines cap the wait"""
+    print("\n[TEST] Consensus Strategies")
+    print("-" * 40)
+
+    ai = make_orchestrator(consensus_strategy="first_k", consensus_k=2)
+    start = time.monotonic()
+    assert "Paris" in ai.generate("Capital of France?")
+    assert time.monotonic() - start < 1.0
+    stats = ai.get_performance_stats()['consensus']['first_k']
+    assert stats['early_exits'] == 1 and stats['synthesis_calls'] == 0
+    print("✅ first_k returned once two models agreed")
+
+    ai = make_orchestrator(consensus_strategy="hedged", hedge_delay=0.1)
+    assert "Paris" in ai.generate("Capital of France?")
+    assert ai.get_performance_stats()['consensus']['hedged']['hedges_fired'] == 1
+    print("✅ hedged request fired backups for a slow primary")
+
+    ai = make_orchestrator(provider_deadline=0.5)
+    ai.openai.text = "The capital of France is Paris."
+    start = time.monotonic()
+    assert "Paris" in ai.generate("Capital of France?")
+    assert time.monotonic() - start < 1.5
+    stats = ai.get_performance_stats()['consensus']['all']
+    assert stats['deadline_misses'] == 2
+    assert stats['synthesis_skipped'] == 1, "Near-identical answers need no synthesis"
+    print("✅ Deadlines abandoned slow providers; synthesis skipped")
+
+
+class FakeDetector:
+    """Treats prompts mentioning 'price' as real-time"""
+
+    def needs_lookup_before(self, prompt):
+        return "price" in prompt
+
+    def needs_lookup_after(self, response):
+        return False
+
+
+def test_response_cache(tmp_path):
+    """Repeated prompts are served from cache; real-time prompts bypass it"""
+    print("\n[TEST] Response Cache")
+    print("-" * 40)
+
+    cache = ResponseCache(path=tmp_path / "cache.json", autosave_every=1)
+    ai = make_orchestrator(response_cache=cache, consensus_strategy="first_k")
+    ai.auto_lookup_enabled = True
+    ai.knowledge_detector = FakeDetector()
+
+    first = ai.generate("Good evening, Alfred")
+    calls = ai.claude.calls
+    assert ai.generate("good evening alfred!") == first
+    assert ai.claude.calls == calls, "Cache hit must not query providers"
+    print("✅ Normalized prompt served from cache")
+
+    ai.generate("What is the price of gold?")
+    ai.generate("What is the price of gold?")
+    assert ai.claude.calls == calls + 2
+    stats = ai.get_performance_stats()['response_cache']
+    assert stats['bypassed'] == 2 and stats['hits'] == 1
+    print(f"✅ Real-time prompts bypassed (hit rate {stats['hit_rate']:.0%})")
+
+    reloaded = ResponseCache(path=tmp_path / "cache.json")
+    assert reloaded.get("Good evening, Alfred", temperature=0.7, max_tokens=2000) == first
+    print("✅ Entries persisted across restarts")
+
+    calls = ai.claude.calls
+    for turn in range(3):
+        history = [{'user': f"turn {turn}", 'alfred': "Indeed, sir."}]
+        ai.generate("Status of the Batmobile?", context=history, cache_context=[])
+    assert ai.claude.calls == calls + 1
+    ai.generate("Status of the Batmobile?", context=history)
+    assert ai.claude.calls == calls + 2, "Without cache_context the key follows the full context"
+    print("✅ Key follows cache_context, not the changing conversation history")
+
+    vectors = {"hello there": [1.0, 0.0], "hello there alfred": [0.99, 0.05]}
+    semantic = ResponseCache(embedder=lambda text: vectors.get(text, [0.0, 1.0]), ttl=60)
+    semantic.put("Hello there", "Good day, sir.")
+    assert semantic.get("Hello there, Alfred") == "Good day, sir."
+    assert semantic.get("Something else") is None
+    assert semantic.get_stats()['semantic_hits'] == 1
+    print("✅ Near-duplicate prompt matched by embedding")
+
+
+class FakeStreamClient(FakeClient):
+    """Ollama stand-in that streams chunks and can fail after `fail_after` of them"""
+
+    def __init__(self, chunks, fail_after=None):
+        super().__init__('ollama', 0.0, None)
+        self.chunks = chunks
+        self.fail_after = fail_after
+
+    def _build_prompt_with_context(self, prompt, context):
+        return prompt
+
+    def generate_stream(self, prompt, temperature=0.7, max_tokens=500, raise_errors=False):
+        for i, chunk in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise OllamaStreamError("connection reset")
+            yield chunk
+        if self.fail_after == len(self.chunks):
+            raise OllamaStreamError("connection reset")
+
+
+def test_stream_failures_not_cached(tmp_path):
+    """Failed streams are not cached or counted as successes; early failures fall back"""
+    print("\n[TEST] Stream Failures")
+    print("-" * 40)
+
+    cache = ResponseCache(path=tmp_path / "cache.json")
+    ai = make_orchestrator(response_cache=cache, consensus_strategy="first_k")
+
+    ai.ollama = FakeStreamClient(["Good ", "evening"], fail_after=1)
+    stream = ai.generate_stream("Good evening, Alfred")
+    assert next(stream) == "Good "
+    try:
+        next(stream)
+    except OllamaStreamError:
+        pass
+    else:
+        raise AssertionError("Mid-stream failure should raise")
+    assert cache.get("Good evening, Alfred", temperature=0.7, max_tokens=2000) is None
+    assert ai.stats['ollama']['successes'] == 0 and ai.stats['ollama']['failures'] == 1
+    print("✅ Partial stream raised, not cached, counted as a failure")
+
+    ai.ollama = FakeStreamClient(["unused"], fail_after=0)
+    assert "Paris" in "".join(ai.generate_stream("Capital of France?"))
+    assert cache.get("Capital of France?", temperature=0.7, max_tokens=2000) != "unused"
+    print("✅ Failure before the first chunk falls back to generate()")
+
+    ai.ollama = FakeStreamClient(["Good ", "evening"])
+    assert "".join(ai.generate_stream("Good evening, Alfred")) == "Good evening"
+    assert cache.get("Good evening, Alfred", temperature=0.7, max_tokens=2000) == "Good evening"
+    print("✅ Completed stream cached")
+
+
+class FakeLookup:
+    """Intelligence-suite source with a fixed latency"""
+
+    def __init__(self, delay: float, context: str):
+        self.delay = delay
+        self.context = context
+
+    def is_available(self) -> bool:
+        return True
+
+    def lookup_for_prompt(self, prompt):
+        time.sleep(self.delay)
+        return bool(self.context), self.context
+
+
+def test_concurrent_pre_lookup():
+    """Lookups run in parallel, respect deadlines and keep priority order"""
+    print("\n[TEST] Concurrent Pre-Lookup")
+    print("-" * 40)
+
+    ai = make_orchestrator(lookup_budget=1.0, lookup_deadlines={'tech': 0.2})
+    ai.knowledge_detector = FakeDetector()
+    ai.news_lookup = FakeLookup(0.3, "NEWS")
+    ai.stock_lookup = FakeLookup(0.3, "STOCK")
+    ai.weather_lookup = FakeLookup(0.3, "")
+    ai.tech_pulse = FakeLookup(0.6, "TECH")
+    ai.encyclopedia = FakeLookup(0.1, "WIKI")
+
+    start = time.monotonic()
+    parts = ai._pre_lookup_sources("Anything new?")
+    elapsed = time.monotonic() - start
+
+    assert [name for name, _ in parts] == ['stock', 'news'], parts
+    assert elapsed < 0.6, f"Lookups ran sequentially ({elapsed:.2f}s)"
+    timings = ai.get_performance_stats()['auto_lookups']['timings']
+    assert timings['tech'] == {'timeout': 1}
+    assert sum(timings['stock'].values()) == 1
+    print(f"✅ 5 lookups in {elapsed:.2f}s, slow source abandoned, order kept")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_consensus_strategies()
+    test_concurrent_pre_lookup()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_response_cache(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_stream_failures_not_cached(Path(tmp))
@@ -0,0 +1,171 @@
+"""
+Test GrepTool/GlobTool search backend (ignore rules, binary skip, mmap, fan-out)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# Add parent directory to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tools.search import GrepTool, GlobTool
+from tools.search_engine import SearchEngine, IgnoreRules, MMAP_THRESHOLD
+
+
+def make_tree(root: Path):
+    (root / "src" / "pkg").mkdir(parents=True)
+    (root / "node_modules" / "lib").mkdir(parents=True)
+    (root / "build").mkdir()
+    (root / "logs").mkdir()
+
+    (root / ".gitignore").write_text("build/\n*.log\n!keep.log\n")
+    (root / "main.py").write_text("import os\n\ndef main():\n    return TODO_marker\n")
+    (root / "src" / "app.py").write_text("x = 1\n# todo_marker here\n")
+    (root / "src" / "pkg" / "util.py").write_text("def helper():\n    pass  # TODO_MARKER\n")
+    (root / "src" / "pkg" / ".gitignore").write_text("generated.py\n")
+    (root / "src" / "pkg" / "generated.py").write_text("TODO_marker\n")
+    (root / "node_modules" / "lib" / "index.js").write_text("// TODO_marker\n")
+    (root / "build" / "out.py").write_text("TODO_marker\n")
+    (root / "logs" / "run.log").write_text("TODO_marker\n")
+    (root / "logs" / "keep.log").write_text("TODO_marker\n")
+    (root / "image.bin").write_bytes(b"\x89PNG\0\0TODO_marker\0")
+
+
+def test_grep_ignore_rules(tmp_path):
+    """gitignore (nested, negation), default ignores and binary files are skipped"""
+    print("\n[TEST] Grep Ignore Rules")
+    print("-" * 40)
+
+    make_tree(tmp_path)
+    grep = GrepTool()
+
+    result = grep.execute("todo_marker", str(tmp_path))
+    assert result.success
+    found = sorted(Path(m['file']).relative_to(tmp_path).as_posix() for m in result.metadata['matches'])
+    assert found == ["logs/keep.log", "main.py", "src/app.py", "src/pkg/util.py"], found
+    print(f"✅ {len(found)} files matched, ignored/binary files skipped")
+
+    main = next(m for m in result.metadata['matches'] if m['file'].endswith("main.py"))
+    assert main['line_num'] == 4 and main['line'] == "    return TODO_marker"
+    assert f"{main['file']}:4:     return TODO_marker" in result.output
+    print("✅ Line numbers and output format preserved")
+
+    everything = grep.execute("todo_marker", str(tmp_path), include_ignored=True)
+    assert everything.metadata['count'] == 8
+    print("✅ include_ignored searches ignored files (binaries still skipped)")
+
+    strict = grep.execute("TODO_marker", str(tmp_path), case_sensitive=True)
+    assert strict.metadata['count'] == 2
+    assert not grep.execute("(", str(tmp_path)).success
+    print("✅ Case sensitivity and invalid patterns handled")
+
+
+def test_grep_limits_and_mmap(tmp_path):
+    """Early termination at max_results; large files are searched via mmap"""
+    print("\n[TEST] Grep Limits")
+    print("-" * 40)
+
+    big = tmp_path / "big.txt"
+    lines = [f"line {i}" for i in range(20000)]
+    lines[15000] = "needle at the end"
+    big.write_text("\n".join(lines) + "\n")
+    assert big.stat().st_size > MMAP_THRESHOLD
+
+    grep = GrepTool()
+    result = grep.execute("^needle", str(big))
+    assert result.metadata['count'] == 1
+    assert result.metadata['matches'][0]['line_num'] == 15001
+    print("✅ Large file matched with correct line number")
+
+    limited = grep.execute(r"line \d+", str(tmp_path), max_results=5)
+    assert limited.metadata['count'] == 5 and limited.metadata['truncated']
+    assert [m['line_num'] for m in limited.metadata['matches']] == [1, 2, 3, 4, 5]
+    print("✅ Stopped at max_results")
+
+    lazy = grep.stream("line", str(tmp_path))
+    assert next(lazy)['line_num'] == 1
+    lazy.close()
+    print("✅ stream() yields lazily")
+
+
+def test_grep_line_semantics(tmp_path):
+    """CRLF line ends and non-ASCII text behave like the old text-mode search"""
+    print("\n[TEST] Grep Line Semantics")
+    print("-" * 40)
+
+    small = tmp_path / "windows.txt"
+    small.write_bytes("foo\r\nbar\r\ncafé au lait\r\n".encode("utf-8"))
+    big = tmp_path / "windows_big.txt"
+    big.write_bytes(b"filler line\r\n" * 8000 + "foo\r\nbar\r\ncafé\r\n".encode("utf-8"))
+    assert big.stat().st_size > MMAP_THRESHOLD
+
+    grep = GrepTool()
+    for path, offset in ((small, 0), (big, 8000)):
+        assert [m['line_num'] for m in grep.execute("foo$", str(path)).metadata['matches']] == [offset + 1]
+        assert [m['line'] for m in grep.execute("^bar$", str(path)).metadata['matches']] == ["bar"]
+        cafe = grep.execute(r"caf\w\b", str(path)).metadata['matches']
+        assert [m['line_num'] for m in cafe] == [offset + 3] and "\r" not in cafe[0]['line']
+    print("✅ '$' matches before CRLF, in small and memory-mapped files")
+
+    assert grep.execute(r"CAF\w", str(small)).metadata['count'] == 1
+    assert grep.execute("CAFÉ", str(small)).metadata['count'] == 1
+    assert grep.execute(r"\bau\b", str(small)).metadata['matches'][0]['line'] == "café au lait"
+    print("✅ Unicode \\w, \\b and case folding match non-ASCII text")
+
+
+def test_grep_parallel(tmp_path):
+    """Worker-process fan-out returns the same results, in walk order"""
+    print("\n[TEST] Grep Fan-out")
+    print("-" * 40)
+
+    for i in range(40):
+        (tmp_path / f"f{i:02d}.txt").write_text(f"alpha\nbeta {i}\nalpha beta\n")
+
+    serial = GrepTool(SearchEngine(max_workers=1)).execute("beta", str(tmp_path))
+    engine = SearchEngine(max_workers=2, parallel_threshold=4, batch_size=3)
+    parallel = GrepTool(engine).execute("beta", str(tmp_path))
+    assert parallel.metadata['matches'] == serial.metadata['matches']
+    assert parallel.metadata['count'] == 80
+    print("✅ 80 matches, identical to the serial search")
+
+    capped = list(engine.grep("beta", str(tmp_path), max_results=11))
+    assert capped == serial.metadata['matches'][:11]
+    print("✅ Early termination with workers")
+
+
+def test_glob(tmp_path):
+    """Path.glob semantics with ignore rules"""
+    print("\n[TEST] Glob")
+    print("-" * 40)
+
+    make_tree(tmp_path)
+    glob = GlobTool()
+
+    top = glob.execute("*.py", str(tmp_path))
+    assert [Path(f).name for f in top.metadata['files']] == ["main.py"]
+    print("✅ '*.py' is top-level only")
+
+    deep = glob.execute("**/*.py", str(tmp_path))
+    names = sorted(Path(f).relative_to(tmp_path).as_posix() for f in deep.metadata['files'])
+    assert names == ["main.py", "src/app.py", "src/pkg/util.py"], names
+    print("✅ '**/*.py' recurses and skips ignored paths")
+
+    scoped = glob.execute("src/*.py", str(tmp_path))
+    assert scoped.metadata['count'] == 1
+    capped = glob.execute("**/*.py", str(tmp_path), max_results=2)
+    assert len(capped.metadata['files']) == 2 and capped.metadata['truncated']
+    print("✅ Literal prefixes and max_results")
+
+    rules = IgnoreRules(["/only_root", "docs/*.md", "!docs/keep.md"])
+    assert rules.match("only_root", False) and rules.match("a/only_root", False) is None
+    assert rules.match("docs/x.md", False) and rules.match("docs/keep.md", False) is False
+    print("✅ Anchored and negated ignore patterns")
+
+
+if __name__ == "__main__":
+    for test in (test_grep_ignore_rules, test_grep_limits_and_mmap, test_grep_line_semantics,
+                 test_grep_parallel, test_glob):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
@@ -0,0 +1,201 @@
+"""
+Test resumable batch sync between the M5 SyncClient and the sync server
+Author: Daniel J Rita (BATDAN)
+"""
+
+import base64
+import json
+import os
+import random
+import sys
+import tempfile
+import zlib
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+# Add parent and m5_cardputer directories to path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+sys.path.insert(0, str(Path(__file__).parent.parent / "m5_cardputer"))
+
+# alfred_sync_server builds its brain at import time: keep it out of the real
+# data dir (under pytest, conftest.py has already set this)
+if "ALFRED_HOME" not in os.environ:
+    os.environ["ALFRED_HOME"] = tempfile.mkdtemp(prefix="alfred_home_")
+
+from core.brain import AlfredBrain
+from core.sync_batch import BatchReceiver, decode_batch
+import sync_client
+from sync_client import SyncClient
+from local_brain import LocalBrain
+
+
+class LoopbackClient(SyncClient):
+    """SyncClient whose requests go straight to a BatchReceiver; can drop the link after N parts"""
+
+    def __init__(self, receiver, fail_after=None):
+        super().__init__("http://server")
+        self.receiver = receiver
+        self.fail_after = fail_after
+        self.parts_sent = 0
+        self.requests = []
+
+    def _make_request(self, method, url, data=None, headers=None, raw=None):
+        parsed = urlparse(url)
+        query = {k: v[0] for k, v in parse_qs(parsed.query).items()}
+        batch_id = parsed.path.rsplit("/", 1)[1]
+        self.requests.append((method, int(query.get("offset", -1))))
+
+        if method == "GET":
+            return self.receiver.status(query["device_id"], batch_id)
+        if self.fail_after is not None and self.parts_sent >= self.fail_after:
+            return {"success": False, "error": "Network error: link down"}
+        self.parts_sent += 1
+        return self.receiver.receive(query["device_id"], batch_id, int(query["offset"]),
+                                     int(query["total"]), raw, query["encoding"])
+
+
+def test_ingest_batch(tmp_path):
+    """Bulk ingest: one transaction, idempotent values, importance conflicts, exactly-once keys"""
+    print("\n[TEST] Brain Bulk Ingest")
+    print("-" * 40)
+
+    brain = AlfredBrain(data_dir=str(tmp_path))
+    brain.store_knowledge("site", "gate_code", "1234", importance=8)
+
+    conversations = [{"user_input": f"Q{i}", "alfred_response": f"A{i}", "topics": ["site"]} for i in range(3)]
+    knowledge = [
+        {"category": "site", "key": "gate_code", "value": "1234"},
+        {"category": "site", "key": "gate_code", "value": "9999", "importance": 5},
+        {"category": "site", "key": "crane", "value": "north side", "importance": 7},
+    ]
+    result = brain.ingest_batch(conversations, knowledge, batch_key="dev:b1", item_ids=["x"])
+    assert result["conversations_uploaded"] == 3 and result["knowledge_uploaded"] == 1
+    assert result["duplicates"] == 1 and len(result["conflicts"]) == 1
+    assert brain.recall_knowledge("site", "crane") == "north side"
+    print("✅ 3 conversations, 1 new fact, 1 duplicate, 1 conflict")
+
+    again = brain.ingest_batch(conversations, knowledge, batch_key="dev:b1")
+    assert again["duplicate"] and again["item_ids"] == ["x"]
+    assert brain.get_memory_stats()["conversations"] == 3
+    print("✅ Same batch key is not applied twice")
+
+    cursor = brain.get_change_cursor()
+    brain.ingest_batch([{"user_input": "Q9", "alfred_response": "A9"}],
+                       [{"category": "site", "key": "lift", "value": "east"}], origin="dev")
+    assert brain.get_changes(cursor, exclude_origin="dev")["next_cursor"] > cursor
+    assert not any(brain.get_changes(cursor, exclude_origin="dev")["changes"].values())
+    assert brain.get_changes(cursor)["changes"]["knowledge"][0]["key"] == "lift"
+    print("✅ Uploaded rows tagged with their origin, not sent back to it")
+
+
+def test_resumable_upload(tmp_path):
+    """Interrupted upload resumes at the server's offset; acked batches are marked synced"""
+    print("\n[TEST] Resumable Batch Upload")
+    print("-" * 40)
+
+    brain = AlfredBrain(data_dir=str(tmp_path / "server"))
+    receiver = BatchReceiver(brain)
+    device = LocalBrain(str(tmp_path / "device"))
+
+    for i in range(30):
+        device.store({"type": "note", "content": f"pour {i} done", "category": "task", "timestamp": i})
+    device.store({"type": "observation", "description": "Crack", "location": "Wall A",
+                  "severity": "critical", "timestamp": 40})
+    audio = random.Random(5).randbytes(60_000)  # Incompressible: several upload parts
+    voice_id = device.store({"type": "voice_note", "audio_data": base64.b64encode(audio).decode(),
+                             "duration": 3, "format": "pcm_16k_16bit_mono", "timestamp": 50})
+
+    # Voice note is several parts: drop the link part-way through it
+    client = LoopbackClient(receiver, fail_after=2)
+    first = client.upload(device.get_pending(), "EDGE_1", on_batch=device.mark_all_synced)
+    assert not first["success"] and first["synced"] == 31
+    assert [p["id"] for p in device.get_pending()] == [voice_id]
+    print("✅ Link dropped mid-batch; 31 acknowledged items marked synced")
+
+    client = LoopbackClient(receiver)
+    second = client.upload(device.get_pending(), "EDGE_1", on_batch=device.mark_all_synced)
+    assert second["success"] and second["synced_ids"] == [voice_id]
+    assert client.requests[0] == ("GET", -1) and client.requests[1][1] == sync_client.PART_BYTES
+    assert device.get_pending_count() == 0
+    print("✅ Resumed at byte", client.requests[1][1])
+
+    assert brain.recall_knowledge("edge_task", device.get_recent_notes(1)[0]["id"])
+    obs = brain.get_top_knowledge(category="site_observations")
+    assert obs[0]["importance"] == 9 and "Wall A" in obs[0]["value"]
+    voice = brain.get_top_knowledge(category="voice_notes")[0]
+    assert Path(voice["value"].rsplit("-> ", 1)[1]).read_bytes() == audio
+    print("✅ Notes, observation and voice audio ingested")
+
+    assert brain.get_changes(0)["changes"]["knowledge"]
+    assert not any(brain.get_changes(0, exclude_origin="EDGE_1")["changes"].values())
+    print("✅ Device uploads excluded from that device's download")
+
+    # Acknowledgement lost: re-sending the same batch returns the stored ack
+    replay = LoopbackClient(receiver).upload([device.get_by_id(voice_id)], "EDGE_1")
+    assert replay["synced_ids"] == [voice_id]
+    assert len(brain.get_top_knowledge(category="voice_notes")) == 1
+    print("✅ Replayed batch acknowledged without storing twice")
+
+
+def test_malformed_batch(tmp_path):
+    """A batch with an incomplete record is rejected with 400 and its spool discarded"""
+    print("\n[TEST] Malformed Batch")
+    print("-" * 40)
+
+    from fastapi.testclient import TestClient
+    import alfred_sync_server
+
+    brain = AlfredBrain(data_dir=str(tmp_path))
+    receiver = BatchReceiver(brain)
+    records = [
+        {"kind": "knowledge", "category": "site", "key": "crane", "value": "north side"},
+        {"kind": "conversation", "alfred_response": "Noted."},
+    ]
+    payload = zlib.compress("\n".join(json.dumps(r) for r in records).encode())
+
+    try:
+        receiver.receive("EDGE_1", "bad", 0, len(payload), payload)
+    except ValueError as e:
+        assert "user_input" in str(e)
+    else:
+        raise AssertionError("Conversation without user_input should be rejected")
+    assert list(receiver.spool_dir.glob("*.part")) == []
+    assert brain.get_memory_stats()["knowledge"] == 0
+    print("✅ Nothing ingested, spool file removed")
+
+    real_receiver = alfred_sync_server.batch_receiver
+    alfred_sync_server.batch_receiver = receiver
+    try:
+        client = TestClient(alfred_sync_server.app)
+        response = client.post(f"/sync/batch/bad?device_id=EDGE_1&offset=0&total={len(payload)}",
+                               content=payload)
+    finally:
+        alfred_sync_server.batch_receiver = real_receiver
+        brain.close()
+    assert response.status_code == 400 and "user_input" in response.json()["detail"]
+    assert receiver.status("EDGE_1", "bad")["received"] == 0
+    print("✅ /sync/batch answers 400")
+
+
+def test_batch_encoding():
+    """Batches are compact, deterministic and decodable"""
+    print("\n[TEST] Batch Encoding")
+    print("-" * 40)
+
+    client = SyncClient("http://server")
+    items = [{"id": f"edge_{i}", "type": "note", "content": "slab poured " * 20} for i in range(250)]
+    batches = list(client._batches(items))
+    assert [len(b) for b in batches] == [sync_client.BATCH_ITEMS, sync_client.BATCH_ITEMS, 50]
+
+    batch_id, payload, encoding = client._encode_batch(batches[0])
+    assert encoding == "zlib" and len(payload) < sum(len(line) for line in batches[0]) / 10
+    assert client._encode_batch(batches[0])[0] == batch_id
+    assert [r["id"] for r in decode_batch(payload, encoding)] == [f"edge_{i}" for i in range(100)]
+    print(f"✅ 100 items -> {len(payload)} bytes, stable batch id {batch_id}")
+
+
+if __name__ == "__main__":
+    for test in (test_ingest_batch, test_resumable_upload, test_malformed_batch):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
+    test_batch_encoding()
@@ -0,0 +1,190 @@
+"""
+Test Vector Knowledge Base (incremental URL sync, hybrid search, grounded answers)
+Author: Daniel J Rita (BATDAN)
+"""
+
+import asyncio
+import hashlib
+import math
+import re
+import sys
+import threading
+import types
+from pathlib import Path
+
+# RAG modules import each other as scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "capabilities" / "rag"))
+
+# The real model is never loaded (an EmbeddingService is injected), so the
+# tests run without sentence_transformers installed
+sys.modules.setdefault("sentence_transformers", types.ModuleType("sentence_transformers"))
+sys.modules["sentence_transformers"].SentenceTransformer = None
+
+from embedding_service import EmbeddingService
+from vector_knowledge import VectorKnowledgeBase
+from rag_module import RAGSystem
+
+
+class FakeEncoder:
+    """SentenceTransformer stand-in: hashed bag of words, unit length"""
+
+    dimensions = 64
+
+    def __init__(self):
+        self.encoded = 0
+
+    def encode(self, texts, batch_size=32):
+        self.encoded += len(texts)
+        return [self._vector(text) for text in texts]
+
+    def _vector(self, text):
+        vector = [0.0] * self.dimensions
+        for word in re.findall(r"\w+", text.lower()):
+            vector[int(hashlib.md5(word.encode()).hexdigest(), 16) % self.dimensions] += 1.0
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+
+def make_kb(tmp_path):
+    encoder = FakeEncoder()
+    kb = VectorKnowledgeBase(data_dir=str(tmp_path), embedding_service=EmbeddingService(encoder))
+    return kb, encoder
+
+
+def lexical_ids(kb, query):
+    return {hit['id'] for hit in kb.lexical.search(query)}
+
+
+def test_url_sync(tmp_path):
+    """Re-syncing only embeds changed paragraphs; the BM25 sidecar follows Chroma"""
+    print("\n[TEST] Incremental URL Sync")
+    print("-" * 40)
+
+    kb, encoder = make_kb(tmp_path)
+    url = "https://docs.example/install"
+    legacy = kb.add_document("Old install notes from the legacy crawler", {"url": url})
+    paragraphs = ["Install with pip install alfred", "Configure the gateway token", "Run alfred serve"]
+
+    first = kb.sync_url_chunks(url, paragraphs, [{"chunk_num": i} for i in range(3)])
+    assert (first['added'], first['unchanged'], first['deleted']) == (3, 0, 1)
+    assert first['ids'] == [kb.chunk_id(url, text) for text in paragraphs]
+    assert legacy not in kb._stored_ids(url) and lexical_ids(kb, "legacy") == set()
+    print("✅ Content-addressed IDs; legacy timestamp chunk replaced")
+
+    encoded = encoder.encoded
+    again = kb.sync_url_chunks(url, paragraphs + [paragraphs[0]])
+    assert (again['added'], again['unchanged'], again['deleted']) == (0, 3, 0)
+    assert encoder.encoded == encoded and kb.collection.count() == 3
+    print("✅ Unchanged content: nothing added or embedded")
+
+    edited = [paragraphs[0], "Configure the gateway certificate", paragraphs[2]]
+    plan = kb._plan_url_sync(url, edited, None)
+    assert plan['new'] == [kb.chunk_id(url, edited[1])]
+    assert plan['removed'] == [kb.chunk_id(url, paragraphs[1])]
+    result = kb._apply_url_sync(url, plan, kb.embedder.embed([edited[1]]))
+    assert (result['added'], result['unchanged'], result['deleted']) == (1, 2, 1)
+    assert encoder.encoded == encoded + 1
+    print("✅ One paragraph changed: 1 added, 1 deleted")
+
+    assert kb.lexical.count() == kb.collection.count() == 3
+    assert lexical_ids(kb, "token") == set() and lexical_ids(kb, "certificate") == {plan['new'][0]}
+    assert kb.lexical.search("alfred serve")[0]['metadata']['char_count'] == len(paragraphs[2])
+    print("✅ Lexical sidecar in step with the collection")
+
+
+def test_hybrid_exact_id(tmp_path):
+    """Chunks with the exact identifier rank first even against denser matches"""
+    print("\n[TEST] Hybrid Search Ranking")
+    print("-" * 40)
+
+    kb, _ = make_kb(tmp_path)
+    kb.sync_url_chunks("https://blog.example/roundup", [
+        "Critical vulnerability roundup: what is new in this critical vulnerability week",
+        "What is new: critical vulnerability advisories for 2024 and 3094 other issues",
+    ], [{"source": "blog"}] * 2)
+    kb.sync_url_chunks("https://nvd.example/xz", [
+        "CVE-2024-3094 backdoor in xz liblzma 5.6.0",
+    ], [{"source": "nvd"}])
+    exact_id = kb.chunk_id("https://nvd.example/xz", "CVE-2024-3094 backdoor in xz liblzma 5.6.0")
+
+    query = "What is new in critical vulnerability CVE-2024-3094?"
+    dense = kb.search(query, n_results=3)['results']
+    assert dense[0]['id'] != exact_id
+    results = kb.hybrid_search(query, n_results=3)['results']
+    assert results[0]['id'] == exact_id and results[0]['exact_match']
+    assert not any(r.get('exact_match') for r in results[1:])
+    assert all('rrf_score' in r for r in results)
+    print("✅ Exact CVE ID ranked ahead of the fused order")
+
+    filtered = kb.hybrid_search(query, n_results=3, where={"source": "blog"})['results']
+    assert filtered and exact_id not in {r['id'] for r in filtered}
+    print("✅ Metadata filter applied to both retrievers")
+
+
+def test_chunk_stream(tmp_path):
+    """Stream sync matches sync_url_chunks across batch boundaries"""
+    print("\n[TEST] Streamed URL Sync")
+    print("-" * 40)
+
+    kb, encoder = make_kb(tmp_path)
+    url = "https://docs.example/guide"
+    texts = [f"Section {i} of the guide" for i in range(5)]
+    chunks = [{"text": text, "metadata": {"chunk_num": i}} for i, text in enumerate(texts)]
+
+    producers = set()
+
+    def produce():
+        for chunk in chunks + chunks[:1]:
+            producers.add(threading.get_ident())
+            yield chunk
+
+    async def sync_from_generator():
+        loop_thread = threading.get_ident()
+        return await kb.sync_url_chunk_stream(url, produce(), batch_size=2), loop_thread
+
+    first, loop_thread = asyncio.run(sync_from_generator())
+    assert (first['added'], first['unchanged'], first['deleted']) == (5, 0, 0)
+    assert first['ids'] == [kb.chunk_id(url, text) for text in texts]
+    assert producers and loop_thread not in producers
+    print("✅ Batches written as they arrive; repeated chunk stored once")
+    print("✅ Synchronous chunk generator read off the event loop")
+
+    async def edited():
+        for chunk in chunks[:3]:
+            yield chunk
+        yield {"text": "Section 3 of the guide, revised"}
+
+    encoded = encoder.encoded
+    second = asyncio.run(kb.sync_url_chunk_stream(url, edited(), batch_size=2))
+    assert (second['added'], second['unchanged'], second['deleted']) == (1, 3, 2)
+    assert encoder.encoded == encoded + 1
+    assert kb.lexical.count() == kb.collection.count() == 4
+    assert lexical_ids(kb, "revised") == {kb.chunk_id(url, "Section 3 of the guide, revised")}
+    print("✅ Async stream: changed chunk embedded, missing chunks deleted")
+
+
+def test_ask_min_similarity(tmp_path):
+    """Only exact identifier hits bypass min_similarity; other lexical hits do not"""
+    print("\n[TEST] Ask Similarity Filter")
+    print("-" * 40)
+
+    kb, _ = make_kb(tmp_path)
+    kb.sync_url_chunks("https://nvd.example/xz", ["CVE-2024-3094: backdoor shipped in xz 5.6.0"])
+    kb.sync_url_chunks("https://blog.example/zlib", ["liblzma and zlib compression benchmarks"])
+    rag = RAGSystem(knowledge_base=kb, default_ai="none")
+
+    results = kb.hybrid_search("Is liblzma affected by CVE-2024-3094?", n_results=5)['results']
+    assert {bool(r.get('exact_match')) for r in results if r.get('lexical_rank')} == {True, False}
+
+    answer = asyncio.run(rag.ask("Is liblzma affected by CVE-2024-3094?", min_similarity=0.9))
+    assert answer['success'] and answer['contexts_used'] == 1
+    assert [s['url'] for s in answer['sources']] == ["https://nvd.example/xz"]
+    print("✅ Exact identifier kept, BM25-only hit filtered by similarity")
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    for test in (test_url_sync, test_hybrid_exact_id, test_chunk_stream, test_ask_min_similarity):
+        with tempfile.TemporaryDirectory() as tmp:
+            test(Path(tmp))
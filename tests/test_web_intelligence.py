@@ -0,0 +1,255 @@
+"""
+Test Web Intelligence Deep Crawl
+Author: Daniel J Rita (BATDAN)
+"""
+
+import asyncio
+import sys
+import threading
+import time
+import types
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# RAG modules import each other as scripts
+sys.path.insert(0, str(Path(__file__).parent.parent / "capabilities" / "rag"))
+
+from crawl_frontier import normalize_url, VisitedSet, BloomFilter
+from crawl_cache import CrawlCache
+from crawler_powerups import CrawlerPowerUps
+import crawler_advanced
+from web_intelligence import WebIntelligence
+
+
+class SiteHandler(BaseHTTPRequestHandler):
+    """Index page links to 8 slow pages, each linking back with tracking params"""
+    requests = []
+
+    def do_GET(self):
+        SiteHandler.requests.append(self.path)
+        if self.path == "/":
+            links = "".join(f'<a href="/page{i}">Page {i}</a>' for i in range(8))
+        else:
+            time.sleep(0.3)
+            links = '<a href="/?utm_source=crawler#top">Home</a><a href="/page0/../page1">Next</a>'
+        body = f"<html><head><title>{self.path}</title></head><body>{links}</body></html>".encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def test_frontier_helpers():
+    """URL normalization and the bounded visited set"""
+    print("\n[TEST] Crawl Frontier")
+    print("-" * 40)
+
+    assert normalize_url("HTTP://Example.com:80?b=2&a=1&utm_source=x#frag") == "http://example.com/?a=1&b=2"
+    assert normalize_url("https://example.com:8443/docs") == "https://example.com:8443/docs"
+    print("✅ URLs normalized")
+
+    bloom = BloomFilter(1000)
+    assert bloom.add("a") and "a" in bloom and not bloom.add("a")
+
+    visited = VisitedSet(exact_limit=2, bloom_capacity=1000)
+    assert all(visited.add(u) for u in ["u1", "u2", "u3", "u4"])
+    assert not visited.add("u1") and not visited.add("u4")
+    assert len(visited) == 4
+    print("✅ Visited set switches to a Bloom filter past its limit")
+
+
+def test_deep_crawl_stream(tmp_path):
+    """Pages are fetched concurrently, de-duplicated and streamed as they arrive"""
+    print("\n[TEST] Concurrent Deep Crawl")
+    print("-" * 40)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), SiteHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+
+    async def crawl():
+        cache = CrawlCache(path=tmp_path / "crawl_cache.db")
+        async with WebIntelligence(max_concurrent=8, per_host_rate=100, host_burst=10, cache=cache) as web:
+            start = time.monotonic()
+            first_at = None
+            pages = []
+            async for page in web.deep_crawl_stream(base, max_depth=2, max_pages=20):
+                first_at = first_at or time.monotonic() - start
+                pages.append(page)
+            return pages, first_at, time.monotonic() - start
+
+    try:
+        pages, first_at, elapsed = asyncio.run(crawl())
+    finally:
+        server.shutdown()
+
+    assert len(pages) == 9 and all(page['success'] for page in pages)
+    assert sorted(SiteHandler.requests) == ["/"] + [f"/page{i}" for i in range(8)]
+    assert elapsed < 1.5, f"Pages fetched serially ({elapsed:.2f}s)"
+    assert first_at < 0.25, "Index page should be yielded before the rest finish"
+    print(f"✅ 9 pages in {elapsed:.2f}s, each fetched once, first yielded at {first_at:.2f}s")
+
+
+class ETagPageHandler(BaseHTTPRequestHandler):
+    """Serves one page with an ETag and honours If-None-Match"""
+    full = 0
+    not_modified = 0
+
+    def do_GET(self):
+        if self.headers.get("If-None-Match") == '"v1"':
+            ETagPageHandler.not_modified += 1
+            self.send_response(304)
+            self.end_headers()
+            return
+        ETagPageHandler.full += 1
+        body = ("<html><body><p>" + "Wayne Manor archive. " * 200 + "</p></body></html>").encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("ETag", '"v1"')
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class FakeCrawler:
+    """Base crawler stand-in for CrawlerPowerUps"""
+
+    def __init__(self, markdown: str):
+        self.markdown = markdown
+
+    async def crawl_url(self, url, **kwargs):
+        return {'url': url, 'success': True, 'markdown': self.markdown}
+
+
+def test_crawl_cache(tmp_path):
+    """Persistent cache: compression, 304 revalidation, LRU eviction, shared snapshots"""
+    print("\n[TEST] Crawl Cache")
+    print("-" * 40)
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), ETagPageHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/archive"
+    db = tmp_path / "crawl_cache.db"
+
+    async def crawl(cache):
+        async with WebIntelligence(cache=cache) as web:
+            return await web.crawl_url(url)
+
+    try:
+        cache = CrawlCache(path=db, ttl=0.1)
+        assert not asyncio.run(crawl(cache))['from_cache']
+        stats = cache.get_stats()
+        assert stats['stored_bytes'] * 5 < cache.get(url)['raw_size'], "Entries should be compressed"
+
+        time.sleep(0.15)
+        revalidated = asyncio.run(crawl(cache))
+        assert revalidated['from_cache'] and "Wayne Manor" in revalidated['markdown']
+        assert ETagPageHandler.full == 1 and ETagPageHandler.not_modified == 1
+        assert cache.get_stats()['revalidated'] == 1 and cache.get_stats()['bytes_saved'] > 0
+        print("✅ Expired page revalidated with If-None-Match (304)")
+
+        reopened = CrawlCache(path=db, ttl=60)
+        assert asyncio.run(crawl(reopened))['from_cache']
+        assert ETagPageHandler.full + ETagPageHandler.not_modified == 2
+        print("✅ Fresh page served from disk after restart")
+
+        # An AdvancedCrawler result for the same URL must not replace the page entry
+        reopened.put(url, {'url': url, 'links': ['/x'], 'external_links': []},
+                     namespace=crawler_advanced.CACHE_NAMESPACE)
+        page = asyncio.run(crawl(reopened))
+        assert page['from_cache'] and isinstance(page['links'], dict)
+        assert reopened.get(url, namespace=crawler_advanced.CACHE_NAMESPACE)['data']['links'] == ['/x']
+        print("✅ Crawler result shapes kept in separate namespaces")
+    finally:
+        server.shutdown()
+
+    small = CrawlCache(path=tmp_path / "small.db", max_bytes=2000, compress_level=0)
+    small.put("http://example.com/status", {"markdown": "baseline"}, namespace='snapshot')
+    for i in range(5):
+        small.put(f"http://example.com/{i}", {"body": "x" * 500})
+        small.get("http://example.com/0")  # keep page 0 hot
+    assert small.get_stats()['evictions'] > 0 and small.get_stats()['stored_bytes'] <= 2000
+    assert small.get("http://example.com/0") is not None
+    assert small.get("http://example.com/1") is None
+    print("✅ Least recently used entries evicted over budget")
+
+    for i in range(5, 20):
+        small.put(f"http://example.com/{i}", {"body": "y" * 500})
+    assert small.get("http://example.com/status", namespace='snapshot', ttl=float('inf'))['data'] == {"markdown": "baseline"}
+    assert small.get_stats()['stored_bytes'] <= 2000
+    print("✅ Monitoring snapshots are never evicted by page traffic")
+
+    async def monitor(markdown):
+        powerups = CrawlerPowerUps(base_crawler=FakeCrawler(markdown), crawl_cache=reopened)
+        return [check async for check in powerups.monitor_url("http://example.com/status", max_checks=1)]
+
+    asyncio.run(monitor("All systems nominal"))
+    assert asyncio.run(monitor("Intruder alert"))[0]['changed']
+    print("✅ Monitoring snapshots persist across instances")
+
+
+class FakeBrowser:
+    """AsyncWebCrawler stand-in: the page text depends on the JavaScript run"""
+
+    def __init__(self):
+        self.loads = 0
+
+    async def arun(self, url, config):
+        self.loads += 1
+        text = "Expanded archive" if getattr(config, 'js_code', None) else "Archive"
+        return types.SimpleNamespace(
+            success=True, status_code=200, markdown=text, cleaned_html=text,
+            html=f"<p>{text}</p>", links={}, media={}, metadata={}
+        )
+
+
+def test_advanced_cache_options(tmp_path):
+    """AdvancedCrawler cache entries are only reused for plain page loads"""
+    print("\n[TEST] Advanced Crawl Cache Options")
+    print("-" * 40)
+
+    crawler = object.__new__(crawler_advanced.AdvancedCrawler)
+    crawler._cache_modes = {'enabled': None}
+    crawler.cache_mode_name = 'enabled'
+    crawler.crawl_cache = CrawlCache(path=tmp_path / "crawl_cache.db", ttl=60)
+    crawler.crawler = browser = FakeBrowser()
+    crawler.stats = dict.fromkeys(('total_crawls', 'successful_crawls', 'failed_crawls',
+                                   'total_pages', 'total_bytes', 'cache_hits'), 0)
+    url = "http://example.com/archive"
+
+    real_config = getattr(crawler_advanced, 'CrawlerRunConfig', None)
+    crawler_advanced.CrawlerRunConfig = types.SimpleNamespace
+    try:
+        bare = asyncio.run(crawler.crawl_url(url, extract_markdown=False))
+        assert bare['markdown'] is None and not bare.get('from_cache')
+        plain = asyncio.run(crawler.crawl_url(url))
+        assert plain['from_cache'] and plain['markdown'] == "Archive" and browser.loads == 1
+        print("✅ Markdown kept in the entry; extract_markdown only shapes the result")
+
+        scripted = asyncio.run(crawler.crawl_url(url, js_code="expand()"))
+        assert not scripted.get('from_cache') and scripted['markdown'] == "Expanded archive"
+        waited = asyncio.run(crawler.crawl_url(url, wait_for_selector="#more"))
+        assert not waited.get('from_cache') and browser.loads == 3
+        assert crawler.crawl_cache.get(url, namespace=crawler_advanced.CACHE_NAMESPACE)['data']['markdown'] == "Archive"
+        print("✅ js_code / wait_for_selector crawls bypass the cache")
+    finally:
+        crawler_advanced.CrawlerRunConfig = real_config
+
+
+if __name__ == "__main__":
+    import tempfile
+
+    test_frontier_helpers()
+    with tempfile.TemporaryDirectory() as tmp:
+        test_deep_crawl_stream(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_crawl_cache(Path(tmp))
+    with tempfile.TemporaryDirectory() as tmp:
+        test_advanced_cache_options(Path(tmp))
@@ -3,16 +3,21 @@ Code Search Tools
 Search for files and content
 """
 
+import heapq
 import os
 import re
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, Iterator, List, Optional
 from .base import Tool, ToolResult
+from .search_engine import SearchEngine
 
 
 class GlobTool(Tool):
     """Find files by pattern"""
 
+    def __init__(self, engine: Optional[SearchEngine] = None):
+        self.engine = engine or SearchEngine()
+
     @property
     def name(self) -> str:
         return "glob"
@@ -34,18 +39,31 @@ class GlobTool(Tool):
                     "type": "string",
                     "description": "Directory to search in (default: current directory)",
                     "default": "."
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Maximum files to return, most recently modified first (default: 1000)",
+                    "default": 1000
+                },
+                "include_ignored": {
+                    "type": "boolean",
+                    "description": "Include .gitignore'd files and build/cache directories (default: false)",
+                    "default": False
                 }
             },
             "required": ["pattern"]
         }
 
-    def execute(self, pattern: str, path: str = ".") -> ToolResult:
+    def execute(self, pattern: str, path: str = ".", max_results: int = 1000,
+                include_ignored: bool = False) -> ToolResult:
         """
         Find files matching pattern
 
         Args:
             pattern: Glob pattern
             path: Directory to search (default: current)
+            max_results: Maximum files to return (most recent first)
+            include_ignored: Include ignored files and directories
 
         Returns:
             ToolResult with list of matching files
@@ -60,11 +78,21 @@ class GlobTool(Tool):
                     error=f"Path not found: {path}"
                 )
 
-            # Find matching files
-            matches = list(search_path.glob(pattern))
+            # Stream matches, keeping only the most recently modified
+            total = 0
+
+            def counted(paths: Iterator[Path]) -> Iterator[tuple]:
+                nonlocal total
+                for p in paths:
+                    total += 1
+                    try:
+                        yield p.stat().st_mtime, p
+                    except OSError:
+                        continue
 
-            # Sort by modification time (most recent first)
-            matches.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+            walk = self.engine.walk(str(search_path), pattern, include_ignored=include_ignored,
+                                    include_dirs=True, anchored=True)
+            matches = [p for _, p in heapq.nlargest(max_results, counted(walk), key=lambda item: item[0])]
 
             if not matches:
                 return ToolResult(
@@ -74,17 +102,21 @@ class GlobTool(Tool):
                 )
 
             # Format output
-            output_lines = [f"Found {len(matches)} files matching '{pattern}':\n"]
+            output_lines = [f"Found {total} files matching '{pattern}':\n"]
+            prefix = os.path.join(str(search_path), '')
             for match in matches:
-                rel_path = match.relative_to(search_path) if match.is_relative_to(search_path) else match
-                output_lines.append(str(rel_path))
+                rel_path = str(match)
+                output_lines.append(rel_path[len(prefix):] if rel_path.startswith(prefix) else rel_path)
+            if total > len(matches):
+                output_lines.append(f"... {total - len(matches)} older files not shown")
 
             return ToolResult(
                 success=True,
                 output='\n'.join(output_lines),
                 metadata={
-                    'count': len(matches),
-                    'files': [str(m) for m in matches]
+                    'count': total,
+                    'files': [str(m) for m in matches],
+                    'truncated': total > len(matches)
                 }
             )
 
@@ -99,6 +131,9 @@ class GlobTool(Tool):
 class GrepTool(Tool):
     """Search file contents with regex"""
 
+    def __init__(self, engine: Optional[SearchEngine] = None):
+        self.engine = engine or SearchEngine()
+
     @property
     def name(self) -> str:
         return "grep"
@@ -130,13 +165,42 @@ class GrepTool(Tool):
                     "type": "boolean",
                     "description": "Case sensitive search (default: false)",
                     "default": False
+                },
+                "max_results": {
+                    "type": "integer",
+                    "description": "Stop after this many matching lines (default: 1000)",
+                    "default": 1000
+                },
+                "include_ignored": {
+                    "type": "boolean",
+                    "description": "Also search .gitignore'd files and build/cache directories (default: false)",
+                    "default": False
                 }
             },
             "required": ["pattern"]
         }
 
+    def stream(self, pattern: str, path: str = ".", file_pattern: str = "*",
+               case_sensitive: bool = False, max_results: Optional[int] = None,
+               include_ignored: bool = False) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield matches (file, line_num, line) as files are searched
+
+        Raises:
+            re.error: Invalid pattern
+        """
+        return self.engine.grep(
+            pattern,
+            str(Path(path).resolve()),
+            file_pattern=file_pattern,
+            case_sensitive=case_sensitive,
+            max_results=max_results,
+            include_ignored=include_ignored
+        )
+
     def execute(self, pattern: str, path: str = ".", file_pattern: str = "*",
-                case_sensitive: bool = False) -> ToolResult:
+                case_sensitive: bool = False, max_results: int = 1000,
+                include_ignored: bool = False) -> ToolResult:
         """
         Search for pattern in files
 
@@ -145,6 +209,8 @@ class GrepTool(Tool):
             path: File or directory to search
             file_pattern: Glob pattern for files to search
             case_sensitive: Case sensitive search
+            max_results: Stop after this many matching lines
+            include_ignored: Also search ignored files
 
         Returns:
             ToolResult with matching lines
@@ -159,34 +225,10 @@ class GrepTool(Tool):
                     error=f"Path not found: {path}"
                 )
 
-            # Compile regex
-            flags = 0 if case_sensitive else re.IGNORECASE
-            regex = re.compile(pattern, flags)
-
-            matches = []
-
-            # Search files
-            if search_path.is_file():
-                files_to_search = [search_path]
-            else:
-                files_to_search = list(search_path.rglob(file_pattern))
-
-            for file_path in files_to_search:
-                if not file_path.is_file():
-                    continue
-
-                try:
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        for line_num, line in enumerate(f, 1):
-                            if regex.search(line):
-                                matches.append({
-                                    'file': str(file_path),
-                                    'line_num': line_num,
-                                    'line': line.rstrip()
-                                })
-                except (UnicodeDecodeError, PermissionError):
-                    # Skip binary files or files we can't read
-                    continue
+            # Binary and ignored files are skipped; the walk stops at max_results
+            matches = list(self.stream(pattern, str(search_path), file_pattern, case_sensitive,
+                                       max_results, include_ignored))
+            truncated = len(matches) >= max_results
 
             if not matches:
                 return ToolResult(
@@ -201,13 +243,16 @@ class GrepTool(Tool):
                 output_lines.append(
                     f"{match['file']}:{match['line_num']}: {match['line']}"
                 )
+            if truncated:
+                output_lines.append(f"... stopped at {max_results} matches")
 
             return ToolResult(
                 success=True,
                 output='\n'.join(output_lines),
                 metadata={
                     'count': len(matches),
-                    'matches': matches
+                    'matches': matches,
+                    'truncated': truncated
                 }
             )
 
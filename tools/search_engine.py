@@ -0,0 +1,455 @@
+"""
+Search Engine
+Streaming file walk and content search behind GrepTool/GlobTool
+
+- Ignore rules: .gitignore files (nested, negation, dir-only, anchored),
+  common build/cache directories, binary sniffing
+- Whole-buffer regex search over memory-mapped files (no per-line loop)
+- Multi-process fan-out over batches of files, results kept in walk order
+- Lazy generators with early termination at a result limit
+"""
+
+import mmap
+import os
+import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from itertools import chain, islice
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterator, List, Optional, Tuple
+
+# Never descended into, even with include_ignored
+ALWAYS_SKIP = frozenset({'.git', '.hg', '.svn'})
+
+# Applied below any .gitignore unless include_ignored is set
+DEFAULT_IGNORES = [
+    '__pycache__/', 'node_modules/', '.venv/', 'venv/', '.tox/',
+    '.mypy_cache/', '.pytest_cache/', '*.pyc'
+]
+
+# Pattern syntax whose bytes semantics differ from a text search: '$' before
+# a CRLF line end, and \w/\b/\d/\s classes that are ASCII-only on bytes
+_TEXT_ONLY_SYNTAX = re.compile(r'\$|\\[wWbBdDsS]')
+
+SNIFF_BYTES = 8192          # A NUL byte in the first 8KB marks a binary file
+MMAP_THRESHOLD = 64 * 1024  # Smaller files are cheaper to read() than to map
+
+
+def translate_glob(pattern: str) -> str:
+    """
+    Translate a path glob into a regex matched against '/'-separated paths
+
+    '*' and '?' stay within one path component, '**' spans components
+    ('**/' also matches zero directories), [...] classes are kept.
+    """
+    out = []
+    i, n = 0, len(pattern)
+    while i < n:
+        char = pattern[i]
+        if char == '*':
+            if pattern.startswith('**', i):
+                if pattern.startswith('**/', i):
+                    out.append('(?:.*/)?')
+                    i += 3
+                else:
+                    out.append('.*')
+                    i += 2
+                continue
+            out.append('[^/]*')
+        elif char == '?':
+            out.append('[^/]')
+        elif char == '[':
+            end = pattern.find(']', i + 1)
+            if end < 0:
+                out.append(re.escape(char))
+            else:
+                body = pattern[i + 1:end]
+                if body.startswith('!'):
+                    body = '^' + body[1:]
+                out.append('[' + body.replace('\\', '\\\\') + ']')
+                i = end
+        else:
+            out.append(re.escape(char))
+        i += 1
+    return ''.join(out)
+
+
+class IgnoreRules:
+    """
+    Rules from one .gitignore (or the built-in defaults)
+
+    Paths are given relative to the directory the rules belong to. The last
+    matching rule wins; a '!' rule re-includes.
+    """
+
+    def __init__(self, lines: List[str]):
+        self.rules: List[Tuple[re.Pattern, bool, bool]] = []  # (regex, negate, dir_only)
+        for raw in lines:
+            line = raw.rstrip('\n').rstrip()
+            if not line or line.startswith('#'):
+                continue
+            negate = line.startswith('!')
+            if negate:
+                line = line[1:]
+            if line.startswith('\\'):
+                line = line[1:]
+            dir_only = line.endswith('/')
+            line = line.rstrip('/')
+            if not line:
+                continue
+            # A slash anywhere but the end anchors the pattern to this directory
+            if '/' in line:
+                regex = translate_glob(line.lstrip('/'))
+            else:
+                regex = '(?:.*/)?' + translate_glob(line)
+            self.rules.append((re.compile(regex + r'\Z', re.DOTALL), negate, dir_only))
+
+    @classmethod
+    def from_file(cls, path: Path) -> Optional['IgnoreRules']:
+        try:
+            rules = cls(path.read_text(encoding='utf-8', errors='ignore').splitlines())
+        except OSError:
+            return None
+        return rules if rules.rules else None
+
+    def match(self, rel_path: str, is_dir: bool) -> Optional[bool]:
+        """True = ignored, False = re-included, None = no rule applies"""
+        result = None
+        for regex, negate, dir_only in self.rules:
+            if dir_only and not is_dir:
+                continue
+            if regex.match(rel_path):
+                result = not negate
+        return result
+
+
+def is_binary(head: bytes) -> bool:
+    """Binary sniff: NUL byte in the first block"""
+    return b'\0' in head[:SNIFF_BYTES]
+
+
+def _compile(pattern, flags: int) -> re.Pattern:
+    # Whole-buffer search: '^'/'$' must still mean line start/end
+    return re.compile(pattern, flags | re.MULTILINE)
+
+
+def _search_buffer(buf, regex: re.Pattern, newline, limit: int) -> List[Tuple[int, Any]]:
+    """(line number, raw line) for each line containing a match, at most limit"""
+    found = []
+    line_num = 1
+    counted_to = 0
+    pos = 0
+    size = len(buf)
+
+    while pos <= size and len(found) < limit:
+        match = regex.search(buf, pos)
+        if match is None:
+            break
+        start = match.start()
+        line_start = buf.rfind(newline, 0, start) + 1
+        line_end = buf.find(newline, start)
+        if line_end < 0:
+            line_end = size
+
+        line_num += buf[counted_to:line_start].count(newline)
+        counted_to = line_start
+        found.append((line_num, buf[line_start:line_end]))
+
+        # One hit per line, as before
+        pos = line_end + 1
+    return found
+
+
+def search_file(path: str, pattern: str, flags: int, limit: int) -> List[Dict[str, Any]]:
+    """
+    Search one file
+
+    ASCII patterns run as bytes regexes over the raw (memory-mapped) buffer.
+    Patterns that need text semantics (non-ASCII, '$', word/digit/space
+    classes) search the decoded text with line endings normalised, like the
+    old line-by-line text-mode search.
+
+    Returns:
+        Match dicts (file, line_num, line); empty for binary/unreadable files
+    """
+    try:
+        with open(path, 'rb') as f:
+            head = f.read(SNIFF_BYTES)
+            if not head or is_binary(head):
+                return []
+            size = os.fstat(f.fileno()).st_size
+            mapped = None
+            if size > MMAP_THRESHOLD:
+                mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+                buf = mapped
+            else:
+                buf = head + f.read()
+
+            try:
+                if pattern.isascii() and not _TEXT_ONLY_SYNTAX.search(pattern):
+                    regex = _compile(pattern.encode(), flags)
+                    hits = _search_buffer(buf, regex, b'\n', limit)
+                    lines = [(num, raw.decode('utf-8', errors='replace')) for num, raw in hits]
+                else:
+                    text = bytes(buf).decode('utf-8', errors='replace')
+                    text = text.replace('\r\n', '\n').replace('\r', '\n')
+                    lines = _search_buffer(text, _compile(pattern, flags), '\n', limit)
+            finally:
+                if mapped is not None:
+                    mapped.close()
+    except (OSError, ValueError):
+        return []
+
+    return [{'file': path, 'line_num': num, 'line': line.rstrip()} for num, line in lines]
+
+
+def _search_batch(paths: List[str], pattern: str, flags: int, limit: int) -> List[Dict[str, Any]]:
+    """Worker entry point: search a batch of files, stopping at limit matches"""
+    found: List[Dict[str, Any]] = []
+    for path in paths:
+        found.extend(search_file(path, pattern, flags, limit - len(found)))
+        if len(found) >= limit:
+            break
+    return found
+
+
+class SearchEngine:
+    """
+    Streaming walker and grep
+
+    Directories are walked lazily (sorted, symlinked directories not
+    followed) and pruned by ignore rules before descending. grep() searches
+    the first files in-process and only starts a process pool once the
+    walk proves large enough to amortise it.
+    """
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        parallel_threshold: int = 200,
+        batch_size: int = 64
+    ):
+        """
+        Initialize search engine
+
+        Args:
+            max_workers: Worker processes for grep (default: CPU count; 1 = no pool)
+            parallel_threshold: Files searched in-process before fanning out
+            batch_size: Files per worker task
+        """
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.parallel_threshold = parallel_threshold
+        self.batch_size = batch_size
+        self._defaults = IgnoreRules(DEFAULT_IGNORES)
+
+    # ==================== WALK ====================
+
+    def walk(
+        self,
+        root: str,
+        pattern: Optional[str] = None,
+        include_ignored: bool = False,
+        include_dirs: bool = False,
+        anchored: bool = False
+    ) -> Iterator[Path]:
+        """
+        Lazily yield paths under root
+
+        Args:
+            root: Directory to walk
+            pattern: Glob matched against the path relative to root
+            include_ignored: Ignore .gitignore and the built-in ignores
+            include_dirs: Yield matching directories too
+            anchored: Match the pattern from root like Path.glob ('*.py' is
+                top-level only); otherwise it may match at any depth like
+                Path.rglob
+
+        Yields:
+            Matching paths, in sorted walk order
+        """
+        root_path = Path(root)
+        start = root_path
+        regex = None
+        max_depth = None  # Deepest directory level worth descending into
+
+        if pattern:
+            if anchored:
+                # Walk only below the literal prefix ('src/**/*.js' starts in src/)
+                literal = []
+                for part in pattern.split('/')[:-1]:
+                    if any(c in part for c in '*?['):
+                        break
+                    literal.append(part)
+                start = root_path.joinpath(*literal)
+                regex = re.compile(translate_glob(pattern) + r'\Z', re.DOTALL)
+                if '**' not in pattern:
+                    max_depth = pattern.count('/')
+            else:
+                regex = re.compile(r'(?:.*/)?' + translate_glob(pattern) + r'\Z', re.DOTALL)
+
+        if not start.is_dir():
+            return
+
+        base_rules = [] if include_ignored else [('', self._defaults)]
+        stack: List[Tuple[Path, str, List[Tuple[str, IgnoreRules]]]] = [
+            (start, start.relative_to(root_path).as_posix() if start != root_path else '', base_rules)
+        ]
+
+        while stack:
+            directory, rel_dir, rules = stack.pop()
+            if not include_ignored:
+                local = IgnoreRules.from_file(directory / '.gitignore')
+                if local:
+                    rules = rules + [(rel_dir, local)]
+
+            try:
+                with os.scandir(directory) as it:
+                    entries = sorted(it, key=lambda e: e.name)
+            except OSError:
+                continue
+
+            subdirs = []
+            for entry in entries:
+                try:
+                    is_dir = entry.is_dir(follow_symlinks=False)
+                except OSError:
+                    continue
+                if is_dir and entry.name in ALWAYS_SKIP:
+                    continue
+                rel = f"{rel_dir}/{entry.name}" if rel_dir else entry.name
+                if rules and self._ignored(rules, rel, is_dir):
+                    continue
+
+                if is_dir:
+                    if max_depth is None or rel.count('/') < max_depth:
+                        subdirs.append((Path(entry.path), rel, rules))
+                    if not include_dirs:
+                        continue
+                elif not entry.is_file():
+                    continue
+
+                if regex is None or regex.match(rel):
+                    yield Path(entry.path)
+
+            stack.extend(reversed(subdirs))
+
+    @staticmethod
+    def _ignored(rules: List[Tuple[str, IgnoreRules]], rel: str, is_dir: bool) -> bool:
+        ignored = False
+        for base, ruleset in rules:
+            if base:
+                if not rel.startswith(base + '/'):
+                    continue
+                local = rel[len(base) + 1:]
+            else:
+                local = rel
+            verdict = ruleset.match(local, is_dir)
+            if verdict is not None:
+                ignored = verdict
+        return ignored
+
+    # ==================== GREP ====================
+
+    def grep(
+        self,
+        pattern: str,
+        root: str,
+        file_pattern: str = '*',
+        case_sensitive: bool = False,
+        max_results: Optional[int] = None,
+        include_ignored: bool = False
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Lazily yield matching lines
+
+        Args:
+            pattern: Regular expression (re syntax; '^'/'$' match at line boundaries)
+            root: File or directory to search
+            file_pattern: Glob filter for files (see walk)
+            case_sensitive: Case sensitive search
+            max_results: Stop after this many matches (None = all)
+            include_ignored: Also search ignored files
+
+        Yields:
+            Dicts with file, line_num, line - in walk order
+
+        Raises:
+            re.error: Invalid pattern
+        """
+        flags = 0 if case_sensitive else re.IGNORECASE
+        re.compile(pattern, flags)  # Fail fast on a bad pattern, before any fan-out
+        limit = max_results if max_results is not None else float('inf')
+        if limit <= 0:
+            return
+
+        root_path = Path(root)
+        if root_path.is_file():
+            files: Iterator[str] = iter([str(root_path)])
+        else:
+            files = (str(p) for p in self.walk(root, file_pattern, include_ignored))
+
+        emitted = 0
+        per_file_cap = int(min(limit, 2 ** 31))
+
+        # In-process until the walk proves large enough for a pool
+        head = list(islice(files, self.parallel_threshold))
+        for path in head:
+            for match in search_file(path, pattern, flags, per_file_cap - emitted):
+                yield match
+                emitted += 1
+                if emitted >= limit:
+                    return
+
+        if len(head) < self.parallel_threshold or self.max_workers <= 1:
+            for path in files:
+                for match in search_file(path, pattern, flags, per_file_cap - emitted):
+                    yield match
+                    emitted += 1
+                    if emitted >= limit:
+                        return
+            return
+
+        yield from self._grep_parallel(files, pattern, flags, limit, emitted)
+
+    def _grep_parallel(self, files: Iterator[str], pattern: str, flags: int,
+                       limit: float, emitted: int) -> Iterator[Dict[str, Any]]:
+        """Fan batches out to worker processes, yielding in submission order"""
+        pending: Deque[Tuple[List[str], Future]] = deque()
+        max_pending = self.max_workers * 4
+        pool = None
+
+        try:
+            pool = ProcessPoolExecutor(max_workers=self.max_workers)
+            while True:
+                while len(pending) < max_pending:
+                    batch = list(islice(files, self.batch_size))
+                    if not batch:
+                        break
+                    cap = int(min(limit - emitted, 2 ** 31))
+                    pending.append((batch, pool.submit(_search_batch, batch, pattern, flags, cap)))
+                if not pending:
+                    return
+
+                for match in pending[0][1].result():
+                    yield match
+                    emitted += 1
+                    if emitted >= limit:
+                        return
+                pending.popleft()
+
+        except (OSError, BrokenProcessPool):
+            # No usable pool: finish unfinished batches and the rest of the walk in-process
+            leftover = (path for batch, _ in pending for path in batch)
+            pending.clear()
+            for path in chain(leftover, files):
+                for match in search_file(path, pattern, flags, int(min(limit - emitted, 2 ** 31))):
+                    yield match
+                    emitted += 1
+                    if emitted >= limit:
+                        return
+        finally:
+            for _, future in pending:
+                future.cancel()
+            if pool is not None:
+                pool.shutdown(wait=False, cancel_futures=True)